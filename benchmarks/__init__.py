@@ -0,0 +1 @@
+"""Benchmarks of the nfch operations whose cost grows with the number of files, run with "python -m benchmarks.run"."""
@@ -0,0 +1,236 @@
+"""Time the nfch operations whose cost grows with the number of files, on synthetic trees of increasing size.
+
+Results are written as json files named after the nfch version, so that runs of different versions can be compared
+with "--compare".
+"""
+
+import contextlib
+import io
+import json
+import platform
+import tempfile
+import time
+from collections.abc import Callable
+from datetime import datetime
+from importlib.metadata import version
+from pathlib import Path
+from typing import Annotated, Any, NamedTuple
+
+import typer
+from rich import box
+from rich import print as rich_print
+from rich.table import Table
+
+from benchmarks import trees
+from nfch import utils
+from nfch.disk_usage import DiskUsage
+from nfch.file_manager import FileManager
+from nfch.genomes import GenomePathValidator
+from nfch.samplesheet import find_fastqs
+
+RESULTS_FOLDER: Path = Path(__file__).parent / "results"
+DEFAULT_SIZES: tuple[int, ...] = (10_000, 100_000)
+# genomes.json files hold a handful of builds, their size is the number of builds rather than files
+GENOME_BUILDS: dict[int, int] = {10_000: 10, 100_000: 100, 1_000_000: 1_000}
+
+app = typer.Typer()
+
+
+class Benchmark(NamedTuple):
+    """An operation and the tree it runs on, "setup" returns the argument of "run"."""
+
+    setup: Callable[[Path, int], Any]
+    run: Callable[[Any], Any]
+
+
+def _clean(wf_folder: Path) -> None:
+    """Remove a whole work folder, the messages of the command are discarded."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        FileManager.clean(wf_folder=wf_folder)
+
+
+def _du(wf_folder: Path, *, use_cache: bool) -> None:
+    """Scan a workflow folder, the cache being written to the benchmark folder."""
+    disk_usage: DiskUsage = DiskUsage(wf_folder=wf_folder, cache_file=wf_folder / "du.json")
+    disk_usage.scan(use_cache=use_cache)
+
+
+def _setup_work_tree(folder: Path, size: int) -> Path:
+    """Create a work tree, the benchmarks run on its workflow folder."""
+    trees.make_work_tree(wf_folder=folder, files=size)
+    return folder
+
+
+def _setup_cached_du(folder: Path, size: int) -> Path:
+    """Create a work tree and scan it once, so that the benchmark measures a scan answered from the cache."""
+    trees.make_work_tree(wf_folder=folder, files=size)
+    _du(wf_folder=folder, use_cache=False)
+    return folder
+
+
+def _validate(genomes_json: Path) -> None:
+    """Validate and deep check all builds of a genomes.json file, without stat cache."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        GenomePathValidator().validate(genomes=utils.json_to_dict(file_path=genomes_json), deep=True)
+
+
+BENCHMARKS: dict[str, Benchmark] = {
+    "clean": Benchmark(
+        setup=_setup_work_tree,
+        run=_clean,
+    ),
+    "du": Benchmark(
+        setup=_setup_work_tree,
+        run=lambda folder: _du(wf_folder=folder, use_cache=False),
+    ),
+    "du_cached": Benchmark(setup=_setup_cached_du, run=lambda folder: _du(wf_folder=folder, use_cache=True)),
+    "find_fastqs": Benchmark(
+        setup=lambda folder, size: trees.make_fastq_folder(folder=folder, files=size),
+        run=lambda folder: find_fastqs(fastq_dirs=[folder]),
+    ),
+    "validate_genomes": Benchmark(
+        setup=lambda folder, size: trees.make_genomes_json(
+            folder=folder, builds=GENOME_BUILDS.get(size, max(1, size // 1000))
+        ),
+        run=_validate,
+    ),
+}
+
+
+def measure(benchmark: Benchmark, size: int, repeats: int, base_folder: Path | None) -> list[float]:
+    """Time an operation on fresh trees, the creation of the trees is not timed.
+
+    Parameters
+    ----------
+    benchmark : Benchmark
+        Operation of interest
+    size : int
+        Number of files of the tree
+    repeats : int
+        Number of timed runs, each on a new tree since some operations (e.g. clean) consume it
+    base_folder : Path | None
+        Folder the trees are created in, e.g. on the filesystem of interest, by default the temporary folder
+
+    Returns
+    -------
+    list[float]
+        Duration of every run in seconds
+
+    """
+    durations: list[float] = []
+    for _ in range(repeats):
+        with tempfile.TemporaryDirectory(dir=base_folder, prefix="nfch_benchmark_") as folder:
+            argument: Any = benchmark.setup(Path(folder) / "tree", size)
+            start: float = time.perf_counter()
+            benchmark.run(argument)
+            durations.append(time.perf_counter() - start)
+    return durations
+
+
+def compare(results: list[dict[str, Any]], reference_file: Path) -> None:
+    """Print the ratio between the durations of two runs, > 1 meaning slower than the reference."""
+    reference: dict[tuple[str, int], float] = {
+        (result["name"], result["size"]): result["seconds"]
+        for result in json.loads(reference_file.read_text(encoding="utf-8"))["results"]
+    }
+    table: Table = Table(title=f'Compared to "{reference_file.name}"', box=box.SIMPLE)
+    for column in ("Benchmark", "Size", "Reference (s)", "Now (s)", "Ratio"):
+        table.add_column(header=column, justify="left" if column == "Benchmark" else "right")
+    for result in results:
+        before: float | None = reference.get((result["name"], result["size"]))
+        ratio: str = f"{result['seconds'] / before:.2f}" if before else "-"
+        table.add_row(
+            result["name"],
+            f"{result['size']:,}",
+            "-" if before is None else f"{before:.3f}",
+            f"{result['seconds']:.3f}",
+            ratio,
+        )
+    rich_print(table)
+
+
+@app.command()
+def run(  # noqa: PLR0913, PLR0917
+    names: Annotated[
+        list[str] | None,
+        typer.Argument(help=f"Benchmarks to be run, by default all of them: {', '.join(BENCHMARKS)}."),
+    ] = None,
+    sizes: Annotated[
+        list[int] | None,
+        typer.Option("--size", help="Number of files of the trees, repeatable, e.g. --size 1000000."),
+    ] = None,
+    repeats: Annotated[int, typer.Option(help="Number of timed runs, the fastest one is kept.")] = 3,
+    base_folder: Annotated[
+        Path | None,
+        typer.Option(help="Folder the trees are created in, e.g. on a network filesystem, by default /tmp."),
+    ] = None,
+    output: Annotated[
+        Path | None,
+        typer.Option(help="Json file receiving the results, by default results/<version>_<date>.json."),
+    ] = None,
+    reference: Annotated[
+        Path | None,
+        typer.Option("--compare", help="Results of a previous run to be compared with."),
+    ] = None,
+) -> None:
+    """Run the benchmarks and write their results as json.
+
+    Parameters
+    ----------
+    names : Annotated[ list[str] | None, typer.Argument, optional
+        Benchmarks to be run, by default None (all of them)
+    sizes : Annotated[ list[int] | None, typer.Option, optional
+        Number of files of the trees, by default None (DEFAULT_SIZES)
+    repeats : Annotated[ int, typer.Option, optional
+        Number of timed runs, by default 3
+    base_folder : Annotated[ Path | None, typer.Option, optional
+        Folder the trees are created in, by default None (the temporary folder)
+    output : Annotated[ Path | None, typer.Option, optional
+        Json file receiving the results, by default None (RESULTS_FOLDER/<version>_<date>.json)
+    reference : Annotated[ Path | None, typer.Option, optional
+        Results of a previous run to be compared with, by default None
+
+    """
+    unknown: list[str] = [name for name in names or [] if name not in BENCHMARKS]
+    if unknown:
+        utils.fail(message=f"Unknown benchmark(s) {', '.join(unknown)}, choose among {', '.join(BENCHMARKS)}!")
+        raise typer.Exit(code=1)
+
+    results: list[dict[str, Any]] = []
+    for name in names or list(BENCHMARKS):
+        for size in sizes or DEFAULT_SIZES:
+            utils.processing(message=f"{name} on {size:,} files...")
+            durations: list[float] = measure(
+                benchmark=BENCHMARKS[name],
+                size=size,
+                repeats=repeats,
+                base_folder=base_folder,
+            )
+            results.append(
+                {
+                    "name": name,
+                    "size": size,
+                    "seconds": round(min(durations), 4),
+                    "runs": [round(d, 4) for d in durations],
+                },
+            )
+            utils.success(message=f"{min(durations):.3f} s", level=1)
+
+    report: dict[str, Any] = {
+        "nfch_version": version("nfch"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "date": datetime.now().astimezone().isoformat(timespec="seconds"),
+        "filesystem": str(base_folder or tempfile.gettempdir()),
+        "results": results,
+    }
+    output = output or RESULTS_FOLDER / f"{report['nfch_version']}_{datetime.now().astimezone():%Y%m%d_%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+    utils.success(message=f'The results have been written to "{output}".')
+    if reference is not None:
+        compare(results=results, reference_file=reference)
+
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,130 @@
+"""Generators of synthetic Nextflow trees, FASTQ folders and genomes.json files of a given size.
+
+Files are empty (or a few bytes) since the operations benchmarked are bound by the number of directory entries and
+metadata calls, not by the amount of data.
+"""
+
+import json
+from pathlib import Path
+
+from nfch.genomes import EXPECTED_INDEX_FILES
+
+# files of a typical task folder, besides its outputs
+TASK_FILES: tuple[str, ...] = (
+    ".command.sh",
+    ".command.run",
+    ".command.out",
+    ".command.err",
+    ".command.log",
+    ".exitcode",
+)
+
+
+def make_work_tree(
+    wf_folder: Path,
+    files: int,
+    files_per_task: int = 10,
+    prefixes: int = 256,
+    symlinks: int = 2,
+) -> Path:
+    """Create a "run/work" folder with "xx/<hash>" task folders, as written by Nextflow.
+
+    Parameters
+    ----------
+    wf_folder : Path
+        Workflow folder to be created
+    files : int
+        Total number of files (symlinks included)
+    files_per_task : int, optional
+        Number of files per task folder, by default 10
+    prefixes : int, optional
+        Number of hash prefix folders ("work/00" to "work/ff"), by default 256
+    symlinks : int, optional
+        Number of files of each task staged as symlinks to the outputs of another task, by default 2
+
+    Returns
+    -------
+    Path
+        The work folder
+
+    """
+    work_folder: Path = wf_folder / "run" / "work"
+    tasks: int = max(1, files // files_per_task)
+    previous: Path | None = None
+    for task in range(tasks):
+        task_folder: Path = work_folder / f"{task % prefixes:02x}" / f"{task:030x}"
+        task_folder.mkdir(parents=True)
+        names: list[str] = [*TASK_FILES, *(f"output_{number}.txt" for number in range(files_per_task))]
+        outputs: list[str] = names[: files_per_task - symlinks]
+        for name in outputs:
+            (task_folder / name).write_bytes(b"x")
+        for number in range(symlinks):
+            target: Path = (previous or task_folder) / outputs[-1]
+            (task_folder / f"input_{number}.txt").symlink_to(target)
+        previous = task_folder
+    return work_folder
+
+
+def make_fastq_folder(folder: Path, files: int, files_per_folder: int = 100) -> Path:
+    """Create a sequencing delivery: one folder per run and lane, paired R1/R2 FASTQ files.
+
+    Parameters
+    ----------
+    folder : Path
+        Folder to be created
+    files : int
+        Total number of FASTQ files
+    files_per_folder : int, optional
+        Number of files per run/lane folder, by default 100
+
+    Returns
+    -------
+    Path
+        The folder
+
+    """
+    for number in range(max(2, files) // 2):
+        lane_folder: Path = folder / f"run_{number // files_per_folder:04d}" / f"L{number % 4 + 1:03d}"
+        lane_folder.mkdir(parents=True, exist_ok=True)
+        for read in ("R1", "R2"):
+            (lane_folder / f"sample{number:07d}_S{number}_L{number % 4 + 1:03d}_{read}_001.fastq.gz").touch()
+        # files that are not FASTQ files, found next to them in deliveries
+        if number % files_per_folder == 0:
+            (lane_folder / "md5sums.txt").touch()
+    return folder
+
+
+def make_genomes_json(folder: Path, builds: int) -> Path:
+    """Create a genomes.json file with fasta/gtf files and complete nfcore/rnaseq indexes for every build.
+
+    Parameters
+    ----------
+    folder : Path
+        Folder receiving the reference files and the json file
+    builds : int
+        Number of genome builds
+
+    Returns
+    -------
+    Path
+        The genomes.json file
+
+    """
+    folder.mkdir(parents=True, exist_ok=True)
+    genomes: dict[str, dict[str, str]] = {}
+    for build in range(builds):
+        build_folder: Path = folder / f"build_{build:05d}"
+        for index, index_files in EXPECTED_INDEX_FILES.items():
+            (build_folder / "index" / index).mkdir(parents=True)
+            for index_file in index_files:
+                (build_folder / "index" / index / index_file).touch()
+        for file_name in ("genome.fa", "genes.gtf", "genes.bed"):
+            (build_folder / file_name).touch()
+        genomes[f"build_{build:05d}"] = {
+            "fasta": str(build_folder / "genome.fa"),
+            "gtf": str(build_folder / "genes.gtf"),
+            "nfcore_rnaseq_index": str(build_folder),
+        }
+    genomes_json: Path = folder / "genomes.json"
+    genomes_json.write_text(json.dumps(genomes, indent=2), encoding="utf-8")
+    return genomes_json
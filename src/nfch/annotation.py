@@ -0,0 +1,409 @@
+"""Module containing the class GeneTable, a compact, memory-mappable index of the genes and transcripts of a gtf file.
+
+A gtf file (optionally gzip compressed) is streamed once per build: genes, transcripts and exons are kept as numpy
+arrays with an interval index, saved as .npy files in the annotation cache ("nfch.reference_store.AnnotationCache") and
+memory-mapped on later loads. The gene bed and features files are written next to them, so that they can be passed to
+the pipelines without streaming the gtf again.
+
+It requires the optional "numpy" package: pip install "nfch[analysis]".
+"""
+
+import gzip
+import json
+import os
+import re
+import shutil
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+from typing import IO, Any
+
+import numpy as np
+
+from nfch import profiling
+from nfch.reference_store import FEATURES_FILE, GENE_BED_FILE
+
+CACHE_VERSION: int = 1
+FEATURES_COLUMNS: tuple[str, ...] = ("gene_id", "gene_name", "gene_biotype")
+ARRAYS: tuple[str, ...] = (
+    "gene_ids",
+    "gene_names",
+    "gene_biotypes",
+    "gene_contigs",
+    "gene_starts",
+    "gene_ends",
+    "gene_strands",
+    "transcript_ids",
+    "transcript_genes",
+    "transcript_starts",
+    "transcript_ends",
+    "transcript_cds",
+    "exon_transcripts",
+    "exon_starts",
+    "exon_ends",
+    "interval_order",
+    "interval_max_ends",
+)
+ATTRIBUTE: re.Pattern[str] = re.compile(r'(\w+) "([^"]*)"')
+GENE_ID: re.Pattern[str] = re.compile(r'gene_id "([^"]*)"')
+TRANSCRIPT_ID: re.Pattern[str] = re.compile(r'transcript_id "([^"]*)"')
+STRANDS: dict[str, int] = {"+": 1, "-": -1}
+BED_STRANDS: dict[int, str] = {1: "+", -1: "-", 0: "."}
+
+
+def open_text(file_path: Path) -> IO[str]:
+    """Open a text file for reading, decompressing it if it is gzip compressed (whatever its extension)."""
+    with file_path.open(mode="rb") as binary_file:
+        compressed: bool = binary_file.read(2) == b"\x1f\x8b"
+    if compressed:
+        return gzip.open(file_path, mode="rt", encoding="utf-8")
+    return file_path.open(mode="r", encoding="utf-8")
+
+
+class _Features:
+    """Genes, transcripts and exons gathered from the lines of a gtf file.
+
+    Genes and transcripts are taken from their own lines when present, otherwise (e.g. UCSC gtf files) their extent is
+    derived from their transcripts and exons.
+    """
+
+    def __init__(self) -> None:
+        """Instantiate empty features."""
+        # gene ID: [contig, start, end, strand, name, biotype], transcript ID: [gene ID, start, end, own line, cds]
+        self.genes: dict[str, list[Any]] = {}
+        self.transcripts: dict[str, list[Any]] = {}
+        self.exons: list[tuple[str, int, int]] = []
+        self.derived: set[str] = set()
+
+    @staticmethod
+    def _extend(extent: list[Any], start: int, end: int) -> None:
+        """Widen the [start, end) extent of a gene or transcript derived from its features."""
+        extent[1] = min(extent[1], start)
+        extent[2] = max(extent[2], end)
+
+    def add_gene(self, fields: list[str], values: dict[str, str], start: int, end: int) -> None:
+        """Add a gene from its own line or, until its line is found, from the line of one of its features."""
+        gene_id: str = values["gene_id"]
+        gene: list[Any] | None = self.genes.get(gene_id)
+        if fields[2] == "gene" or gene is None:
+            self.genes[gene_id] = [
+                fields[0],
+                start,
+                end,
+                STRANDS.get(fields[6], 0),
+                values.get("gene_name", gene_id),
+                values.get("gene_biotype", values.get("gene_type", "")),
+            ]
+            (self.derived.discard if fields[2] == "gene" else self.derived.add)(gene_id)
+        elif gene_id in self.derived:
+            self._extend(extent=gene, start=start, end=end)
+            gene[4] = values.get("gene_name", gene[4])
+
+    def add_transcript(self, feature: str, values: dict[str, str], start: int, end: int) -> None:
+        """Add a transcript from its own line or, until its line is found, from the line of one of its exons."""
+        transcript_id: str = values["transcript_id"]
+        transcript: list[Any] | None = self.transcripts.get(transcript_id)
+        if transcript is None:
+            self.transcripts[transcript_id] = [values["gene_id"], start, end, feature == "transcript", []]
+        elif feature == "transcript":
+            transcript[1:4] = [start, end, True]
+        elif not transcript[3]:
+            self._extend(extent=transcript, start=start, end=end)
+
+    def add_cds(self, transcript_id: str, start: int, end: int) -> None:
+        """Widen the coding part of a transcript."""
+        transcript: list[Any] | None = self.transcripts.get(transcript_id)
+        if transcript is not None:
+            cds: list[int] = transcript[4]
+            transcript[4] = [min(start, cds[0]), max(end, cds[1])] if cds else [start, end]
+
+    def read(self, lines: Iterable[str]) -> None:
+        """Gather the features of gtf lines, other features (UTRs, codons, etc.) are skipped."""
+        for line in lines:
+            fields: list[str] = line.split("\t", maxsplit=8)
+            if len(fields) < 9 or fields[2] not in {"gene", "transcript", "exon", "CDS"}:  # noqa: PLR2004
+                continue
+            feature, start, end, attributes = fields[2], int(fields[3]) - 1, int(fields[4]), fields[8]
+            if feature in {"exon", "CDS"}:
+                # the bulk of the lines, only the IDs are extracted
+                gene_match: re.Match[str] | None = GENE_ID.search(attributes)
+                transcript_match: re.Match[str] | None = TRANSCRIPT_ID.search(attributes)
+                if gene_match is None or transcript_match is None:
+                    continue
+                values: dict[str, str] = {"gene_id": gene_match.group(1), "transcript_id": transcript_match.group(1)}
+                if feature == "exon" and values["gene_id"] not in self.genes:
+                    # the first exon of a gene without line (yet) also gives its name and biotype
+                    values = {**dict(ATTRIBUTE.findall(attributes)), **values}
+            else:
+                values = dict(ATTRIBUTE.findall(attributes))
+                if "gene_id" not in values or (feature == "transcript" and "transcript_id" not in values):
+                    continue
+            if feature == "CDS":
+                self.add_cds(transcript_id=values["transcript_id"], start=start, end=end)
+                continue
+            self.add_gene(fields=fields, values=values, start=start, end=end)
+            if feature == "exon":
+                self.exons.append((values["transcript_id"], start, end))
+            if feature != "gene":
+                self.add_transcript(feature=feature, values=values, start=start, end=end)
+
+
+class GeneTable:
+    """Genes, transcripts and exons of a gtf file, in 0-based half-open coordinates (as in bed files).
+
+    Genes are in order of appearance in the gtf, transcripts refer to their gene and exons to their transcript by row.
+    Genes are indexed by position: "interval_order" sorts them by contig and start and "interval_max_ends" holds the
+    running maximum of their ends within each contig, so that overlap queries are binary searches.
+    """
+
+    def __init__(self, contigs: list[str], arrays: dict[str, np.ndarray]) -> None:
+        """Instantiate the table.
+
+        Parameters
+        ----------
+        contigs : list[str]
+            Contig names, "gene_contigs" holds indexes into this list
+        arrays : dict[str, np.ndarray]
+            Columns of the table, one per name of ARRAYS
+
+        """
+        self.contigs: list[str] = contigs
+        self.contig_index: dict[str, int] = {contig: index for index, contig in enumerate(contigs)}
+        self.arrays: dict[str, np.ndarray] = arrays
+        self.gene_ids: np.ndarray = arrays["gene_ids"]
+        self.gene_names: np.ndarray = arrays["gene_names"]
+        self.gene_biotypes: np.ndarray = arrays["gene_biotypes"]
+
+    @classmethod
+    def parse(cls, file_path: Path) -> "GeneTable":
+        """Parse a gtf file, streamed line by line.
+
+        Parameters
+        ----------
+        file_path : Path
+            Gtf file, optionally gzip compressed
+
+        Returns
+        -------
+        GeneTable
+            Parsed table
+
+        """
+        with profiling.span("gtf parse", path=file_path), open_text(file_path=file_path) as gtf_file:
+            features: _Features = _Features()
+            features.read(lines=gtf_file)
+        genes, transcripts, exons = features.genes, features.transcripts, features.exons
+
+        contigs: list[str] = list(dict.fromkeys(gene[0] for gene in genes.values()))
+        contig_index: dict[str, int] = {contig: index for index, contig in enumerate(contigs)}
+        gene_rows: dict[str, int] = {gene_id: row for row, gene_id in enumerate(genes)}
+        transcript_rows: dict[str, int] = {transcript_id: row for row, transcript_id in enumerate(transcripts)}
+        exons.sort(key=lambda exon: (transcript_rows[exon[0]], exon[1]))
+        # transcripts without CDS have an empty thick part at their start, as in the bed files of UCSC
+        cds: list[list[int]] = [transcript[4] or [transcript[1], transcript[1]] for transcript in transcripts.values()]
+
+        arrays: dict[str, np.ndarray] = {
+            "gene_ids": np.array(list(genes), dtype=str),
+            "gene_names": np.array([gene[4] for gene in genes.values()], dtype=str),
+            "gene_biotypes": np.array([gene[5] for gene in genes.values()], dtype=str),
+            "gene_contigs": np.array([contig_index[gene[0]] for gene in genes.values()], dtype=np.int32),
+            "gene_starts": np.array([gene[1] for gene in genes.values()], dtype=np.int64),
+            "gene_ends": np.array([gene[2] for gene in genes.values()], dtype=np.int64),
+            "gene_strands": np.array([gene[3] for gene in genes.values()], dtype=np.int8),
+            "transcript_ids": np.array(list(transcripts), dtype=str),
+            "transcript_genes": np.array(
+                [gene_rows[transcript[0]] for transcript in transcripts.values()],
+                dtype=np.int32,
+            ),
+            "transcript_starts": np.array([transcript[1] for transcript in transcripts.values()], dtype=np.int64),
+            "transcript_ends": np.array([transcript[2] for transcript in transcripts.values()], dtype=np.int64),
+            "transcript_cds": np.array(cds, dtype=np.int64).reshape(-1, 2),
+            "exon_transcripts": np.array([transcript_rows[exon[0]] for exon in exons], dtype=np.int32),
+            "exon_starts": np.array([exon[1] for exon in exons], dtype=np.int64),
+            "exon_ends": np.array([exon[2] for exon in exons], dtype=np.int64),
+        }
+        order: np.ndarray = np.lexsort((arrays["gene_starts"], arrays["gene_contigs"]))
+        max_ends: np.ndarray = arrays["gene_ends"][order].copy()
+        sorted_contigs: np.ndarray = arrays["gene_contigs"][order]
+        for contig in range(len(contigs)):
+            lower, upper = np.searchsorted(sorted_contigs, [contig, contig + 1])
+            max_ends[lower:upper] = np.maximum.accumulate(max_ends[lower:upper])
+        arrays["interval_order"] = order.astype(np.int64)
+        arrays["interval_max_ends"] = max_ends
+        return cls(contigs=contigs, arrays=arrays)
+
+    def save(self, folder: Path, source: Path) -> None:
+        """Save the table as .npy files with its gene bed and features files, the metadata (written last) completing it.
+
+        The table is written to a temporary folder renamed into place, a table saved meanwhile by another process is
+        kept.
+
+        Parameters
+        ----------
+        folder : Path
+            Cache folder of the gtf
+        source : Path
+            Gtf file the table was parsed from
+
+        """
+        partial: Path = folder.with_name(f".{folder.name}.partial-{os.getpid()}")
+        shutil.rmtree(partial, ignore_errors=True)
+        partial.mkdir(parents=True)
+        for name in ARRAYS:
+            np.save(file=partial / f"{name}.npy", arr=self.arrays[name])
+        with (partial / GENE_BED_FILE).open(mode="w", encoding="utf-8") as bed_file:
+            bed_file.writelines(self.bed_lines())
+        self.write_features(file_path=partial / FEATURES_FILE)
+        metadata: dict[str, Any] = {
+            "version": CACHE_VERSION,
+            "gtf": str(source.absolute()),
+            "contigs": self.contigs,
+            "genes": len(self.gene_ids),
+            "transcripts": len(self.arrays["transcript_ids"]),
+        }
+        (partial / "metadata.json").write_text(json.dumps(metadata), encoding="utf-8")
+        try:
+            partial.rename(folder)
+        except OSError:
+            # built concurrently by another process
+            shutil.rmtree(partial, ignore_errors=True)
+
+    @classmethod
+    def load(cls, gtf: Path, folder: Path, *, use_cache: bool = True) -> "GeneTable":
+        """Load the table of a gtf file, memory-mapped from its cache folder, which is built if missing.
+
+        Parameters
+        ----------
+        gtf : Path
+            Gtf file, optionally gzip compressed
+        folder : Path
+            Cache folder of the gtf, see AnnotationCache.folder
+        use_cache : bool, optional
+            Read and write the cache, by default True
+
+        Returns
+        -------
+        GeneTable
+            Table of the gtf
+
+        """
+        metadata_file: Path = folder / "metadata.json"
+        if use_cache and metadata_file.is_file():
+            metadata: dict[str, Any] = json.loads(metadata_file.read_text(encoding="utf-8"))
+            if metadata.get("version") == CACHE_VERSION:
+                return cls(
+                    contigs=metadata["contigs"],
+                    arrays={name: np.load(file=folder / f"{name}.npy", mmap_mode="r") for name in ARRAYS},
+                )
+            shutil.rmtree(folder, ignore_errors=True)
+        table: GeneTable = cls.parse(file_path=gtf)
+        if use_cache:
+            table.save(folder=folder, source=gtf)
+        return table
+
+    def symbols(self) -> dict[str, str]:
+        """Return the gene names by gene ID."""
+        return dict(zip(self.gene_ids.tolist(), self.gene_names.tolist(), strict=True))
+
+    def biotype_counts(self) -> dict[str, int]:
+        """Return the number of genes per biotype, most frequent first."""
+        biotypes, counts = np.unique(self.gene_biotypes, return_counts=True)
+        return {str(biotypes[index]): int(counts[index]) for index in np.argsort(-counts, kind="stable")}
+
+    def select(self, biotypes: Iterable[str] | None = None) -> np.ndarray:
+        """Return the rows of the genes of some biotypes, all genes if None."""
+        if biotypes is None:
+            return np.arange(len(self.gene_ids))
+        return np.flatnonzero(np.isin(self.gene_biotypes, list(biotypes)))
+
+    def overlapping(self, contig: str, start: int, end: int) -> np.ndarray:
+        """Return the rows of the genes overlapping a region, by position.
+
+        Parameters
+        ----------
+        contig : str
+            Contig of the region
+        start : int
+            Start of the region, 0-based
+        end : int
+            End of the region, excluded
+
+        Returns
+        -------
+        np.ndarray
+            Gene rows
+
+        """
+        contig_row: int | None = self.contig_index.get(contig)
+        if contig_row is None:
+            return np.empty(0, dtype=np.int64)
+        order: np.ndarray = self.arrays["interval_order"]
+        sorted_contigs: np.ndarray = self.arrays["gene_contigs"][order]
+        lower, upper = np.searchsorted(sorted_contigs, [contig_row, contig_row + 1])
+        # genes starting before the end of the region, from the first whose running maximum end passes its start
+        upper = lower + np.searchsorted(self.arrays["gene_starts"][order[lower:upper]], end, side="left")
+        lower += np.searchsorted(self.arrays["interval_max_ends"][lower:upper], start, side="right")
+        candidates: np.ndarray = order[lower:upper]
+        return candidates[self.arrays["gene_ends"][candidates] > start]
+
+    def write_features(self, file_path: Path, biotypes: Iterable[str] | None = None) -> None:
+        """Write the gene_id, gene_name and gene_biotype of genes as a tab separated file.
+
+        Parameters
+        ----------
+        file_path : Path
+            File to be written
+        biotypes : Iterable[str] | None, optional
+            Biotypes of the genes of interest, by default None (all genes)
+
+        """
+        with file_path.open(mode="w", encoding="utf-8") as tsv_file:
+            tsv_file.write("\t".join(FEATURES_COLUMNS) + "\n")
+            tsv_file.writelines(
+                f"{self.gene_ids[row]}\t{self.gene_names[row]}\t{self.gene_biotypes[row]}\n"
+                for row in self.select(biotypes=biotypes)
+            )
+
+    def bed_lines(self, biotypes: Iterable[str] | None = None) -> Iterator[str]:
+        """Yield the transcripts as bed12 lines (one block per exon), sorted by position, as nfcore/rnaseq expects.
+
+        Parameters
+        ----------
+        biotypes : Iterable[str] | None, optional
+            Biotypes of the genes whose transcripts are of interest, by default None (all transcripts)
+
+        Yields
+        ------
+        Iterator[str]
+            Lines of the gene bed file
+
+        """
+        rows: np.ndarray = np.flatnonzero(np.isin(self.arrays["transcript_genes"], self.select(biotypes=biotypes)))
+        genes: list[int] = self.arrays["transcript_genes"][rows].tolist()
+        starts: list[int] = self.arrays["transcript_starts"][rows].tolist()
+        ends: list[int] = self.arrays["transcript_ends"][rows].tolist()
+        cds: list[list[int]] = self.arrays["transcript_cds"][rows].tolist()
+        contigs: list[int] = self.arrays["gene_contigs"].tolist()
+        strands: list[int] = self.arrays["gene_strands"].tolist()
+        transcript_ids: list[str] = self.arrays["transcript_ids"][rows].tolist()
+        # exons are sorted by transcript, the exons of a transcript are a slice
+        bounds: list[int] = np.searchsorted(
+            self.arrays["exon_transcripts"],
+            np.arange(len(self.arrays["transcript_ids"]) + 1),
+        ).tolist()
+        exon_starts: np.ndarray = self.arrays["exon_starts"]
+        exon_ends: np.ndarray = self.arrays["exon_ends"]
+        for index in sorted(range(len(rows)), key=lambda index: (contigs[genes[index]], starts[index])):
+            row: int = int(rows[index])
+            start: int = starts[index]
+            lower, upper = bounds[row], bounds[row + 1]
+            if lower == upper:
+                block_sizes: list[int] = [ends[index] - start]
+                block_starts: list[int] = [0]
+            else:
+                block_sizes = (exon_ends[lower:upper] - exon_starts[lower:upper]).tolist()
+                block_starts = (exon_starts[lower:upper] - start).tolist()
+            yield (
+                f"{self.contigs[contigs[genes[index]]]}\t{start}\t{ends[index]}\t{transcript_ids[index]}\t0\t"
+                f"{BED_STRANDS[strands[genes[index]]]}\t{cds[index][0]}\t{cds[index][1]}\t0\t{len(block_sizes)}\t"
+                f"{','.join(map(str, block_sizes))},\t{','.join(map(str, block_starts))},\n"
+            )
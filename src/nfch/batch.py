@@ -0,0 +1,238 @@
+"""Module containing the functions to prepare many projects (e.g. one per sequencing batch) at once."""
+
+import contextlib
+import csv
+import io
+import os
+from collections.abc import Iterable
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import NamedTuple
+
+from rich import box
+from rich import print as rich_print
+from rich.table import Table
+
+from nfch import utils
+from nfch.genomes import GenomePathValidator
+from nfch.proj import Project
+from nfch.workflow import RNASeq
+
+LOG_FILE: Path = Path(".nfch/batch_prepare.log")
+
+
+class BatchEntry(NamedTuple):
+    """A row of a batch manifest, i.e. a project to be prepared."""
+
+    project_dir: Path
+    genome_build: str
+    revision: str
+    email: str
+
+
+class BatchResult(NamedTuple):
+    """Outcome of the preparation of a project."""
+
+    project_dir: Path
+    genome_build: str
+    revision: str
+    ok: bool
+    message: str
+
+
+def read_manifest(file_path: Path, genome_build: str, revision: str, email: str | None) -> list[BatchEntry]:
+    """Read a batch manifest in CSV format, only the "project_dir" column is required.
+
+    Project folders are made absolute, relative ones being resolved against the folder of the manifest, empty
+    "genome_build", "revision" and "email" cells fall back to the given defaults.
+
+    Parameters
+    ----------
+    file_path : Path
+        Manifest with the columns "project_dir", "genome_build", "revision" and "email"
+    genome_build : str
+        Default genome build
+    revision : str
+        Default pipeline version
+    email : str | None
+        Default e-mail address
+
+    Returns
+    -------
+    list[BatchEntry]
+        Projects in file order
+
+    """
+    entries: list[BatchEntry] = []
+    with file_path.open(mode="r", encoding="utf-8", newline="") as csv_file:
+        for row in csv.DictReader(f=csv_file):
+            if not row.get("project_dir"):
+                continue
+            project_dir: Path = Path(row["project_dir"])
+            entries.append(
+                BatchEntry(
+                    project_dir=(file_path.parent / project_dir).resolve(),
+                    genome_build=row.get("genome_build") or genome_build,
+                    revision=row.get("revision") or revision,
+                    email=row.get("email") or email or "",
+                ),
+            )
+    return entries
+
+
+def check_entries(entries: Iterable[BatchEntry], genomes: dict[str, dict[str, str]]) -> list[str]:
+    """Check the manifest before anything is created: unique folders, known genome builds and e-mail addresses.
+
+    Parameters
+    ----------
+    entries : Iterable[BatchEntry]
+        Projects to be prepared
+    genomes : dict[str, dict[str, str]]
+        Content of the shared genomes.json file
+
+    Returns
+    -------
+    list[str]
+        Problems found
+
+    """
+    problems: list[str] = []
+    seen: set[Path] = set()
+    for entry in entries:
+        project_dir: Path = entry.project_dir.absolute()
+        if project_dir in seen:
+            problems.append(f'"{entry.project_dir}" is listed more than once')
+        seen.add(project_dir)
+        if entry.genome_build not in genomes:
+            problems.append(f'"{entry.project_dir}": genome build "{entry.genome_build}" is not in the genomes.json')
+        if not entry.email:
+            problems.append(f'"{entry.project_dir}" has no e-mail address')
+    return problems
+
+
+def prepare_project(entry: BatchEntry, genomes_json: Path) -> BatchResult:
+    """Initiate a project and prepare its nfcore/rnaseq run, as "nfch project init" and "nfch rnaseq prepare" do.
+
+    Meant to run in its own process: the working directory is changed to the project folder and the messages are
+    written to ".nfch/batch_prepare.log" within the project instead of the terminal. The genomes.json is copied
+    without being validated again.
+
+    Parameters
+    ----------
+    entry : BatchEntry
+        Project to be prepared
+    genomes_json : Path
+        Absolute path to the shared, already validated, genomes.json file
+
+    Returns
+    -------
+    BatchResult
+        Outcome of the preparation
+
+    """
+    output: io.StringIO = io.StringIO()
+    ok: bool = True
+    message: str = f'"{RNASeq.wf_folder}" prepared'
+    # worker processes are reused, the working directory of the next project must not depend on this one
+    previous_dir: Path = Path.cwd()
+    try:
+        entry.project_dir.mkdir(parents=True, exist_ok=True)
+        os.chdir(entry.project_dir)
+        with contextlib.redirect_stdout(new_target=output):
+            Project(email=entry.email, genomes_json=genomes_json, validate_genomes=False)
+            RNASeq(revision=entry.revision, genome_build=entry.genome_build)
+    except SystemExit:
+        # the last message (messages are separated by blank lines and wrapped) is the reason of the failure
+        ok = False
+        messages: list[str] = output.getvalue().strip().split("\n\n")
+        message = " ".join(messages[-1].split()) or "aborted"
+    except Exception as error:  # noqa: BLE001
+        # anything else (e.g. a corrupt ".nfch" file) fails this project only, the others are still prepared
+        ok = False
+        message = f"{type(error).__name__}: {error}"
+    finally:
+        os.chdir(previous_dir)
+    log_file: Path = entry.project_dir / LOG_FILE
+    if log_file.parent.is_dir():
+        with contextlib.suppress(OSError):
+            log_file.write_text(output.getvalue(), encoding="utf-8")
+    return BatchResult(
+        project_dir=entry.project_dir,
+        genome_build=entry.genome_build,
+        revision=entry.revision,
+        ok=ok,
+        message=message,
+    )
+
+
+def prepare_projects(
+    entries: list[BatchEntry],
+    genomes_json: Path,
+    workers: int | None = None,
+    *,
+    deep_check: bool = False,
+) -> list[BatchResult]:
+    """Validate the shared genomes.json once and prepare all projects in parallel processes.
+
+    Parameters
+    ----------
+    entries : list[BatchEntry]
+        Projects to be prepared
+    genomes_json : Path
+        Shared genomes.json file
+    workers : int | None, optional
+        Number of processes, by default None (number of CPUs)
+    deep_check : bool, optional
+        Also check that the STAR/salmon index folders are complete, by default False
+
+    Returns
+    -------
+    list[BatchResult]
+        Outcome per project in manifest order, empty if the manifest or the genomes.json are not valid
+
+    """
+    genomes: dict[str, dict[str, str]] = utils.json_to_dict(file_path=genomes_json)
+    problems: list[str] = check_entries(entries=entries, genomes=genomes)
+    for problem in problems:
+        utils.fail(message=problem, level=1)
+    if problems:
+        utils.fail(message=f"{len(problems)} problem(s) found in the manifest, nothing has been prepared!")
+        return []
+
+    utils.processing(message=f'Validating the supplied "{genomes_json}" file once for all projects...')
+    validator: GenomePathValidator = GenomePathValidator(cache_file=Path(".nfch/genome_paths.json"))
+    used_builds: dict[str, dict[str, str]] = {entry.genome_build: genomes[entry.genome_build] for entry in entries}
+    if not validator.validate(genomes=used_builds, deep=deep_check):
+        utils.fail(
+            message='At least one of the paths within the "genomes.json" is not valid, nothing has been prepared!'
+        )
+        return []
+
+    utils.processing(message=f"Preparing {len(entries)} projects...")
+    results: dict[Path, BatchResult] = {}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(prepare_project, entry, genomes_json.absolute()) for entry in entries]
+        for done, future in enumerate(as_completed(futures), start=1):
+            result: BatchResult = future.result()
+            results[result.project_dir] = result
+            echo = utils.success if result.ok else utils.fail
+            echo(message=f"[{done}/{len(entries)}] {result.project_dir}: {result.message}", level=1)
+    return [results[entry.project_dir] for entry in entries]
+
+
+def report(results: Iterable[BatchResult]) -> None:
+    """Print a summary table of the prepared projects.
+
+    Parameters
+    ----------
+    results : Iterable[BatchResult]
+        Outcome per project
+
+    """
+    table: Table = Table(title="Batch preparation", box=box.SIMPLE)
+    for column in ("Project", "Genome build", "Revision", "Status", "Details"):
+        table.add_column(header=column)
+    for result in results:
+        status: str = "[green]ok[/green]" if result.ok else "[red]failed[/red]"
+        table.add_row(str(result.project_dir), result.genome_build, result.revision, status, result.message)
+    rich_print(table)
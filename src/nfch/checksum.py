@@ -0,0 +1,295 @@
+"""Module containing the class ChecksumManifest keeping track of the checksums of raw data and reference files."""
+
+import csv
+import hashlib
+import sys
+import time
+from collections.abc import Iterable
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from enum import Enum
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from nfch import utils
+
+if TYPE_CHECKING:
+    import os
+
+BUFFER_SIZE: int = 8 * 1024 * 1024
+# seconds between two saves of the manifest during an update
+SAVE_INTERVAL: float = 30.0
+
+
+class HashAlgorithm(str, Enum):
+    """Supported checksum algorithms, "xxhash" (XXH3 128 bits) requires the optional "xxhash" package."""
+
+    MD5 = "md5"
+    SHA256 = "sha256"
+    XXHASH = "xxhash"
+
+
+def _new_hasher(algorithm: HashAlgorithm) -> Any:  # noqa: ANN401
+    """Return a new hash object of the algorithm of interest."""
+    if algorithm == HashAlgorithm.XXHASH:
+        try:
+            import xxhash  # noqa: PLC0415
+        except ImportError as error:
+            msg: str = 'The "xxhash" algorithm requires the "xxhash" package: pip install "nfch[xxhash]"'
+            raise ImportError(msg) from error
+        return xxhash.xxh3_128()
+    return hashlib.new(algorithm.value)
+
+
+def hash_file(file_path: Path, algorithm: HashAlgorithm = HashAlgorithm.MD5, buffer_size: int = BUFFER_SIZE) -> str:
+    """Compute the checksum of a file, streaming it through a large reusable buffer.
+
+    Parameters
+    ----------
+    file_path : Path
+        File of interest
+    algorithm : HashAlgorithm, optional
+        Checksum algorithm, by default HashAlgorithm.MD5
+    buffer_size : int, optional
+        Number of bytes read at once, by default BUFFER_SIZE (8 MiB)
+
+    Returns
+    -------
+    str
+        Hexadecimal digest
+
+    """
+    hasher: Any = _new_hasher(algorithm=algorithm)
+    buffer: bytearray = bytearray(buffer_size)
+    view: memoryview = memoryview(buffer)
+    with file_path.open(mode="rb", buffering=0) as binary_file:
+        while num_bytes := binary_file.readinto(buffer):
+            hasher.update(view[:num_bytes])
+    return hasher.hexdigest()
+
+
+def samplesheet_fastqs(samplesheet: Path, base_folder: Path) -> list[Path]:
+    """List the FASTQ files of a nf-core samplesheet ("fastq_1" and "fastq_2" columns).
+
+    Parameters
+    ----------
+    samplesheet : Path
+        Samplesheet in CSV format
+    base_folder : Path
+        Folder relative paths are resolved against, i.e. the folder Nextflow is launched from
+
+    Returns
+    -------
+    list[Path]
+        FASTQ files, without duplicates
+
+    """
+    fastqs: dict[Path, None] = {}
+    with samplesheet.open(mode="r", encoding="utf-8", newline="") as csv_file:
+        for row in csv.DictReader(f=csv_file):
+            for column in ("fastq_1", "fastq_2"):
+                if row.get(column):
+                    fastq: Path = Path(row[column])
+                    fastqs[fastq if fastq.is_absolute() else base_folder / fastq] = None
+    return list(fastqs)
+
+
+def genome_files(genomes_json: Path, genome_build: str | None = None) -> list[Path]:
+    """List the files (not the index folders) of a genomes.json file.
+
+    Parameters
+    ----------
+    genomes_json : Path
+        json file containing genome information
+    genome_build : str | None, optional
+        Genome build of interest, by default None (all builds)
+
+    Returns
+    -------
+    list[Path]
+        Genome files, e.g. fasta and gtf
+
+    """
+    genomes: dict[str, dict[str, str]] = utils.json_to_dict(file_path=genomes_json)
+    builds: list[str] = [genome_build] if genome_build else list(genomes)
+    return [
+        Path(file_path)
+        for build in builds
+        for file_path in genomes[build].values()
+        if file_path and Path(file_path).is_file()
+    ]
+
+
+class ChecksumManifest:
+    """Checksums of files together with the size and mtime they were computed for.
+
+    Re-running an update only hashes the files that are new or whose size/mtime changed, a verification re-hashes all
+    files and reports the ones whose content changed although their size and mtime did not (i.e. corrupted files).
+    """
+
+    def __init__(self, manifest_file: Path = Path(".nfch/checksums.json")) -> None:
+        """Load the manifest, if present.
+
+        Parameters
+        ----------
+        manifest_file : Path, optional
+            json file storing the checksums, by default Path(".nfch/checksums.json")
+
+        """
+        self.manifest_file: Path = manifest_file
+        self.files: dict[str, dict[str, Any]] = {}
+        # files that could not be read by the last update
+        self.unreadable: list[Path] = []
+        if manifest_file.is_file():
+            self.files = utils.json_to_dict(file_path=manifest_file)
+
+    def is_current(self, file_path: Path, algorithm: HashAlgorithm) -> bool:
+        """Check if the stored checksum of a file is still valid, based on its size and mtime."""
+        entry: dict[str, Any] | None = self.files.get(str(file_path.absolute()))
+        if entry is None or entry["algorithm"] != algorithm.value:
+            return False
+        file_stat: os.stat_result = file_path.stat()
+        return entry["size"] == file_stat.st_size and entry["mtime"] == file_stat.st_mtime_ns
+
+    def digest(self, file_path: Path) -> str | None:
+        """Return the stored checksum of a file, if any."""
+        entry: dict[str, Any] | None = self.files.get(str(file_path.absolute()))
+        return entry["digest"] if entry else None
+
+    def select(self, file_paths: Iterable[Path], algorithm: HashAlgorithm, *, verify: bool = False) -> list[Path]:
+        """Return the files to be hashed, missing files being reported and skipped.
+
+        Parameters
+        ----------
+        file_paths : Iterable[Path]
+            Files of interest
+        algorithm : HashAlgorithm
+            Checksum algorithm
+        verify : bool, optional
+            Also select the unchanged files, by default False
+
+        Returns
+        -------
+        list[Path]
+            New and changed files, or all existing files with verify, without duplicates
+
+        """
+        to_hash: list[Path] = []
+        for file_path in dict.fromkeys(file_paths):
+            if not file_path.is_file():
+                utils.fail(message=f'"{file_path}" could not be found, skipped!', level=1)
+            elif verify or not self.is_current(file_path=file_path, algorithm=algorithm):
+                to_hash.append(file_path)
+        return to_hash
+
+    def update(
+        self,
+        file_paths: Iterable[Path],
+        algorithm: HashAlgorithm = HashAlgorithm.MD5,
+        workers: int | None = None,
+        *,
+        verify: bool = False,
+    ) -> list[Path]:
+        """Hash new and changed files in parallel processes and save the manifest, also periodically and when stopped.
+
+        Files that cannot be read are reported and listed in "unreadable", the others are hashed anyway.
+
+        Parameters
+        ----------
+        file_paths : Iterable[Path]
+            Files of interest
+        algorithm : HashAlgorithm, optional
+            Checksum algorithm, by default HashAlgorithm.MD5
+        workers : int | None, optional
+            Number of processes, by default None (number of CPUs)
+        verify : bool, optional
+            Also re-hash the unchanged files and compare them with the stored checksums, by default False
+
+        Returns
+        -------
+        list[Path]
+            Files whose content does not match the stored checksum although their size and mtime did not change
+
+        """
+        try:
+            # e.g. "xxhash" without the optional package, reported before any process is started
+            _new_hasher(algorithm=algorithm)
+        except ImportError as error:
+            utils.fail(message=f"{error}, exiting!")
+            sys.exit(1)
+        to_hash: list[Path] = self.select(file_paths=file_paths, algorithm=algorithm, verify=verify)
+        if not to_hash:
+            utils.success(message="All checksums are up to date.")
+            return []
+
+        # largest files first so that a single large file does not end up alone at the end
+        to_hash.sort(key=lambda file_path: file_path.stat().st_size, reverse=True)
+        total_bytes: int = sum(file_path.stat().st_size for file_path in to_hash)
+        utils.processing(
+            message=f"Hashing {len(to_hash):,} files ({utils.human_readable_size(num_bytes=total_bytes)}) with "
+            f"{algorithm.value}...",
+        )
+        corrupted: list[Path] = []
+        self.unreadable = []
+        interrupted: bool = False
+        executor: ProcessPoolExecutor = ProcessPoolExecutor(max_workers=workers)
+        last_save: float = time.monotonic()
+        try:
+            futures = {
+                executor.submit(hash_file, file_path, algorithm): (file_path, file_path.stat()) for file_path in to_hash
+            }
+            for done, future in enumerate(as_completed(futures), start=1):
+                file_path, file_stat = futures[future]
+                try:
+                    digest: str = future.result()
+                except OSError as error:
+                    self.unreadable.append(file_path)
+                    utils.fail(message=f'"{file_path}" could not be read: {error}', level=1)
+                    continue
+                if self.record(file_path=file_path, file_stat=file_stat, algorithm=algorithm, digest=digest):
+                    utils.processing(message=f"[{done}/{len(to_hash)}] {digest}  {file_path}", level=1)
+                else:
+                    corrupted.append(file_path)
+                    utils.fail(message=f'"{file_path}" does not match its recorded checksum!', level=1)
+                # the checksums computed so far survive a crash or a Ctrl-C of a long update
+                if time.monotonic() - last_save >= SAVE_INTERVAL:
+                    utils.dict_to_json(dictionary=self.files, file_path=self.manifest_file)
+                    last_save = time.monotonic()
+        except KeyboardInterrupt:
+            interrupted = True
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+            utils.dict_to_json(dictionary=self.files, file_path=self.manifest_file)
+        if interrupted:
+            utils.warning(message="Interrupted, the checksums computed so far are saved. Run the same command again.")
+            sys.exit(130)
+        return corrupted
+
+    def record(self, file_path: Path, file_stat: "os.stat_result", algorithm: HashAlgorithm, digest: str) -> bool:
+        """Record the checksum of a file, unless it contradicts the stored one for the same size and mtime.
+
+        Parameters
+        ----------
+        file_path : Path
+            Hashed file
+        file_stat : os.stat_result
+            Status of the file when it was hashed
+        algorithm : HashAlgorithm
+            Checksum algorithm
+        digest : str
+            Hexadecimal digest
+
+        Returns
+        -------
+        bool
+            False if the file is corrupted, i.e. its content changed although its size and mtime did not
+
+        """
+        if self.is_current(file_path=file_path, algorithm=algorithm) and self.digest(file_path=file_path) != digest:
+            return False
+        self.files[str(file_path.absolute())] = {
+            "size": file_stat.st_size,
+            "mtime": file_stat.st_mtime_ns,
+            "algorithm": algorithm.value,
+            "digest": digest,
+        }
+        return True
@@ -0,0 +1,110 @@
+"""Module containing the class LazyGroup, a typer group importing its sub-commands only when they are run.
+
+Every group lists its sub-commands in a registry mapping their names to the module defining them and their short
+help, so that "--help" and shell completion are answered without importing the sub-commands (and their
+dependencies). A module defining a group exposes a "COMMANDS" registry, a module defining a command exposes a typer
+"app".
+"""
+
+import importlib
+from typing import TYPE_CHECKING, Any, ClassVar, NamedTuple
+
+import typer.main
+from typer.core import TyperCommand, TyperGroup
+
+if TYPE_CHECKING:
+    from typer._click import Command, Context, HelpFormatter
+    from typer._click.shell_completion import CompletionItem
+
+COMPLETION_PARAMS: frozenset[str] = frozenset({"install_completion", "show_completion"})
+
+
+class LazyCommand(NamedTuple):
+    """A registry entry: the module defining a (group of) command(s) and its short help."""
+
+    module: str
+    help: str
+
+
+class LazyGroup(TyperGroup):
+    """A typer group whose sub-commands are imported on first use."""
+
+    registry: ClassVar[dict[str, LazyCommand]] = {}
+
+    def __init__(self, *, registry: dict[str, LazyCommand] | None = None, **kwargs: Any) -> None:  # noqa: ANN401
+        """Instantiate the group.
+
+        Parameters
+        ----------
+        registry : dict[str, LazyCommand] | None, optional
+            Sub-commands of the group, by default None (the "registry" class attribute)
+        **kwargs : Any
+            Arguments of TyperGroup
+
+        """
+        super().__init__(**kwargs)
+        if registry is not None:
+            self.registry = registry
+        # while listing (help, completion) the registry is used instead of the sub-commands themselves
+        self.listing: bool = False
+
+    def list_commands(self, ctx: "Context") -> list[str]:  # noqa: ARG002
+        """Return the names of the sub-commands, in registry order."""
+        return list(self.registry)
+
+    def get_command(self, ctx: "Context", cmd_name: str) -> "Command | None":  # noqa: ARG002
+        """Return a sub-command, importing it unless it is only listed."""
+        entry: LazyCommand | None = self.registry.get(cmd_name)
+        if entry is None:
+            return None
+        if self.listing:
+            return TyperCommand(name=cmd_name, short_help=entry.help)
+        if cmd_name not in self.commands:
+            self.commands[cmd_name] = self.load_command(name=cmd_name, entry=entry)
+        return self.commands[cmd_name]
+
+    def load_command(self, name: str, entry: LazyCommand) -> "Command":
+        """Import the module of a sub-command and build the command.
+
+        Parameters
+        ----------
+        name : str
+            Name of the sub-command
+        entry : LazyCommand
+            Registry entry of the sub-command
+
+        Returns
+        -------
+        Command
+            The sub-command, itself a LazyGroup if its module exposes a "COMMANDS" registry
+
+        """
+        module: Any = importlib.import_module(name=entry.module)
+        if hasattr(module, "COMMANDS"):
+            return LazyGroup(
+                name=name, registry=module.COMMANDS, help=entry.help, rich_markup_mode=self.rich_markup_mode
+            )
+        command: Command = typer.main.get_command(typer_instance=module.app)
+        if isinstance(command, TyperGroup):
+            # a module defining several commands, e.g. "init" and "prerequisites"
+            command = command.commands[name]
+        # completion is installed from the top level command only
+        command.params = [param for param in command.params if param.name not in COMPLETION_PARAMS]
+        command.name = name
+        return command
+
+    def format_help(self, ctx: "Context", formatter: "HelpFormatter") -> None:
+        """Format the help, listing the sub-commands from the registry."""
+        self.listing = True
+        try:
+            super().format_help(ctx, formatter)
+        finally:
+            self.listing = False
+
+    def shell_complete(self, ctx: "Context", incomplete: str) -> list["CompletionItem"]:
+        """Complete the sub-command names from the registry."""
+        self.listing = True
+        try:
+            return super().shell_complete(ctx, incomplete)
+        finally:
+            self.listing = False
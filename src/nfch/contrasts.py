@@ -0,0 +1,251 @@
+"""Module containing the functions to read the samplesheet and the contrasts of nfcore/differentialabundance runs."""
+
+import csv
+from pathlib import Path
+from typing import NamedTuple
+
+
+class Contrast(NamedTuple):
+    """A row of a nfcore/differentialabundance contrasts file."""
+
+    id: str
+    variable: str
+    reference: str
+    target: str
+    blocking: tuple[str, ...]
+
+
+def read_contrasts(file_path: Path) -> list[Contrast]:
+    """Read a contrasts file ("id", "variable", "reference", "target" and the optional "blocking" columns).
+
+    Parameters
+    ----------
+    file_path : Path
+        Contrasts file in CSV format
+
+    Returns
+    -------
+    list[Contrast]
+        Contrasts in file order
+
+    """
+    with file_path.open(mode="r", encoding="utf-8", newline="") as csv_file:
+        return [
+            Contrast(
+                id=row.get("id") or "",
+                variable=row.get("variable") or "",
+                reference=row.get("reference") or "",
+                target=row.get("target") or "",
+                blocking=tuple(column for column in (row.get("blocking") or "").split(";") if column),
+            )
+            for row in csv.DictReader(f=csv_file)
+        ]
+
+
+def read_samplesheet(file_path: Path, id_column: str = "sample") -> dict[str, dict[str, str]]:
+    """Read a samplesheet into sample metadata indexed by sample ID.
+
+    Samples listed several times (e.g. one row per lane in nf-core/rnaseq samplesheets) are kept once.
+
+    Parameters
+    ----------
+    file_path : Path
+        Samplesheet in CSV format
+    id_column : str, optional
+        Column containing the sample IDs, by default "sample"
+
+    Returns
+    -------
+    dict[str, dict[str, str]]
+        Metadata per sample
+
+    """
+    samples: dict[str, dict[str, str]] = {}
+    with file_path.open(mode="r", encoding="utf-8", newline="") as csv_file:
+        for row in csv.DictReader(f=csv_file):
+            samples.setdefault(row.get(id_column) or "", row)
+    return samples
+
+
+def contrast_samples(contrast: Contrast, samples: dict[str, dict[str, str]]) -> tuple[list[str], list[str]]:
+    """Return the samples of the reference and the target level of a contrast.
+
+    Parameters
+    ----------
+    contrast : Contrast
+        Contrast of interest
+    samples : dict[str, dict[str, str]]
+        Metadata per sample
+
+    Returns
+    -------
+    tuple[list[str], list[str]]
+        Reference and target samples
+
+    """
+    reference: list[str] = [
+        sample for sample, row in samples.items() if row.get(contrast.variable) == contrast.reference
+    ]
+    target: list[str] = [sample for sample, row in samples.items() if row.get(contrast.variable) == contrast.target]
+    return reference, target
+
+
+def read_matrix_samples(file_path: Path) -> list[str]:
+    """Read the column names of a tab separated count matrix, only its header line is read.
+
+    Parameters
+    ----------
+    file_path : Path
+        Count matrix
+
+    Returns
+    -------
+    list[str]
+        Column names, including the gene annotation columns
+
+    """
+    with file_path.open(mode="r", encoding="utf-8") as tsv_file:
+        return tsv_file.readline().rstrip("\r\n").split("\t")
+
+
+def read_matrix_genes(file_path: Path) -> set[str]:
+    """Read the gene IDs and gene names of a tab separated count matrix ("gene_id" and "gene_name" columns).
+
+    Parameters
+    ----------
+    file_path : Path
+        Count matrix
+
+    Returns
+    -------
+    set[str]
+        Gene IDs and names, the values of its first column if it has neither
+
+    """
+    with file_path.open(mode="r", encoding="utf-8") as tsv_file:
+        header: list[str] = tsv_file.readline().rstrip("\r\n").split("\t")
+        columns: list[int] = [index for index, column in enumerate(header) if column in {"gene_id", "gene_name"}] or [0]
+        genes: set[str] = set()
+        for line in tsv_file:
+            fields: list[str] = line.split("\t", maxsplit=max(columns) + 1)
+            genes.update(fields[column] for column in columns)
+    return genes
+
+
+def check_contrast(contrast: Contrast, levels: dict[str, set[str]]) -> list[str]:
+    """Check a contrast against the levels of the sample metadata.
+
+    Parameters
+    ----------
+    contrast : Contrast
+        Contrast of interest
+    levels : dict[str, set[str]]
+        Values of every samplesheet column
+
+    Returns
+    -------
+    list[str]
+        Problems found
+
+    """
+    label: str = f'Contrast "{contrast.id}"'
+    problems: list[str] = []
+    if not contrast.id:
+        problems.append(f"{label} has no id")
+    if contrast.variable not in levels:
+        problems.append(f'{label}: variable "{contrast.variable}" is not a column of the samplesheet')
+    else:
+        available: str = ", ".join(sorted(levels[contrast.variable]))
+        problems.extend(
+            f'{label}: {role} level "{level}" is not a value of "{contrast.variable}" ({available})'
+            for role, level in (("reference", contrast.reference), ("target", contrast.target))
+            if level not in levels[contrast.variable]
+        )
+    if contrast.reference == contrast.target:
+        problems.append(f'{label}: reference and target are both "{contrast.reference}"')
+    problems.extend(
+        f'{label}: blocking variable "{column}" is not a column of the samplesheet'
+        for column in contrast.blocking
+        if column not in levels
+    )
+    return problems
+
+
+def validate_inputs(samplesheet: Path, contrasts_file: Path, matrix: Path, id_column: str = "sample") -> list[str]:
+    """Check the inputs of a nfcore/differentialabundance run against each other, reporting all problems at once.
+
+    Every contrast is checked against the sample metadata (variable, reference/target levels and blocking columns
+    present) and every sample of the samplesheet must be a column of the count matrix. Samples listed several times
+    (e.g. one row per lane in nf-core/rnaseq samplesheets) are kept once, as long as their rows agree on the columns
+    used by the contrasts.
+
+    Parameters
+    ----------
+    samplesheet : Path
+        Samplesheet in CSV format
+    contrasts_file : Path
+        Contrasts file in CSV format
+    matrix : Path
+        Tab separated count matrix
+    id_column : str, optional
+        Samplesheet column containing the sample IDs, by default "sample"
+
+    Returns
+    -------
+    list[str]
+        Problems found, empty if the inputs are consistent
+
+    """
+    problems: list[str] = [
+        f'"{path}" could not be found' for path in (samplesheet, contrasts_file, matrix) if not path.is_file()
+    ]
+    if problems:
+        return problems
+
+    # index the sample metadata: the levels of every column, the first row of every sample and the columns on which
+    # the rows of a sample disagree
+    levels: dict[str, set[str]] = {}
+    samples: dict[str, dict[str, str]] = {}
+    conflicts: dict[str, set[str]] = {}
+    with samplesheet.open(mode="r", encoding="utf-8", newline="") as csv_file:
+        reader: csv.DictReader[str] = csv.DictReader(f=csv_file)
+        columns: list[str] = list(reader.fieldnames or [])
+        if id_column not in columns:
+            return [f'"{samplesheet}" has no "{id_column}" column']
+        levels = {column: set() for column in columns}
+        for row in reader:
+            for column in columns:
+                levels[column].add(row.get(column) or "")
+            first: dict[str, str] = samples.setdefault(row[id_column], row)
+            conflicts.setdefault(row[id_column], set()).update(
+                column for column in columns if (row.get(column) or "") != (first.get(column) or "")
+            )
+
+    with contrasts_file.open(mode="r", encoding="utf-8", newline="") as csv_file:
+        contrast_columns: list[str] = list(csv.DictReader(f=csv_file).fieldnames or [])
+    missing_columns: list[str] = [
+        column for column in ("id", "variable", "reference", "target") if column not in contrast_columns
+    ]
+    if missing_columns:
+        problems.append(f'"{contrasts_file}" lacks the column(s) {", ".join(missing_columns)}')
+        return problems
+
+    seen: set[str] = set()
+    used_columns: set[str] = set()
+    for contrast in read_contrasts(file_path=contrasts_file):
+        if contrast.id in seen:
+            problems.append(f'Contrast "{contrast.id}" is defined more than once')
+        seen.add(contrast.id)
+        used_columns.update((contrast.variable, *contrast.blocking))
+        problems.extend(check_contrast(contrast=contrast, levels=levels))
+    problems.extend(
+        f'Sample "{sample}" has rows with different values of "{column}" in "{samplesheet}"'
+        for sample, columns_differing in conflicts.items()
+        for column in sorted(columns_differing & used_columns)
+    )
+
+    matrix_columns: set[str] = set(read_matrix_samples(file_path=matrix))
+    missing_samples: list[str] = [sample for sample in samples if sample not in matrix_columns]
+    if missing_samples:
+        problems.append(f'{len(missing_samples)} samples are not columns of "{matrix}": {", ".join(missing_samples)}')
+    return problems
@@ -0,0 +1,190 @@
+"""Module containing the class CountsMatrix, a compact columnar form of the merged count matrices of nfcore/rnaseq.
+
+It requires the optional "numpy" package: pip install "nfch[analysis]".
+"""
+
+import contextlib
+import json
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+import numpy as np
+
+if TYPE_CHECKING:
+    import os
+
+CACHE_FOLDER: str = ".nfch_cache"
+CACHE_VERSION: int = 1
+ANNOTATION_COLUMNS: frozenset[str] = frozenset({"gene_id", "gene_name", "transcript_id", "tx", "Geneid", "gene"})
+
+
+class CountsMatrix:
+    """Counts of genes (rows) by samples (columns), e.g. "salmon.merged.gene_counts_length_scaled.tsv".
+
+    Parsed matrices are cached as .npy files next to the source file, in ".nfch_cache/<file name>/", and memory-mapped
+    on later loads as long as the size and mtime of the source did not change.
+    """
+
+    def __init__(self, gene_ids: np.ndarray, gene_names: np.ndarray, samples: list[str], values: np.ndarray) -> None:
+        """Instantiate the matrix.
+
+        Parameters
+        ----------
+        gene_ids : np.ndarray
+            Gene IDs, one per row
+        gene_names : np.ndarray
+            Gene names, one per row (the gene IDs if the source has no gene names)
+        samples : list[str]
+            Sample IDs, one per column
+        values : np.ndarray
+            Counts, genes x samples
+
+        """
+        self.gene_ids: np.ndarray = gene_ids
+        self.gene_names: np.ndarray = gene_names
+        self.samples: list[str] = samples
+        self.values: np.ndarray = values
+        self.sample_index: dict[str, int] = {sample: index for index, sample in enumerate(samples)}
+
+    @staticmethod
+    def cache_folder(file_path: Path) -> Path:
+        """Return the cache folder of a count matrix."""
+        return file_path.parent / CACHE_FOLDER / file_path.name
+
+    @classmethod
+    def parse(cls, file_path: Path) -> "CountsMatrix":
+        """Parse a tab separated count matrix whose leading columns are gene annotations (gene_id, gene_name, ...).
+
+        Parameters
+        ----------
+        file_path : Path
+            Count matrix
+
+        Returns
+        -------
+        CountsMatrix
+            Parsed matrix
+
+        """
+        with file_path.open(mode="r", encoding="utf-8") as tsv_file:
+            header: list[str] = tsv_file.readline().rstrip("\n").split("\t")
+            annotation_count: int = 0
+            while annotation_count < len(header) and header[annotation_count] in ANNOTATION_COLUMNS:
+                annotation_count += 1
+            annotations: list[list[str]] = [[] for _ in range(annotation_count)]
+            for line in tsv_file:
+                fields: list[str] = line.split("\t", maxsplit=annotation_count)
+                for column in range(annotation_count):
+                    annotations[column].append(fields[column])
+        values: np.ndarray = np.loadtxt(
+            fname=file_path,
+            delimiter="\t",
+            skiprows=1,
+            usecols=range(annotation_count, len(header)),
+            dtype=np.float64,
+            ndmin=2,
+        )
+        gene_ids: np.ndarray = np.array(annotations[0] if annotations else [str(row) for row in range(len(values))])
+        gene_names: np.ndarray = np.array(annotations[1]) if annotation_count > 1 else gene_ids
+        return cls(gene_ids=gene_ids, gene_names=gene_names, samples=header[annotation_count:], values=values)
+
+    def save(self, folder: Path, source: Path) -> None:
+        """Save the matrix as .npy files, the metadata (written last) marks the cache as complete.
+
+        Parameters
+        ----------
+        folder : Path
+            Cache folder
+        source : Path
+            Source file the matrix was parsed from
+
+        """
+        folder.mkdir(parents=True, exist_ok=True)
+        for name, array in {"values": self.values, "gene_ids": self.gene_ids, "gene_names": self.gene_names}.items():
+            temporary: Path = folder / f"{name}.tmp.npy"
+            np.save(file=temporary, arr=array)
+            temporary.replace(folder / f"{name}.npy")
+        source_stat: os.stat_result = source.stat()
+        metadata: dict[str, Any] = {
+            "version": CACHE_VERSION,
+            "size": source_stat.st_size,
+            "mtime": source_stat.st_mtime_ns,
+            "samples": self.samples,
+        }
+        temporary = folder / "metadata.tmp.json"
+        temporary.write_text(json.dumps(metadata), encoding="utf-8")
+        temporary.replace(folder / "metadata.json")
+
+    @classmethod
+    def load(cls, file_path: Path, *, use_cache: bool = True) -> "CountsMatrix":
+        """Load a count matrix, from its memory-mapped cache if the source did not change.
+
+        Parameters
+        ----------
+        file_path : Path
+            Count matrix
+        use_cache : bool, optional
+            Read and write the cache, by default True
+
+        Returns
+        -------
+        CountsMatrix
+            Count matrix
+
+        """
+        folder: Path = cls.cache_folder(file_path=file_path)
+        metadata_file: Path = folder / "metadata.json"
+        if use_cache and metadata_file.is_file():
+            metadata: dict[str, Any] = json.loads(metadata_file.read_text(encoding="utf-8"))
+            source_stat: os.stat_result = file_path.stat()
+            if (metadata.get("version"), metadata.get("size"), metadata.get("mtime")) == (
+                CACHE_VERSION,
+                source_stat.st_size,
+                source_stat.st_mtime_ns,
+            ):
+                return cls(
+                    gene_ids=np.load(file=folder / "gene_ids.npy", mmap_mode="r"),
+                    gene_names=np.load(file=folder / "gene_names.npy", mmap_mode="r"),
+                    samples=metadata["samples"],
+                    values=np.load(file=folder / "values.npy", mmap_mode="r"),
+                )
+        matrix: CountsMatrix = cls.parse(file_path=file_path)
+        if use_cache:
+            # a read-only output folder or mount only means that the matrix is parsed again next time
+            with contextlib.suppress(OSError):
+                matrix.save(folder=folder, source=file_path)
+        return matrix
+
+    def subset(self, samples: list[str]) -> "CountsMatrix":
+        """Return the matrix restricted to some samples, in the given order.
+
+        Parameters
+        ----------
+        samples : list[str]
+            Sample IDs
+
+        Returns
+        -------
+        CountsMatrix
+            Matrix of the samples of interest
+
+        """
+        columns: list[int] = [self.sample_index[sample] for sample in samples]
+        return CountsMatrix(
+            gene_ids=self.gene_ids,
+            gene_names=self.gene_names,
+            samples=list(samples),
+            values=self.values[:, columns],
+        )
+
+    def library_sizes(self) -> np.ndarray:
+        """Return the total counts per sample."""
+        return self.values.sum(axis=0)
+
+    def detected_genes(self, min_count: float = 1.0) -> np.ndarray:
+        """Return the number of genes with at least "min_count" counts per sample."""
+        return (self.values >= min_count).sum(axis=0)
+
+    def correlation(self) -> np.ndarray:
+        """Return the Pearson correlation of the log counts between samples (samples x samples)."""
+        return np.corrcoef(np.log1p(self.values), rowvar=False)
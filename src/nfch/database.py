@@ -0,0 +1,36 @@
+"""Module containing the helpers of the SQLite databases written by nfch (QC tables, indexes).
+
+The databases are meant to be shared, e.g. one per analysis team on a network filesystem: they use a rollback journal
+rather than WAL (which needs shared memory between the processes of a single host) and wait for the writers of other
+nfch invocations instead of failing.
+"""
+
+import sqlite3
+from pathlib import Path
+
+BUSY_TIMEOUT_MS: int = 60_000
+
+
+def connect(file_path: Path, schema: str) -> sqlite3.Connection:
+    """Open a database, creating its tables if needed.
+
+    Parameters
+    ----------
+    file_path : Path
+        Database file, its folder is created if needed
+    schema : str
+        SQL statements creating the tables and indexes, with "IF NOT EXISTS"
+
+    Returns
+    -------
+    sqlite3.Connection
+        Connection, to be used as a context manager for each transaction
+
+    """
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    connection: sqlite3.Connection = sqlite3.connect(file_path, timeout=BUSY_TIMEOUT_MS / 1000)
+    connection.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+    connection.execute("PRAGMA foreign_keys = ON")
+    with connection:
+        connection.executescript(schema)
+    return connection
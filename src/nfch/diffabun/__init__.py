@@ -1,11 +1,49 @@
-"""Presents the "diffabun" typer app."""
+"""Presents the "diffabun" sub-command managing nfcore/differentialabundance runs, its commands are loaded lazily."""
 
-import typer
+from nfch.cli import LazyCommand
 
-from nfch.diffabun.clean import app as clean_app
-from nfch.diffabun.prepare import app as prepare_app
-
-app = typer.Typer()
-
-app.add_typer(typer_instance=prepare_app)
-app.add_typer(typer_instance=clean_app)
+COMMANDS: dict[str, LazyCommand] = {
+    "prepare": LazyCommand(
+        module="nfch.diffabun.prepare",
+        help="Create folders and files associated with a typical nfcore/differentialabundance run.",
+    ),
+    "clean": LazyCommand(
+        module="nfch.diffabun.clean",
+        help="Clean after a nfcore/differentialabundance run is finished.",
+    ),
+    "status": LazyCommand(
+        module="nfch.diffabun.status",
+        help="Show the completed/running/failed tasks per process, the throughput and the ETA of the run.",
+    ),
+    "launch": LazyCommand(
+        module="nfch.diffabun.launch",
+        help="Start the prepared Nextflow run, at most --max-runs runs at once per host, and record its PID and "
+        "timings.",
+    ),
+    "du": LazyCommand(
+        module="nfch.diffabun.du",
+        help="Show where the space of a nfcore/differentialabundance run goes: work/output/metadata, processes and "
+        "samples.",
+    ),
+    "counts": LazyCommand(
+        module="nfch.diffabun.counts",
+        help="Show library sizes, detected genes and sample correlations of a count matrix.",
+    ),
+    "validate": LazyCommand(
+        module="nfch.diffabun.validate",
+        help="Check that the contrasts match the samplesheet and that the count matrix contains all samples.",
+    ),
+    "index": LazyCommand(
+        module="nfch.diffabun.index",
+        help="Add the differential tables of runs to a SQLite store indexed on gene and contrast, unchanged tables "
+        "are skipped.",
+    ),
+    "query": LazyCommand(
+        module="nfch.diffabun.query",
+        help="Find the genes differentially expressed in several contrasts, such as the genes up in all of them.",
+    ),
+    "why": LazyCommand(
+        module="nfch.diffabun.why",
+        help="Show the failed tasks of the run grouped by process and exit status, with the end of their stderr.",
+    ),
+}
@@ -1,14 +1,40 @@
 """Clean after a nfcore/rnaseq run."""
 
+from typing import Annotated
+
 import typer
 
-from nfch.file_manager import FileManager
+from nfch.file_manager import DEFAULT_WORKERS, CleanMode, FileManager
 from nfch.workflow import DiffAbun
 
 app = typer.Typer()
 
 
 @app.command()
-def clean() -> None:
-    """Clean after a nfcore/differentialabundance run is finished."""
-    FileManager.clean(wf_folder=DiffAbun.wf_folder)
+def clean(
+    workers: Annotated[
+        int,
+        typer.Option(
+            help="Number of threads deleting task folders in parallel.",
+        ),
+    ] = DEFAULT_WORKERS,
+    mode: Annotated[
+        CleanMode,
+        typer.Option(
+            help='"all" removes the whole work folder, "failed" only failed/aborted/superseded task attempts and '
+            '"stale" only task folders older than and unused by the last successful run (based on the execution '
+            'traces), both keeping what "-resume" needs.',
+        ),
+    ] = CleanMode.ALL,
+) -> None:
+    """Clean after a nfcore/differentialabundance run is finished.
+
+    Parameters
+    ----------
+    workers : Annotated[ int, typer.Option, optional
+        Number of threads deleting task folders in parallel, by default DEFAULT_WORKERS
+    mode : Annotated[ CleanMode, typer.Option, optional
+        Which task folders to remove, by default CleanMode.ALL
+
+    """
+    FileManager.clean(wf_folder=DiffAbun.wf_folder, workers=workers, mode=mode)
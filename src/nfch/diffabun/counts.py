@@ -0,0 +1,118 @@
+"""Quality control of the nfcore/rnaseq count matrix used as input of nfcore/differentialabundance runs."""
+
+from pathlib import Path
+from typing import Annotated
+
+import typer
+from rich import box
+from rich import print as rich_print
+from rich.table import Table
+
+from nfch import contrasts, utils
+from nfch.workflow import DiffAbun, RNASeq
+
+app = typer.Typer()
+
+
+@app.command()
+def counts(  # noqa: PLR0913, PLR0917
+    matrix: Annotated[
+        Path,
+        typer.Option(
+            help="Count matrix, genes x samples.",
+        ),
+    ] = RNASeq.wf_folder / "output" / "star_salmon" / "salmon.merged.gene_counts_length_scaled.tsv",
+    contrast: Annotated[
+        str | None,
+        typer.Option(
+            help="Restrict the report to the samples of a contrast (its ID within the contrasts file).",
+        ),
+    ] = None,
+    samplesheet: Annotated[
+        Path,
+        typer.Option(
+            help="Samplesheet, used with --contrast.",
+        ),
+    ] = RNASeq.wf_folder / "metadata" / "samplesheet.csv",
+    contrasts_file: Annotated[
+        Path,
+        typer.Option(
+            "--contrasts",
+            help="Contrasts file, used with --contrast.",
+        ),
+    ] = DiffAbun.wf_folder / "metadata" / "contrasts.csv",
+    min_count: Annotated[
+        float,
+        typer.Option(
+            help="Minimum count for a gene to be considered as detected.",
+        ),
+    ] = 1.0,
+    refresh: Annotated[  # noqa: FBT002
+        bool,
+        typer.Option(
+            help='Parse the matrix again instead of using its cache (".nfch_cache/" next to the matrix).',
+        ),
+    ] = False,
+) -> None:
+    """Show library sizes, detected genes and sample correlations of a count matrix.
+
+    Parameters
+    ----------
+    matrix : Annotated[ Path, typer.Option, optional
+        Count matrix, by default the salmon.merged.gene_counts_length_scaled.tsv of the nfcore/rnaseq run
+    contrast : Annotated[ str | None, typer.Option, optional
+        Restrict the report to the samples of a contrast, by default None
+    samplesheet : Annotated[ Path, typer.Option, optional
+        Samplesheet, by default "nfcore_rnaseq/metadata/samplesheet.csv"
+    contrasts_file : Annotated[ Path, typer.Option, optional
+        Contrasts file, by default "nfcore_differentialabundance/metadata/contrasts.csv"
+    min_count : Annotated[ float, typer.Option, optional
+        Minimum count for a gene to be considered as detected, by default 1.0
+    refresh : Annotated[ bool, typer.Option, optional
+        Parse the matrix again instead of using its cache, by default False
+
+    """
+    try:
+        from nfch.counts import CountsMatrix  # noqa: PLC0415
+    except ImportError:
+        utils.fail(message='This command requires the "numpy" package: pip install "nfch[analysis]"')
+        raise typer.Exit(code=1) from None
+
+    if not matrix.is_file():
+        utils.fail(message=f'Count matrix "{matrix}" could not be found, exiting!')
+        raise typer.Exit(code=1)
+    counts_matrix: CountsMatrix = CountsMatrix.load(file_path=matrix, use_cache=not refresh)
+    title: str = f"{matrix.name}: {len(counts_matrix.gene_ids):,} genes x {len(counts_matrix.samples):,} samples"
+
+    if contrast:
+        selected: list[contrasts.Contrast] = [
+            row for row in contrasts.read_contrasts(contrasts_file) if row.id == contrast
+        ]
+        if not selected:
+            utils.fail(message=f'Contrast "{contrast}" could not be found within "{contrasts_file}", exiting!')
+            raise typer.Exit(code=1)
+        reference, target = contrasts.contrast_samples(
+            contrast=selected[0],
+            samples=contrasts.read_samplesheet(file_path=samplesheet),
+        )
+        counts_matrix = counts_matrix.subset(
+            samples=[sample for sample in reference + target if sample in counts_matrix.sample_index],
+        )
+        title += f', contrast "{contrast}": {len(reference)} reference vs {len(target)} target samples'
+
+    library_sizes = counts_matrix.library_sizes()
+    detected_genes = counts_matrix.detected_genes(min_count=min_count)
+    correlation = counts_matrix.correlation()
+    sample_count: int = len(counts_matrix.samples)
+
+    table: Table = Table(title=title, box=box.SIMPLE)
+    table.add_column(header="Sample")
+    table.add_column(header="Library size", justify="right")
+    table.add_column(header="Detected genes", justify="right")
+    table.add_column(header="Mean correlation", justify="right")
+    for index, sample in enumerate(counts_matrix.samples):
+        mean_correlation: float = (
+            (correlation[index].sum() - 1) / (sample_count - 1) if sample_count > 1 else float("nan")
+        )
+        table.add_row(sample, f"{library_sizes[index]:,.0f}", f"{detected_genes[index]:,}", f"{mean_correlation:.3f}")
+    rich_print(table)
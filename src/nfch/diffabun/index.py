@@ -0,0 +1,63 @@
+"""Indexes the differential tables of nfcore/differentialabundance runs into a SQLite store, see "diffabun query"."""
+
+from pathlib import Path
+from typing import Annotated
+
+import typer
+from rich import box
+from rich import print as rich_print
+from rich.table import Table
+
+from nfch import differential, utils
+from nfch.workflow import DiffAbun
+
+app = typer.Typer()
+
+
+@app.command()
+def index(
+    paths: Annotated[
+        list[Path] | None,
+        typer.Argument(
+            help="Differential tables, or output folders of runs containing them, by default the current project.",
+        ),
+    ] = None,
+    database: Annotated[
+        Path,
+        typer.Option(
+            help="SQLite database the tables are added to.",
+        ),
+    ] = differential.DATABASE,
+) -> None:
+    """Add the differential tables of runs to a SQLite store indexed on gene and contrast, unchanged tables are skipped.
+
+    Parameters
+    ----------
+    paths : Annotated[ list[Path] | None, typer.Argument, optional
+        Differential tables or output folders containing them, by default None (the run of the current project)
+    database : Annotated[ Path, typer.Option, optional
+        SQLite database the tables are added to, by default differential.DATABASE
+
+    """
+    files: list[Path] = differential.find_tables(paths=paths or [DiffAbun.wf_folder / "output"])
+    if not files:
+        utils.fail(message="No differential table could be found, exiting!")
+        raise typer.Exit(code=1)
+    utils.processing(message=f'Indexing {len(files)} differential table(s) into "{database}"...')
+    try:
+        summary: differential.IndexSummary = differential.index(files=files, database_file=database)
+    except (ValueError, IndexError) as error:
+        utils.fail(message=f"A differential table could not be read: {error}")
+        raise typer.Exit(code=1) from error
+    utils.success(
+        message=f"{summary.indexed} table(s) indexed ({summary.rows:,} rows), {summary.unchanged} unchanged, "
+        f"{summary.removed} removed.",
+    )
+
+    table: Table = Table(title="Contrasts", box=box.SIMPLE)
+    table.add_column(header="Contrast")
+    table.add_column(header="Method")
+    table.add_column(header="Genes", justify="right")
+    for contrast, method, genes in differential.contrasts(database_file=database):
+        table.add_row(contrast, method, f"{genes:,}")
+    rich_print(table)
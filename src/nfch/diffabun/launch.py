@@ -0,0 +1,97 @@
+"""Launches a prepared nfcore/differentialabundance run through the run queue of the host."""
+
+from typing import TYPE_CHECKING, Annotated, Any
+
+import typer
+
+from nfch import launcher, utils
+from nfch.workflow import DiffAbun
+
+if TYPE_CHECKING:
+    from pathlib import Path
+
+app = typer.Typer()
+
+
+@app.command()
+def launch(
+    max_runs: Annotated[
+        int,
+        typer.Option(
+            help="Maximum number of Nextflow runs at once on this host, the run waits for a free slot.",
+        ),
+    ] = 4,
+    detach: Annotated[  # noqa: FBT002
+        bool,
+        typer.Option(
+            help='Wait for a slot and run in the background, the output goes to ".nfch/launch_<workflow folder>.log".',
+        ),
+    ] = True,
+    backend: Annotated[
+        str,
+        typer.Option(
+            help=f"Scheduler backend the Nextflow head job is started with: {', '.join(launcher.BACKENDS)}.",
+        ),
+    ] = "local",
+    interval: Annotated[
+        float,
+        typer.Option(
+            help="Number of seconds between checks of the queue and of the run.",
+        ),
+    ] = 30.0,
+) -> None:
+    """Start the prepared Nextflow run, at most --max-runs runs at once per host, and record its PID and timings.
+
+    Parameters
+    ----------
+    max_runs : Annotated[ int, typer.Option, optional
+        Maximum number of Nextflow runs at once on this host, by default 4
+    detach : Annotated[ bool, typer.Option, optional
+        Wait for a slot and run in the background, by default True
+    backend : Annotated[ str, typer.Option, optional
+        Scheduler backend the head job is started with, by default "local"
+    interval : Annotated[ float, typer.Option, optional
+        Number of seconds between checks of the queue and of the run, by default 30.0
+
+    """
+    if not (DiffAbun.wf_folder / "run" / launcher.COMMAND_FILE).is_file():
+        utils.fail(message=f'"{DiffAbun.wf_folder}" is not prepared, run "nfch diffabun prepare" first!')
+        raise typer.Exit(code=1)
+    # the pre-flight check of "nfch diffabun validate", before the run is queued
+    if not DiffAbun.validate_inputs():
+        raise typer.Exit(code=1)
+    if backend not in launcher.BACKENDS:
+        utils.fail(message=f'Unknown backend "{backend}", choose one of {", ".join(launcher.BACKENDS)}!')
+        raise typer.Exit(code=1)
+    run_launcher: launcher.Launcher = launcher.Launcher(
+        wf_folder=DiffAbun.wf_folder,
+        backend=launcher.BACKENDS[backend](),
+        queue=launcher.RunQueue(slots=max_runs),
+    )
+    active: dict[str, Any] | None = run_launcher.active()
+    if active is not None:
+        utils.fail(message=f"The run is already {active['status']} (launcher PID {active['launcher_pid']}), exiting!")
+        raise typer.Exit(code=1)
+
+    if detach:
+        log_file: Path = run_launcher.record_file.with_suffix(".log")
+        pid: int = launcher.detach(
+            arguments=[
+                "diffabun",
+                "launch",
+                "--no-detach",
+                f"--max-runs={max_runs}",
+                f"--backend={backend}",
+                f"--interval={interval}",
+            ],
+            log_file=log_file,
+        )
+        utils.success(message=f'The run is queued (launcher PID {pid}), follow it with "nfch diffabun status".')
+        return
+
+    utils.processing(message=f"Waiting for one of the {max_runs} slots of the host...")
+    exit_status: int = run_launcher.run(interval=interval)
+    if exit_status:
+        utils.fail(message=f"The run failed with exit status {exit_status}.")
+        raise typer.Exit(code=exit_status)
+    utils.success(message="The run has completed.")
@@ -25,6 +25,18 @@ def prepare(
             help="Genome build of interest.",
         ),
     ] = "GRCh38_Ensembl_release_113",
+    min_set_size: Annotated[
+        int,
+        typer.Option(
+            help="Gene sets with fewer genes of the count matrix are left out of the GMT files passed to GSEA.",
+        ),
+    ] = 15,
+    max_set_size: Annotated[
+        int,
+        typer.Option(
+            help="Gene sets with more genes of the count matrix are left out of the GMT files passed to GSEA.",
+        ),
+    ] = 500,
 ) -> None:
     """Create folders and files associated with a typical nfcore/differentialabundance run.
 
@@ -34,9 +46,13 @@ def prepare(
         Pipeline version, by default "3.18.0"
     genome_build : Annotated[ str, typer.Option, optional
         Genome build of interest, used to provide the right annotation for the "--gtf" parameter
+    min_set_size : Annotated[ int, typer.Option, optional
+        Minimum number of genes of the count matrix for a gene set to be tested, by default 15
+    max_set_size : Annotated[ int, typer.Option, optional
+        Maximum number of genes of the count matrix for a gene set to be tested, by default 500
 
     """
-    diff_abun: DiffAbun = DiffAbun(revision=revision)
+    diff_abun: DiffAbun = DiffAbun(revision=revision, min_set_size=min_set_size, max_set_size=max_set_size)
     diff_abun_dict: dict[str, str] = {"revision": diff_abun.revision, genome_build: "test"}
 
     settings_file: str = "diff_abun.json"
@@ -0,0 +1,135 @@
+"""Queries the differential tables indexed by "diffabun index" across contrasts."""
+
+from pathlib import Path
+from typing import Annotated
+
+import typer
+from rich import box
+from rich import print as rich_print
+from rich.table import Table
+
+from nfch import differential, utils
+
+app = typer.Typer()
+
+
+@app.command()
+def query(  # noqa: PLR0913, PLR0917
+    contrast: Annotated[
+        list[str] | None,
+        typer.Option(
+            help="Contrast of interest, can be repeated, by default all indexed contrasts.",
+        ),
+    ] = None,
+    direction: Annotated[
+        differential.Direction,
+        typer.Option(
+            help="Direction of the fold changes.",
+        ),
+    ] = differential.Direction.ANY,
+    padj: Annotated[
+        float,
+        typer.Option(
+            help="Maximum adjusted p-value.",
+        ),
+    ] = 0.05,
+    log2_fold_change: Annotated[
+        float,
+        typer.Option(
+            help="Minimum absolute log2 fold change.",
+        ),
+    ] = 1.0,
+    min_contrasts: Annotated[
+        int | None,
+        typer.Option(
+            help="Minimum number of contrasts a gene passes the filters in, by default all contrasts of interest.",
+        ),
+    ] = None,
+    output: Annotated[
+        Path | None,
+        typer.Option(
+            help="Write all the genes found to this tab separated file.",
+        ),
+    ] = None,
+    limit: Annotated[
+        int,
+        typer.Option(
+            help="Maximum number of genes shown.",
+        ),
+    ] = 50,
+    database: Annotated[
+        Path,
+        typer.Option(
+            help='SQLite database written by "nfch diffabun index".',
+        ),
+    ] = differential.DATABASE,
+) -> None:
+    """Find the genes differentially expressed in several contrasts, such as the genes up in all of them.
+
+    Parameters
+    ----------
+    contrast : Annotated[ list[str] | None, typer.Option, optional
+        Contrasts of interest, by default None (all indexed contrasts)
+    direction : Annotated[ differential.Direction, typer.Option, optional
+        Direction of the fold changes, by default differential.Direction.ANY
+    padj : Annotated[ float, typer.Option, optional
+        Maximum adjusted p-value, by default 0.05
+    log2_fold_change : Annotated[ float, typer.Option, optional
+        Minimum absolute log2 fold change, by default 1.0
+    min_contrasts : Annotated[ int | None, typer.Option, optional
+        Minimum number of contrasts a gene passes the filters in, by default None (all contrasts of interest)
+    output : Annotated[ Path | None, typer.Option, optional
+        Tab separated file receiving all the genes found, by default None (not written)
+    limit : Annotated[ int, typer.Option, optional
+        Maximum number of genes shown, by default 50
+    database : Annotated[ Path, typer.Option, optional
+        SQLite database written by "nfch diffabun index", by default differential.DATABASE
+
+    """
+    if not database.is_file():
+        utils.fail(message=f'"{database}" could not be found, run "nfch diffabun index" first!')
+        raise typer.Exit(code=1)
+    indexed: list[str] = sorted({row[0] for row in differential.contrasts(database_file=database)})
+    unknown: list[str] = [name for name in contrast or [] if name not in indexed]
+    if unknown:
+        utils.fail(message=f"Contrast(s) {', '.join(unknown)} not indexed, available: {', '.join(indexed)}.")
+        raise typer.Exit(code=1)
+    contrast_ids: list[str] = contrast or indexed
+    hits: list[differential.Hit] = differential.query(
+        database_file=database,
+        contrast_ids=contrast_ids,
+        direction=direction,
+        max_padj=padj,
+        min_log2_fold_change=log2_fold_change,
+        min_contrasts=min_contrasts,
+    )
+
+    table: Table = Table(
+        title=f"{len(hits):,} gene(s), {direction.value}, padj <= {padj}, |log2 fold change| >= {log2_fold_change}",
+        box=box.SIMPLE,
+    )
+    table.add_column(header="Gene ID")
+    table.add_column(header="Gene name")
+    for name in contrast_ids:
+        table.add_column(header=name, justify="right")
+    for hit in hits[:limit]:
+        table.add_row(
+            hit.gene_id,
+            hit.gene_name,
+            *(f"{hit.log2_fold_changes[name]:.2f}" if name in hit.log2_fold_changes else "-" for name in contrast_ids),
+        )
+    rich_print(table)
+    if len(hits) > limit:
+        utils.info(message=f"{len(hits) - limit:,} more gene(s) not shown, use --output to get them all.")
+
+    if output is not None:
+        with output.open(mode="w", encoding="utf-8") as tsv_file:
+            tsv_file.write("\t".join(["gene_id", "gene_name", *contrast_ids]) + "\n")
+            tsv_file.writelines(
+                "\t".join(
+                    [hit.gene_id, hit.gene_name, *(str(hit.log2_fold_changes.get(name, "")) for name in contrast_ids)]
+                )
+                + "\n"
+                for hit in hits
+            )
+        utils.success(message=f'{len(hits):,} gene(s) written to "{output}".')
@@ -0,0 +1,57 @@
+"""Follow the progress of a nfcore/differentialabundance run."""
+
+from typing import Annotated
+
+import typer
+from rich import print as rich_print
+
+from nfch import utils
+from nfch.monitor import RunMonitor
+from nfch.workflow import DiffAbun
+
+app = typer.Typer()
+
+
+@app.command()
+def status(
+    watch: Annotated[  # noqa: FBT002
+        bool,
+        typer.Option(
+            help="Keep refreshing the status until the run finishes.",
+        ),
+    ] = False,
+    interval: Annotated[
+        float,
+        typer.Option(
+            help="Number of seconds between refreshes with --watch.",
+        ),
+    ] = 5.0,
+    top: Annotated[
+        int,
+        typer.Option(
+            help="Number of processes to be shown.",
+        ),
+    ] = 30,
+) -> None:
+    """Show the completed/running/failed tasks per process, the throughput and the ETA of the run.
+
+    Parameters
+    ----------
+    watch : Annotated[ bool, typer.Option, optional
+        Keep refreshing the status until the run finishes, by default False
+    interval : Annotated[ float, typer.Option, optional
+        Number of seconds between refreshes, by default 5.0
+    top : Annotated[ int, typer.Option, optional
+        Number of processes to be shown, by default 30
+
+    """
+    if not DiffAbun.wf_folder.is_dir():
+        utils.fail(message=f'Folder "{DiffAbun.wf_folder}" could not be found, exiting!')
+        raise typer.Exit(code=1)
+    monitor: RunMonitor = RunMonitor(wf_folder=DiffAbun.wf_folder)
+    if watch:
+        monitor.watch(interval=interval, top=top)
+        return
+    monitor.poll()
+    monitor.save()
+    rich_print(monitor.render(top=top))
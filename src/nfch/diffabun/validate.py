@@ -0,0 +1,14 @@
+"""Checks the inputs of a nfcore/differentialabundance run before it is launched."""
+
+import typer
+
+from nfch.workflow import DiffAbun
+
+app = typer.Typer()
+
+
+@app.command()
+def validate() -> None:
+    """Check that the contrasts match the samplesheet and that the count matrix contains all samples."""
+    if not DiffAbun.validate_inputs():
+        raise typer.Exit(code=1)
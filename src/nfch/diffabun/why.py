@@ -0,0 +1,57 @@
+"""Explain why a nfcore/differentialabundance run failed."""
+
+from pathlib import Path
+from typing import Annotated
+
+import typer
+
+from nfch import utils
+from nfch.failures import LOG_FILE, Diagnosis, report, scan_log
+from nfch.workflow import DiffAbun
+
+app = typer.Typer()
+
+
+@app.command()
+def why(
+    log: Annotated[
+        Path | None,
+        typer.Option(
+            help='Nextflow log to be scanned, by default "run/.nextflow.log", the logs of previous runs being '
+            '".nextflow.log.1" and so on.',
+        ),
+    ] = None,
+    examples: Annotated[
+        int,
+        typer.Option(
+            help="Number of failed tasks detailed per process and exit status.",
+        ),
+    ] = 2,
+    lines: Annotated[
+        int,
+        typer.Option(
+            help='Number of lines of the ".command.err" of every detailed task to be shown.',
+        ),
+    ] = 10,
+) -> None:
+    """Show the failed tasks of the run grouped by process and exit status, with the end of their stderr.
+
+    Parameters
+    ----------
+    log : Annotated[ Path | None, typer.Option, optional
+        Nextflow log to be scanned, by default None ("run/.nextflow.log")
+    examples : Annotated[ int, typer.Option, optional
+        Number of failed tasks detailed per process and exit status, by default 2
+    lines : Annotated[ int, typer.Option, optional
+        Number of lines of ".command.err" shown per detailed task, by default 10
+
+    """
+    log_file: Path = log or DiffAbun.wf_folder / "run" / LOG_FILE
+    if not log_file.is_file():
+        utils.fail(message=f'Nextflow log "{log_file}" could not be found, exiting!')
+        raise typer.Exit(code=1)
+    diagnosis: Diagnosis = scan_log(file_path=log_file)
+    if not diagnosis.tasks and not diagnosis.errors:
+        utils.success(message=f'No failed task or error in "{log_file}".')
+        return
+    report(diagnosis=diagnosis, work_folder=DiffAbun.wf_folder / "run" / "work", examples=examples, lines=lines)
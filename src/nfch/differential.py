@@ -0,0 +1,303 @@
+"""Module containing the SQLite store of the differential tables of nfcore/differentialabundance runs.
+
+A run writes one table per contrast and method, e.g. "tables/differential/treated_vs_ctrl.deseq2.results.tsv".
+The tables are streamed into a single database indexed on gene and contrast, so that cross-contrast questions ("which
+genes are up in all three contrasts") are answered with a query instead of loading every table. Tables unchanged since
+they were indexed (same size and mtime) are skipped.
+"""
+
+import csv
+import math
+import re
+from collections.abc import Iterable, Iterator
+from enum import Enum
+from pathlib import Path
+from typing import TYPE_CHECKING, NamedTuple
+
+from nfch import database, profiling
+
+if TYPE_CHECKING:
+    import sqlite3
+
+DATABASE: Path = Path(".nfch/differential.sqlite")
+TABLES_PATTERN: str = "tables/differential/*.results.tsv"
+TABLE_NAME: re.Pattern[str] = re.compile(r"(?P<contrast>.+)\.(?P<method>[^.]+)\.results\.tsv")
+# column names of the supported methods, first match wins: DESeq2, limma
+COLUMNS: dict[str, tuple[str, ...]] = {
+    "gene_name": ("gene_name", "gene_symbol"),
+    "base_mean": ("baseMean", "AveExpr"),
+    "log2_fold_change": ("log2FoldChange", "logFC"),
+    "pvalue": ("pvalue", "P.Value"),
+    "padj": ("padj", "adj.P.Val"),
+}
+SCHEMA: str = """
+CREATE TABLE IF NOT EXISTS sources (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    contrast TEXT NOT NULL,
+    method TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS results (
+    source_id INTEGER NOT NULL REFERENCES sources (id) ON DELETE CASCADE,
+    contrast TEXT NOT NULL,
+    gene_id TEXT NOT NULL,
+    gene_name TEXT,
+    base_mean REAL,
+    log2_fold_change REAL,
+    pvalue REAL,
+    padj REAL
+);
+CREATE INDEX IF NOT EXISTS results_source ON results (source_id);
+CREATE INDEX IF NOT EXISTS results_gene ON results (gene_id);
+CREATE INDEX IF NOT EXISTS results_contrast ON results (contrast, padj);
+"""
+
+
+class Direction(str, Enum):
+    """Direction of the fold changes of interest."""
+
+    UP = "up"
+    DOWN = "down"
+    ANY = "any"
+
+
+class IndexSummary(NamedTuple):
+    """Outcome of an indexing."""
+
+    indexed: int
+    unchanged: int
+    removed: int
+    rows: int
+
+
+class Hit(NamedTuple):
+    """A gene passing the filters of a query, with its log2 fold change per contrast where it passed."""
+
+    gene_id: str
+    gene_name: str
+    log2_fold_changes: dict[str, float]
+
+
+def find_tables(paths: Iterable[Path]) -> list[Path]:
+    """Find the differential tables of runs.
+
+    Parameters
+    ----------
+    paths : Iterable[Path]
+        Differential tables, or output folders of nfcore/differentialabundance runs
+
+    Returns
+    -------
+    list[Path]
+        Differential tables, sorted
+
+    """
+    tables: set[Path] = set()
+    for path in paths:
+        if path.is_file():
+            tables.add(path)
+        else:
+            tables.update(table for table in path.glob(pattern=TABLES_PATTERN) if TABLE_NAME.fullmatch(table.name))
+    return sorted(tables)
+
+
+def _number(value: str) -> float | None:
+    """Convert a value of a table, "NA" (e.g. padj of genes filtered out by DESeq2) becoming None."""
+    try:
+        number: float = float(value)
+    except ValueError:
+        return None
+    return None if math.isnan(number) else number
+
+
+def read_table(
+    file_path: Path,
+) -> Iterator[tuple[str, str | None, float | None, float | None, float | None, float | None]]:
+    """Stream the rows of a differential table: gene ID and name, base mean, log2 fold change, p-value and padj.
+
+    Parameters
+    ----------
+    file_path : Path
+        Tab separated differential table, its first column (or "gene_id") holds the gene IDs
+
+    Yields
+    ------
+    Iterator[tuple[str, str | None, float | None, float | None, float | None, float | None]]
+        A tuple per gene, None where the table has no such column or no value
+
+    Raises
+    ------
+    ValueError
+        If the table has no log2 fold change or adjusted p-value column
+
+    """
+    with file_path.open(mode="r", encoding="utf-8", newline="") as tsv_file:
+        reader = csv.reader(tsv_file, delimiter="\t")
+        header: list[str] = next(reader, [])
+        positions: dict[str, int | None] = {
+            column: next((header.index(name) for name in names if name in header), None)
+            for column, names in COLUMNS.items()
+        }
+        if positions["log2_fold_change"] is None or positions["padj"] is None:
+            msg: str = f'"{file_path}" has no log2 fold change or adjusted p-value column'
+            raise ValueError(msg)
+        gene_id: int = header.index("gene_id") if "gene_id" in header else 0
+        name: int | None = positions.pop("gene_name")
+        numbers: list[int | None] = list(positions.values())
+        for row in reader:
+            yield (
+                row[gene_id],
+                row[name] if name is not None else None,
+                *(None if position is None else _number(row[position]) for position in numbers),
+            )
+
+
+def index(files: Iterable[Path], database_file: Path = DATABASE) -> IndexSummary:
+    """Add differential tables to a database, tables unchanged since they were indexed are skipped.
+
+    Tables indexed before but deleted since are removed from the database.
+
+    Parameters
+    ----------
+    files : Iterable[Path]
+        Differential tables, named "<contrast>.<method>.results.tsv"
+    database_file : Path, optional
+        SQLite database, by default DATABASE (".nfch/differential.sqlite")
+
+    Returns
+    -------
+    IndexSummary
+        Number of tables indexed, unchanged and removed, and of rows written
+
+    """
+    connection: sqlite3.Connection = database.connect(file_path=database_file, schema=SCHEMA)
+    indexed: int = 0
+    unchanged: int = 0
+    rows: int = 0
+    try:
+        for file_path in files:
+            path: str = str(file_path.absolute())
+            size: int = file_path.stat().st_size
+            mtime_ns: int = file_path.stat().st_mtime_ns
+            known: tuple[int, int] | None = connection.execute(
+                "SELECT size, mtime_ns FROM sources WHERE path = ?",
+                (path,),
+            ).fetchone()
+            if known == (size, mtime_ns):
+                unchanged += 1
+                continue
+            match: re.Match[str] | None = TABLE_NAME.fullmatch(file_path.name)
+            contrast, method = (match.group("contrast"), match.group("method")) if match else (file_path.stem, "")
+            with profiling.span("index table", path=file_path), connection:
+                connection.execute("DELETE FROM sources WHERE path = ?", (path,))
+                source_id: int | None = connection.execute(
+                    "INSERT INTO sources (path, contrast, method, size, mtime_ns) VALUES (?, ?, ?, ?, ?)",
+                    (path, contrast, method, size, mtime_ns),
+                ).lastrowid
+                before: int = connection.total_changes
+                connection.executemany(
+                    "INSERT INTO results (source_id, contrast, gene_id, gene_name, base_mean, log2_fold_change, "
+                    "pvalue, padj) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    ((source_id, contrast, *row) for row in read_table(file_path=file_path)),
+                )
+                rows += connection.total_changes - before
+            indexed += 1
+        with connection:
+            removed: int = 0
+            for source_id, path in connection.execute("SELECT id, path FROM sources").fetchall():
+                if not Path(path).is_file():
+                    connection.execute("DELETE FROM sources WHERE id = ?", (source_id,))
+                    removed += 1
+    finally:
+        connection.close()
+    return IndexSummary(indexed=indexed, unchanged=unchanged, removed=removed, rows=rows)
+
+
+def contrasts(database_file: Path = DATABASE) -> list[tuple[str, str, int]]:
+    """List the indexed contrasts.
+
+    Parameters
+    ----------
+    database_file : Path, optional
+        SQLite database, by default DATABASE (".nfch/differential.sqlite")
+
+    Returns
+    -------
+    list[tuple[str, str, int]]
+        A row per table: contrast, method and number of genes
+
+    """
+    connection: sqlite3.Connection = database.connect(file_path=database_file, schema=SCHEMA)
+    try:
+        return connection.execute(
+            "SELECT sources.contrast, sources.method, COUNT(results.source_id) FROM sources "
+            "LEFT JOIN results ON results.source_id = sources.id GROUP BY sources.id ORDER BY sources.contrast",
+        ).fetchall()
+    finally:
+        connection.close()
+
+
+def query(  # noqa: PLR0913
+    database_file: Path = DATABASE,
+    *,
+    contrast_ids: list[str] | None = None,
+    direction: Direction = Direction.ANY,
+    max_padj: float = 0.05,
+    min_log2_fold_change: float = 1.0,
+    min_contrasts: int | None = None,
+) -> list[Hit]:
+    """Find the genes differentially expressed in several contrasts.
+
+    Parameters
+    ----------
+    database_file : Path, optional
+        SQLite database, by default DATABASE (".nfch/differential.sqlite")
+    contrast_ids : list[str] | None, optional
+        Contrasts of interest, by default None (all indexed contrasts)
+    direction : Direction, optional
+        Direction of the fold changes, by default Direction.ANY (up or down, possibly differing between contrasts)
+    max_padj : float, optional
+        Maximum adjusted p-value, by default 0.05
+    min_log2_fold_change : float, optional
+        Minimum absolute log2 fold change, by default 1.0
+    min_contrasts : int | None, optional
+        Minimum number of contrasts a gene passes the filters in, by default None (all contrasts of interest)
+
+    Returns
+    -------
+    list[Hit]
+        Genes passing the filters in enough contrasts, sorted by number of contrasts then gene ID
+
+    """
+    connection: sqlite3.Connection = database.connect(file_path=database_file, schema=SCHEMA)
+    try:
+        if contrast_ids is None:
+            contrast_ids = [row[0] for row in connection.execute("SELECT DISTINCT contrast FROM sources")]
+        fold_change: str = {
+            Direction.UP: "log2_fold_change >= ?",
+            Direction.DOWN: "log2_fold_change <= -?",
+            Direction.ANY: "ABS(log2_fold_change) >= ?",
+        }[direction]
+        placeholders: str = ", ".join("?" * len(contrast_ids))
+        rows: list[tuple[str, str | None, str, float]] = connection.execute(
+            "SELECT gene_id, gene_name, contrast, log2_fold_change FROM results "  # noqa: S608, constant clauses
+            f"WHERE contrast IN ({placeholders}) AND padj <= ? AND {fold_change}",
+            (*contrast_ids, max_padj, min_log2_fold_change),
+        ).fetchall()
+    finally:
+        connection.close()
+
+    hits: dict[str, Hit] = {}
+    for gene_id, gene_name, contrast, log2_fold_change in rows:
+        hit: Hit = hits.setdefault(gene_id, Hit(gene_id=gene_id, gene_name="", log2_fold_changes={}))
+        if gene_name and not hit.gene_name:
+            # e.g. limma tables have no gene names
+            hit = hits[gene_id] = hit._replace(gene_name=gene_name)
+        hit.log2_fold_changes[contrast] = log2_fold_change
+    required: int = len(set(contrast_ids)) if min_contrasts is None else min_contrasts
+    return sorted(
+        (hit for hit in hits.values() if len(hit.log2_fold_changes) >= required),
+        key=lambda hit: (-len(hit.log2_fold_changes), hit.gene_id),
+    )
@@ -0,0 +1,205 @@
+"""Module containing the class DiskUsage reporting where the space of a workflow folder goes."""
+
+import os
+import stat
+import threading
+from pathlib import Path
+from typing import Any
+
+from rich import box
+from rich import print as rich_print
+from rich.table import Table
+
+from nfch import scanner, trace, utils
+
+CACHE_VERSION: int = 1
+
+
+class DiskUsage:
+    """Disk usage of a workflow folder ("run/work", "output", "metadata", ...), broken down by area, process and sample.
+
+    Every directory is summarised by the allocated size of the files directly within it. Symlinks are not followed and
+    files with several hard links are counted once, so that the inputs staged into Nextflow task folders and outputs
+    published as links do not inflate the totals. The summaries are cached in ".nfch/" and reused for every directory
+    whose mtime did not change (i.e. no entry was added, removed or renamed within it).
+    """
+
+    def __init__(self, wf_folder: Path, cache_file: Path | None = None) -> None:
+        """Instantiate the analyzer.
+
+        Parameters
+        ----------
+        wf_folder : Path
+            Folder containing all intermediate/final files/folders for a nfcore run
+        cache_file : Path | None, optional
+            Cache of the directory summaries, by default ".nfch/du_<wf_folder>.json"
+
+        """
+        self.wf_folder: Path = wf_folder
+        self.cache_file: Path = cache_file or Path(".nfch") / f"du_{wf_folder.name}.json"
+        self.summaries: dict[str, dict[str, Any]] = {}
+        self.cache_hits: int = 0
+        self._cache: dict[str, dict[str, Any]] = {}
+        self._lock: threading.Lock = threading.Lock()
+
+    def _load_cache(self) -> None:
+        """Load the directory summaries of a previous scan, ignoring caches of another format."""
+        if not self.cache_file.is_file():
+            return
+        cache: dict[str, Any] = utils.json_to_dict(file_path=self.cache_file)
+        if cache.get("version") == CACHE_VERSION:
+            self._cache = cache["directories"]
+
+    def _summarise(self, path: str) -> list[str]:
+        """Summarise the files directly within a directory and return its subdirectories."""
+        mtime: int = os.lstat(path).st_mtime_ns
+        cached: dict[str, Any] | None = self._cache.get(path)
+        if cached is not None and cached["mtime"] == mtime:
+            summary: dict[str, Any] = cached
+            with self._lock:
+                self.cache_hits += 1
+        else:
+            summary = {"mtime": mtime, "files": 0, "bytes": 0, "bam_bytes": 0, "links": [], "subdirs": []}
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        summary["subdirs"].append(entry.name)
+                        continue
+                    try:
+                        entry_stat: os.stat_result = entry.stat(follow_symlinks=False)
+                    except FileNotFoundError:
+                        continue
+                    if stat.S_ISLNK(entry_stat.st_mode):
+                        continue
+                    size: int = entry_stat.st_blocks * 512
+                    summary["files"] += 1
+                    if entry_stat.st_nlink > 1:
+                        # accounted for once all directories are known
+                        summary["links"].append(
+                            [entry_stat.st_dev, entry_stat.st_ino, size, entry.name.endswith(".bam")]
+                        )
+                        continue
+                    summary["bytes"] += size
+                    if entry.name.endswith(".bam"):
+                        summary["bam_bytes"] += size
+        self.summaries[path] = summary
+        return [os.path.join(path, subdir) for subdir in summary["subdirs"]]  # noqa: PTH118
+
+    def scan(self, workers: int = scanner.DEFAULT_WORKERS, *, use_cache: bool = True) -> None:
+        """Scan the workflow folder in parallel and update the cache.
+
+        Parameters
+        ----------
+        workers : int, optional
+            Number of threads, by default scanner.DEFAULT_WORKERS
+        use_cache : bool, optional
+            Reuse the summaries of unchanged directories, by default True
+
+        """
+        if use_cache:
+            self._load_cache()
+        errors: list[tuple[str, OSError]] = scanner.parallel_walk(
+            roots=[str(self.wf_folder)],
+            expand=self._summarise,
+            workers=workers,
+        )
+        for path, error in errors:
+            utils.warning(message=f'"{path}" could not be scanned: {error}', level=1)
+        if self.cache_file.parent.is_dir():
+            utils.dict_to_json(
+                dictionary={"version": CACHE_VERSION, "directories": self.summaries},
+                file_path=self.cache_file,
+            )
+
+    def _area(self, relative: Path) -> str:
+        """Return the area of the workflow folder a (relative) directory belongs to."""
+        parts: tuple[str, ...] = relative.parts
+        if parts[:2] == ("run", "work"):
+            return "work"
+        if parts and parts[0] in {"output", "metadata"}:
+            return parts[0]
+        return "other"
+
+    def totals(self) -> dict[str, dict[str, dict[str, int]]]:
+        """Aggregate the directory summaries by area, process and sample.
+
+        Processes and samples are looked up in the execution traces of the workflow by task hash, task folders not
+        referenced by any trace are reported as "(untraced)".
+
+        Returns
+        -------
+        dict[str, dict[str, dict[str, int]]]
+            {"area": {...}, "process": {...}, "sample": {...}}, each mapping a name to files, bytes and bam_bytes
+
+        """
+        task_index: trace.TaskIndex = trace.TaskIndex.from_trace_files(
+            trace_files=trace.find_trace_files(output_folder=self.wf_folder / "output"),
+        )
+        totals: dict[str, dict[str, dict[str, int]]] = {"area": {}, "process": {}, "sample": {}}
+        seen_inodes: set[tuple[int, int]] = set()
+
+        def _add(kind: str, name: str, files: int, num_bytes: int, bam_bytes: int) -> None:
+            counters: dict[str, int] = totals[kind].setdefault(name, {"files": 0, "bytes": 0, "bam_bytes": 0})
+            counters["files"] += files
+            counters["bytes"] += num_bytes
+            counters["bam_bytes"] += bam_bytes
+
+        for path, summary in self.summaries.items():
+            files: int = summary["files"]
+            num_bytes: int = summary["bytes"]
+            bam_bytes: int = summary["bam_bytes"]
+            for device, inode, size, is_bam in summary["links"]:
+                if (device, inode) in seen_inodes:
+                    files -= 1
+                    continue
+                seen_inodes.add((device, inode))
+                num_bytes += size
+                bam_bytes += size if is_bam else 0
+
+            relative: Path = Path(path).relative_to(self.wf_folder)
+            area: str = self._area(relative=relative)
+            _add("area", area, files, num_bytes, bam_bytes)
+            if area == "work" and len(relative.parts) >= 4:  # noqa: PLR2004
+                records: list[trace.TraceRecord] = task_index.get(task_folder=Path(*relative.parts[2:4]))
+                process: str = records[0].process if records else "(untraced)"
+                sample: str = (records[0].tag or "(none)") if records else "(untraced)"
+                _add("process", process, files, num_bytes, bam_bytes)
+                _add("sample", sample, files, num_bytes, bam_bytes)
+        return totals
+
+    def report(self, top: int = 20) -> None:
+        """Print the disk usage by area, process and sample.
+
+        Parameters
+        ----------
+        top : int, optional
+            Number of processes/samples to be shown, by default 20
+
+        """
+        totals: dict[str, dict[str, dict[str, int]]] = self.totals()
+        titles: dict[str, str] = {
+            "area": f'Disk usage of "{self.wf_folder}"',
+            "process": f"Top {top} processes (work folder)",
+            "sample": f"Top {top} samples (work folder)",
+        }
+        for kind, title in titles.items():
+            if not totals[kind]:
+                continue
+            table: Table = Table(title=title, box=box.SIMPLE)
+            table.add_column(header=kind.capitalize())
+            table.add_column(header="Files", justify="right")
+            table.add_column(header="Size", justify="right")
+            table.add_column(header="BAM", justify="right")
+            ranked: list[tuple[str, dict[str, int]]] = sorted(
+                totals[kind].items(),
+                key=lambda item: item[1]["bytes"],
+                reverse=True,
+            )
+            for name, counters in ranked if kind == "area" else ranked[:top]:
+                table.add_row(
+                    name,
+                    f"{counters['files']:,}",
+                    utils.human_readable_size(num_bytes=counters["bytes"]),
+                    utils.human_readable_size(num_bytes=counters["bam_bytes"]),
+                )
+            rich_print(table)
@@ -0,0 +1,308 @@
+"""Module explaining why a Nextflow run failed from its ".nextflow.log".
+
+The log of a long run can weigh gigabytes. It is memory-mapped and scanned once by a single precompiled pattern
+anchored on a literal, which only stops on the lines logged as errors and on the notes about failed task attempts
+("[3f/9a7b12] NOTE: Process `X` terminated with an error exit status (137) -- Execution is retried (1)"). Only these
+lines, and the block following the fatal "Error executing process" error, are decoded. The failed tasks are grouped
+by process and exit status, and followed to their work folder for the end of their ".command.err".
+"""
+
+import mmap
+import re
+from collections.abc import Iterator
+from pathlib import Path
+from typing import NamedTuple
+
+from rich import box
+from rich import print as rich_print
+from rich.markup import escape
+from rich.panel import Panel
+from rich.table import Table
+from rich.text import Text
+
+from nfch import profiling, utils
+
+LOG_FILE: str = ".nextflow.log"
+# the only pattern run over the whole log, anchored on "] " to benefit from the literal search of the re module
+EVENT_PATTERN: re.Pattern[bytes] = re.compile(rb"\] (?:ERROR |NOTE: )")
+# start of a log line, e.g. "Oct-17 12:00:01.123 [Task monitor] INFO  nextflow.Session - "
+LINE_PATTERN: re.Pattern[bytes] = re.compile(rb"\n[A-Z][a-z]{2}-\d{2} \d{2}:\d{2}:\d{2}\.\d{3} \[")
+HASH_PATTERN: re.Pattern[str] = re.compile(r"\[(?P<hash>[0-9a-f]{2}/[0-9a-f]{6})\] NOTE: ")
+PROCESS_PATTERN: re.Pattern[str] = re.compile(r"[Pp]rocess `(?P<name>[^`]+)`")
+EXIT_PATTERN: re.Pattern[str] = re.compile(r"exit status \((?P<status>-?\d+)\)")
+FATAL_PATTERN: re.Pattern[str] = re.compile(r"Error executing process > '(?P<name>[^']+)'")
+# sections of the block following the fatal error, their content being on the next line
+SECTIONS: dict[str, re.Pattern[str]] = {
+    "cause": re.compile(r"^Caused by:\n\s*(?P<value>.+)$", re.MULTILINE),
+    "exit_status": re.compile(r"^Command exit status:\n\s*(?P<value>-?\d+)", re.MULTILINE),
+    "work_dir": re.compile(r"^Work dir:\n\s*(?P<value>\S+)", re.MULTILINE),
+}
+MAX_BLOCK_BYTES: int = 1 << 20
+TAIL_BYTES: int = 1 << 16
+# usual meaning of the exit statuses of tasks
+EXIT_HINTS: dict[str, str] = {
+    "1": "generic error, see the stderr",
+    "126": "command not executable",
+    "127": "command not found, e.g. a missing container or conda environment",
+    "130": "interrupted (SIGINT)",
+    "137": "killed (SIGKILL), usually out of memory",
+    "139": "segmentation fault",
+    "140": "killed by the scheduler, usually a time or memory limit",
+    "143": "terminated (SIGTERM), usually the time limit of the scheduler",
+}
+
+
+class FailedTask(NamedTuple):
+    """A failed attempt of a task."""
+
+    name: str
+    exit_status: str
+    outcome: str
+    task_hash: str
+    work_dir: str
+    cause: str
+
+
+class FailureGroup(NamedTuple):
+    """The failed attempts of a process with the same exit status."""
+
+    process: str
+    exit_status: str
+    tasks: list[FailedTask]
+
+
+class Diagnosis(NamedTuple):
+    """What went wrong in a run: failed task attempts, in order, and the other errors logged."""
+
+    tasks: list[FailedTask]
+    errors: list[str]
+
+
+def _line(log: mmap.mmap, position: int) -> tuple[str, int]:
+    """Return the line holding a byte position, and the position of its end."""
+    start: int = log.rfind(b"\n", 0, position) + 1
+    end: int = log.find(b"\n", position)
+    end = len(log) if end == -1 else end
+    return log[start:end].decode(encoding="utf-8", errors="replace"), end
+
+
+def _block(log: mmap.mmap, position: int) -> tuple[str, int]:
+    """Return the lines following a log line up to the next log line (e.g. the fatal error details), and their end."""
+    match: re.Match[bytes] | None = LINE_PATTERN.search(log, position, min(len(log), position + MAX_BLOCK_BYTES))
+    end: int = match.start() if match is not None else min(len(log), position + MAX_BLOCK_BYTES)
+    return log[position:end].decode(encoding="utf-8", errors="replace"), end
+
+
+def _fatal_task(name: str, block: str) -> FailedTask:
+    """Read the task which stopped the run from the block following "Error executing process"."""
+    values: dict[str, str] = {}
+    for section, pattern in SECTIONS.items():
+        match: re.Match[str] | None = pattern.search(block)
+        values[section] = match.group("value").strip() if match is not None else ""
+    if not values["exit_status"]:
+        exit_match: re.Match[str] | None = EXIT_PATTERN.search(values["cause"])
+        values["exit_status"] = exit_match.group("status") if exit_match is not None else "-"
+    task_hash: str = "/".join(Path(values["work_dir"]).parts[-2:])[:9] if values["work_dir"] else ""
+    return FailedTask(
+        name=name,
+        exit_status=values["exit_status"],
+        outcome="fatal",
+        task_hash=task_hash,
+        work_dir=values["work_dir"],
+        cause=values["cause"],
+    )
+
+
+def _note_task(line: str) -> FailedTask | None:
+    """Read a failed task attempt from a note, None if the note is about something else."""
+    if "-- Execution is retried" in line:
+        outcome: str = "retried"
+    elif "-- Error is ignored" in line:
+        outcome = "ignored"
+    else:
+        return None
+    process: re.Match[str] | None = PROCESS_PATTERN.search(line)
+    task_hash: re.Match[str] | None = HASH_PATTERN.search(line)
+    exit_status: re.Match[str] | None = EXIT_PATTERN.search(line)
+    if process is None:
+        return None
+    return FailedTask(
+        name=process.group("name"),
+        exit_status=exit_status.group("status") if exit_status is not None else "-",
+        outcome=outcome,
+        task_hash=task_hash.group("hash") if task_hash is not None else "",
+        work_dir="",
+        cause=line.split("NOTE: ", maxsplit=1)[-1].split(" -- ", maxsplit=1)[0],
+    )
+
+
+@profiling.traced
+def scan_log(file_path: Path) -> Diagnosis:
+    """Scan a Nextflow log once for the failed task attempts and the errors.
+
+    Parameters
+    ----------
+    file_path : Path
+        Nextflow log, usually "run/.nextflow.log"
+
+    Returns
+    -------
+    Diagnosis
+        Failed task attempts (retried, ignored and the fatal one) and the other error messages, in order
+
+    """
+    tasks: list[FailedTask] = []
+    errors: list[str] = []
+    with file_path.open(mode="rb") as log_file:
+        if file_path.stat().st_size == 0:
+            return Diagnosis(tasks=tasks, errors=errors)
+        with mmap.mmap(log_file.fileno(), 0, access=mmap.ACCESS_READ) as log:
+            # the commands and stderr quoted by the fatal error can contain "] ERROR ", they are skipped
+            resume: int = 0
+            for match in EVENT_PATTERN.finditer(log):
+                if match.start() < resume:
+                    continue
+                line, end = _line(log=log, position=match.start())
+                if match.group().endswith(b"NOTE: "):
+                    task: FailedTask | None = _note_task(line=line)
+                    if task is not None:
+                        tasks.append(task)
+                    continue
+                message: str = line.split(" - ", maxsplit=1)[-1].strip()
+                fatal: re.Match[str] | None = FATAL_PATTERN.search(message)
+                if fatal is not None:
+                    block, resume = _block(log=log, position=end)
+                    tasks.append(_fatal_task(name=fatal.group("name"), block=block))
+                elif message and message not in errors:
+                    errors.append(message)
+    return Diagnosis(tasks=tasks, errors=errors)
+
+
+def group_failures(tasks: list[FailedTask]) -> list[FailureGroup]:
+    """Group failed task attempts by process and exit status, the groups holding the fatal attempt first.
+
+    Parameters
+    ----------
+    tasks : list[FailedTask]
+        Failed task attempts
+
+    Returns
+    -------
+    list[FailureGroup]
+        Groups, those with a fatal attempt first and then by decreasing number of attempts
+
+    """
+    groups: dict[tuple[str, str], FailureGroup] = {}
+    for task in tasks:
+        process: str = task.name.split(" (", maxsplit=1)[0]
+        groups.setdefault(
+            (process, task.exit_status),
+            FailureGroup(process=process, exit_status=task.exit_status, tasks=[]),
+        ).tasks.append(task)
+    return sorted(
+        groups.values(),
+        key=lambda group: (all(task.outcome != "fatal" for task in group.tasks), -len(group.tasks)),
+    )
+
+
+def find_work_dir(task: FailedTask, work_folder: Path) -> Path | None:
+    """Find the work folder of a task, also when the run was moved since it was logged.
+
+    Parameters
+    ----------
+    task : FailedTask
+        Failed task attempt
+    work_folder : Path
+        Nextflow "work" folder of the run
+
+    Returns
+    -------
+    Path | None
+        Work folder of the task, None if it is gone (e.g. cleaned)
+
+    """
+    if task.work_dir and Path(task.work_dir).is_dir():
+        return Path(task.work_dir)
+    if not task.task_hash:
+        return None
+    prefix, start = task.task_hash.split("/", maxsplit=1)
+    return next((path for path in (work_folder / prefix).glob(f"{start}*") if path.is_dir()), None)
+
+
+def tail(file_path: Path, lines: int = 10) -> list[str]:
+    """Return the last lines of a file, only its end being read.
+
+    Parameters
+    ----------
+    file_path : Path
+        Text file, e.g. the ".command.err" of a task
+    lines : int, optional
+        Number of lines, by default 10
+
+    Returns
+    -------
+    list[str]
+        Last lines, empty if the file is missing or empty
+
+    """
+    try:
+        with file_path.open(mode="rb") as text_file:
+            size: int = text_file.seek(0, 2)
+            text_file.seek(max(0, size - TAIL_BYTES))
+            content: bytes = text_file.read()
+    except FileNotFoundError:
+        return []
+    return content.decode(encoding="utf-8", errors="replace").splitlines()[-lines:] if lines > 0 else []
+
+
+def _examples(group: FailureGroup, examples: int) -> Iterator[FailedTask]:
+    """Yield the attempts of a group to be detailed, the fatal one first."""
+    yield from sorted(group.tasks, key=lambda task: task.outcome != "fatal")[:examples]
+
+
+def report(diagnosis: Diagnosis, work_folder: Path, examples: int = 2, lines: int = 10) -> None:
+    """Print the failed task attempts grouped by process and exit status, with the end of the stderr of some of them.
+
+    Parameters
+    ----------
+    diagnosis : Diagnosis
+        Outcome of scan_log
+    work_folder : Path
+        Nextflow "work" folder of the run
+    examples : int, optional
+        Number of attempts detailed per group, by default 2
+    lines : int, optional
+        Number of lines of ".command.err" shown per attempt, by default 10
+
+    """
+    groups: list[FailureGroup] = group_failures(tasks=diagnosis.tasks)
+    if groups:
+        table: Table = Table(title="Failed task attempts", box=box.SIMPLE)
+        table.add_column(header="Process", overflow="fold")
+        table.add_column(header="Exit", justify="right")
+        table.add_column(header="Fatal", justify="right")
+        table.add_column(header="Retried", justify="right")
+        table.add_column(header="Ignored", justify="right")
+        table.add_column(header="Usual meaning")
+        for group in groups:
+            outcomes: list[str] = [task.outcome for task in group.tasks]
+            table.add_row(
+                group.process,
+                group.exit_status,
+                *(f"{outcomes.count(outcome):,}" for outcome in ("fatal", "retried", "ignored")),
+                EXIT_HINTS.get(group.exit_status, ""),
+            )
+        rich_print(table)
+    for group in groups:
+        for task in _examples(group=group, examples=examples):
+            utils.fail(message=escape(f"{task.name} ({task.outcome}, exit status {task.exit_status}): {task.cause}"))
+            work_dir: Path | None = find_work_dir(task=task, work_folder=work_folder)
+            if work_dir is None:
+                utils.warning(message="Its work folder could not be found, it may have been cleaned.", level=1)
+                continue
+            utils.info(message=escape(f'Work folder: "{work_dir}"'), level=1)
+            stderr: list[str] = tail(file_path=work_dir / ".command.err", lines=lines)
+            if stderr:
+                rich_print(Panel(Text("\n".join(stderr)), title=".command.err", title_align="left"))
+    for error in diagnosis.errors:
+        utils.fail(message=escape(error))
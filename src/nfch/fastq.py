@@ -0,0 +1,262 @@
+"""Module containing the functions to inspect the first records of FASTQ files without decompressing them fully."""
+
+import zlib
+from collections import Counter
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import NamedTuple
+
+from nfch import scanner
+from nfch.samplesheet import FastqPair
+
+CHUNK_SIZE: int = 64 * 1024
+DEFAULT_RECORDS: int = 1000
+GZIP_WBITS: int = 16 + zlib.MAX_WBITS
+
+
+class ReadHeader(NamedTuple):
+    """Information encoded within the header line of an Illumina read."""
+
+    name: str
+    instrument: str
+    run_id: str
+    flowcell: str
+    lane: str
+    read: str
+    index: str
+
+
+class FastqSummary(NamedTuple):
+    """Summary of the first records of a FASTQ file."""
+
+    path: Path
+    records: int
+    instrument: str
+    flowcell: str
+    lanes: tuple[str, ...]
+    min_length: int
+    max_length: int
+    index: str
+    first_read: str
+    # why the file could not be read, e.g. a truncated or corrupted gzip file
+    error: str = ""
+
+
+def parse_header(header: str) -> ReadHeader:
+    """Parse the header line of a read, unknown fields are left empty.
+
+    Both the Casava 1.8+ format ("@A00123:45:HXXXXDSXY:2:1101:1000:1000 1:N:0:ACGTACGT+TGCATGCA") and the older one
+    ("@HWUSI-EAS100R:6:73:941:1973#ACGT/1") are supported.
+
+    Parameters
+    ----------
+    header : str
+        Header line, starting with "@"
+
+    Returns
+    -------
+    ReadHeader
+        Parsed header
+
+    """
+    name, _, comment = header[1:].rstrip().partition(" ")
+    fields: list[str] = name.split(":")
+    if len(fields) == 7:  # noqa: PLR2004
+        comment_fields: list[str] = comment.split(":")
+        return ReadHeader(
+            name=name,
+            instrument=fields[0],
+            run_id=fields[1],
+            flowcell=fields[2],
+            lane=fields[3],
+            read=comment_fields[0] if len(comment_fields) == 4 else "",  # noqa: PLR2004
+            index=comment_fields[3] if len(comment_fields) == 4 else "",  # noqa: PLR2004
+        )
+    if len(fields) == 5:  # noqa: PLR2004
+        base, _, read = name.partition("/")
+        index: str = base.partition("#")[2]
+        return ReadHeader(
+            name=name.partition("#")[0],
+            instrument=fields[0],
+            run_id="",
+            flowcell="",
+            lane=fields[1],
+            read=read,
+            index=index,
+        )
+    return ReadHeader(name=name, instrument="", run_id="", flowcell="", lane="", read="", index="")
+
+
+def iter_lines(file_path: Path, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """Yield the lines of a (gzipped) FASTQ file, decompressing incrementally only as much as is consumed.
+
+    Parameters
+    ----------
+    file_path : Path
+        FASTQ file, gzipped (including multi-member/bgzip files) or not
+    chunk_size : int, optional
+        Number of compressed bytes read at once, by default CHUNK_SIZE
+
+    Yields
+    ------
+    Iterator[bytes]
+        Lines without line endings
+
+    """
+    compressed: bool = file_path.name.endswith(".gz")
+    decompressor = zlib.decompressobj(wbits=GZIP_WBITS)
+    remainder: bytes = b""
+    with file_path.open(mode="rb") as binary_file:
+        while chunk := binary_file.read(chunk_size):
+            data: bytes = chunk
+            if compressed:
+                data = decompressor.decompress(chunk)
+                # concatenated gzip members, as written by bgzip or "cat a.gz b.gz"
+                while decompressor.eof and decompressor.unused_data:
+                    unused: bytes = decompressor.unused_data
+                    decompressor = zlib.decompressobj(wbits=GZIP_WBITS)
+                    data += decompressor.decompress(unused)
+            lines: list[bytes] = (remainder + data).split(b"\n")
+            remainder = lines.pop()
+            yield from (line.rstrip(b"\r") for line in lines)
+    if compressed and not decompressor.eof:
+        msg: str = "Compressed file ended before the end-of-stream marker was reached"
+        raise EOFError(msg)
+    if remainder:
+        yield remainder
+
+
+def inspect_fastq(file_path: Path, records: int = DEFAULT_RECORDS) -> FastqSummary:
+    """Summarise the first records of a FASTQ file.
+
+    Parameters
+    ----------
+    file_path : Path
+        FASTQ file
+    records : int, optional
+        Number of records to be read, by default DEFAULT_RECORDS
+
+    Returns
+    -------
+    FastqSummary
+        Instrument, flowcell, lanes, read lengths and most frequent index of the records read, or "error" if the file
+        could not be read
+
+    """
+    headers: list[ReadHeader] = []
+    lengths: list[int] = []
+    error: str = ""
+    try:
+        for line_number, line in enumerate(iter_lines(file_path=file_path)):
+            if line_number % 4 == 0:
+                if len(headers) == records:
+                    break
+                headers.append(parse_header(header=line.decode(encoding="ascii", errors="replace")))
+            elif line_number % 4 == 1:
+                lengths.append(len(line))
+    except (OSError, EOFError, zlib.error) as exception:
+        # reported by check_pairs rather than stopping the inspection of the other files
+        error = str(exception) or type(exception).__name__
+    if error or not headers:
+        return FastqSummary(
+            path=file_path,
+            records=0,
+            instrument="",
+            flowcell="",
+            lanes=(),
+            min_length=0,
+            max_length=0,
+            index="",
+            first_read="",
+            error=error,
+        )
+    indexes: Counter[str] = Counter(header.index for header in headers)
+    return FastqSummary(
+        path=file_path,
+        records=len(headers),
+        instrument=headers[0].instrument,
+        flowcell=headers[0].flowcell,
+        lanes=tuple(sorted({header.lane for header in headers if header.lane})),
+        min_length=min(lengths, default=0),
+        max_length=max(lengths, default=0),
+        index=indexes.most_common(1)[0][0],
+        first_read=headers[0].name,
+    )
+
+
+def inspect_fastqs(
+    file_paths: Iterable[Path],
+    records: int = DEFAULT_RECORDS,
+    workers: int = scanner.DEFAULT_WORKERS,
+) -> dict[Path, FastqSummary]:
+    """Inspect many FASTQ files in parallel (decompression releases the GIL).
+
+    Parameters
+    ----------
+    file_paths : Iterable[Path]
+        FASTQ files
+    records : int, optional
+        Number of records read per file, by default DEFAULT_RECORDS
+    workers : int, optional
+        Number of threads, by default scanner.DEFAULT_WORKERS
+
+    Returns
+    -------
+    dict[Path, FastqSummary]
+        Summary per file
+
+    """
+    unique_paths: list[Path] = list(dict.fromkeys(file_paths))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        summaries: Iterator[FastqSummary] = executor.map(lambda path: inspect_fastq(path, records), unique_paths)
+        return dict(zip(unique_paths, summaries, strict=True))
+
+
+def check_pairs(pairs: Iterable[FastqPair], summaries: dict[Path, FastqSummary]) -> tuple[list[str], list[str]]:
+    """Sanity-check the samplesheet rows against the inspected FASTQ files.
+
+    Parameters
+    ----------
+    pairs : Iterable[FastqPair]
+        Samplesheet rows
+    summaries : dict[Path, FastqSummary]
+        Summary per FASTQ file
+
+    Returns
+    -------
+    tuple[list[str], list[str]]
+        Warnings (mismatched pairs, mixed read lengths, ...) and the samples spread over several rows, i.e. the ones
+        nf-core/rnaseq merges
+
+    """
+    warnings: list[str] = []
+    rows_per_sample: Counter[str] = Counter()
+    read_lengths: Counter[int] = Counter()
+    for pair in pairs:
+        rows_per_sample[pair.sample] += 1
+        unreadable: list[FastqSummary] = [
+            summaries[path] for path in (pair.fastq_1, pair.fastq_2) if path is not None and summaries[path].error
+        ]
+        if unreadable:
+            warnings.extend(f'"{summary.path}" could not be read: {summary.error}' for summary in unreadable)
+            continue
+        summary_1: FastqSummary = summaries[pair.fastq_1]
+        read_lengths[summary_1.max_length] += 1
+        if summary_1.records == 0:
+            warnings.append(f'"{pair.fastq_1}" does not contain any read')
+        if pair.fastq_2 is None:
+            continue
+        summary_2: FastqSummary = summaries[pair.fastq_2]
+        read_lengths[summary_2.max_length] += 1
+        if (summary_1.flowcell, summary_1.lanes) != (summary_2.flowcell, summary_2.lanes):
+            warnings.append(f'"{pair.fastq_1}" and "{pair.fastq_2}" come from different flowcells/lanes')
+        elif summary_1.first_read.removesuffix("/1") != summary_2.first_read.removesuffix("/2"):
+            warnings.append(f'"{pair.fastq_1}" and "{pair.fastq_2}" do not start with the same read')
+        if summary_1.records != summary_2.records:
+            warnings.append(f'"{pair.fastq_1}" and "{pair.fastq_2}" do not contain the same number of reads')
+    if len(read_lengths) > 1:
+        lengths: str = ", ".join(f"{length} bp ({files} files)" for length, files in sorted(read_lengths.items()))
+        warnings.append(f"Mixed read lengths: {lengths}")
+    merged: list[str] = sorted(sample for sample, rows in rows_per_sample.items() if rows > 1)
+    return warnings, merged
@@ -1,30 +1,351 @@
 """Module contatining the class FileManager managing file/folder operations."""
 
-import shutil
+import contextlib
+import os
+import stat
 import sys
+import threading
+import time
+from collections.abc import Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from enum import Enum
 from pathlib import Path
 
-from nfch import utils
+from nfch import profiling, trace, utils
+from nfch.scanner import DEFAULT_WORKERS
+
+
+class CleanMode(str, Enum):
+    """Which task folders of a work folder are removed by a clean."""
+
+    ALL = "all"
+    FAILED = "failed"
+    STALE = "stale"
+
+
+class DeletionProgress:
+    """Thread-safe counters for a running deletion, periodically printed as progress messages."""
+
+    def __init__(self, report_interval: float = 2.0) -> None:
+        """Instantiate the progress counters.
+
+        Parameters
+        ----------
+        report_interval : float, optional
+            Minimum number of seconds between two progress messages, by default 2.0
+
+        """
+        self.files: int = 0
+        self.bytes: int = 0
+        self.folders: int = 0
+        self.interrupted: bool = False
+        self.errors: list[str] = []
+        self.report_interval: float = report_interval
+        self._start: float = time.monotonic()
+        self._last_report: float = self._start
+        self._lock: threading.Lock = threading.Lock()
+
+    def add(self, files: int, num_bytes: int, folders: int = 0) -> None:
+        """Add the outcome of a (partial) deletion to the counters."""
+        with self._lock:
+            self.files += files
+            self.bytes += num_bytes
+            self.folders += folders
+
+    def add_error(self, error: str) -> None:
+        """Record an error that prevented (part of) a folder from being deleted."""
+        with self._lock:
+            self.errors.append(error)
+
+    @property
+    def elapsed(self) -> float:
+        """Seconds since the deletion started."""
+        return time.monotonic() - self._start
+
+    def summary(self) -> str:
+        """Return a one-line summary of the deletion so far."""
+        elapsed: float = max(self.elapsed, 1e-9)
+        rate: str = utils.human_readable_size(num_bytes=self.bytes / elapsed)
+        return (
+            f"{self.folders:,} task folders, {self.files:,} files, {utils.human_readable_size(num_bytes=self.bytes)} "
+            f"removed in {elapsed:.1f}s ({self.files / elapsed:,.0f} files/s, {rate}/s)"
+        )
+
+    def report(self, *, force: bool = False) -> None:
+        """Print the progress if the report interval has passed (or if forced)."""
+        now: float = time.monotonic()
+        if force or now - self._last_report >= self.report_interval:
+            self._last_report = now
+            utils.processing(message=self.summary(), level=1)
 
 
 class FileManager:
     """A class for file/folder operations."""
 
     @staticmethod
-    def clean(wf_folder: Path) -> None:
+    def remove_tree(path: Path, stop: threading.Event | None = None) -> tuple[int, int]:
+        """Remove a folder and its content with os.scandir, without following symlinks.
+
+        Parameters
+        ----------
+        path : Path
+            Folder to be removed, a file or a symlink is removed itself (a symlink to a folder is not followed)
+        stop : threading.Event | None, optional
+            Once set, the removal stops as soon as possible leaving the remainder of the folder in place, by default
+            None
+
+        Returns
+        -------
+        tuple[int, int]
+            Number of files and bytes removed
+
+        """
+        try:
+            path_stat: os.stat_result = os.lstat(path)
+        except FileNotFoundError:
+            return 0, 0
+        if not stat.S_ISDIR(path_stat.st_mode):
+            # a file or a symlink (e.g. "work/singularity" pointing to a shared cache) is removed, never followed
+            os.unlink(path)  # noqa: PTH108
+            return 1, path_stat.st_size
+        files: int = 0
+        num_bytes: int = 0
+        # post-order traversal without recursion: a folder is removed once all its children are gone
+        stack: list[tuple[str, bool]] = [(str(path), False)]
+        while stack:
+            if stop is not None and stop.is_set():
+                break
+            folder, children_done = stack.pop()
+            if children_done:
+                with contextlib.suppress(FileNotFoundError):
+                    os.rmdir(folder)  # noqa: PTH106
+                continue
+            stack.append((folder, True))
+            try:
+                with os.scandir(folder) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append((entry.path, False))
+                            continue
+                        try:
+                            size: int = entry.stat(follow_symlinks=False).st_size
+                            os.unlink(entry.path)  # noqa: PTH108
+                        except FileNotFoundError:
+                            continue
+                        files += 1
+                        num_bytes += size
+            except FileNotFoundError:
+                stack.pop()
+        return files, num_bytes
+
+    @staticmethod
+    def iter_work_units(work_folder: Path) -> Iterator[Path]:
+        """Yield the deletable units of a Nextflow work folder.
+
+        Task folders are laid out as "work/xx/hash..." and are yielded one by one, everything else directly within the
+        work folder (e.g. "conda", "singularity", "stage-*") is yielded as a whole.
+
+        Parameters
+        ----------
+        work_folder : Path
+            Nextflow "work" folder
+
+        Yields
+        ------
+        Iterator[Path]
+            Task folders and other top-level entries
+
+        """
+        with os.scandir(work_folder) as top_entries:
+            top_level: list[os.DirEntry[str]] = list(top_entries)
+        for top_entry in top_level:
+            if FileManager.is_hash_prefix(name=top_entry.name) and top_entry.is_dir(follow_symlinks=False):
+                try:
+                    with os.scandir(top_entry.path) as task_entries:
+                        task_paths: list[str] = [task_entry.path for task_entry in task_entries]
+                except FileNotFoundError:
+                    continue
+                yield from (Path(task_path) for task_path in task_paths)
+            else:
+                yield Path(top_entry.path)
+
+    @staticmethod
+    def is_hash_prefix(name: str) -> bool:
+        """Check if a folder name is a two-character hexadecimal prefix as used by Nextflow for task folders."""
+        return len(name) == 2 and all(char in "0123456789abcdef" for char in name)  # noqa: PLR2004
+
+    @staticmethod
+    @profiling.traced
+    def delete_folders(folders: Iterable[Path], workers: int = DEFAULT_WORKERS) -> DeletionProgress:
+        """Delete folders through a bounded thread pool while streaming progress messages.
+
+        Folders are consumed lazily, so that deletion starts before the listing is complete. On Ctrl-C, the pending
+        deletions are cancelled and the running ones stop at their next folder, everything not yet removed is left in
+        place so that a later run picks up where this one stopped.
+
+        Parameters
+        ----------
+        folders : Iterable[Path]
+            Folders (or files) to be deleted
+        workers : int, optional
+            Number of threads, by default DEFAULT_WORKERS
+
+        Returns
+        -------
+        DeletionProgress
+            Final counters, "interrupted" is set if the deletion was stopped by the user and "errors" lists the folders
+            that could not be (fully) removed
+
+        """
+        progress: DeletionProgress = DeletionProgress()
+        stop: threading.Event = threading.Event()
+        max_in_flight: int = workers * 4
+
+        def _delete(folder: Path) -> None:
+            try:
+                files, num_bytes = FileManager.remove_tree(path=folder, stop=stop)
+            except OSError as error:
+                progress.add_error(error=f"{folder}: {error}")
+                return
+            progress.add(files=files, num_bytes=num_bytes, folders=0 if stop.is_set() else 1)
+
+        executor: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="nfch-delete")
+        in_flight: set[Future[None]] = set()
+        try:
+            for folder in folders:
+                in_flight.add(executor.submit(_delete, folder))
+                if len(in_flight) >= max_in_flight:
+                    _, in_flight = wait(in_flight, timeout=progress.report_interval, return_when=FIRST_COMPLETED)
+                    progress.report()
+            while in_flight:
+                _, in_flight = wait(in_flight, timeout=progress.report_interval)
+                progress.report()
+        except KeyboardInterrupt:
+            progress.interrupted = True
+            stop.set()
+            for future in in_flight:
+                future.cancel()
+        finally:
+            executor.shutdown(wait=True)
+        return progress
+
+    @staticmethod
+    @profiling.traced
+    def select_task_folders(wf_folder: Path, mode: CleanMode) -> list[Path]:
+        """Select the task folders to be removed based on the execution traces of the workflow.
+
+        Parameters
+        ----------
+        wf_folder : Path
+            Folder containing all intermediate/final files/folders for a nfcore run
+        mode : CleanMode
+            "failed" selects failed/aborted/superseded attempts, "stale" selects the traced task folders created before
+            the last successful run and not used by it
+
+        Returns
+        -------
+        list[Path]
+            Task folders to be removed, task folders not referenced by any trace are always kept
+
+        """
+        trace_files: list[Path] = trace.find_trace_files(output_folder=wf_folder / "output")
+        if not trace_files:
+            utils.fail(
+                message=f'No execution trace could be found within "{wf_folder / "output" / "pipeline_info"}", use '
+                '"--mode all" to remove the whole work folder.',
+            )
+            sys.exit()
+        utils.processing(message=f"Indexing the tasks of {len(trace_files)} execution trace file(s)...")
+        task_index: trace.TaskIndex = trace.TaskIndex.from_trace_files(trace_files=trace_files)
+
+        keep: set[str]
+        started_before: float | None = None
+        if mode == CleanMode.FAILED:
+            keep = task_index.resume_critical()
+        else:
+            last_run: int | None = task_index.last_successful_run()
+            if last_run is None:
+                utils.fail(message="None of the traced runs has completed successfully, nothing is stale.")
+                sys.exit()
+            keep = task_index.run_hashes(run=last_run)
+            started_before = trace.trace_start_time(file_path=trace_files[last_run])
+            if started_before is None:
+                utils.fail(
+                    message=f'The name of "{trace_files[last_run]}" holds no start time, the task folders of later runs'
+                    " cannot be told from stale ones, exiting!",
+                )
+                sys.exit(1)
+
+        selected: list[Path] = []
+        for task_folder in FileManager.iter_work_units(work_folder=wf_folder / "run" / "work"):
+            key: str = trace.task_key(task_folder=task_folder)
+            if not FileManager.is_hash_prefix(name=task_folder.parent.name) or key in keep:
+                continue
+            if not task_index.get(task_folder=task_folder):
+                continue
+            if started_before is not None and task_folder.lstat().st_mtime >= started_before:
+                continue
+            selected.append(task_folder)
+        return selected
+
+    @staticmethod
+    @profiling.traced
+    def clean(wf_folder: Path, workers: int = DEFAULT_WORKERS, mode: CleanMode | None = None) -> None:
         """Clean after a nfcore run.
 
         Parameters
         ----------
         wf_folder : Path
             _Folder "work" containing all intermediate/final files/folders for a nfcore run
+        workers : int, optional
+            Number of threads deleting task folders in parallel, by default DEFAULT_WORKERS
+        mode : CleanMode | None, optional
+            Which task folders to remove, by default None which removes the whole work folder
 
         """
         run_folder: Path = wf_folder / "run" / "work"
-        try:
-            utils.processing(message=f'Removing "{run_folder}"...')
-            shutil.rmtree(path=run_folder)
-            utils.success(message=f'"{run_folder}" has been removed successfully.')
-        except FileNotFoundError:
+        if not run_folder.is_dir():
             utils.fail(message=f'Folder "{run_folder}" could not be found, exiting!')
             sys.exit()
+
+        mode = mode or CleanMode.ALL
+        folders: Iterable[Path]
+        if mode == CleanMode.ALL:
+            folders = FileManager.iter_work_units(work_folder=run_folder)
+            utils.processing(message=f'Removing "{run_folder}" with {workers} threads...')
+        else:
+            folders = FileManager.select_task_folders(wf_folder=wf_folder, mode=mode)
+            utils.processing(message=f"Removing {len(folders):,} {mode.value} task folders with {workers} threads...")
+        progress: DeletionProgress = FileManager.delete_folders(folders=folders, workers=workers)
+        if progress.interrupted:
+            utils.warning(
+                message=f"Interrupted after {progress.summary()}. Run the same command again to continue removing "
+                f'"{run_folder}".',
+            )
+            sys.exit(130)
+        if progress.errors:
+            for error in progress.errors:
+                utils.fail(message=error, level=1)
+            utils.fail(message=f'{len(progress.errors)} entries of "{run_folder}" could not be removed, exiting!')
+            sys.exit(1)
+
+        if mode == CleanMode.ALL:
+            # the (now empty) hash prefix folders and the work folder itself
+            FileManager.remove_tree(path=run_folder)
+            utils.success(message=f'"{run_folder}" has been removed successfully: {progress.summary()}.')
+        else:
+            FileManager.remove_empty_prefixes(work_folder=run_folder)
+            utils.success(
+                message=f"{utils.human_readable_size(num_bytes=progress.bytes)} reclaimed, the remaining task folders "
+                f'can still be reused by "-resume": {progress.summary()}.',
+            )
+
+    @staticmethod
+    @profiling.traced
+    def remove_empty_prefixes(work_folder: Path) -> None:
+        """Remove the hash prefix folders ("work/xx") left empty by a selective clean."""
+        with os.scandir(work_folder) as entries:
+            for entry in entries:
+                if FileManager.is_hash_prefix(name=entry.name) and entry.is_dir(follow_symlinks=False):
+                    with contextlib.suppress(OSError):
+                        os.rmdir(entry.path)  # noqa: PTH106
@@ -0,0 +1,227 @@
+"""Module containing the class GeneSetIndex, a compact index of the gene sets of a GMT file (e.g. MSigDB collections).
+
+A GMT file is parsed once: its genes are numbered and every set is kept as a slice of an array of gene numbers. The
+index is cached next to the GMT file, in ".nfch_cache/<file name>/", and read back with a few array reads as long as
+the size and mtime of the GMT file did not change. Sets can then be trimmed to the genes of a count matrix and to a
+size window, so that GSEA only gets the sets which can be tested.
+"""
+
+import contextlib
+import json
+from array import array
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, NamedTuple
+
+from nfch import profiling
+
+if TYPE_CHECKING:
+    import os
+
+CACHE_FOLDER: str = ".nfch_cache"
+CACHE_VERSION: int = 1
+
+
+class GeneSet(NamedTuple):
+    """A gene set of a GMT file."""
+
+    name: str
+    description: str
+    genes: list[str]
+
+
+class GeneSetIndex:
+    """Gene sets of a GMT file, the gene numbers of the set i being members[offsets[i]:offsets[i + 1]]."""
+
+    def __init__(
+        self, genes: list[str], names: list[str], descriptions: list[str], offsets: array, members: array
+    ) -> None:
+        """Instantiate the index.
+
+        Parameters
+        ----------
+        genes : list[str]
+            Genes of the file, numbered by position
+        names : list[str]
+            Set names
+        descriptions : list[str]
+            Set descriptions (usually a URL in MSigDB collections)
+        offsets : array
+            Start of the members of every set, followed by the number of members
+        members : array
+            Gene numbers of the sets, set after set
+
+        """
+        self.genes: list[str] = genes
+        self.names: list[str] = names
+        self.descriptions: list[str] = descriptions
+        self.offsets: array = offsets
+        self.members: array = members
+
+    @staticmethod
+    def cache_folder(file_path: Path) -> Path:
+        """Return the cache folder of a GMT file."""
+        return file_path.parent / CACHE_FOLDER / file_path.name
+
+    @classmethod
+    def parse(cls, file_path: Path) -> "GeneSetIndex":
+        """Parse a GMT file: one set per line, its name, its description and its genes, tab separated.
+
+        Parameters
+        ----------
+        file_path : Path
+            GMT file
+
+        Returns
+        -------
+        GeneSetIndex
+            Parsed index
+
+        """
+        gene_numbers: dict[str, int] = {}
+        names: list[str] = []
+        descriptions: list[str] = []
+        offsets: array = array("q", [0])
+        members: array = array("i")
+        with profiling.span("gmt parse", path=file_path), file_path.open(mode="r", encoding="utf-8") as gmt_file:
+            for line in gmt_file:
+                fields: list[str] = line.rstrip("\r\n").split("\t")
+                if len(fields) < 2:  # noqa: PLR2004
+                    continue
+                names.append(fields[0])
+                descriptions.append(fields[1])
+                # "setdefault" numbers the genes in order of appearance, duplicated genes of a set are kept once
+                members.extend(
+                    dict.fromkeys(gene_numbers.setdefault(gene, len(gene_numbers)) for gene in fields[2:] if gene)
+                )
+                offsets.append(len(members))
+        return cls(genes=list(gene_numbers), names=names, descriptions=descriptions, offsets=offsets, members=members)
+
+    def save(self, folder: Path, source: Path) -> None:
+        """Save the index, the metadata (written last) marks the cache as complete.
+
+        Parameters
+        ----------
+        folder : Path
+            Cache folder
+        source : Path
+            GMT file the index was parsed from
+
+        """
+        folder.mkdir(parents=True, exist_ok=True)
+        for name, values in {"offsets": self.offsets, "members": self.members}.items():
+            temporary: Path = folder / f"{name}.tmp.bin"
+            with temporary.open(mode="wb") as binary_file:
+                values.tofile(binary_file)
+            temporary.replace(folder / f"{name}.bin")
+        source_stat: os.stat_result = source.stat()
+        metadata: dict[str, Any] = {
+            "version": CACHE_VERSION,
+            "size": source_stat.st_size,
+            "mtime": source_stat.st_mtime_ns,
+            "genes": self.genes,
+            "names": self.names,
+            "descriptions": self.descriptions,
+        }
+        temporary = folder / "metadata.tmp.json"
+        temporary.write_text(json.dumps(metadata), encoding="utf-8")
+        temporary.replace(folder / "metadata.json")
+
+    @classmethod
+    def load(cls, file_path: Path, *, use_cache: bool = True) -> "GeneSetIndex":
+        """Load the index of a GMT file, from its cache if the file did not change.
+
+        Parameters
+        ----------
+        file_path : Path
+            GMT file
+        use_cache : bool, optional
+            Read and write the cache, by default True
+
+        Returns
+        -------
+        GeneSetIndex
+            Index of the GMT file
+
+        """
+        folder: Path = cls.cache_folder(file_path=file_path)
+        metadata_file: Path = folder / "metadata.json"
+        if use_cache and metadata_file.is_file():
+            metadata: dict[str, Any] = json.loads(metadata_file.read_text(encoding="utf-8"))
+            source_stat: os.stat_result = file_path.stat()
+            if (metadata.get("version"), metadata.get("size"), metadata.get("mtime")) == (
+                CACHE_VERSION,
+                source_stat.st_size,
+                source_stat.st_mtime_ns,
+            ):
+                arrays: dict[str, array] = {"offsets": array("q"), "members": array("i")}
+                for name, values in arrays.items():
+                    binary_file: Path = folder / f"{name}.bin"
+                    with binary_file.open(mode="rb") as opened_file:
+                        values.fromfile(opened_file, binary_file.stat().st_size // values.itemsize)
+                return cls(
+                    genes=metadata["genes"],
+                    names=metadata["names"],
+                    descriptions=metadata["descriptions"],
+                    offsets=arrays["offsets"],
+                    members=arrays["members"],
+                )
+        index: GeneSetIndex = cls.parse(file_path=file_path)
+        if use_cache:
+            # a read-only reference folder or mount only means that the file is parsed again next time
+            with contextlib.suppress(OSError):
+                index.save(folder=folder, source=file_path)
+        return index
+
+    def trim(self, universe: Iterable[str], min_size: int = 15, max_size: int = 500) -> Iterator[GeneSet]:
+        """Yield the sets restricted to the genes of a universe, dropping those out of a size window once restricted.
+
+        Parameters
+        ----------
+        universe : Iterable[str]
+            Genes of interest, e.g. the gene IDs and names of a count matrix
+        min_size : int, optional
+            Minimum number of genes of a set within the universe, by default 15 (as GSEA)
+        max_size : int, optional
+            Maximum number of genes of a set within the universe, by default 500 (as GSEA)
+
+        Yields
+        ------
+        Iterator[GeneSet]
+            Trimmed sets, in the order of the file
+
+        """
+        genes_of_interest: set[str] = set(universe)
+        kept: bytearray = bytearray(gene in genes_of_interest for gene in self.genes)
+        for position, name in enumerate(self.names):
+            genes: list[int] = [
+                gene for gene in self.members[self.offsets[position] : self.offsets[position + 1]] if kept[gene]
+            ]
+            if min_size <= len(genes) <= max_size:
+                yield GeneSet(
+                    name=name, description=self.descriptions[position], genes=[self.genes[gene] for gene in genes]
+                )
+
+
+def write_gmt(gene_sets: Iterable[GeneSet], file_path: Path) -> int:
+    """Write gene sets as a GMT file.
+
+    Parameters
+    ----------
+    gene_sets : Iterable[GeneSet]
+        Gene sets
+    file_path : Path
+        GMT file to be written
+
+    Returns
+    -------
+    int
+        Number of sets written
+
+    """
+    count: int = 0
+    with file_path.open(mode="w", encoding="utf-8") as gmt_file:
+        for gene_set in gene_sets:
+            gmt_file.write("\t".join([gene_set.name, gene_set.description, *gene_set.genes]) + "\n")
+            count += 1
+    return count
@@ -0,0 +1,152 @@
+"""Module containing the class GenomePathValidator checking the paths listed within a genomes.json file."""
+
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from nfch import profiling, utils
+
+if TYPE_CHECKING:
+    import os
+
+# files expected within the index folders generated by nfcore/rnaseq ("save_reference")
+EXPECTED_INDEX_FILES: dict[str, tuple[str, ...]] = {
+    "star": ("Genome", "SA", "SAindex", "chrName.txt"),
+    "salmon": ("versionInfo.json", "pos.bin", "seq.bin"),
+}
+
+
+class GenomePathValidator:
+    """Validate the fasta/gtf/index paths of all genome builds of a genomes.json file concurrently.
+
+    Every path is checked in its own thread with a timeout, so that a single hung mount cannot freeze the tool. The
+    (size, mtime, inode) of the validated paths are stored in a cache so that the optional deep checks are skipped for
+    unchanged references.
+    """
+
+    def __init__(self, cache_file: Path | None = None, timeout: float = 10.0, max_workers: int = 32) -> None:
+        """Instantiate the validator.
+
+        Parameters
+        ----------
+        cache_file : Path | None, optional
+            Stat cache of the validated paths, by default None (no cache)
+        timeout : float, optional
+            Maximum number of seconds spent on a single path, by default 10.0
+        max_workers : int, optional
+            Maximum number of paths checked concurrently, by default 32
+
+        """
+        self.cache_file: Path | None = cache_file
+        self.timeout: float = timeout
+        self.max_workers: int = max_workers
+        self.cache: dict[str, dict[str, Any]] = {}
+        if cache_file is not None and cache_file.is_file():
+            self.cache = utils.json_to_dict(file_path=cache_file)
+
+    @staticmethod
+    def deep_check(file_type: str, path: Path) -> str | None:
+        """Check the content of an index folder.
+
+        Parameters
+        ----------
+        file_type : str
+            Key of the path within the genomes.json, "nfcore_rnaseq_index", "star_index" and "salmon_index" are checked
+        path : Path
+            Path of interest
+
+        Returns
+        -------
+        str | None
+            Description of the problem, None if the path looks fine
+
+        """
+        index_name: str = file_type.removesuffix("_index")
+        if index_name in EXPECTED_INDEX_FILES:
+            missing: list[str] = [file for file in EXPECTED_INDEX_FILES[index_name] if not (path / file).exists()]
+            return f'"{path}" lacks {", ".join(missing)}' if missing else None
+        if file_type != "nfcore_rnaseq_index":
+            return None
+        for index, expected_files in EXPECTED_INDEX_FILES.items():
+            index_folder: Path = path / "index" / index
+            missing = [file for file in expected_files if not (index_folder / file).exists()]
+            if missing:
+                return f'"{index_folder}" lacks {", ".join(missing)}'
+        if next(path.glob(pattern="*.bed"), None) is None:
+            return f'"{path}" does not contain a gene bed file'
+        return None
+
+    def _check(self, item: tuple[str, str], *, deep: bool) -> dict[str, Any]:
+        """Stat a path (and optionally check its content), returning its cache entry."""
+        file_type, file_path = item
+        path_stat: os.stat_result = Path(file_path).stat()
+        entry: dict[str, Any] = {
+            "size": path_stat.st_size,
+            "mtime": path_stat.st_mtime_ns,
+            "inode": path_stat.st_ino,
+            "deep_checked": False,
+        }
+        cached: dict[str, Any] | None = self.cache.get(file_path)
+        if not deep:
+            entry["deep_checked"] = bool(cached and cached["deep_checked"] and self._unchanged(cached, entry))
+            return entry
+        if cached and cached["deep_checked"] and self._unchanged(cached, entry):
+            entry["deep_checked"] = True
+            return entry
+        problem: str | None = self.deep_check(file_type=file_type, path=Path(file_path))
+        if problem:
+            raise ValueError(problem)
+        entry["deep_checked"] = True
+        return entry
+
+    @staticmethod
+    def _unchanged(cached: dict[str, Any], entry: dict[str, Any]) -> bool:
+        """Compare the stat signatures of two cache entries."""
+        return all(cached[key] == entry[key] for key in ("size", "mtime", "inode"))
+
+    @profiling.traced
+    def validate(self, genomes: dict[str, dict[str, str]], *, deep: bool = False) -> bool:
+        """Validate all paths of all genome builds, reporting every problem found.
+
+        Parameters
+        ----------
+        genomes : dict[str, dict[str, str]]
+            Content of a genomes.json file: {genome_build: {file_type: path}}
+        deep : bool, optional
+            Also check that the index folders contain the expected files, by default False
+
+        Returns
+        -------
+        bool
+            True if all existing paths are valid
+
+        """
+        items: list[tuple[str, str]] = []
+        for genome_build, paths in genomes.items():
+            for file_type, file_path in paths.items():
+                if file_path:
+                    items.append((file_type, file_path))
+                else:
+                    utils.warning(message=f'"{file_type}" path for {genome_build} is missing.')
+
+        results: dict[tuple[str, str], dict[str, Any] | Exception] = utils.map_with_timeout(
+            func=lambda item: self._check(item, deep=deep),
+            items=items,
+            timeout=self.timeout,
+            max_workers=self.max_workers,
+        )
+        all_ok: bool = True
+        for (_, file_path), result in results.items():
+            if isinstance(result, TimeoutError):
+                utils.fail(message=f'"{file_path}" could not be checked: {result}!')
+                all_ok = False
+            elif isinstance(result, FileNotFoundError):
+                utils.fail(message=f'"{file_path}" does not seem to be a valid path!')
+                all_ok = False
+            elif isinstance(result, Exception):
+                utils.fail(message=f'"{file_path}" is not valid: {result}!')
+                all_ok = False
+            else:
+                self.cache[file_path] = result
+        if self.cache_file is not None and self.cache_file.parent.is_dir():
+            utils.dict_to_json(dictionary=self.cache, file_path=self.cache_file)
+        return all_ok
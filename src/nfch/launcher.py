@@ -0,0 +1,326 @@
+"""Module containing the classes launching Nextflow head jobs through a host-wide run queue.
+
+A run waits for one of the slots of the queue of the host ("~/.nfch/queue/slot_<n>.lock") before its head job is
+started, so that launching many projects at once never runs more than a given number of Nextflow heads per host. Slots
+are held with advisory locks shared by the launcher and its head job, which the kernel releases once both are gone, so
+that a crash never leaks a slot and a killed launcher never frees the slot of a Nextflow head still running.
+The launches of a workflow, with their PID, exit status and timings, are recorded in ".nfch/launch_<wf folder>.json".
+"""
+
+import os
+import shlex
+import socket
+import subprocess
+import sys
+import time
+from abc import ABC, abstractmethod
+from collections.abc import Iterator
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, ClassVar, NamedTuple
+
+from nfch import state
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover, not available on Windows
+    fcntl = None
+
+QUEUE_FOLDER: Path = Path.home() / ".nfch" / "queue"
+COMMAND_FILE: str = "nextflow_command.txt"
+ACTIVE_STATUSES: frozenset[str] = frozenset({"queued", "running"})
+
+
+def parse_command(command_file: Path) -> list[str]:
+    """Read the Nextflow command written by "prepare", without "nohup" and the output redirections.
+
+    Parameters
+    ----------
+    command_file : Path
+        "nextflow_command.txt" of a run folder
+
+    Returns
+    -------
+    list[str]
+        Arguments of the command, e.g. ["nextflow", "run", "nf-core/rnaseq", "-revision", "3.18.0", ...]
+
+    """
+    words: list[str] = shlex.split(command_file.read_text(encoding="utf-8").replace("\\\n", " "))
+    command: list[str] = []
+    skip_next: bool = False
+    for word in words:
+        if skip_next:
+            skip_next = False
+        elif word in {">", "2>", ">>", "2>>"}:
+            skip_next = True
+        elif word != "nohup" and not word.startswith(("2>", ">")):
+            command.append(word)
+    return command
+
+
+def now() -> str:
+    """Return the current time as an ISO 8601 string."""
+    return datetime.now().astimezone().isoformat(timespec="seconds")
+
+
+class Slot(NamedTuple):
+    """A slot of the run queue held by a launcher."""
+
+    number: int
+    fd: int
+
+
+class Backend(ABC):
+    """Interface of the schedulers the head jobs are started with."""
+
+    name: ClassVar[str]
+
+    @abstractmethod
+    def start(self, command: list[str], run_folder: Path, pass_fds: tuple[int, ...] = ()) -> int:
+        """Start a head job from within its run folder, inheriting pass_fds, and return its id (e.g. a PID)."""
+
+    @abstractmethod
+    def poll(self, job_id: int) -> int | None:
+        """Return the exit status of a head job, None while it is running."""
+
+
+class LocalBackend(Backend):
+    """Head jobs run as subprocesses of the launcher, in their own session so that they survive a logout."""
+
+    name = "local"
+
+    def __init__(self) -> None:
+        """Instantiate the backend."""
+        self.processes: dict[int, subprocess.Popen] = {}
+
+    def start(self, command: list[str], run_folder: Path, pass_fds: tuple[int, ...] = ()) -> int:
+        """Start Nextflow, its output goes to "nohup_nextflow.out"/"nohup_nextflow.err" as with the command file."""
+        with (
+            (run_folder / "nohup_nextflow.out").open(mode="ab") as stdout,
+            (run_folder / "nohup_nextflow.err").open(mode="ab") as stderr,
+        ):
+            process: subprocess.Popen = subprocess.Popen(  # noqa: S603, command written by "prepare"
+                command,
+                cwd=run_folder,
+                stdin=subprocess.DEVNULL,
+                stdout=stdout,
+                stderr=stderr,
+                start_new_session=True,
+                pass_fds=pass_fds,
+            )
+        self.processes[process.pid] = process
+        return process.pid
+
+    def poll(self, job_id: int) -> int | None:
+        """Return the exit code of the subprocess."""
+        return self.processes[job_id].poll()
+
+
+class FakeBackend(Backend):
+    """Backend recording the commands instead of running them, each job "runs" for a given time."""
+
+    name = "fake"
+
+    def __init__(self, exit_status: int = 0, duration: float = 0.0) -> None:
+        """Instantiate the backend.
+
+        Parameters
+        ----------
+        exit_status : int, optional
+            Exit status of every job, by default 0
+        duration : float, optional
+            Number of seconds every job runs for, by default 0.0
+
+        """
+        self.exit_status: int = exit_status
+        self.duration: float = duration
+        self.jobs: dict[int, tuple[list[str], Path, float]] = {}
+
+    def start(self, command: list[str], run_folder: Path, pass_fds: tuple[int, ...] = ()) -> int:  # noqa: ARG002
+        """Record the command."""
+        job_id: int = len(self.jobs) + 1
+        self.jobs[job_id] = (command, run_folder, time.monotonic())
+        return job_id
+
+    def poll(self, job_id: int) -> int | None:
+        """Return the exit status once the job has run for its duration."""
+        return self.exit_status if time.monotonic() - self.jobs[job_id][2] >= self.duration else None
+
+
+BACKENDS: dict[str, type[Backend]] = {backend.name: backend for backend in (LocalBackend, FakeBackend)}
+
+
+class RunQueue:
+    """The slots of a host, at most one head job runs per slot."""
+
+    def __init__(self, slots: int, folder: Path = QUEUE_FOLDER) -> None:
+        """Instantiate the queue.
+
+        Parameters
+        ----------
+        slots : int
+            Maximum number of head jobs running at once on the host
+        folder : Path, optional
+            Folder of the slot lock files, by default QUEUE_FOLDER ("~/.nfch/queue")
+
+        """
+        self.slots: int = slots
+        self.folder: Path = folder
+
+    @contextmanager
+    def slot(self, interval: float = 30.0) -> Iterator[Slot]:
+        """Wait for a free slot and hold it, the head job started in it holds it as well through the locked descriptor.
+
+        Parameters
+        ----------
+        interval : float, optional
+            Number of seconds between attempts while all slots are taken, by default 30.0
+
+        Yields
+        ------
+        Iterator[Slot]
+            Number of the slot and descriptor of its locked file, released on exit if no head job inherited it
+
+        """
+        self.folder.mkdir(parents=True, exist_ok=True)
+        while True:
+            for number in range(self.slots):
+                lock_file = (self.folder / f"slot_{number}.lock").open(mode="a")  # held while yielding
+                try:
+                    if fcntl is not None:
+                        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    lock_file.close()
+                    continue
+                try:
+                    yield Slot(number=number, fd=lock_file.fileno())
+                finally:
+                    lock_file.close()
+                return
+            time.sleep(interval)
+
+
+class Launcher:
+    """Launch the head job of a prepared workflow through the run queue and record its progress."""
+
+    def __init__(
+        self, wf_folder: Path, backend: Backend, queue: RunQueue, settings_folder: Path = Path(".nfch")
+    ) -> None:
+        """Instantiate the launcher.
+
+        Parameters
+        ----------
+        wf_folder : Path
+            Workflow folder, e.g. "nfcore_rnaseq"
+        backend : Backend
+            Scheduler the head job is started with
+        queue : RunQueue
+            Run queue of the host
+        settings_folder : Path, optional
+            Settings folder of the project, by default Path(".nfch")
+
+        """
+        self.wf_folder: Path = wf_folder
+        self.run_folder: Path = wf_folder / "run"
+        self.backend: Backend = backend
+        self.queue: RunQueue = queue
+        self.record_file: Path = settings_folder / f"launch_{wf_folder.name}.json"
+
+    def launches(self) -> list[dict[str, Any]]:
+        """Return the recorded launches of the workflow, the latest last."""
+        if not self.record_file.is_file():
+            return []
+        return state.read_json(file_path=self.record_file).get("launches", [])
+
+    def active(self) -> dict[str, Any] | None:
+        """Return the latest launch if it is queued or running on this host and its launcher is still alive."""
+        launches: list[dict[str, Any]] = self.launches()
+        if (
+            not launches
+            or launches[-1]["status"] not in ACTIVE_STATUSES
+            or launches[-1]["host"] != socket.gethostname()
+        ):
+            return None
+        try:
+            os.kill(launches[-1]["launcher_pid"], 0)
+        except ProcessLookupError:
+            return None
+        except PermissionError:
+            pass
+        return launches[-1]
+
+    def record(self, **fields: Any) -> None:  # noqa: ANN401
+        """Update the latest launch, a new one is added when "status" is "queued"."""
+        with state.update_json(file_path=self.record_file, missing_ok=True) as records:
+            launches: list[dict[str, Any]] = records.setdefault("launches", [])
+            if fields.get("status") == "queued":
+                launches.append({})
+            launches[-1].update(fields)
+
+    def run(self, interval: float = 30.0) -> int:
+        """Wait for a slot, run the head job and wait for it to finish.
+
+        Parameters
+        ----------
+        interval : float, optional
+            Number of seconds between checks of the queue and of the job, by default 30.0
+
+        Returns
+        -------
+        int
+            Exit status of the head job
+
+        """
+        command: list[str] = parse_command(command_file=self.run_folder / COMMAND_FILE)
+        self.record(
+            status="queued",
+            host=socket.gethostname(),
+            backend=self.backend.name,
+            launcher_pid=os.getpid(),
+            command=shlex.join(command),
+            queued=now(),
+        )
+        with self.queue.slot(interval=interval) as slot:
+            # the head job inherits the lock, so that its slot stays taken if this launcher is killed
+            job_id: int = self.backend.start(command=command, run_folder=self.run_folder, pass_fds=(slot.fd,))
+            started: float = time.monotonic()
+            self.record(status="running", slot=slot.number, pid=job_id, started=now())
+            exit_status: int | None = self.backend.poll(job_id=job_id)
+            while exit_status is None:
+                time.sleep(min(interval, 5.0))
+                exit_status = self.backend.poll(job_id=job_id)
+        self.record(
+            status="completed" if exit_status == 0 else "failed",
+            exit_status=exit_status,
+            finished=now(),
+            duration_seconds=round(time.monotonic() - started, 1),
+        )
+        return exit_status
+
+
+def detach(arguments: list[str], log_file: Path) -> int:
+    """Run a nfch command in the background, in its own session, e.g. a launch waiting for a slot overnight.
+
+    Parameters
+    ----------
+    arguments : list[str]
+        Arguments of the command, e.g. ["rnaseq", "launch", "--no-detach"]
+    log_file : Path
+        File receiving the output of the command
+
+    Returns
+    -------
+    int
+        PID of the background process
+
+    """
+    with log_file.open(mode="ab") as log:
+        process: subprocess.Popen = subprocess.Popen(  # noqa: S603, runs nfch itself
+            [sys.executable, "-m", "nfch.main", *arguments],
+            stdin=subprocess.DEVNULL,
+            stdout=log,
+            stderr=subprocess.STDOUT,
+            start_new_session=True,
+        )
+    return process.pid
@@ -11,17 +11,76 @@ https://www.datacamp.com/tutorial/python-uv
 Add --save_merged_fastq to the rnaseq nf_settings.json
 """
 
+from pathlib import Path
+from typing import Annotated
+
 import typer
 
-from nfch.diffabun import app as diffabun_app
-from nfch.project_init import app as project_app
-from nfch.rnaseq import app as rnaseq_app
+from nfch.cli import LazyCommand, LazyGroup
+
+# sub-commands are only imported when run, "--help" and shell completion use this registry
+COMMANDS: dict[str, LazyCommand] = {
+    "project": LazyCommand(module="nfch.project_init", help="Initiate projects and keep track of their settings."),
+    "rnaseq": LazyCommand(module="nfch.rnaseq", help="Prepare, inspect and clean nfcore/rnaseq runs."),
+    "diffabun": LazyCommand(
+        module="nfch.diffabun",
+        help="Prepare, validate and clean nfcore/differentialabundance runs.",
+    ),
+    "reference": LazyCommand(module="nfch.reference", help="Share the genome indexes built by runs between projects."),
+    "sweep": LazyCommand(
+        module="nfch.sweep",
+        help="Find the work folders of the nfch projects under a folder, their size and last run, and remove expired "
+        "ones.",
+    ),
+}
+
+
+class NfchGroup(LazyGroup):
+    """The top level "nfch" command."""
+
+    registry = COMMANDS
+
+
+app: typer.Typer = typer.Typer(cls=NfchGroup)
+
+
+@app.callback()
+def main(
+    ctx: typer.Context,
+    profile: Annotated[  # noqa: FBT002
+        bool,
+        typer.Option(
+            help="Time the filesystem and json operations of the command and print them as a tree.",
+        ),
+    ] = False,
+    profile_output: Annotated[
+        Path | None,
+        typer.Option(
+            help="Also write the timings as a Chrome trace (chrome://tracing, ui.perfetto.dev), implies --profile.",
+        ),
+    ] = None,
+) -> None:
+    """Manage projects using nfcore pipelines."""
+    if not profile and profile_output is None:
+        return
+    # imported here so that the startup of the CLI does not pay for it
+    from rich import print as rich_print  # noqa: PLC0415
+
+    from nfch import profiling  # noqa: PLC0415
+
+    profiling.enable()
+    command_span: profiling.Span = profiling.Span(name=f"nfch {ctx.invoked_subcommand}", attributes={})
+    command_span.__enter__()
 
-app: typer.Typer = typer.Typer()
+    def report() -> None:
+        command_span.__exit__()
+        profiling.disable()
+        rich_print(profiling.render())
+        if profile_output is not None:
+            profiling.write_chrome_trace(file_path=profile_output)
+            rich_print(f'The Chrome trace has been written to "{profile_output}".')
 
-app.add_typer(typer_instance=project_app, name="project")
-app.add_typer(typer_instance=rnaseq_app, name="rnaseq")
-app.add_typer(typer_instance=diffabun_app, name="diffabun")
+    ctx.call_on_close(report)
 
 
 if __name__ == "__main__":
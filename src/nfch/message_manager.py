@@ -1,11 +1,30 @@
 """Module contatining the class MessageManager managing colored output messages."""
 
+import textwrap
+
 from rich import print as rich_print
 
 
 class MessageManager:
     """A utility class for printing colored messages."""
 
+    @staticmethod
+    def _format_message(message: str) -> str:
+        """Remove the common indentation and the surrounding whitespace of a (multiline) message.
+
+        Parameters
+        ----------
+        message : str
+            Text message to be formatted
+
+        Returns
+        -------
+        str
+            Formatted message
+
+        """
+        return textwrap.dedent(text=message).strip()
+
     @staticmethod
     def echo(message: str, message_type: str = "info", level: int = 0) -> None:
         """Print a colored and optionally indented message based on message type.
@@ -37,4 +56,30 @@ class MessageManager:
             indentation: str = " " * level
             emoticon = ":arrow_right_hook: "
 
+        message = MessageManager._format_message(message=message)
         rich_print(f"{new_line}{color}{indentation + emoticon + message}{color}")
+
+    @staticmethod
+    def info(message: str, level: int = 0) -> None:
+        """Print an info message (yellow)."""
+        MessageManager.echo(message=message, message_type="info", level=level)
+
+    @staticmethod
+    def processing(message: str, level: int = 0) -> None:
+        """Print a message about an ongoing process (blue)."""
+        MessageManager.echo(message=message, message_type="process", level=level)
+
+    @staticmethod
+    def success(message: str, level: int = 0) -> None:
+        """Print a success message (green)."""
+        MessageManager.echo(message=message, message_type="success", level=level)
+
+    @staticmethod
+    def warning(message: str, level: int = 0) -> None:
+        """Print a warning message (orange)."""
+        MessageManager.echo(message=message, message_type="warning", level=level)
+
+    @staticmethod
+    def fail(message: str, level: int = 0) -> None:
+        """Print a failure message (red)."""
+        MessageManager.echo(message=message, message_type="fail", level=level)
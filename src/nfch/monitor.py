@@ -0,0 +1,345 @@
+"""Module containing the class RunMonitor following a Nextflow run through its log and its execution trace.
+
+Both files are read incrementally: only the bytes appended since the previous poll are read, the byte offsets and the
+task table are kept in ".nfch/" so that successive "status" calls stay cheap for runs with tens of thousands of tasks.
+"""
+
+import re
+import time
+from collections import Counter
+from collections.abc import Iterator
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from rich import box
+from rich.console import Group
+from rich.live import Live
+from rich.table import Table
+from rich.text import Text
+
+from nfch import trace, utils
+
+if TYPE_CHECKING:
+    import os
+
+# lines printed by Nextflow when its output is not a terminal, e.g. "[3f/9a7b12] Submitted process > FASTQC (s1)"
+LOG_PATTERN: re.Pattern[str] = re.compile(
+    r"^\[(?P<hash>[0-9a-f]{2}/[0-9a-f]{6})\] (?P<event>Submitted|Re-submitted|Cached) process > (?P<name>.+?)\s*$",
+)
+STATE_VERSION: int = 1
+RUNNING: str = "RUNNING"
+FINISHED_STATUSES: frozenset[str] = frozenset({"COMPLETED", "FAILED", "ABORTED"})
+COLUMNS: tuple[str, ...] = ("COMPLETED", "CACHED", RUNNING, "FAILED")
+# bytes read at once, the log of a run followed for the first time can weigh gigabytes
+CHUNK_BYTES: int = 1 << 23
+
+
+class IncrementalReader:
+    """Read the lines appended to a growing text file since the previous read."""
+
+    def __init__(self, file_path: Path, offset: int = 0, inode: int = 0) -> None:
+        """Instantiate the reader.
+
+        Parameters
+        ----------
+        file_path : Path
+            File of interest
+        offset : int, optional
+            Number of bytes already read, by default 0
+        inode : int, optional
+            Inode of the file the offset belongs to, by default 0
+
+        """
+        self.file_path: Path = file_path
+        self.offset: int = offset
+        self.inode: int = inode
+
+    def read_lines(self, chunk_bytes: int = CHUNK_BYTES) -> tuple[list[str], bool]:
+        """Read the complete lines of the next chunk appended since the previous read, a partial line is left for later.
+
+        Parameters
+        ----------
+        chunk_bytes : int, optional
+            Number of bytes read at once, more only for a line longer than that, by default CHUNK_BYTES
+
+        Returns
+        -------
+        tuple[list[str], bool]
+            New lines and whether the file was replaced or truncated, i.e. read again from its beginning
+
+        """
+        try:
+            file_stat: os.stat_result = self.file_path.stat()
+        except FileNotFoundError:
+            return [], False
+        restarted: bool = file_stat.st_ino != self.inode or file_stat.st_size < self.offset
+        if restarted:
+            self.offset = 0
+            self.inode = file_stat.st_ino
+        if file_stat.st_size == self.offset:
+            return [], restarted
+        chunks: list[bytes] = []
+        remaining: int = file_stat.st_size - self.offset
+        with self.file_path.open(mode="rb") as binary_file:
+            binary_file.seek(self.offset)
+            while remaining > 0:
+                chunk: bytes = binary_file.read(min(chunk_bytes, remaining))
+                if not chunk:
+                    break
+                chunks.append(chunk)
+                remaining -= len(chunk)
+                if b"\n" in chunk:
+                    break
+        data: bytes = b"".join(chunks)
+        complete: int = data.rfind(b"\n") + 1
+        self.offset += complete
+        return data[:complete].decode(encoding="utf-8", errors="replace").splitlines(), restarted
+
+    def iter_chunks(self, chunk_bytes: int = CHUNK_BYTES) -> Iterator[tuple[list[str], bool]]:
+        """Yield the complete lines appended since the previous read chunk by chunk, see read_lines."""
+        while True:
+            lines, restarted = self.read_lines(chunk_bytes=chunk_bytes)
+            if lines or restarted:
+                yield lines, restarted
+            if not lines:
+                return
+
+    def state(self) -> dict[str, int]:
+        """Return the position of the reader, to be stored."""
+        return {"offset": self.offset, "inode": self.inode}
+
+
+class RunMonitor:
+    """Task states of the latest run of a workflow, updated from its log and its execution trace."""
+
+    def __init__(self, wf_folder: Path, state_file: Path | None = None) -> None:
+        """Instantiate the monitor, restoring the state of the previous poll if the run did not change.
+
+        Parameters
+        ----------
+        wf_folder : Path
+            Workflow folder, e.g. "nfcore_rnaseq"
+        state_file : Path | None, optional
+            File the state is stored in, by default ".nfch/status_<workflow folder>.json"
+
+        """
+        self.wf_folder: Path = wf_folder
+        self.state_file: Path = state_file or Path(".nfch") / f"status_{wf_folder.name}.json"
+        self.log_reader: IncrementalReader = IncrementalReader(file_path=wf_folder / "run" / "nohup_nextflow.out")
+        self.trace_reader: IncrementalReader | None = None
+        self.columns: list[str] = []
+        self.tasks: dict[str, list[str]] = {}
+        self.counts: dict[str, Counter[str]] = {}
+        self.start_time: float | None = None
+        self.expected: int = 0
+        self.last_error: str = ""
+        self.finished: bool = False
+        if self.state_file.is_file():
+            self.restore(state=utils.json_to_dict(file_path=self.state_file))
+
+    def restore(self, state: dict[str, Any]) -> None:
+        """Restore the readers and the task table stored by a previous poll."""
+        if state.get("version") != STATE_VERSION:
+            return
+        self.log_reader = IncrementalReader(file_path=self.log_reader.file_path, **state["log"])
+        if state["trace_file"]:
+            self.trace_reader = IncrementalReader(file_path=Path(state["trace_file"]), **state["trace"])
+        self.columns = state["columns"]
+        self.start_time = state["start_time"]
+        self.expected = state["expected"]
+        self.last_error = state["last_error"]
+        self.finished = state["finished"]
+        for task_hash, (process, status) in state["tasks"].items():
+            self.set_status(task_hash=task_hash, process=process, status=status)
+
+    def save(self) -> None:
+        """Store the readers and the task table, if the ".nfch/" folder exists."""
+        if not self.state_file.parent.is_dir():
+            return
+        state: dict[str, Any] = {
+            "version": STATE_VERSION,
+            "log": self.log_reader.state(),
+            "trace_file": str(self.trace_reader.file_path) if self.trace_reader else "",
+            "trace": self.trace_reader.state() if self.trace_reader else {},
+            "columns": self.columns,
+            "start_time": self.start_time,
+            "expected": self.expected,
+            "last_error": self.last_error,
+            "finished": self.finished,
+            "tasks": self.tasks,
+        }
+        utils.dict_to_json(dictionary=state, file_path=self.state_file)
+
+    def reset(self, trace_file: Path) -> None:
+        """Forget the previous run and start following a new one.
+
+        The number of tasks of the largest previous run is used as the expected number of tasks of the new run.
+
+        Parameters
+        ----------
+        trace_file : Path
+            Execution trace file of the new run
+
+        """
+        self.trace_reader = IncrementalReader(file_path=trace_file)
+        self.log_reader = IncrementalReader(file_path=self.log_reader.file_path)
+        self.columns = []
+        self.tasks = {}
+        self.counts = {}
+        self.start_time = trace.trace_start_time(file_path=trace_file)
+        self.last_error = ""
+        self.finished = False
+        self.expected = 0
+        for previous in trace.find_trace_files(output_folder=self.wf_folder / "output"):
+            if previous != trace_file:
+                names: set[str] = {record.name for record in trace.read_trace(file_path=previous)}
+                self.expected = max(self.expected, len(names))
+
+    def set_status(self, task_hash: str, process: str, status: str) -> None:
+        """Update the state of a task and the counts of its process."""
+        previous: list[str] | None = self.tasks.get(task_hash)
+        if previous is not None:
+            if previous[1] in FINISHED_STATUSES and status == RUNNING:
+                # the log can be read after the trace
+                return
+            self.counts[previous[0]][previous[1]] -= 1
+        self.tasks[task_hash] = [process, status]
+        self.counts.setdefault(process, Counter())[status] += 1
+
+    def poll(self) -> None:
+        """Read what was appended to the log and the trace since the previous poll."""
+        trace_files: list[Path] = trace.find_trace_files(output_folder=self.wf_folder / "output")
+        if trace_files and (self.trace_reader is None or self.trace_reader.file_path != trace_files[-1]):
+            self.reset(trace_file=trace_files[-1])
+        self.read_log()
+        if self.trace_reader is not None:
+            self.read_trace(reader=self.trace_reader)
+
+    def read_log(self) -> None:
+        """Read the new lines of the log: submitted/cached tasks, errors and the end of the run."""
+        for log_lines, restarted in self.log_reader.iter_chunks():
+            if restarted:
+                self.last_error = ""
+                self.finished = False
+            for line in log_lines:
+                match: re.Match[str] | None = LOG_PATTERN.match(line)
+                if match is not None:
+                    status: str = "CACHED" if match.group("event") == "Cached" else RUNNING
+                    process: str = match.group("name").split(" (", maxsplit=1)[0]
+                    self.set_status(task_hash=match.group("hash"), process=process, status=status)
+                elif line.startswith("ERROR ~"):
+                    self.last_error = line.removeprefix("ERROR ~").strip()
+                elif "Pipeline completed" in line or "Execution cancelled" in line:
+                    self.finished = True
+
+    def read_trace(self, reader: IncrementalReader) -> None:
+        """Read the new rows of the execution trace, i.e. the finished tasks."""
+        for trace_lines, restarted in reader.iter_chunks():
+            if restarted:
+                self.columns = []
+            if not self.columns and trace_lines:
+                self.columns = trace_lines.pop(0).split("\t")
+            if not self.columns:
+                continue
+            positions: dict[str, int] = {column: index for index, column in enumerate(self.columns)}
+            for line in trace_lines:
+                fields: list[str] = line.split("\t")
+                if len(fields) != len(self.columns) or fields[positions["hash"]] in {"", "-"}:
+                    continue
+                process: str = fields[positions["name"]].split(" (", maxsplit=1)[0]
+                self.set_status(
+                    task_hash=fields[positions["hash"]],
+                    process=process,
+                    status=fields[positions["status"]],
+                )
+
+    def totals(self) -> Counter[str]:
+        """Return the number of tasks per state, over all processes."""
+        totals: Counter[str] = Counter()
+        for counts in self.counts.values():
+            totals.update(counts)
+        return totals
+
+    def throughput(self, now: float | None = None) -> float | None:
+        """Return the number of tasks finished (not cached) per hour since the start of the run."""
+        if self.start_time is None:
+            return None
+        elapsed: float = (now or time.time()) - self.start_time
+        finished: int = sum(count for status, count in self.totals().items() if status in FINISHED_STATUSES)
+        return finished / elapsed * 3600 if elapsed > 0 and finished else None
+
+    def eta(self, now: float | None = None) -> float | None:
+        """Return the estimated number of seconds left, based on the throughput and the size of previous runs."""
+        throughput: float | None = self.throughput(now=now)
+        totals: Counter[str] = self.totals()
+        done: int = totals["COMPLETED"] + totals["CACHED"]
+        remaining: int = max(self.expected, len(self.tasks)) - done
+        if throughput is None or remaining <= 0:
+            return None
+        return remaining / throughput * 3600
+
+    def render(self, top: int = 30) -> Group:
+        """Render the task counts per process and the progress of the run.
+
+        Parameters
+        ----------
+        top : int, optional
+            Number of processes shown, the ones with running/failed tasks first, by default 30
+
+        Returns
+        -------
+        Group
+            Renderable table and summary
+
+        """
+        table: Table = Table(title=f"{self.wf_folder}", box=box.SIMPLE)
+        table.add_column(header="Process")
+        for column in COLUMNS:
+            table.add_column(header=column.capitalize(), justify="right")
+        processes: list[str] = sorted(
+            self.counts,
+            key=lambda process: (-self.counts[process][RUNNING], -self.counts[process]["FAILED"], process),
+        )
+        for process in processes[:top]:
+            table.add_row(process, *(f"{self.counts[process][column]:,}" for column in COLUMNS))
+        totals: Counter[str] = self.totals()
+        table.add_row("Total", *(f"{totals[column]:,}" for column in COLUMNS), style="bold")
+
+        throughput: float | None = self.throughput()
+        eta: float | None = self.eta()
+        summary: list[str] = [f"{len(self.tasks):,} tasks"]
+        if self.expected:
+            summary.append(f"~{self.expected:,} expected from previous runs")
+        if throughput is not None:
+            summary.append(f"{throughput:,.0f} tasks/h")
+        if eta is not None and not self.finished:
+            summary.append(f"ETA {eta / 60:,.0f} min")
+        if self.finished:
+            summary.append("run finished")
+        lines: list[Text] = [Text(", ".join(summary))]
+        if self.last_error:
+            lines.append(Text(f"Last error: {self.last_error}", style="red"))
+        return Group(table, *lines)
+
+    def watch(self, interval: float = 5.0, top: int = 30) -> None:
+        """Poll and redraw the status until the run finishes or Ctrl-C is pressed, saving the state at the end.
+
+        Parameters
+        ----------
+        interval : float, optional
+            Number of seconds between polls, by default 5.0
+        top : int, optional
+            Number of processes shown, by default 30
+
+        """
+        self.poll()
+        try:
+            with Live(self.render(top=top), auto_refresh=False) as live:
+                while not self.finished:
+                    time.sleep(interval)
+                    self.poll()
+                    live.update(self.render(top=top), refresh=True)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.save()
@@ -0,0 +1,369 @@
+"""Module containing the harvester of the general statistics of MultiQC reports into a cross-project SQLite table.
+
+"multiqc_data.json" files hold the plot data and the raw data of every module and reach hundreds of MB for large runs,
+while the per-sample general statistics (mapping rate, duplication, assigned reads, etc.) are a few kB. The files are
+therefore scanned in chunks: only the wanted top-level values are kept, the others are skipped piece by piece so that
+the memory used is bounded by the chunk size rather than by the size of the file.
+"""
+
+import json
+import re
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, NamedTuple, TextIO
+
+from nfch import database
+
+if TYPE_CHECKING:
+    import sqlite3
+
+DATABASE: Path = Path(".nfch/qc.sqlite")
+# data files are looked up at fixed depths so that work folders are never walked
+MULTIQC_PATTERNS: tuple[str, ...] = (
+    "output/multiqc/*/multiqc_data/multiqc_data.json",
+    "nfcore_rnaseq/output/multiqc/*/multiqc_data/multiqc_data.json",
+    "*/nfcore_rnaseq/output/multiqc/*/multiqc_data/multiqc_data.json",
+)
+# general statistics summarised per project, averaged over the samples
+KEY_METRICS: dict[str, str] = {
+    "uniquely_mapped_percent": "Uniquely mapped (%)",
+    "percent_mapped": "Salmon mapped (%)",
+    "percent_assigned": "Assigned (%)",
+    "PERCENT_DUPLICATION": "Duplication",
+}
+SECTIONS: frozenset[str] = frozenset({"report_general_stats_data", "report_general_stats_headers"})
+CHUNK_SIZE: int = 1024 * 1024
+SCHEMA: str = """
+CREATE TABLE IF NOT EXISTS sources (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    project TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS metrics (
+    source_id INTEGER NOT NULL REFERENCES sources (id) ON DELETE CASCADE,
+    sample TEXT NOT NULL,
+    module TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    value REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS metrics_source ON metrics (source_id);
+CREATE INDEX IF NOT EXISTS metrics_metric ON metrics (metric, value);
+CREATE INDEX IF NOT EXISTS metrics_sample ON metrics (sample);
+CREATE INDEX IF NOT EXISTS sources_project ON sources (project);
+CREATE VIEW IF NOT EXISTS qc AS
+    SELECT sources.project, metrics.sample, metrics.module, metrics.metric, metrics.value
+    FROM metrics JOIN sources ON sources.id = metrics.source_id;
+"""
+
+NON_WHITESPACE: re.Pattern[str] = re.compile(r"\S")
+# the rest of a string whose opening quote was consumed
+SCALAR_END: re.Pattern[str] = re.compile(r"[,}\]\s]")
+STRING_END: re.Pattern[str] = re.compile(r'[^"\\]*(?:\\.[^"\\]*)*"', re.DOTALL)
+
+
+class Metric(NamedTuple):
+    """A general statistic of a sample."""
+
+    sample: str
+    module: str
+    metric: str
+    value: float
+
+
+class HarvestSummary(NamedTuple):
+    """Outcome of a harvest."""
+
+    harvested: int
+    unchanged: int
+    rows: int
+
+
+class ChunkScanner:
+    """Walk through the top-level object of a json file held in a sliding buffer."""
+
+    def __init__(self, json_file: TextIO, chunk_size: int = CHUNK_SIZE) -> None:
+        """Instantiate the scanner.
+
+        Parameters
+        ----------
+        json_file : TextIO
+            Open json file
+        chunk_size : int, optional
+            Number of characters read at once, by default CHUNK_SIZE
+
+        """
+        self.json_file: TextIO = json_file
+        self.chunk_size: int = chunk_size
+        self.buffer: str = ""
+        self.position: int = 0
+        self.eof: bool = False
+        self.decoder: json.JSONDecoder = json.JSONDecoder()
+
+    def fill(self) -> bool:
+        """Read the next chunk, dropping the consumed part of the buffer, False at the end of the file."""
+        if self.eof:
+            return False
+        chunk: str = self.json_file.read(self.chunk_size)
+        self.buffer = self.buffer[self.position :] + chunk
+        self.position = 0
+        self.eof = not chunk
+        return bool(chunk)
+
+    def skip_whitespace(self) -> str:
+        """Move to the next non-whitespace character and return it, empty at the end of the file."""
+        while True:
+            match: re.Match[str] | None = NON_WHITESPACE.search(self.buffer, self.position)
+            if match is not None:
+                self.position = match.start()
+                return match.group()
+            self.position = len(self.buffer)
+            if not self.fill():
+                return ""
+
+    def search(self, pattern: re.Pattern[str], *, anchored: bool = False) -> re.Match[str]:
+        """Find a pattern after the current position, reading further chunks until it is found.
+
+        Raises
+        ------
+        ValueError
+            If the end of the file is reached first
+
+        """
+        while True:
+            match: re.Match[str] | None = (
+                pattern.match(self.buffer, self.position) if anchored else pattern.search(self.buffer, self.position)
+            )
+            # a match ending the buffer may continue in the next chunk, e.g. a number
+            if match is not None and (match.end() < len(self.buffer) or self.eof):
+                return match
+            if not self.fill() and match is None:
+                msg: str = "unexpected end of the json file"
+                raise ValueError(msg)
+
+    def read_key(self) -> str:
+        """Read the key whose opening quote is at the current position."""
+        self.position += 1
+        match: re.Match[str] = self.search(pattern=STRING_END, anchored=True)
+        self.position = match.end()
+        return json.loads('"' + match.group())
+
+    def decode_value(self) -> Any:  # noqa: ANN401
+        """Decode the value at the current position."""
+        if self.buffer[self.position] not in '[{"':
+            # a number may continue in the next chunk
+            self.search(pattern=SCALAR_END)
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.position)
+            except json.JSONDecodeError:
+                if not self.fill():
+                    raise
+                continue
+            if end < len(self.buffer) or self.eof:
+                self.position = end
+                return value
+            self.fill()
+
+    def skip_value(self) -> None:
+        """Move after the value at the current position, only holding the parts of it that fit in the buffer.
+
+        Values within the buffer are decoded and dropped at once, which is faster than walking through them, larger
+        containers are walked through and their items skipped the same way.
+
+        Raises
+        ------
+        ValueError
+            If the end of the file is reached first
+
+        """
+        first: str = self.skip_whitespace()
+        if first not in '[{"':
+            # numbers, true, false and null, a number may continue in the next chunk
+            self.position = self.search(pattern=SCALAR_END).start()
+            return
+        try:
+            _, end = self.decoder.raw_decode(self.buffer, self.position)
+        except json.JSONDecodeError:
+            end = len(self.buffer)
+        if end < len(self.buffer) or self.eof:
+            self.position = end
+            return
+        if first == '"':
+            self.position += 1
+            self.position = self.search(pattern=STRING_END, anchored=True).end()
+            return
+        self.position += 1
+        while (character := self.skip_whitespace()) not in {"]", "}"}:
+            if not character:
+                msg: str = "unexpected end of the json file"
+                raise ValueError(msg)
+            if character in {",", ":"}:
+                self.position += 1
+            else:
+                self.skip_value()
+        self.position += 1
+
+    def sections(self, keys: frozenset[str]) -> Iterator[tuple[str, Any]]:
+        """Yield the wanted keys of the top-level object with their decoded value.
+
+        Raises
+        ------
+        ValueError
+            If the file does not contain a json object
+
+        """
+        if self.skip_whitespace() != "{":
+            msg: str = "not a json object"
+            raise ValueError(msg)
+        self.position += 1
+        while (character := self.skip_whitespace()) not in {"}", ""}:
+            if character == ",":
+                self.position += 1
+                continue
+            key: str = self.read_key()
+            if self.skip_whitespace() != ":":
+                msg = f'":" expected after "{key}"'
+                raise ValueError(msg)
+            self.position += 1
+            if key in keys:
+                self.skip_whitespace()
+                yield key, self.decode_value()
+            else:
+                self.skip_value()
+
+
+def read_general_stats(file_path: Path, chunk_size: int = CHUNK_SIZE) -> list[Metric]:
+    """Read the numeric general statistics of a "multiqc_data.json" file.
+
+    Parameters
+    ----------
+    file_path : Path
+        MultiQC data file
+    chunk_size : int, optional
+        Number of characters read at once, by default CHUNK_SIZE
+
+    Returns
+    -------
+    list[Metric]
+        A metric per sample, module and statistic, e.g. ("s1", "STAR", "uniquely_mapped_percent", 91.2)
+
+    """
+    with file_path.open(mode="r", encoding="utf-8") as json_file:
+        sections: dict[str, Any] = dict(ChunkScanner(json_file=json_file, chunk_size=chunk_size).sections(SECTIONS))
+    data: Any = sections.get("report_general_stats_data") or {}
+    headers: Any = sections.get("report_general_stats_headers") or {}
+    # a list with an item per module in older MultiQC versions, a dict keyed by module in recent ones, the headers
+    # being normalised on their own as they can be missing or empty whatever the form of the data
+    if isinstance(data, list):
+        data = {str(index): samples for index, samples in enumerate(data)}
+    if isinstance(headers, list):
+        headers = {str(index): module_headers for index, module_headers in enumerate(headers)}
+    if not isinstance(headers, dict):
+        headers = {}
+    modules: Iterable[tuple[str, dict[str, Any], dict[str, Any]]] = (
+        (module, samples, headers.get(module) or {}) for module, samples in data.items()
+    )
+    metrics: list[Metric] = []
+    for module, samples, module_headers in modules:
+        for sample, values in samples.items():
+            for metric, value in values.items():
+                if isinstance(value, bool) or not isinstance(value, (int, float)):
+                    continue
+                namespace: str = (module_headers.get(metric) or {}).get("namespace") or module
+                metrics.append(Metric(sample=sample, module=namespace, metric=metric, value=float(value)))
+    return metrics
+
+
+def find_multiqc_files(paths: Iterable[Path]) -> list[Path]:
+    """Find the MultiQC data files of projects or output folders, given files are kept as they are."""
+    files: dict[Path, None] = {}
+    for path in paths:
+        if path.is_file():
+            files[path] = None
+            continue
+        for pattern in MULTIQC_PATTERNS:
+            files.update(dict.fromkeys(sorted(path.glob(pattern=pattern))))
+    return list(files)
+
+
+def project_of(file_path: Path) -> str:
+    """Return the project folder of a MultiQC data file, the folder containing the workflow folder of the run."""
+    absolute: Path = file_path.absolute()
+    output_folder: Path | None = next((parent for parent in absolute.parents if parent.name == "output"), None)
+    return str(output_folder.parent.parent if output_folder is not None else absolute.parent)
+
+
+def harvest(files: Iterable[Path], database_file: Path = DATABASE) -> HarvestSummary:
+    """Add the general statistics of MultiQC data files to a database, files unchanged since their harvest are skipped.
+
+    Parameters
+    ----------
+    files : Iterable[Path]
+        MultiQC data files
+    database_file : Path, optional
+        SQLite database, by default DATABASE (".nfch/qc.sqlite")
+
+    Returns
+    -------
+    HarvestSummary
+        Number of files harvested and unchanged, and of rows written
+
+    """
+    connection: sqlite3.Connection = database.connect(file_path=database_file, schema=SCHEMA)
+    harvested: int = 0
+    unchanged: int = 0
+    rows: int = 0
+    try:
+        for file_path in files:
+            path: str = str(file_path.absolute())
+            size: int = file_path.stat().st_size
+            mtime_ns: int = file_path.stat().st_mtime_ns
+            known: tuple[int, int] | None = connection.execute(
+                "SELECT size, mtime_ns FROM sources WHERE path = ?",
+                (path,),
+            ).fetchone()
+            if known == (size, mtime_ns):
+                unchanged += 1
+                continue
+            metrics: list[Metric] = read_general_stats(file_path=file_path)
+            with connection:
+                connection.execute("DELETE FROM sources WHERE path = ?", (path,))
+                source_id: int | None = connection.execute(
+                    "INSERT INTO sources (path, project, size, mtime_ns) VALUES (?, ?, ?, ?)",
+                    (path, project_of(file_path=file_path), size, mtime_ns),
+                ).lastrowid
+                connection.executemany(
+                    "INSERT INTO metrics (source_id, sample, module, metric, value) VALUES (?, ?, ?, ?, ?)",
+                    ((source_id, *metric) for metric in metrics),
+                )
+            harvested += 1
+            rows += len(metrics)
+    finally:
+        connection.close()
+    return HarvestSummary(harvested=harvested, unchanged=unchanged, rows=rows)
+
+
+def project_summary(database_file: Path = DATABASE) -> list[tuple[Any, ...]]:
+    """Summarise the harvested projects: number of samples and average of the key metrics.
+
+    Parameters
+    ----------
+    database_file : Path, optional
+        SQLite database, by default DATABASE (".nfch/qc.sqlite")
+
+    Returns
+    -------
+    list[tuple[Any, ...]]
+        A row per project: project, samples and a value (None if not available) per KEY_METRICS entry
+
+    """
+    averages: str = ", ".join(f"AVG(CASE WHEN metric = '{metric}' THEN value END)" for metric in KEY_METRICS)
+    connection: sqlite3.Connection = database.connect(file_path=database_file, schema=SCHEMA)
+    try:
+        return connection.execute(
+            f"SELECT project, COUNT(DISTINCT sample), {averages} FROM qc GROUP BY project ORDER BY project",  # noqa: S608, constant metrics
+        ).fetchall()
+    finally:
+        connection.close()
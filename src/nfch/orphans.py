@@ -0,0 +1,258 @@
+"""Module containing the class Sweep finding the Nextflow work folders left by the nfch projects of a filesystem tree.
+
+The tree is crawled in parallel and every folder containing a ".nfch" settings folder is taken as a project, whose
+"nfcore_*/run/work" folders are measured. The crawl state is kept between sweeps: a folder whose mtime did not change
+(no entry added, removed or renamed within it) is not listed again, and a work folder whose hash prefix folders
+("work/xx") did not change is not measured again, so that nightly sweeps of large trees only visit what changed.
+"""
+
+import os
+import stat
+import threading
+from pathlib import Path
+from typing import Any, NamedTuple
+
+from nfch import profiling, scanner, state
+from nfch.file_manager import FileManager
+from nfch.launcher import ACTIVE_STATUSES
+
+STATE_FILE: Path = Path.home() / ".nfch" / "sweep.json"
+STATE_VERSION: int = 1
+SETTINGS_FOLDER: str = ".nfch"
+WORK_PATTERN: str = "nfcore_*/run/work"
+# files Nextflow updates on every run, within the run folder
+RUN_MARKERS: tuple[str, ...] = (".nextflow.log", ".nextflow/history")
+
+
+class WorkFolder(NamedTuple):
+    """A Nextflow work folder of a project."""
+
+    project: Path
+    path: Path
+    files: int
+    bytes: int
+    last_run: float
+    active: bool
+
+
+class Sweep:
+    """Crawl a filesystem tree for nfch projects and measure their work folders, reusing previous sweeps."""
+
+    def __init__(self, root: Path, state_file: Path = STATE_FILE) -> None:
+        """Instantiate the sweep.
+
+        Parameters
+        ----------
+        root : Path
+            Top of the tree, e.g. the shared filesystem holding the projects
+        state_file : Path, optional
+            State of previous sweeps, by default STATE_FILE ("~/.nfch/sweep.json")
+
+        """
+        self.root: Path = root
+        self.state_file: Path = state_file
+        self.directories: dict[str, dict[str, Any]] = {}
+        self.work_folders: dict[str, dict[str, Any]] = {}
+        self.projects: list[Path] = []
+        self.listed: int = 0
+        self.measured: int = 0
+        self._previous: dict[str, Any] = {"directories": {}, "work_folders": {}}
+        self._lock: threading.Lock = threading.Lock()
+
+    def _load_state(self) -> None:
+        """Load the state of previous sweeps, ignoring states of another format."""
+        if not self.state_file.is_file():
+            return
+        previous: dict[str, Any] = state.read_json(file_path=self.state_file)
+        if previous.get("version") == STATE_VERSION:
+            self._previous = previous
+
+    def _expand(self, path: str) -> list[str]:
+        """Visit a folder: record it as a project or return its subfolders, hidden ones being skipped."""
+        mtime: int = os.lstat(path).st_mtime_ns
+        entry: dict[str, Any] | None = self._previous["directories"].get(path)
+        if entry is None or entry["mtime"] != mtime:
+            subdirs: list[str] = []
+            with os.scandir(path) as entries:
+                subdirs = [item.name for item in entries if item.is_dir(follow_symlinks=False)]
+            entry = {"mtime": mtime, "project": SETTINGS_FOLDER in subdirs, "subdirs": subdirs}
+            with self._lock:
+                self.listed += 1
+        self.directories[path] = entry
+        if entry["project"]:
+            # the folders of a project are not crawled further
+            with self._lock:
+                self.projects.append(Path(path))
+            return []
+        return [os.path.join(path, subdir) for subdir in entry["subdirs"] if not subdir.startswith(".")]  # noqa: PTH118
+
+    @staticmethod
+    def signature(work_folder: Path) -> list[int]:
+        """Return what changes when tasks are added to or removed from a work folder: its hash prefix folders."""
+        mtimes: list[int] = [work_folder.lstat().st_mtime_ns]
+        with os.scandir(work_folder) as entries:
+            mtimes.extend(
+                entry.stat(follow_symlinks=False).st_mtime_ns
+                for entry in entries
+                if FileManager.is_hash_prefix(name=entry.name) and entry.is_dir(follow_symlinks=False)
+            )
+        return [len(mtimes), max(mtimes)]
+
+    @staticmethod
+    @profiling.traced
+    def measure(work_folder: Path, workers: int = scanner.DEFAULT_WORKERS) -> tuple[int, int]:
+        """Measure a work folder: number of files and allocated bytes, files with several hard links counted once.
+
+        Parameters
+        ----------
+        work_folder : Path
+            Nextflow work folder
+        workers : int, optional
+            Number of threads, by default scanner.DEFAULT_WORKERS
+
+        Returns
+        -------
+        tuple[int, int]
+            Number of files and of bytes, symlinks (e.g. staged inputs) are not followed
+
+        """
+        totals: list[int] = [0, 0]
+        inodes: set[tuple[int, int]] = set()
+        lock: threading.Lock = threading.Lock()
+
+        def _expand(path: str) -> list[str]:
+            subdirs: list[str] = []
+            files: int = 0
+            num_bytes: int = 0
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.path)
+                        continue
+                    try:
+                        entry_stat: os.stat_result = entry.stat(follow_symlinks=False)
+                    except FileNotFoundError:
+                        continue
+                    if stat.S_ISLNK(entry_stat.st_mode):
+                        continue
+                    if entry_stat.st_nlink > 1:
+                        with lock:
+                            if (entry_stat.st_dev, entry_stat.st_ino) in inodes:
+                                continue
+                            inodes.add((entry_stat.st_dev, entry_stat.st_ino))
+                    files += 1
+                    num_bytes += entry_stat.st_blocks * 512
+            with lock:
+                totals[0] += files
+                totals[1] += num_bytes
+            return subdirs
+
+        scanner.parallel_walk(roots=[str(work_folder)], expand=_expand, workers=workers)
+        return totals[0], totals[1]
+
+    @staticmethod
+    def last_run(work_folder: Path, signature: list[int]) -> float:
+        """Return when the run of a work folder was last active: its Nextflow log, history or newest task folder."""
+        run_folder: Path = work_folder.parent
+        times: list[float] = [signature[1] / 1e9]
+        times.extend((run_folder / marker).stat().st_mtime for marker in RUN_MARKERS if (run_folder / marker).is_file())
+        return max(times)
+
+    @staticmethod
+    def is_active(project: Path, work_folder: Path) -> bool:
+        """Return whether the latest launch of the workflow ("nfch <wf> launch") is queued or running."""
+        record_file: Path = project / SETTINGS_FOLDER / f"launch_{work_folder.parent.parent.name}.json"
+        if not record_file.is_file():
+            return False
+        launches: list[dict[str, Any]] = state.read_json(file_path=record_file).get("launches", [])
+        return bool(launches) and launches[-1].get("status") in ACTIVE_STATUSES
+
+    @profiling.traced
+    def run(self, workers: int = scanner.DEFAULT_WORKERS, *, use_state: bool = True) -> list[tuple[str, OSError]]:
+        """Crawl the tree, measure the work folders of the projects found and save the state.
+
+        Parameters
+        ----------
+        workers : int, optional
+            Number of threads, by default scanner.DEFAULT_WORKERS
+        use_state : bool, optional
+            Reuse the state of previous sweeps, by default True
+
+        Returns
+        -------
+        list[tuple[str, OSError]]
+            Folders that could not be visited and the reason
+
+        """
+        if use_state:
+            self._load_state()
+        with profiling.span("crawl", root=self.root):
+            errors: list[tuple[str, OSError]] = scanner.parallel_walk(
+                roots=[str(self.root.absolute())],
+                expand=self._expand,
+                workers=workers,
+            )
+        self.projects.sort()
+        for project in self.projects:
+            for work_folder in sorted(project.glob(pattern=WORK_PATTERN)):
+                if not work_folder.is_dir() or work_folder.is_symlink():
+                    continue
+                try:
+                    signature: list[int] = self.signature(work_folder=work_folder)
+                    entry: dict[str, Any] | None = self._previous["work_folders"].get(str(work_folder))
+                    if entry is None or entry["signature"] != signature:
+                        files, num_bytes = self.measure(work_folder=work_folder, workers=workers)
+                        entry = {"signature": signature, "files": files, "bytes": num_bytes}
+                        self.measured += 1
+                except OSError as error:
+                    errors.append((str(work_folder), error))
+                    continue
+                self.work_folders[str(work_folder)] = {
+                    **entry,
+                    "project": str(project),
+                    "last_run": self.last_run(work_folder=work_folder, signature=signature),
+                    "active": self.is_active(project=project, work_folder=work_folder),
+                }
+        # the state of other trees swept with the same state file is kept
+        root: str = str(self.root.absolute())
+        self.state_file.parent.mkdir(parents=True, exist_ok=True)
+        with state.update_json(file_path=self.state_file, missing_ok=True) as saved:
+            if saved.get("version") != STATE_VERSION:
+                saved.clear()
+            for key, current in (("directories", self.directories), ("work_folders", self.work_folders)):
+                entries: dict[str, Any] = {
+                    path: entry
+                    for path, entry in saved.get(key, {}).items()
+                    if path != root and not path.startswith(root + os.sep)
+                }
+                entries.update(
+                    (
+                        path,
+                        {
+                            name: entry[name]
+                            for name in ("mtime", "project", "subdirs", "signature", "files", "bytes")
+                            if name in entry
+                        },
+                    )
+                    for path, entry in current.items()
+                )
+                saved[key] = entries
+            saved["version"] = STATE_VERSION
+        return errors
+
+    def results(self) -> list[WorkFolder]:
+        """Return the work folders found, largest first."""
+        return sorted(
+            (
+                WorkFolder(
+                    project=Path(entry["project"]),
+                    path=Path(path),
+                    files=entry["files"],
+                    bytes=entry["bytes"],
+                    last_run=entry["last_run"],
+                    active=entry["active"],
+                )
+                for path, entry in self.work_folders.items()
+            ),
+            key=lambda work_folder: -work_folder.bytes,
+        )
@@ -0,0 +1,225 @@
+"""Module containing the timed spans of "nfch --profile".
+
+The filesystem and json operations of nfch run within spans ("with profiling.span(...)" or "@profiling.traced"). Until
+enable() is called, span() returns a shared no-op object and traced functions only pay a flag check, so that the spans
+cost next to nothing in normal runs. Once enabled, the spans of every thread are recorded as a tree which can be printed
+(siblings of the same name merged) or written as a Chrome trace, to be opened with chrome://tracing or ui.perfetto.dev.
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+from collections.abc import Callable
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, ParamSpec, TypeVar
+
+if TYPE_CHECKING:
+    from rich.tree import Tree
+
+P = ParamSpec("P")
+R = TypeVar("R")
+
+_enabled: bool = False
+_roots: list["Span"] = []
+_lock: threading.Lock = threading.Lock()
+_local: threading.local = threading.local()
+
+
+class Span:
+    """A timed operation, with the operations it ran nested as children."""
+
+    __slots__ = ("attributes", "children", "end_ns", "name", "start_ns", "thread")
+
+    def __init__(self, name: str, attributes: dict[str, Any]) -> None:
+        """Instantiate a span, it is timed while used as a context manager."""
+        self.name: str = name
+        self.attributes: dict[str, Any] = attributes
+        self.children: list[Span] = []
+        self.thread: str = threading.current_thread().name
+        self.start_ns: int = 0
+        self.end_ns: int = 0
+
+    @property
+    def duration_ns(self) -> int:
+        """Return the duration of the span in nanoseconds."""
+        return self.end_ns - self.start_ns
+
+    def __enter__(self) -> None:
+        """Start the span, nested within the current span of the thread if any."""
+        stack: list[Span] = _stack()
+        if stack:
+            stack[-1].children.append(self)
+        else:
+            with _lock:
+                _roots.append(self)
+        stack.append(self)
+        self.start_ns = time.perf_counter_ns()
+
+    def __exit__(self, *_: object) -> None:
+        """Stop the span."""
+        self.end_ns = time.perf_counter_ns()
+        _stack().pop()
+
+
+class _NullSpan:
+    """Stand-in returned by span() while profiling is off."""
+
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, *_: object) -> None:
+        return None
+
+
+NULL_SPAN: _NullSpan = _NullSpan()
+
+
+def _stack() -> list[Span]:
+    """Return the spans currently open in the thread, innermost last."""
+    stack: list[Span] | None = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+
+def enable() -> None:
+    """Start recording spans, the spans recorded so far are dropped."""
+    global _enabled  # noqa: PLW0603
+    with _lock:
+        _roots.clear()
+    _enabled = True
+
+
+def disable() -> None:
+    """Stop recording spans, the recorded spans are kept."""
+    global _enabled  # noqa: PLW0603
+    _enabled = False
+
+
+def is_enabled() -> bool:
+    """Return whether spans are being recorded."""
+    return _enabled
+
+
+def span(name: str, **attributes: Any) -> Span | _NullSpan:  # noqa: ANN401
+    """Time the operations of a "with" block, e.g. "with profiling.span("json read", path=str(file_path)):".
+
+    Parameters
+    ----------
+    name : str
+        Name of the operation, the spans of the same name within a parent are merged when printed
+    **attributes : Any
+        Details of the operation (file path, number of items, etc.), kept in the Chrome trace
+
+    Returns
+    -------
+    Span | _NullSpan
+        Context manager timing the block, a no-op while profiling is off
+
+    """
+    if not _enabled:
+        return NULL_SPAN
+    return Span(name=name, attributes=attributes)
+
+
+def traced(function: Callable[P, R]) -> Callable[P, R]:
+    """Time every call of a function within a span named after it."""
+    name: str = function.__qualname__
+
+    @functools.wraps(function)
+    def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
+        if not _enabled:
+            return function(*args, **kwargs)
+        with Span(name=name, attributes={}):
+            return function(*args, **kwargs)
+
+    return wrapper
+
+
+def roots() -> list[Span]:
+    """Return the spans recorded outside of any other span, per thread in order of start."""
+    with _lock:
+        return list(_roots)
+
+
+def _merge(spans: list[Span]) -> dict[str, tuple[int, int, list[Span]]]:
+    """Merge spans by name: number of spans, total duration and all their children."""
+    merged: dict[str, tuple[int, int, list[Span]]] = {}
+    for item in spans:
+        count, total, children = merged.get(item.name, (0, 0, []))
+        children.extend(item.children)
+        merged[item.name] = (count + 1, total + item.duration_ns, children)
+    return merged
+
+
+def _add_branches(tree: "Tree", spans: list[Span], min_ms: float) -> None:
+    """Add the merged spans to a tree, slowest first, skipping those shorter than min_ms in total."""
+    merged: dict[str, tuple[int, int, list[Span]]] = _merge(spans=spans)
+    for name, (count, total, children) in sorted(merged.items(), key=lambda item: -item[1][1]):
+        if total / 1e6 < min_ms:
+            continue
+        calls: str = f" x{count:,}" if count > 1 else ""
+        branch: Tree = tree.add(f"[bold]{total / 1e6:,.1f} ms[/bold] {name}{calls}")
+        _add_branches(tree=branch, spans=children, min_ms=min_ms)
+
+
+def render(min_ms: float = 0.1) -> "Tree":
+    """Build the tree of the recorded spans, spans of the same name within a parent being merged.
+
+    Parameters
+    ----------
+    min_ms : float, optional
+        Spans shorter than this number of milliseconds in total are left out, by default 0.1
+
+    Returns
+    -------
+    Tree
+        rich tree, one branch per thread
+
+    """
+    # imported here as every command imports this module, only "nfch --profile" renders a tree
+    from rich.tree import Tree  # noqa: PLC0415
+
+    tree: Tree = Tree("Profile")
+    by_thread: dict[str, list[Span]] = {}
+    for item in roots():
+        by_thread.setdefault(item.thread, []).append(item)
+    for thread, spans in by_thread.items():
+        _add_branches(tree=tree.add(f"[dim]{thread}[/dim]"), spans=spans, min_ms=min_ms)
+    return tree
+
+
+def write_chrome_trace(file_path: Path) -> None:
+    """Write the recorded spans in the Chrome trace event format ("X" complete events, microseconds).
+
+    Parameters
+    ----------
+    file_path : Path
+        Json file to be written
+
+    """
+    events: list[dict[str, Any]] = []
+    threads: dict[str, int] = {}
+    pending: list[Span] = roots()
+    while pending:
+        item: Span = pending.pop()
+        events.append(
+            {
+                "name": item.name,
+                "cat": "nfch",
+                "ph": "X",
+                "ts": item.start_ns / 1000,
+                "dur": item.duration_ns / 1000,
+                "pid": os.getpid(),
+                "tid": threads.setdefault(item.thread, len(threads)),
+                "args": {key: str(value) for key, value in item.attributes.items()},
+            },
+        )
+        pending.extend(item.children)
+    events.extend(
+        {"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": tid, "args": {"name": thread}}
+        for thread, tid in threads.items()
+    )
+    file_path.write_text(json.dumps({"traceEvents": events, "displayTimeUnit": "ms"}), encoding="utf-8")
@@ -1,17 +1,26 @@
 """Class representing an nfcore project."""
 
-import shutil
 import sys
 from pathlib import Path
 
-from nfch import utils
+from nfch import profiling, state, utils
+from nfch.genomes import GenomePathValidator
 
 
 class Project:
     """The Project class represents an nfcore project."""
 
-    def __init__(self, email: str | None, genomes_json: Path | None) -> None:
-        """Instantiate a project."""
+    def __init__(
+        self,
+        email: str | None,
+        genomes_json: Path | None,
+        *,
+        deep_check: bool = False,
+        validate_genomes: bool = True,
+    ) -> None:
+        """Instantiate a project, "validate_genomes" can be turned off when the genomes.json was already validated."""
+        self.deep_check: bool = deep_check
+        self.validate_genomes: bool = validate_genomes
         self.is_git()
         self.create_settings_folder()
         if email:
@@ -21,6 +30,7 @@ class Project:
             self.genomes_json: Path = genomes_json
             self.copy_genomes_json(genomes_json=genomes_json)
 
+    @profiling.traced
     def is_git(self) -> bool:
         """Check if the working/project directory is under version control.
 
@@ -40,6 +50,7 @@ class Project:
         )
         return False
 
+    @profiling.traced
     def create_settings_folder(self) -> None:
         """Create a settings folder, ".nfch", within the project directory (if not present) and store settings there."""
         settings_folder: Path = Path(".nfch")
@@ -59,6 +70,7 @@ class Project:
                 sys.exit()
             utils.success(message=f'Folder "{settings_folder}" has been created.')
 
+    @profiling.traced
     def create_settings_file(self, email: str | None = None) -> None:
         """Create a settings folder, ".nfch", within the project directory (if not present) and store settings there.
 
@@ -81,14 +93,11 @@ class Project:
                 "be added to this file if not already present or will be overridden otherwise!"
                 'Tip: "nfch project settings" will show existing information about the current project.',
             )
-
-            old_settings: dict[str, str] = utils.json_to_dict(file_path=settings_file)
-            old_settings.update(new_settings)
-            utils.dict_to_json(dictionary=old_settings, file_path=settings_file)
         else:
             utils.processing(message=f"Creating {settings_file}...")
-            utils.dict_to_json(dictionary=new_settings, file_path=settings_file)
+        state.ProjectState().update_settings(settings=new_settings)
 
+    @profiling.traced
     def copy_genomes_json(self, genomes_json: Path) -> None:
         """Copy the genomes.json file to the ".nfch/" folder.
 
@@ -115,22 +124,16 @@ class Project:
             """
             utils.processing(message=f'Validating the supplied "{genomes_json}" file...')
             genomes_dict: dict[str, dict[str, str]] = utils.json_to_dict(file_path=genomes_json)
-            for genome_build, paths in genomes_dict.items():
-                for file_type, file_path in paths.items():
-                    if file_path and Path(file_path).exists():
-                        pass
-                    elif not file_path:
-                        utils.warning(message=f'"{file_type}" path for {genome_build} is missing.')
-                    else:
-                        utils.fail(message=f'"{file_path}" does not seem to be a valid path!')
-                        return False
+            validator: GenomePathValidator = GenomePathValidator(cache_file=Path(".nfch/genome_paths.json"))
+            if not validator.validate(genomes=genomes_dict, deep=self.deep_check):
+                return False
             utils.success(message="All existing paths within the genomes.json are valid.")
             return True
 
         genomes_json_src_path: Path = Path(genomes_json)
         if not genomes_json_src_path.exists():
             utils.fail(message=f'"{genomes_json_src_path}" does not seem to be a valid path!')
-        elif not _genome_paths_ok(genomes_json=genomes_json_src_path):
+        elif self.validate_genomes and not _genome_paths_ok(genomes_json=genomes_json_src_path):
             utils.fail(message='At least one of the paths within the "genomes.json" is not valid!')
         else:
             genomes_json_dst_path: Path = Path(".nfch/genomes.json")
@@ -139,4 +142,8 @@ class Project:
             utils.processing(
                 message=f'"{genomes_json_src_path}" is being copied into "{genomes_json_dst_path.parent}/"...',
             )
-            shutil.copy(src=genomes_json_src_path, dst=genomes_json_dst_path)
+            # written atomically while holding its lock, like the other files of ".nfch/"
+            utils.dict_to_json(
+                dictionary=utils.json_to_dict(file_path=genomes_json_src_path),
+                file_path=genomes_json_dst_path,
+            )
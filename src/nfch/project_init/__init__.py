@@ -1,9 +1,23 @@
-"""Presents the "project" typer app serving as the "project" sub-command to take care of project initiation."""
+"""Presents the "project" sub-command taking care of project initiation, its commands are loaded lazily."""
 
-import typer
+from nfch.cli import LazyCommand
 
-from nfch.project_init.project_init import app as project_app
-
-app = typer.Typer()
-
-app.add_typer(typer_instance=project_app)
+COMMANDS: dict[str, LazyCommand] = {
+    "prerequisites": LazyCommand(
+        module="nfch.project_init.project_init",
+        help="Show prerequisites of a typical nfcore project.",
+    ),
+    "init": LazyCommand(
+        module="nfch.project_init.project_init",
+        help="Initiate project, track user, available genomes, ...",
+    ),
+    "show-settings": LazyCommand(
+        module="nfch.project_init.project_init",
+        help="Show project settings: user, available genomes, ...",
+    ),
+    "checksum": LazyCommand(
+        module="nfch.project_init.checksum",
+        help='Record the checksums of the FASTQ and genome files in ".nfch/checksums.json", only new/changed files are '
+        "hashed.",
+    ),
+}
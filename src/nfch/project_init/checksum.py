@@ -0,0 +1,81 @@
+"""Records and verifies the checksums of the raw data and reference files of a project."""
+
+from pathlib import Path
+from typing import Annotated
+
+import typer
+
+from nfch import utils
+from nfch.checksum import ChecksumManifest, HashAlgorithm, genome_files, samplesheet_fastqs
+from nfch.workflow import RNASeq
+
+app = typer.Typer()
+
+
+@app.command()
+def checksum(
+    samplesheet: Annotated[
+        Path,
+        typer.Option(
+            help="nf-core samplesheet listing the FASTQ files, relative paths are resolved against the run folder.",
+        ),
+    ] = RNASeq.wf_folder / "metadata" / "samplesheet.csv",
+    genome_build: Annotated[
+        str | None,
+        typer.Option(
+            help='Genome build whose files are hashed as well, by default all builds of ".nfch/genomes.json".',
+        ),
+    ] = None,
+    algorithm: Annotated[
+        HashAlgorithm,
+        typer.Option(
+            help='Checksum algorithm, "xxhash" is the fastest but requires the "xxhash" package.',
+        ),
+    ] = HashAlgorithm.MD5,
+    workers: Annotated[
+        int | None,
+        typer.Option(
+            help="Number of processes hashing files in parallel, by default the number of CPUs.",
+        ),
+    ] = None,
+    verify: Annotated[  # noqa: FBT002
+        bool,
+        typer.Option(
+            help="Re-hash all files and compare them with the recorded checksums.",
+        ),
+    ] = False,
+) -> None:
+    """Record the checksums of the FASTQ and genome files in ".nfch/checksums.json", only new/changed files are hashed.
+
+    Parameters
+    ----------
+    samplesheet : Annotated[ Path, typer.Option, optional
+        nf-core samplesheet listing the FASTQ files, by default "nfcore_rnaseq/metadata/samplesheet.csv"
+    genome_build : Annotated[ str | None, typer.Option, optional
+        Genome build whose files are hashed as well, by default None (all builds)
+    algorithm : Annotated[ HashAlgorithm, typer.Option, optional
+        Checksum algorithm, by default HashAlgorithm.MD5
+    workers : Annotated[ int | None, typer.Option, optional
+        Number of processes hashing files in parallel, by default None (number of CPUs)
+    verify : Annotated[ bool, typer.Option, optional
+        Re-hash all files and compare them with the recorded checksums, by default False
+
+    """
+    file_paths: list[Path] = []
+    if samplesheet.is_file():
+        file_paths.extend(samplesheet_fastqs(samplesheet=samplesheet, base_folder=RNASeq.wf_folder / "run"))
+    else:
+        utils.warning(message=f'Samplesheet "{samplesheet}" could not be found, FASTQ files are skipped.')
+    genomes_json: Path = Path(".nfch/genomes.json")
+    if genomes_json.is_file():
+        file_paths.extend(genome_files(genomes_json=genomes_json, genome_build=genome_build))
+
+    manifest: ChecksumManifest = ChecksumManifest()
+    corrupted: list[Path] = manifest.update(file_paths=file_paths, algorithm=algorithm, workers=workers, verify=verify)
+    if corrupted:
+        utils.fail(message=f"{len(corrupted)} files do not match their recorded checksums!")
+        raise typer.Exit(code=1)
+    if manifest.unreadable:
+        utils.fail(message=f"{len(manifest.unreadable)} files could not be read, their checksums are not recorded!")
+        raise typer.Exit(code=1)
+    utils.success(message=f'Checksums of {len(file_paths):,} files are recorded in "{manifest.manifest_file}".')
@@ -38,7 +38,7 @@ def prerequisites() -> None:
     Extra things to check:
     1- Teams channel
     2- git repo dedicated to the (bioinformatics) project
-    3- secuing raw data after integrity with checksum, sum, etc.
+    3- secuing raw data after integrity with checksum, sum, etc. ("nfch project checksum")
     4- transferring meta data to the Teams channel
     """
     utils.info(message=extras)
@@ -56,9 +56,13 @@ def init(
         Path | None,
         typer.Option(help="Path to the json file containing genome information."),
     ] = None,
+    deep_check: Annotated[  # noqa: FBT002
+        bool,
+        typer.Option(help="Also check that the STAR/salmon index folders within the genomes.json are complete."),
+    ] = False,
 ) -> None:
     """Initiate project, track user, available genomes, ..."""
-    Project(email=email, genomes_json=genomes_json)
+    Project(email=email, genomes_json=genomes_json, deep_check=deep_check)
 
 
 @app.command()
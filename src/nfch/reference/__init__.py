@@ -0,0 +1,20 @@
+"""Presents the "reference" sub-command managing the shared genome indexes, its commands are loaded lazily."""
+
+from nfch.cli import LazyCommand
+
+COMMANDS: dict[str, LazyCommand] = {
+    "register": LazyCommand(
+        module="nfch.reference.register",
+        help="Store the genome indexes built by the nfcore/rnaseq run in the shared reference store.",
+    ),
+    "publish": LazyCommand(
+        module="nfch.reference.publish",
+        help="Copy the genome indexes built by the nfcore/rnaseq run to a reference location, in parallel and "
+        "verified.",
+    ),
+    "annotation": LazyCommand(
+        module="nfch.reference.annotation",
+        help="Index the gtf annotation of a genome build once, and export gene names, biotypes and gene bed files "
+        "from it.",
+    ),
+}
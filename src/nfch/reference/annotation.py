@@ -0,0 +1,124 @@
+"""Indexes the gtf annotation of a genome build once, and exports gene names, biotypes and gene bed files from it."""
+
+import shutil
+from pathlib import Path
+from typing import Annotated, Any
+
+import typer
+from rich import box
+from rich import print as rich_print
+from rich.table import Table
+
+from nfch import state, utils
+from nfch.reference_store import AnnotationCache
+from nfch.workflow import RNASeq
+
+app = typer.Typer()
+
+
+@app.command()
+def annotation(  # noqa: PLR0913, PLR0917
+    genome_build: Annotated[
+        str | None,
+        typer.Option(
+            help='Genome build whose gtf is indexed, from ".nfch/genomes.json", by default the gtf of the rnaseq run.',
+        ),
+    ] = None,
+    gtf: Annotated[
+        Path | None,
+        typer.Option(
+            help="Gtf file to be indexed instead of the one of a genome build, optionally gzip compressed.",
+        ),
+    ] = None,
+    biotype: Annotated[
+        list[str] | None,
+        typer.Option(
+            help="Restrict the exported files to the genes of these biotypes, e.g. protein_coding.",
+        ),
+    ] = None,
+    features: Annotated[
+        Path | None,
+        typer.Option(
+            help="Write the gene_id, gene_name and gene_biotype of the genes to this tab separated file.",
+        ),
+    ] = None,
+    gene_bed: Annotated[
+        Path | None,
+        typer.Option(
+            help="Write the transcripts of the genes to this bed12 file.",
+        ),
+    ] = None,
+    refresh: Annotated[  # noqa: FBT002
+        bool,
+        typer.Option(
+            help="Index the gtf again, replacing its indexed annotation.",
+        ),
+    ] = False,
+) -> None:
+    """Index the gtf annotation of a genome build once, and export gene names, biotypes and gene bed files from it.
+
+    The indexed annotation is stored in the "annotations" folder of the reference store (or "~/.nfch/annotations"),
+    keyed by the digest of the gtf, and used by "nfch rnaseq prepare" and "nfch diffabun prepare" once built.
+
+    Parameters
+    ----------
+    genome_build : Annotated[ str | None, typer.Option, optional
+        Genome build whose gtf is indexed, by default None (the gtf of the prepared rnaseq run)
+    gtf : Annotated[ Path | None, typer.Option, optional
+        Gtf file to be indexed instead of the one of a genome build, by default None
+    biotype : Annotated[ list[str] | None, typer.Option, optional
+        Restrict the exported files to the genes of these biotypes, by default None (all genes)
+    features : Annotated[ Path | None, typer.Option, optional
+        Tab separated file receiving gene_id, gene_name and gene_biotype, by default None (not written)
+    gene_bed : Annotated[ Path | None, typer.Option, optional
+        Bed12 file receiving the transcripts, by default None (not written)
+    refresh : Annotated[ bool, typer.Option, optional
+        Index the gtf again, replacing its indexed annotation, by default False
+
+    """
+    try:
+        from nfch.annotation import GeneTable  # noqa: PLC0415
+    except ImportError:
+        utils.fail(message='This command requires the "numpy" package: pip install "nfch[analysis]"')
+        raise typer.Exit(code=1) from None
+
+    project: state.ProjectState = state.ProjectState()
+    if gtf is None:
+        gtf = Path(
+            project.genomes[genome_build]["gtf"]
+            if genome_build
+            else project.nf_params(wf_folder=RNASeq.wf_folder)["gtf"],
+        )
+    if not gtf.is_file():
+        utils.fail(message=f'Gtf file "{gtf}" could not be found, exiting!')
+        raise typer.Exit(code=1)
+
+    settings: dict[str, Any] = project.settings if project.settings_file.is_file() else {}
+    cache: AnnotationCache = AnnotationCache.from_settings(settings=settings)
+    folder: Path | None = cache.folder(gtf=gtf)
+    if folder is None:
+        utils.fail(message=f'The annotation of "{gtf}" could not be located, exiting!')
+        raise typer.Exit(code=1)
+    if refresh:
+        shutil.rmtree(folder, ignore_errors=True)
+    if not (folder / "metadata.json").is_file():
+        utils.processing(message=f'Indexing "{gtf}" into "{folder}"...')
+    table: GeneTable = GeneTable.load(gtf=gtf, folder=folder)
+
+    summary: Table = Table(
+        title=f"{gtf.name}: {len(table.gene_ids):,} genes, {len(table.arrays['transcript_ids']):,} transcripts",
+        box=box.SIMPLE,
+    )
+    summary.add_column(header="Biotype")
+    summary.add_column(header="Genes", justify="right")
+    for name, count in table.biotype_counts().items():
+        summary.add_row(name or "-", f"{count:,}")
+    rich_print(summary)
+
+    if features is not None:
+        table.write_features(file_path=features, biotypes=biotype)
+        utils.success(message=f'Genes written to "{features}".')
+    if gene_bed is not None:
+        with gene_bed.open(mode="w", encoding="utf-8") as bed_file:
+            bed_file.writelines(table.bed_lines(biotypes=biotype))
+        utils.success(message=f'Transcripts written to "{gene_bed}".')
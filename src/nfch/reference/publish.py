@@ -0,0 +1,113 @@
+"""Publishes the genome indexes built by a nfcore/rnaseq run ("save_reference") to a reference location."""
+
+from pathlib import Path
+from typing import Annotated, Any
+
+import typer
+
+from nfch import state, utils
+from nfch.checksum import HashAlgorithm
+from nfch.genomes import GenomePathValidator
+from nfch.reference.register import update_genomes
+from nfch.reference_store import index_files
+from nfch.transfer import Transfer, TransferSummary, plan
+from nfch.workflow import RNASeq
+
+app = typer.Typer()
+
+
+@app.command()
+def publish(
+    destination: Annotated[
+        Path,
+        typer.Argument(
+            help='Reference location receiving "index/" and the gene bed file, e.g. /references/GRCh38/rnaseq_3.18.0.',
+        ),
+    ],
+    genome_build: Annotated[
+        str | None,
+        typer.Option(
+            help="Genome build whose genomes.json entry is updated, by default the one whose fasta the run used.",
+        ),
+    ] = None,
+    genomes_json: Annotated[
+        list[Path] | None,
+        typer.Option(
+            help='Shared genomes.json file(s) to be updated as well as ".nfch/genomes.json".',
+        ),
+    ] = None,
+    workers: Annotated[
+        int,
+        typer.Option(
+            help="Number of file ranges copied and files verified in parallel.",
+        ),
+    ] = 8,
+    algorithm: Annotated[
+        HashAlgorithm,
+        typer.Option(
+            help='Checksum the copies are verified with, "xxhash" is much faster but needs nfch[xxhash].',
+        ),
+    ] = HashAlgorithm.MD5,
+) -> None:
+    """Copy the genome indexes built by the nfcore/rnaseq run to a reference location, in parallel and verified.
+
+    Parameters
+    ----------
+    destination : Annotated[ Path, typer.Argument ]
+        Reference location receiving the indexes
+    genome_build : Annotated[ str | None, typer.Option, optional
+        Genome build whose genomes.json entry is updated, by default None (detected from the fasta of the run)
+    genomes_json : Annotated[ list[Path] | None, typer.Option, optional
+        Shared genomes.json files to be updated as well, by default None
+    workers : Annotated[ int, typer.Option, optional
+        Number of file ranges copied and files verified in parallel, by default 8
+    algorithm : Annotated[ HashAlgorithm, typer.Option, optional
+        Checksum the copies are verified with, by default HashAlgorithm.MD5
+
+    """
+    project: state.ProjectState = state.ProjectState()
+    nf_params: dict[str, Any] = project.nf_params(wf_folder=RNASeq.wf_folder)
+    genome_folder: Path = RNASeq.wf_folder / "run" / nf_params["outdir"] / "genome"
+    if not nf_params.get("save_reference"):
+        utils.fail(message=f'"{RNASeq.wf_folder}" was not prepared to save the genome indexes, nothing to publish!')
+        raise typer.Exit(code=1)
+    problem: str | None = GenomePathValidator.deep_check(file_type="nfcore_rnaseq_index", path=genome_folder)
+    if problem:
+        utils.fail(message=f"The genome indexes of the run are incomplete: {problem}")
+        raise typer.Exit(code=1)
+
+    transfer: Transfer = Transfer(
+        transfers=plan(
+            source_folder=genome_folder,
+            destination_folder=destination,
+            files=index_files(genome_folder=genome_folder),
+        ),
+        workers=workers,
+        algorithm=algorithm,
+    )
+    total: int = sum(file.size for file in transfer.transfers)
+    utils.processing(
+        message=f"Copying {len(transfer.transfers)} files ({utils.human_readable_size(num_bytes=total)}) from "
+        f'"{genome_folder}" to "{destination}" with {workers} threads...',
+    )
+    try:
+        summary: TransferSummary = transfer.run()
+    except (OSError, ImportError) as error:
+        utils.fail(message=f"The transfer failed, run the same command again to resume it: {error}")
+        raise typer.Exit(code=1) from error
+    utils.success(
+        message=f"{summary.files} file(s) copied and verified "
+        f"({utils.human_readable_size(num_bytes=summary.copied_bytes)} copied, "
+        f"{utils.human_readable_size(num_bytes=summary.resumed_bytes)} resumed), {summary.skipped} already in place.",
+    )
+
+    problem = GenomePathValidator.deep_check(file_type="nfcore_rnaseq_index", path=destination)
+    if problem:
+        utils.fail(message=f"The published genome indexes are incomplete: {problem}")
+        raise typer.Exit(code=1)
+    update_genomes(
+        file_paths=[project.genomes_file, *(genomes_json or [])],
+        fasta=nf_params["fasta"],
+        index_folder=destination.absolute(),
+        genome_build=genome_build,
+    )
@@ -0,0 +1,137 @@
+"""Registers the genome indexes built by a nfcore/rnaseq run ("save_reference") in the shared reference store."""
+
+import re
+from pathlib import Path
+from typing import Annotated, Any
+
+import typer
+
+from nfch import state, utils
+from nfch.reference_store import ReferenceStore
+from nfch.workflow import RNASeq
+
+app = typer.Typer()
+
+
+def prepared_revision(run_folder: Path) -> str:
+    """Read the pipeline revision from the Nextflow command of a prepared run, empty if not found."""
+    command_file: Path = run_folder / "nextflow_command.txt"
+    if not command_file.is_file():
+        return ""
+    match: re.Match[str] | None = re.search(r"-revision\s+(\S+)", command_file.read_text(encoding="utf-8"))
+    return match.group(1) if match else ""
+
+
+def update_genomes(file_paths: list[Path], fasta: str, index_folder: Path, genome_build: str | None = None) -> None:
+    """Point the "nfcore_rnaseq_index" of a genome build to new indexes in genomes.json files.
+
+    Parameters
+    ----------
+    file_paths : list[Path]
+        genomes.json files to be updated, missing ones are reported and skipped
+    fasta : str
+        Genome fasta file the indexes were built from, used to find the build when not given
+    index_folder : Path
+        Folder of the indexes
+    genome_build : str | None, optional
+        Genome build to be updated, by default None (the one using the fasta file)
+
+    """
+    for file_path in file_paths:
+        if not file_path.is_file():
+            utils.warning(message=f'File "{file_path}" not found, not updated.')
+            continue
+        with state.update_json(file_path=file_path) as genomes:
+            build: str | None = genome_build or next(
+                (build for build, paths in genomes.items() if paths.get("fasta") == fasta),
+                None,
+            )
+            if build is not None and build in genomes:
+                genomes[build]["nfcore_rnaseq_index"] = str(index_folder)
+        if build is None or build not in genomes:
+            utils.warning(message=f'No genome build of "{file_path}" uses "{fasta}", not updated.')
+            continue
+        utils.success(message=f'"nfcore_rnaseq_index" of {build} has been updated in "{file_path}".', level=1)
+
+
+@app.command()
+def register(
+    store: Annotated[
+        Path | None,
+        typer.Option(
+            help='Shared folder of the reference store, remembered in ".nfch/settings.json" for later runs.',
+        ),
+    ] = None,
+    genome_build: Annotated[
+        str | None,
+        typer.Option(
+            help="Genome build whose genomes.json entry is updated, by default the one whose fasta the run used.",
+        ),
+    ] = None,
+    genomes_json: Annotated[
+        list[Path] | None,
+        typer.Option(
+            help='Shared genomes.json file(s) to be updated as well as ".nfch/genomes.json".',
+        ),
+    ] = None,
+    workers: Annotated[
+        int,
+        typer.Option(
+            help="Number of files linked/copied in parallel.",
+        ),
+    ] = 8,
+) -> None:
+    """Store the genome indexes built by the nfcore/rnaseq run in the shared reference store.
+
+    Parameters
+    ----------
+    store : Annotated[ Path | None, typer.Option, optional
+        Shared folder of the reference store, by default None (the one of the project settings)
+    genome_build : Annotated[ str | None, typer.Option, optional
+        Genome build whose genomes.json entry is updated, by default None (detected from the fasta of the run)
+    genomes_json : Annotated[ list[Path] | None, typer.Option, optional
+        Shared genomes.json files to be updated as well, by default None
+    workers : Annotated[ int, typer.Option, optional
+        Number of files linked/copied in parallel, by default 8
+
+    """
+    project: state.ProjectState = state.ProjectState()
+    settings: dict[str, Any] = project.settings
+    if store is None:
+        if not settings.get("reference_store"):
+            utils.fail(message='No reference store is configured, use "--store" to set one, exiting!')
+            raise typer.Exit(code=1)
+        store = Path(settings["reference_store"])
+    elif settings.get("reference_store") != str(store.absolute()):
+        project.update_settings(settings={"reference_store": str(store.absolute())})
+        utils.info(message=f'"{store}" is now the reference store of the project.')
+
+    run_folder: Path = RNASeq.wf_folder / "run"
+    nf_params: dict[str, Any] = project.nf_params(wf_folder=RNASeq.wf_folder)
+    revision: str = prepared_revision(run_folder=run_folder)
+    genome_folder: Path = run_folder / nf_params["outdir"] / "genome"
+    if not nf_params.get("save_reference") or not revision:
+        utils.fail(message=f'"{RNASeq.wf_folder}" was not prepared to save the genome indexes, nothing to register!')
+        raise typer.Exit(code=1)
+
+    store.mkdir(parents=True, exist_ok=True)
+    utils.processing(message=f'Registering the genome indexes of "{genome_folder}" in "{store}"...')
+    try:
+        stored: Path = ReferenceStore(root=store).register(
+            genome_folder=genome_folder,
+            fasta=Path(nf_params["fasta"]),
+            gtf=Path(nf_params["gtf"]),
+            revision=revision,
+            workers=workers,
+        )
+    except (OSError, ValueError) as error:
+        utils.fail(message=f"The genome indexes could not be registered: {error}")
+        raise typer.Exit(code=1) from error
+    utils.success(message=f'The genome indexes are stored in "{stored}".')
+
+    update_genomes(
+        file_paths=[project.genomes_file, *(genomes_json or [])],
+        fasta=nf_params["fasta"],
+        index_folder=stored,
+        genome_build=genome_build,
+    )
@@ -0,0 +1,275 @@
+"""Module containing the classes ReferenceStore and AnnotationCache sharing genome indexes and annotations.
+
+Indexes are stored under a key derived from the content of the fasta and gtf files and the pipeline revision (STAR
+indexes are tied to the STAR version, hence to the revision), in the layout expected for "nfcore_rnaseq_index" entries
+of genomes.json files: "<store>/<key>/index/star", "<store>/<key>/index/salmon" and "<store>/<key>/<genes>.bed".
+Indexed gtf annotations are stored under "<store>/annotations/<gtf digest>".
+"""
+
+import hashlib
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+from nfch import state, utils
+from nfch.checksum import hash_file
+from nfch.genomes import GenomePathValidator
+
+INDEX_FILE: str = "index.json"
+MANIFEST_FILE: str = "nfch_reference.json"
+ANNOTATION_FOLDER: str = "annotations"
+ANNOTATION_CACHE: Path = Path.home() / ".nfch" / ANNOTATION_FOLDER
+# written with the indexed annotation of a gtf, in the formats of the "gene_bed" and "features" pipeline parameters
+GENE_BED_FILE: str = "genes.bed"
+FEATURES_FILE: str = "features.tsv"
+
+
+def link_or_copy(source: Path, destination: Path) -> dict[str, Any]:
+    """Hard-link a file, or copy it when the destination is on another filesystem, and verify the result.
+
+    Parameters
+    ----------
+    source : Path
+        File to be stored
+    destination : Path
+        Path within the store
+
+    Returns
+    -------
+    dict[str, Any]
+        Manifest entry: size, whether the file was linked and, for copies, the verified md5 digest
+
+    Raises
+    ------
+    OSError
+        If the copy does not match the source
+
+    """
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        os.link(source, destination)
+    except OSError:
+        shutil.copyfile(src=source, dst=destination)
+    else:
+        if destination.samefile(source):
+            return {"size": source.stat().st_size, "linked": True}
+    digest: str = hash_file(file_path=source)
+    if destination.stat().st_size != source.stat().st_size or hash_file(file_path=destination) != digest:
+        msg: str = f'"{destination}" does not match "{source}"'
+        raise OSError(msg)
+    return {"size": source.stat().st_size, "linked": False, "md5": digest}
+
+
+def index_files(genome_folder: Path) -> list[Path]:
+    """List the files of the indexes saved by a nfcore/rnaseq run: "index/**" and the gene bed file(s)."""
+    files: list[Path] = [path for path in (genome_folder / "index").rglob(pattern="*") if path.is_file()]
+    files.extend(genome_folder.glob(pattern="*.bed"))
+    return files
+
+
+class ReferenceStore:
+    """A shared folder of genome indexes, addressed by (fasta digest, gtf digest, pipeline revision)."""
+
+    def __init__(self, root: Path) -> None:
+        """Instantiate the store, its index lists the registered references.
+
+        Parameters
+        ----------
+        root : Path
+            Shared folder, e.g. on a filesystem mounted by all analysis nodes
+
+        """
+        self.root: Path = root
+        self.index_file: Path = root / INDEX_FILE
+        self.index: dict[str, dict[str, Any]] = {}
+        if self.index_file.is_file():
+            self.index = utils.json_to_dict(file_path=self.index_file)
+
+    @staticmethod
+    def make_key(fasta_digest: str, gtf_digest: str, revision: str) -> str:
+        """Derive the key of a reference from the digests of its files and the pipeline revision."""
+        return hashlib.sha256(f"{fasta_digest}:{gtf_digest}:{revision}".encode()).hexdigest()[:16]
+
+    @staticmethod
+    def signature(file_path: Path) -> list[int]:
+        """Return the (size, mtime) of a file, used to look up references without hashing."""
+        file_stat: os.stat_result = file_path.stat()
+        return [file_stat.st_size, file_stat.st_mtime_ns]
+
+    def lookup(self, fasta: Path, gtf: Path, revision: str) -> Path | None:
+        """Find the stored indexes of a fasta/gtf pair for a pipeline revision.
+
+        Entries registered from the same, unchanged, files are found from their size and mtime, otherwise the files
+        are hashed and compared by content.
+
+        Parameters
+        ----------
+        fasta : Path
+            Genome fasta file
+        gtf : Path
+            Annotation gtf file
+        revision : str
+            Pipeline version
+
+        Returns
+        -------
+        Path | None
+            Folder to be used as "nfcore_rnaseq_index", None if not stored
+
+        """
+        candidates: dict[str, dict[str, Any]] = {
+            key: entry
+            for key, entry in self.index.items()
+            if entry["revision"] == revision and (self.root / key).is_dir()
+        }
+        if not candidates or not fasta.is_file() or not gtf.is_file():
+            return None
+        signatures: tuple[list[int], list[int]] = (self.signature(file_path=fasta), self.signature(file_path=gtf))
+        for key, entry in candidates.items():
+            if (entry["fasta"], entry["gtf"]) == (str(fasta), str(gtf)) and (
+                entry["fasta_signature"],
+                entry["gtf_signature"],
+            ) == signatures:
+                return self.root / key
+        key: str = self.make_key(
+            fasta_digest=hash_file(file_path=fasta),
+            gtf_digest=hash_file(file_path=gtf),
+            revision=revision,
+        )
+        return self.root / key if key in candidates else None
+
+    def register(self, genome_folder: Path, fasta: Path, gtf: Path, revision: str, workers: int = 8) -> Path:
+        """Store the indexes saved by a nfcore/rnaseq run ("save_reference"), hard-linked when possible.
+
+        The files are gathered in a temporary folder which is renamed once every file is verified, so that an
+        interrupted registration never looks complete.
+
+        Parameters
+        ----------
+        genome_folder : Path
+            Folder written by the run, "<outdir>/genome", containing "index/star", "index/salmon" and the gene bed file
+        fasta : Path
+            Genome fasta file the indexes were built from
+        gtf : Path
+            Annotation gtf file the indexes were built from
+        revision : str
+            Pipeline version of the run
+        workers : int, optional
+            Number of files linked/copied in parallel, by default 8
+
+        Returns
+        -------
+        Path
+            Folder of the reference within the store
+
+        Raises
+        ------
+        ValueError
+            If the indexes of the run are incomplete
+
+        """
+        problem: str | None = GenomePathValidator.deep_check(file_type="nfcore_rnaseq_index", path=genome_folder)
+        if problem:
+            raise ValueError(problem)
+        fasta_digest: str = hash_file(file_path=fasta)
+        gtf_digest: str = hash_file(file_path=gtf)
+        key: str = self.make_key(fasta_digest=fasta_digest, gtf_digest=gtf_digest, revision=revision)
+        destination: Path = self.root / key
+        if not destination.is_dir():
+            files: list[Path] = index_files(genome_folder=genome_folder)
+            partial: Path = self.root / f".{key}.partial"
+            shutil.rmtree(partial, ignore_errors=True)
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                entries: list[dict[str, Any]] = list(
+                    executor.map(
+                        lambda path: link_or_copy(source=path, destination=partial / path.relative_to(genome_folder)),
+                        files,
+                    ),
+                )
+            manifest: dict[str, Any] = {
+                str(path.relative_to(genome_folder)): entry for path, entry in zip(files, entries, strict=True)
+            }
+            utils.dict_to_json(dictionary=manifest, file_path=partial / MANIFEST_FILE)
+            partial.rename(destination)
+
+        entry: dict[str, Any] = {
+            "fasta": str(fasta),
+            "gtf": str(gtf),
+            "revision": revision,
+            "fasta_digest": fasta_digest,
+            "gtf_digest": gtf_digest,
+            "fasta_signature": self.signature(file_path=fasta),
+            "gtf_signature": self.signature(file_path=gtf),
+            "registered": datetime.now().astimezone().isoformat(timespec="seconds"),
+        }
+        # several projects may register references at the same time, the index is updated under its lock
+        with state.update_json(file_path=self.index_file, missing_ok=True) as index:
+            index[key] = entry
+            self.index = index
+        return destination
+
+
+class AnnotationCache:
+    """Folders of indexed gtf annotations ("nfch.annotation"), one per gtf content, keyed by the md5 digest of the gtf.
+
+    The cache lives in the "annotations" folder of the reference store when one is configured, so that every project
+    using a build shares it, and in "~/.nfch/annotations" otherwise.
+    """
+
+    def __init__(self, root: Path) -> None:
+        """Instantiate the cache, its index maps gtf paths to their digest.
+
+        Parameters
+        ----------
+        root : Path
+            Folder of the cache
+
+        """
+        self.root: Path = root
+        self.index_file: Path = root / INDEX_FILE
+
+    @classmethod
+    def from_settings(cls, settings: dict[str, Any]) -> "AnnotationCache":
+        """Return the cache of a project: within its reference store if any, in the home folder otherwise."""
+        if settings.get("reference_store"):
+            return cls(root=Path(settings["reference_store"]) / ANNOTATION_FOLDER)
+        return cls(root=ANNOTATION_CACHE)
+
+    def folder(self, gtf: Path, *, hash_missing: bool = True) -> Path | None:
+        """Return the folder of the annotation of a gtf file, whether it is already built or not.
+
+        The digest of an unchanged gtf (same path, size and mtime) is read from the index instead of being computed
+        again.
+
+        Parameters
+        ----------
+        gtf : Path
+            Annotation gtf file, optionally gzip compressed
+        hash_missing : bool, optional
+            Hash the gtf when its digest is not known yet, by default True
+
+        Returns
+        -------
+        Path | None
+            Folder of the annotation, None if the gtf is missing or its digest is not known and hash_missing is False
+
+        """
+        if not gtf.is_file():
+            return None
+        signature: list[int] = ReferenceStore.signature(file_path=gtf)
+        index: dict[str, dict[str, Any]] = (
+            utils.json_to_dict(file_path=self.index_file) if self.index_file.is_file() else {}
+        )
+        entry: dict[str, Any] | None = index.get(str(gtf.absolute()))
+        if entry and entry["signature"] == signature:
+            return self.root / entry["digest"]
+        if not hash_missing:
+            return None
+        digest: str = hash_file(file_path=gtf)
+        self.root.mkdir(parents=True, exist_ok=True)
+        with state.update_json(file_path=self.index_file, missing_ok=True) as index:
+            index[str(gtf.absolute())] = {"signature": signature, "digest": digest}
+        return self.root / digest
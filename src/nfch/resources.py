@@ -0,0 +1,241 @@
+"""Module containing the functions to right-size the resources of Nextflow processes from past execution traces."""
+
+import csv
+import math
+import re
+from array import array
+from collections.abc import Iterable
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import NamedTuple
+
+from nfch import trace
+
+CUSTOM_CONFIG: Path = Path(".nfch/custom.config")
+# trace files are looked up at fixed depths so that work folders are never walked
+TRACE_PATTERNS: tuple[str, ...] = (
+    f"pipeline_info/{trace.TRACE_GLOB}",
+    f"output/pipeline_info/{trace.TRACE_GLOB}",
+    f"*/output/pipeline_info/{trace.TRACE_GLOB}",
+    f"*/*/output/pipeline_info/{trace.TRACE_GLOB}",
+)
+METRICS: tuple[str, ...] = ("peak_rss", "%cpu", "realtime", "rchar")
+MEMORY_UNITS: dict[str, int] = {"B": 1, "KB": 1024, "MB": 1024**2, "GB": 1024**3, "TB": 1024**4}
+DURATION_UNITS: dict[str, float] = {"ms": 0.001, "s": 1, "m": 60, "h": 3600, "d": 86400}
+DURATION_PATTERN: re.Pattern[str] = re.compile(r"([\d.]+)\s*(ms|s|m|h|d)")
+
+
+class ProcessResources(NamedTuple):
+    """Resources recommended for a process."""
+
+    process: str
+    tasks: int
+    cpus: int
+    memory_gb: int
+    time_minutes: int
+    memory_per_input_gb: float | None
+
+
+def parse_memory(text: str) -> float | None:
+    """Convert a trace memory value ("1.5 GB", "512 MB" or raw bytes) into bytes, None if not available."""
+    value, _, unit = text.strip().partition(" ")
+    try:
+        return float(value) * MEMORY_UNITS[unit or "B"]
+    except (ValueError, KeyError):
+        return None
+
+
+def parse_duration(text: str) -> float | None:
+    """Convert a trace duration ("1h 2m 3s", "450ms" or raw milliseconds) into seconds, None if not available."""
+    text = text.strip()
+    if text.isdigit():
+        return int(text) / 1000
+    matches: list[tuple[str, str]] = DURATION_PATTERN.findall(text)
+    if not matches:
+        return None
+    return sum(float(value) * DURATION_UNITS[unit] for value, unit in matches)
+
+
+def parse_percent(text: str) -> float | None:
+    """Convert a trace percentage ("98.5%") into a float, None if not available."""
+    try:
+        return float(text.strip().removesuffix("%"))
+    except ValueError:
+        return None
+
+
+def find_trace_files(paths: Iterable[Path]) -> list[Path]:
+    """Find the execution trace files of projects, workflow folders or output folders.
+
+    Parameters
+    ----------
+    paths : Iterable[Path]
+        Trace files or folders containing them at the usual locations
+
+    Returns
+    -------
+    list[Path]
+        Trace files, without duplicates
+
+    """
+    trace_files: dict[Path, None] = {}
+    for path in paths:
+        if path.is_file():
+            trace_files[path] = None
+            continue
+        for pattern in TRACE_PATTERNS:
+            trace_files.update(dict.fromkeys(sorted(path.glob(pattern=pattern))))
+    return list(trace_files)
+
+
+def read_metrics(file_path: Path) -> dict[str, dict[str, array]]:
+    """Read the metrics of the completed tasks of a trace file into columns per process.
+
+    Parameters
+    ----------
+    file_path : Path
+        Execution trace file
+
+    Returns
+    -------
+    dict[str, dict[str, array]]
+        Per process simple name (e.g. "STAR_ALIGN"), an array per metric ("peak_rss" and "rchar" in bytes, "%cpu" and
+        "realtime" in seconds), tasks lacking a metric are skipped
+
+    """
+    parsers = {"peak_rss": parse_memory, "rchar": parse_memory, "%cpu": parse_percent, "realtime": parse_duration}
+    columns: dict[str, dict[str, array]] = {}
+    with file_path.open(mode="r", encoding="utf-8", newline="") as trace_file:
+        for row in csv.DictReader(f=trace_file, delimiter="\t"):
+            if row.get("status") != "COMPLETED":
+                continue
+            values: dict[str, float | None] = {metric: parsers[metric](row.get(metric) or "") for metric in METRICS}
+            if any(value is None for value in values.values()):
+                continue
+            process: str = (row.get("name") or "").split(" (", maxsplit=1)[0].rsplit(":", maxsplit=1)[-1]
+            process_columns: dict[str, array] = columns.setdefault(
+                process,
+                {metric: array("d") for metric in METRICS},
+            )
+            for metric, value in values.items():
+                process_columns[metric].append(value)
+    return columns
+
+
+def aggregate(trace_files: list[Path], workers: int | None = None) -> dict[str, dict[str, array]]:
+    """Read trace files in parallel processes and merge their columns per process.
+
+    Parameters
+    ----------
+    trace_files : list[Path]
+        Execution trace files
+    workers : int | None, optional
+        Number of processes, by default None (number of CPUs)
+
+    Returns
+    -------
+    dict[str, dict[str, array]]
+        Per process, an array per metric
+
+    """
+    merged: dict[str, dict[str, array]] = {}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for columns in executor.map(read_metrics, trace_files, chunksize=8):
+            for process, metrics in columns.items():
+                if process not in merged:
+                    merged[process] = metrics
+                    continue
+                for metric, values in metrics.items():
+                    merged[process][metric].extend(values)
+    return merged
+
+
+def percentile(values: Iterable[float], q: float) -> float:
+    """Return the q-th percentile (0-100) of values, with linear interpolation."""
+    ordered: list[float] = sorted(values)
+    if not ordered:
+        return 0.0
+    position: float = (len(ordered) - 1) * q / 100
+    lower: int = math.floor(position)
+    upper: int = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def recommend(
+    columns: dict[str, dict[str, array]],
+    q: float = 95.0,
+    headroom: float = 1.2,
+    min_tasks: int = 3,
+) -> list[ProcessResources]:
+    """Recommend the cpus, memory and time of every process with enough completed tasks.
+
+    Parameters
+    ----------
+    columns : dict[str, dict[str, array]]
+        Per process, an array per metric
+    q : float, optional
+        Percentile of the metrics the resources are based on, by default 95.0
+    headroom : float, optional
+        Factor applied to the memory and time percentiles, by default 1.2
+    min_tasks : int, optional
+        Minimum number of completed tasks for a process to be tuned, by default 3
+
+    Returns
+    -------
+    list[ProcessResources]
+        Recommended resources, sorted by process
+
+    """
+    recommendations: list[ProcessResources] = []
+    for process, metrics in sorted(columns.items()):
+        tasks: int = len(metrics["peak_rss"])
+        if tasks < min_tasks:
+            continue
+        # memory used per GB read, e.g. to spot processes whose footprint grows with the input
+        ratios: list[float] = [
+            rss / rchar for rss, rchar in zip(metrics["peak_rss"], metrics["rchar"], strict=True) if rchar > 0
+        ]
+        recommendations.append(
+            ProcessResources(
+                process=process,
+                tasks=tasks,
+                cpus=max(1, math.ceil(percentile(values=metrics["%cpu"], q=q) / 100)),
+                memory_gb=max(1, math.ceil(percentile(values=metrics["peak_rss"], q=q) * headroom / 1024**3)),
+                time_minutes=max(10, math.ceil(percentile(values=metrics["realtime"], q=q) * headroom / 60)),
+                memory_per_input_gb=percentile(values=ratios, q=50) if ratios else None,
+            ),
+        )
+    return recommendations
+
+
+def write_config(recommendations: Iterable[ProcessResources], file_path: Path, trace_files: int) -> None:
+    """Write a Nextflow config with a "withName" block per process, memory and time grow with the retry attempt.
+
+    Parameters
+    ----------
+    recommendations : Iterable[ProcessResources]
+        Recommended resources
+    file_path : Path
+        Config file to be written
+    trace_files : int
+        Number of trace files the recommendations are based on, mentioned in the header
+
+    """
+    lines: list[str] = [
+        f'// Generated by "nfch rnaseq tune" from {trace_files} execution trace(s) on {datetime.now().astimezone():%F}',
+        "process {",
+    ]
+    for resources in recommendations:
+        lines.extend(
+            [
+                f"    // {resources.tasks} completed tasks",
+                f"    withName: '{resources.process}' {{",
+                f"        cpus = {resources.cpus}",
+                f"        memory = {{ {resources.memory_gb}.GB * task.attempt }}",
+                f"        time = {{ {resources.time_minutes}.m * task.attempt }}",
+                "    }",
+            ],
+        )
+    lines.append("}")
+    file_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
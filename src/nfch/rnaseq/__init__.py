@@ -1,14 +1,47 @@
-"""Presents the "rnaseq" typer app serving as the "rnaseq sub-command" to take care of managing nfcore/rnaseq runs."""
+"""Presents the "rnaseq" sub-command taking care of managing nfcore/rnaseq runs, its commands are loaded lazily."""
 
-import typer
+from nfch.cli import LazyCommand
 
-from nfch.rnaseq.clean import app as clean_app
-
-# from nfch.rnaseq.extract import app as extract_app
-from nfch.rnaseq.prepare import app as prepare_app
-
-app = typer.Typer()
-
-app.add_typer(typer_instance=prepare_app)
-app.add_typer(typer_instance=clean_app)
-# app.add_typer(typer_instance=extract_app)
+COMMANDS: dict[str, LazyCommand] = {
+    "prepare": LazyCommand(
+        module="nfch.rnaseq.prepare",
+        help="Create folders and files associated with a typical nfcore/rnaseq run.",
+    ),
+    "clean": LazyCommand(module="nfch.rnaseq.clean", help="Clean after a nfcore/rnaseq run is finished."),
+    "status": LazyCommand(
+        module="nfch.rnaseq.status",
+        help="Show the completed/running/failed tasks per process, the throughput and the ETA of the run.",
+    ),
+    "launch": LazyCommand(
+        module="nfch.rnaseq.launch",
+        help="Start the prepared Nextflow run, at most --max-runs runs at once per host, and record its PID and "
+        "timings.",
+    ),
+    "du": LazyCommand(
+        module="nfch.rnaseq.du",
+        help="Show where the space of a nfcore/rnaseq run goes: work/output/metadata, processes and samples.",
+    ),
+    "samplesheet": LazyCommand(
+        module="nfch.rnaseq.samplesheet",
+        help="Create the nfcore/rnaseq samplesheet, pairing R1/R2 files and inferring sample names from the file "
+        "names.",
+    ),
+    "batch": LazyCommand(
+        module="nfch.rnaseq.batch",
+        help='Run "nfch project init" and "nfch rnaseq prepare" for every project of a manifest, in parallel.',
+    ),
+    "tune": LazyCommand(
+        module="nfch.rnaseq.tune",
+        help="Write a Nextflow config with per-process cpus/memory/time derived from the traces of past runs.",
+    ),
+    "qc": LazyCommand(
+        module="nfch.rnaseq.qc",
+        help="Add the per-sample MultiQC general statistics of runs to a SQLite QC table, unchanged reports are "
+        "skipped.",
+    ),
+    "why": LazyCommand(
+        module="nfch.rnaseq.why",
+        help="Show the failed tasks of the run grouped by process and exit status, with the end of their stderr.",
+    ),
+    # "extract": LazyCommand(module="nfch.rnaseq.extract", help=...),
+}
@@ -0,0 +1,92 @@
+"""Initiates many projects and prepares their nfcore/rnaseq runs at once from a manifest."""
+
+from pathlib import Path
+from typing import Annotated
+
+import typer
+
+from nfch import batch, utils
+
+app = typer.Typer()
+
+
+@app.command(name="batch")
+def batch_prepare(  # noqa: PLR0913, PLR0917
+    manifest: Annotated[
+        Path,
+        typer.Argument(
+            help='CSV file with the columns "project_dir" and, optionally, "genome_build", "revision" and "email".',
+        ),
+    ],
+    genomes_json: Annotated[
+        Path,
+        typer.Option(help="Path to the json file containing genome information, shared by all projects."),
+    ],
+    email: Annotated[
+        str | None,
+        typer.Option(help="E-mail address used for the projects without one in the manifest."),
+    ] = None,
+    revision: Annotated[
+        str,
+        typer.Option(help="Pipeline version used for the projects without one in the manifest."),
+    ] = "3.18.0",
+    genome_build: Annotated[
+        str,
+        typer.Option(help="Genome build used for the projects without one in the manifest."),
+    ] = "GRCh38_Ensembl_release_113",
+    workers: Annotated[
+        int | None,
+        typer.Option(help="Number of projects prepared in parallel, by default the number of CPUs."),
+    ] = None,
+    deep_check: Annotated[  # noqa: FBT002
+        bool,
+        typer.Option(help="Also check that the STAR/salmon index folders within the genomes.json are complete."),
+    ] = False,
+) -> None:
+    """Run "nfch project init" and "nfch rnaseq prepare" for every project of a manifest, in parallel.
+
+    Parameters
+    ----------
+    manifest : Annotated[ Path, typer.Argument ]
+        CSV file listing the projects, relative folders are resolved against the folder of the manifest
+    genomes_json : Annotated[ Path, typer.Option ]
+        Path to the json file containing genome information, validated once for all projects
+    email : Annotated[ str | None, typer.Option, optional
+        Default e-mail address, by default None
+    revision : Annotated[ str, typer.Option, optional
+        Default pipeline version, by default "3.18.0"
+    genome_build : Annotated[ str, typer.Option, optional
+        Default genome build, by default "GRCh38_Ensembl_release_113"
+    workers : Annotated[ int | None, typer.Option, optional
+        Number of processes, by default None (number of CPUs)
+    deep_check : Annotated[ bool, typer.Option, optional
+        Also check the content of the index folders, by default False
+
+    """
+    for file_path in (manifest, genomes_json):
+        if not file_path.is_file():
+            utils.fail(message=f'"{file_path}" could not be found, exiting!')
+            raise typer.Exit(code=1)
+    entries: list[batch.BatchEntry] = batch.read_manifest(
+        file_path=manifest,
+        genome_build=genome_build,
+        revision=revision,
+        email=email,
+    )
+    if not entries:
+        utils.warning(message=f'"{manifest}" does not list any project.')
+        return
+    results: list[batch.BatchResult] = batch.prepare_projects(
+        entries=entries,
+        genomes_json=genomes_json,
+        workers=workers,
+        deep_check=deep_check,
+    )
+    if not results:
+        raise typer.Exit(code=1)
+    batch.report(results=results)
+    failed: int = sum(not result.ok for result in results)
+    if failed:
+        utils.fail(message=f'{failed} of {len(results)} projects failed, see their ".nfch/batch_prepare.log".')
+        raise typer.Exit(code=1)
+    utils.success(message=f"{len(results)} projects prepared.")
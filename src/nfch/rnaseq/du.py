@@ -0,0 +1,56 @@
+"""Report the disk usage of a nfcore/rnaseq run."""
+
+from typing import Annotated
+
+import typer
+
+from nfch import utils
+from nfch.disk_usage import DiskUsage
+from nfch.scanner import DEFAULT_WORKERS
+from nfch.workflow import RNASeq
+
+app = typer.Typer()
+
+
+@app.command()
+def du(
+    workers: Annotated[
+        int,
+        typer.Option(
+            help="Number of threads scanning folders in parallel.",
+        ),
+    ] = DEFAULT_WORKERS,
+    top: Annotated[
+        int,
+        typer.Option(
+            help="Number of processes/samples to be shown.",
+        ),
+    ] = 20,
+    refresh: Annotated[  # noqa: FBT002
+        bool,
+        typer.Option(
+            help='Ignore the cached results of previous scans stored in ".nfch/".',
+        ),
+    ] = False,
+) -> None:
+    """Show where the space of a nfcore/rnaseq run goes: work/output/metadata, processes and samples.
+
+    Parameters
+    ----------
+    workers : Annotated[ int, typer.Option, optional
+        Number of threads scanning folders in parallel, by default DEFAULT_WORKERS
+    top : Annotated[ int, typer.Option, optional
+        Number of processes/samples to be shown, by default 20
+    refresh : Annotated[ bool, typer.Option, optional
+        Ignore the cached results of previous scans, by default False
+
+    """
+    if not RNASeq.wf_folder.is_dir():
+        utils.fail(message=f'Folder "{RNASeq.wf_folder}" could not be found, exiting!')
+        raise typer.Exit(code=1)
+    disk_usage: DiskUsage = DiskUsage(wf_folder=RNASeq.wf_folder)
+    utils.processing(message=f'Scanning "{RNASeq.wf_folder}" with {workers} threads...')
+    disk_usage.scan(workers=workers, use_cache=not refresh)
+    scanned: int = len(disk_usage.summaries)
+    utils.info(message=f"{scanned:,} folders scanned, {disk_usage.cache_hits:,} unchanged since the last scan.")
+    disk_usage.report(top=top)
@@ -0,0 +1,61 @@
+"""Harvests the general statistics of the MultiQC reports of nfcore/rnaseq runs into a cross-project QC table."""
+
+from pathlib import Path
+from typing import Annotated, Any
+
+import typer
+from rich import box
+from rich import print as rich_print
+from rich.table import Table
+
+from nfch import multiqc, utils
+
+app = typer.Typer()
+
+
+@app.command()
+def qc(
+    paths: Annotated[
+        list[Path] | None,
+        typer.Argument(
+            help="MultiQC data files, or projects/output folders containing them, by default the current project.",
+        ),
+    ] = None,
+    database: Annotated[
+        Path,
+        typer.Option(
+            help="SQLite database the per-sample metrics are added to, e.g. one shared by all projects.",
+        ),
+    ] = multiqc.DATABASE,
+) -> None:
+    """Add the per-sample MultiQC general statistics of runs to a SQLite QC table, unchanged reports are skipped.
+
+    Parameters
+    ----------
+    paths : Annotated[ list[Path] | None, typer.Argument, optional
+        MultiQC data files or folders containing them, by default None (the current project)
+    database : Annotated[ Path, typer.Option, optional
+        SQLite database the metrics are added to, by default multiqc.DATABASE
+
+    """
+    files: list[Path] = multiqc.find_multiqc_files(paths=paths or [Path()])
+    if not files:
+        utils.fail(message="No MultiQC data file could be found, exiting!")
+        raise typer.Exit(code=1)
+    utils.processing(message=f'Harvesting {len(files)} MultiQC data file(s) into "{database}"...')
+    try:
+        summary: multiqc.HarvestSummary = multiqc.harvest(files=files, database_file=database)
+    except ValueError as error:
+        utils.fail(message=f"A MultiQC data file could not be read: {error}")
+        raise typer.Exit(code=1) from error
+    utils.success(
+        message=f"{summary.harvested} file(s) harvested ({summary.rows:,} metrics), {summary.unchanged} unchanged.",
+    )
+
+    table: Table = Table(title="Projects (averages over the samples)", box=box.SIMPLE)
+    for column in ("Project", "Samples", *multiqc.KEY_METRICS.values()):
+        table.add_column(header=column, justify="left" if column == "Project" else "right")
+    rows: list[tuple[Any, ...]] = multiqc.project_summary(database_file=database)
+    for project, samples, *values in rows:
+        table.add_row(project, str(samples), *("-" if value is None else f"{value:.2f}" for value in values))
+    rich_print(table)
@@ -0,0 +1,113 @@
+"""Creates the nfcore/rnaseq samplesheet from the FASTQ files found within one or several folders."""
+
+from pathlib import Path
+from typing import Annotated
+
+import typer
+
+from nfch import fastq, utils
+from nfch import samplesheet as samplesheet_module
+from nfch.scanner import DEFAULT_WORKERS
+from nfch.workflow import RNASeq
+
+app = typer.Typer()
+
+
+@app.command()
+def samplesheet(  # noqa: PLR0913, PLR0917
+    fastq_dir: Annotated[
+        list[Path],
+        typer.Option(
+            help="Folder searched recursively for FASTQ files, can be given several times (e.g. once per sequencing "
+            "run).",
+        ),
+    ],
+    pattern: Annotated[
+        str,
+        typer.Option(
+            help='Regular expression matching FASTQ file names with the named groups "sample", "read" (1/2) and the '
+            'optional "lane".',
+        ),
+    ] = samplesheet_module.DEFAULT_PATTERN,
+    strandedness: Annotated[
+        samplesheet_module.Strandedness,
+        typer.Option(
+            help='Value of the "strandedness" column.',
+        ),
+    ] = samplesheet_module.Strandedness.AUTO,
+    output: Annotated[
+        Path,
+        typer.Option(
+            help="Samplesheet to be written.",
+        ),
+    ] = RNASeq.wf_folder / "metadata" / "samplesheet.csv",
+    workers: Annotated[
+        int,
+        typer.Option(
+            help="Number of threads searching folders/inspecting FASTQ files in parallel.",
+        ),
+    ] = DEFAULT_WORKERS,
+    inspect: Annotated[  # noqa: FBT002
+        bool,
+        typer.Option(
+            help="Read the first records of every FASTQ file to check pairs, read lengths and lanes.",
+        ),
+    ] = True,
+    records: Annotated[
+        int,
+        typer.Option(
+            help="Number of records read per FASTQ file by the inspection.",
+        ),
+    ] = fastq.DEFAULT_RECORDS,
+) -> None:
+    """Create the nfcore/rnaseq samplesheet, pairing R1/R2 files and inferring sample names from the file names.
+
+    Parameters
+    ----------
+    fastq_dir : Annotated[ list[Path], typer.Option
+        Folders searched recursively for FASTQ files
+    pattern : Annotated[ str, typer.Option, optional
+        Regular expression matching FASTQ file names, by default samplesheet.DEFAULT_PATTERN
+    strandedness : Annotated[ Strandedness, typer.Option, optional
+        Value of the "strandedness" column, by default Strandedness.AUTO
+    output : Annotated[ Path, typer.Option, optional
+        Samplesheet to be written, by default "nfcore_rnaseq/metadata/samplesheet.csv"
+    workers : Annotated[ int, typer.Option, optional
+        Number of threads searching folders/inspecting FASTQ files in parallel, by default DEFAULT_WORKERS
+    inspect : Annotated[ bool, typer.Option, optional
+        Read the first records of every FASTQ file to check pairs, read lengths and lanes, by default True
+    records : Annotated[ int, typer.Option, optional
+        Number of records read per FASTQ file by the inspection, by default fastq.DEFAULT_RECORDS
+
+    """
+    utils.processing(message=f"Searching FASTQ files within {len(fastq_dir)} folder(s)...")
+    fastqs: list[Path] = samplesheet_module.find_fastqs(fastq_dirs=fastq_dir, workers=workers)
+    pairs, problems = samplesheet_module.pair_fastqs(fastqs=fastqs, pattern=pattern)
+    for problem in problems:
+        utils.warning(message=problem, level=1)
+    if not pairs:
+        utils.fail(message=f"None of the {len(fastqs):,} FASTQ files found could be paired, exiting!")
+        raise typer.Exit(code=1)
+
+    samples: set[str] = {pair.sample for pair in pairs}
+    utils.info(message=f"{len(fastqs):,} FASTQ files, {len(pairs):,} rows, {len(samples):,} samples.")
+    if not output.parent.is_dir():
+        utils.fail(message=f'Folder "{output.parent}" could not be found, run "nfch rnaseq prepare" first!')
+        raise typer.Exit(code=1)
+    samplesheet_module.write_samplesheet(pairs=pairs, file_path=output, strandedness=strandedness)
+    utils.success(message=f'Samplesheet "{output}" has been created successfully.')
+
+    if inspect:
+        utils.processing(message=f"Inspecting the first {records:,} records of {len(fastqs):,} FASTQ files...")
+        summaries: dict[Path, fastq.FastqSummary] = fastq.inspect_fastqs(
+            file_paths=[path for pair in pairs for path in (pair.fastq_1, pair.fastq_2) if path is not None],
+            records=records,
+            workers=workers,
+        )
+        warnings, merged = fastq.check_pairs(pairs=pairs, summaries=summaries)
+        for warning in warnings:
+            utils.warning(message=warning, level=1)
+        if merged:
+            utils.info(message=f"{len(merged)} samples span several lanes/runs and will be merged by the pipeline.")
+            if RNASeq.wf_folder.joinpath("run", "nf_params.json").is_file():
+                RNASeq.update_nf_params(settings={"save_merged_fastq": True})
@@ -0,0 +1,111 @@
+"""Right-sizes the resources of nfcore/rnaseq processes based on the execution traces of past runs."""
+
+from pathlib import Path
+from typing import TYPE_CHECKING, Annotated
+
+import typer
+from rich import box
+from rich import print as rich_print
+from rich.table import Table
+
+from nfch import resources, utils
+
+if TYPE_CHECKING:
+    from array import array
+
+app = typer.Typer()
+
+
+@app.command()
+def tune(  # noqa: PLR0913, PLR0917
+    paths: Annotated[
+        list[Path] | None,
+        typer.Argument(
+            help="Trace files, or projects/workflow/output folders containing them, by default the current project.",
+        ),
+    ] = None,
+    percentile: Annotated[
+        float,
+        typer.Option(
+            help="Percentile of the peak memory, CPU usage and run time the resources are based on.",
+        ),
+    ] = 95.0,
+    headroom: Annotated[
+        float,
+        typer.Option(
+            help="Factor applied to the memory and run time percentiles.",
+        ),
+    ] = 1.2,
+    min_tasks: Annotated[
+        int,
+        typer.Option(
+            help="Minimum number of completed tasks for a process to be tuned.",
+        ),
+    ] = 3,
+    workers: Annotated[
+        int | None,
+        typer.Option(
+            help="Number of processes reading trace files in parallel, by default the number of CPUs.",
+        ),
+    ] = None,
+    output: Annotated[
+        Path,
+        typer.Option(
+            help='Nextflow config to be written, passed with "-c" to the runs prepared afterwards.',
+        ),
+    ] = resources.CUSTOM_CONFIG,
+) -> None:
+    """Write a Nextflow config with per-process cpus/memory/time derived from the traces of past runs.
+
+    Parameters
+    ----------
+    paths : Annotated[ list[Path] | None, typer.Argument, optional
+        Trace files or folders containing them, by default None (the current project)
+    percentile : Annotated[ float, typer.Option, optional
+        Percentile the resources are based on, by default 95.0
+    headroom : Annotated[ float, typer.Option, optional
+        Factor applied to the memory and run time percentiles, by default 1.2
+    min_tasks : Annotated[ int, typer.Option, optional
+        Minimum number of completed tasks for a process to be tuned, by default 3
+    workers : Annotated[ int | None, typer.Option, optional
+        Number of processes reading trace files in parallel, by default None (number of CPUs)
+    output : Annotated[ Path, typer.Option, optional
+        Nextflow config to be written, by default resources.CUSTOM_CONFIG
+
+    """
+    trace_files: list[Path] = resources.find_trace_files(paths=paths or [Path()])
+    if not trace_files:
+        utils.fail(message="No execution trace could be found, exiting!")
+        raise typer.Exit(code=1)
+    utils.processing(message=f"Reading {len(trace_files)} execution trace(s)...")
+    columns: dict[str, dict[str, array]] = resources.aggregate(trace_files=trace_files, workers=workers)
+    recommendations: list[resources.ProcessResources] = resources.recommend(
+        columns=columns,
+        q=percentile,
+        headroom=headroom,
+        min_tasks=min_tasks,
+    )
+    if not recommendations:
+        utils.warning(message=f"No process has {min_tasks} completed tasks or more, nothing to tune.")
+        return
+
+    table: Table = Table(title=f"Resources (p{percentile:g}, x{headroom:g} headroom)", box=box.SIMPLE)
+    for column in ("Process", "Tasks", "CPUs", "Memory", "Time", "Memory/GB read"):
+        table.add_column(header=column, justify="left" if column == "Process" else "right")
+    for process in recommendations:
+        ratio: str = f"{process.memory_per_input_gb:.2f}" if process.memory_per_input_gb is not None else "-"
+        table.add_row(
+            process.process,
+            f"{process.tasks:,}",
+            str(process.cpus),
+            f"{process.memory_gb} GB",
+            f"{process.time_minutes} min",
+            ratio,
+        )
+    rich_print(table)
+
+    if not output.parent.is_dir():
+        utils.fail(message=f'Folder "{output.parent}" could not be found, run "nfch project init" first!')
+        raise typer.Exit(code=1)
+    resources.write_config(recommendations=recommendations, file_path=output, trace_files=len(trace_files))
+    utils.success(message=f'"{output}" has been written, runs prepared from now on will use it.')
@@ -0,0 +1,176 @@
+"""Module containing the functions to discover FASTQ files and write nf-core/rnaseq samplesheets."""
+
+import csv
+import os
+import re
+import sys
+import threading
+from collections.abc import Iterable
+from enum import Enum
+from pathlib import Path
+from typing import NamedTuple
+
+from nfch import scanner, utils
+
+FASTQ_SUFFIXES: tuple[str, ...] = (".fastq.gz", ".fq.gz")
+# Illumina style names, e.g. "Sample-1_S3_L002_R1_001.fastq.gz", "Sample-1_R2.fq.gz" or "Sample-1_1.fastq.gz"
+DEFAULT_PATTERN: str = r"^(?P<sample>.+?)(?:_S\d+)?(?:_L(?P<lane>\d{3}))?_R?(?P<read>[12])(?:_\d{3})?\.f(?:ast)?q\.gz$"
+SAMPLESHEET_COLUMNS: tuple[str, ...] = ("sample", "fastq_1", "fastq_2", "strandedness")
+
+
+class Strandedness(str, Enum):
+    """Values of the "strandedness" column of a nf-core/rnaseq samplesheet."""
+
+    AUTO = "auto"
+    FORWARD = "forward"
+    REVERSE = "reverse"
+    UNSTRANDED = "unstranded"
+
+
+class FastqPair(NamedTuple):
+    """A row of a nf-core/rnaseq samplesheet, i.e. the FASTQ file(s) of one lane of one sequencing run of a sample."""
+
+    sample: str
+    lane: str
+    fastq_1: Path
+    fastq_2: Path | None
+
+
+def find_fastqs(fastq_dirs: Iterable[Path], workers: int = scanner.DEFAULT_WORKERS) -> list[Path]:
+    """Find FASTQ files recursively with a parallel walk, symlinked files are included but symlinked folders are not.
+
+    Parameters
+    ----------
+    fastq_dirs : Iterable[Path]
+        Folders to be searched
+    workers : int, optional
+        Number of threads, by default scanner.DEFAULT_WORKERS
+
+    Returns
+    -------
+    list[Path]
+        Sorted FASTQ files
+
+    """
+    fastqs: list[Path] = []
+    lock: threading.Lock = threading.Lock()
+
+    def _expand(path: str) -> list[str]:
+        subdirs: list[str] = []
+        found: list[Path] = []
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.path)
+                elif entry.name.endswith(FASTQ_SUFFIXES) and entry.is_file():
+                    found.append(Path(entry.path))
+        with lock:
+            fastqs.extend(found)
+        return subdirs
+
+    errors: list[tuple[str, OSError]] = scanner.parallel_walk(
+        roots=[str(fastq_dir) for fastq_dir in fastq_dirs],
+        expand=_expand,
+        workers=workers,
+    )
+    for path, error in errors:
+        utils.warning(message=f'"{path}" could not be searched: {error}', level=1)
+    return sorted(fastqs)
+
+
+def sanitise_sample_name(name: str) -> str:
+    """Replace the characters nf-core/rnaseq does not accept in sample names (e.g. spaces) with underscores."""
+    return re.sub(pattern=r"[^A-Za-z0-9_.-]", repl="_", string=name)
+
+
+def pair_fastqs(fastqs: Iterable[Path], pattern: str = DEFAULT_PATTERN) -> tuple[list[FastqPair], list[str]]:
+    """Pair R1/R2 files and infer sample names and lanes from the file names.
+
+    The pattern is matched against file names and must define the named groups "sample" and "read" (1 or 2), "lane" is
+    optional. Files of the same sample found in several folders (e.g. sequencing runs) or lanes become separate rows,
+    nf-core/rnaseq merges them per sample.
+
+    Parameters
+    ----------
+    fastqs : Iterable[Path]
+        FASTQ files
+    pattern : str, optional
+        Regular expression, by default DEFAULT_PATTERN
+
+    Returns
+    -------
+    tuple[list[FastqPair], list[str]]
+        Samplesheet rows sorted by sample and lane, and the problems found (unmatched files, R2 without R1, R1 without
+        R2 in a paired-end sample, ...)
+
+    """
+    regex: re.Pattern[str] = re.compile(pattern=pattern)
+    units: dict[tuple[Path, str], dict[str, Path]] = {}
+    samples: dict[tuple[Path, str], tuple[str, str]] = {}
+    problems: list[str] = []
+    for fastq in fastqs:
+        match: re.Match[str] | None = regex.match(fastq.name)
+        if match is None:
+            problems.append(f'"{fastq}" does not match the file name pattern')
+            continue
+        read: str = match.group("read")[-1]
+        # the file name without the read number identifies the pair
+        key: tuple[Path, str] = (fastq.parent, fastq.name[: match.start("read")] + fastq.name[match.end("read") :])
+        if read in units.setdefault(key, {}):
+            problems.append(f'"{fastq}" and "{units[key][read]}" are both read {read} of the same pair')
+            continue
+        units[key][read] = fastq
+        samples[key] = (sanitise_sample_name(name=match.group("sample")), match.groupdict().get("lane") or "")
+
+    pairs: list[FastqPair] = []
+    for key, reads in units.items():
+        sample, lane = samples[key]
+        if "1" not in reads:
+            problems.append(f'"{reads["2"]}" has no matching read 1 file')
+            continue
+        pairs.append(FastqPair(sample=sample, lane=lane, fastq_1=reads["1"], fastq_2=reads.get("2")))
+    # nf-core/rnaseq rejects samples mixing single-end and paired-end rows, a missing R2 is usually a delivery error
+    paired_samples: set[str] = {pair.sample for pair in pairs if pair.fastq_2 is not None}
+    problems.extend(
+        f'"{pair.fastq_1}" has no matching read 2 file although sample "{pair.sample}" is paired-end, left out'
+        for pair in pairs
+        if pair.fastq_2 is None and pair.sample in paired_samples
+    )
+    pairs = [pair for pair in pairs if pair.fastq_2 is not None or pair.sample not in paired_samples]
+    pairs.sort(key=lambda pair: (pair.sample, pair.lane, str(pair.fastq_1)))
+    return pairs, problems
+
+
+def write_samplesheet(
+    pairs: Iterable[FastqPair],
+    file_path: Path,
+    strandedness: Strandedness = Strandedness.AUTO,
+) -> None:
+    """Write a nf-core/rnaseq samplesheet with absolute FASTQ paths.
+
+    Parameters
+    ----------
+    pairs : Iterable[FastqPair]
+        Samplesheet rows
+    file_path : Path
+        Samplesheet to be written
+    strandedness : Strandedness, optional
+        Value of the "strandedness" column, by default Strandedness.AUTO
+
+    """
+    try:
+        with file_path.open(mode="w", encoding="utf-8", newline="") as csv_file:
+            writer = csv.writer(csv_file)
+            writer.writerow(SAMPLESHEET_COLUMNS)
+            for pair in pairs:
+                writer.writerow(
+                    [
+                        pair.sample,
+                        pair.fastq_1.absolute(),
+                        pair.fastq_2.absolute() if pair.fastq_2 else "",
+                        strandedness.value,
+                    ],
+                )
+    except PermissionError:
+        utils.fail(message=f'"{file_path}" is not writable, aborting!')
+        sys.exit()
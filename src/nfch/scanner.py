@@ -0,0 +1,51 @@
+"""Module containing a parallel directory walker used by the scanning commands."""
+
+import os
+from collections.abc import Callable, Iterable
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+
+# scanning is I/O bound (stat calls on network filesystems), hence more threads than cores
+DEFAULT_WORKERS: int = min(32, (os.cpu_count() or 1) * 4)
+
+
+def parallel_walk(
+    roots: Iterable[str],
+    expand: Callable[[str], Iterable[str]],
+    workers: int = DEFAULT_WORKERS,
+) -> list[tuple[str, OSError]]:
+    """Walk directory trees breadth-first with a thread pool.
+
+    The walker does not look into the directories itself: "expand" is called once per directory (typically running
+    os.scandir, or answering from a cache) and returns the subdirectories to descend into. Calls to "expand" run
+    concurrently, any state it collects must be thread-safe (e.g. one dict key per directory).
+
+    Parameters
+    ----------
+    roots : Iterable[str]
+        Directories to start from
+    expand : Callable[[str], Iterable[str]]
+        Function visiting a directory and returning the paths of the subdirectories to be walked
+    workers : int, optional
+        Number of threads, by default DEFAULT_WORKERS
+
+    Returns
+    -------
+    list[tuple[str, OSError]]
+        Directories that could not be visited (e.g. permission denied or removed meanwhile) and the reason
+
+    """
+    errors: list[tuple[str, OSError]] = []
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="nfch-scan") as executor:
+        pending: dict[Future[Iterable[str]], str] = {executor.submit(expand, root): root for root in roots}
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                path: str = pending.pop(future)
+                try:
+                    subdirs: Iterable[str] = future.result()
+                except OSError as error:
+                    errors.append((path, error))
+                    continue
+                for subdir in subdirs:
+                    pending[executor.submit(expand, subdir)] = subdir
+    return errors
@@ -0,0 +1,215 @@
+"""Module containing the project state layer: cached reads, atomic and lock-protected writes of json files.
+
+Every (small) json file is parsed once per process and served from a cache as long as its (mtime, size, inode) do not
+change.
+Writes go to a temporary file renamed over the target, so that readers never see a half-written file, and are
+serialised with an advisory lock on a sidecar ".<name>.lock" file, so that concurrent nfch invocations on the same
+project (batch scripts, cron jobs) do not lose each other's updates.
+"""
+
+import contextlib
+import copy
+import json
+import os
+import sys
+import tempfile
+import threading
+from collections.abc import Iterator
+from pathlib import Path
+from typing import Any
+
+from nfch import profiling
+from nfch.message_manager import MessageManager
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover, not available on Windows
+    fcntl = None
+
+SETTINGS_FOLDER: Path = Path(".nfch")
+# larger files (e.g. scan caches) are read once per process anyway, copying them out of a cache would only cost time
+CACHE_MAX_BYTES: int = 1024 * 1024
+
+_cache: dict[Path, tuple[tuple[int, int, int], dict[str, Any]]] = {}
+_cache_lock: threading.Lock = threading.Lock()
+
+
+def _signature(file_stat: os.stat_result) -> tuple[int, int, int]:
+    """Return what identifies a version of a file."""
+    return file_stat.st_mtime_ns, file_stat.st_size, file_stat.st_ino
+
+
+@contextlib.contextmanager
+def file_lock(file_path: Path) -> Iterator[None]:
+    """Hold an exclusive advisory lock on the sidecar lock file of a json file.
+
+    Parameters
+    ----------
+    file_path : Path
+        json file of interest, its folder must exist
+
+    Yields
+    ------
+    Iterator[None]
+        Nothing, the lock is released on exit
+
+    """
+    lock_path: Path = file_path.parent / f".{file_path.name}.lock"
+    with lock_path.open(mode="a") as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+def read_json(file_path: Path) -> dict[str, Any]:
+    """Read a json file, parsing it only if it changed since the previous read.
+
+    Parameters
+    ----------
+    file_path : Path
+        json file
+
+    Returns
+    -------
+    dict[str, Any]
+        Content of the file, a copy that can be modified freely
+
+    Raises
+    ------
+    FileNotFoundError
+        If the file does not exist
+
+    """
+    key: Path = file_path.absolute()
+    signature: tuple[int, int, int] = _signature(file_stat=file_path.stat())
+    with _cache_lock:
+        cached: tuple[tuple[int, int, int], dict[str, Any]] | None = _cache.get(key)
+    if cached is not None and cached[0] == signature:
+        return copy.deepcopy(cached[1])
+    with profiling.span("json parse", path=file_path), file_path.open(mode="r", encoding="utf-8") as json_file:
+        data: dict[str, Any] = json.load(fp=json_file)
+    if signature[1] <= CACHE_MAX_BYTES:
+        # the stat is taken again so that a file replaced during the read is not cached with the old signature
+        signature = _signature(file_stat=file_path.stat())
+        with _cache_lock:
+            _cache[key] = (signature, copy.deepcopy(data))
+    return data
+
+
+def _write(dictionary: dict[str, Any], file_path: Path) -> None:
+    """Write a json file atomically, the caller holds the lock."""
+    file_descriptor, temporary = tempfile.mkstemp(dir=file_path.parent, prefix=f".{file_path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(file_descriptor, mode="w", encoding="utf-8") as json_file:
+            json.dump(obj=dictionary, fp=json_file, indent=2)
+            json_file.flush()
+            os.fsync(json_file.fileno())
+        if file_path.exists():
+            # keep the permissions of the file being replaced, mkstemp creates files readable by the owner only
+            Path(temporary).chmod(file_path.stat().st_mode & 0o777)
+        else:
+            Path(temporary).chmod(0o666 & ~_umask())
+        Path(temporary).replace(file_path)
+    except BaseException:
+        Path(temporary).unlink(missing_ok=True)
+        raise
+    signature: tuple[int, int, int] = _signature(file_stat=file_path.stat())
+    with _cache_lock:
+        if signature[1] <= CACHE_MAX_BYTES:
+            _cache[file_path.absolute()] = (signature, copy.deepcopy(dictionary))
+        else:
+            _cache.pop(file_path.absolute(), None)
+
+
+def _umask() -> int:
+    """Return the umask of the process."""
+    umask: int = os.umask(0)
+    os.umask(umask)
+    return umask
+
+
+def write_json(dictionary: dict[str, Any], file_path: Path) -> None:
+    """Write a json file atomically while holding its lock.
+
+    Parameters
+    ----------
+    dictionary : dict[str, Any]
+        Content to be written
+    file_path : Path
+        json file
+
+    """
+    with file_lock(file_path=file_path):
+        _write(dictionary=dictionary, file_path=file_path)
+
+
+@contextlib.contextmanager
+def update_json(file_path: Path, *, missing_ok: bool = False) -> Iterator[dict[str, Any]]:
+    """Read, modify and write a json file while holding its lock, i.e. without losing concurrent updates.
+
+    Parameters
+    ----------
+    file_path : Path
+        json file
+    missing_ok : bool, optional
+        Start from an empty dict if the file does not exist, by default False
+
+    Yields
+    ------
+    Iterator[dict[str, Any]]
+        Content of the file, written back on exit unless an exception is raised
+
+    """
+    with file_lock(file_path=file_path):
+        data: dict[str, Any] = {} if missing_ok and not file_path.exists() else read_json(file_path=file_path)
+        yield data
+        _write(dictionary=data, file_path=file_path)
+
+
+class ProjectState:
+    """The settings, genomes and run parameters of a project, read through the cache of this module."""
+
+    def __init__(self, settings_folder: Path = SETTINGS_FOLDER) -> None:
+        """Instantiate the state of the project whose ".nfch" folder is given.
+
+        Parameters
+        ----------
+        settings_folder : Path, optional
+            Settings folder of the project, by default SETTINGS_FOLDER (".nfch" in the working directory)
+
+        """
+        self.settings_folder: Path = settings_folder
+        self.settings_file: Path = settings_folder / "settings.json"
+        self.genomes_file: Path = settings_folder / "genomes.json"
+
+    @staticmethod
+    def load(file_path: Path) -> dict[str, Any]:
+        """Read a json file of the project, exiting with a message if it does not exist."""
+        try:
+            return read_json(file_path=file_path)
+        except FileNotFoundError:
+            MessageManager.fail(message=f'File "{file_path}" not found, aborting!')
+            sys.exit()
+
+    @property
+    def settings(self) -> dict[str, Any]:
+        """Return the project settings, ".nfch/settings.json"."""
+        return self.load(file_path=self.settings_file)
+
+    @property
+    def genomes(self) -> dict[str, dict[str, str]]:
+        """Return the genomes available to the project, ".nfch/genomes.json"."""
+        return self.load(file_path=self.genomes_file)
+
+    def nf_params(self, wf_folder: Path) -> dict[str, Any]:
+        """Return the Nextflow parameters of a prepared workflow, "<wf_folder>/run/nf_params.json"."""
+        return self.load(file_path=wf_folder / "run" / "nf_params.json")
+
+    def update_settings(self, settings: dict[str, Any]) -> None:
+        """Add or override project settings, creating the settings file if needed."""
+        with update_json(file_path=self.settings_file, missing_ok=True) as current:
+            current.update(settings)
@@ -0,0 +1,173 @@
+"""Find (and remove) the work folders left by the nfch projects of a shared filesystem."""
+
+import time
+from pathlib import Path
+from typing import Annotated
+
+import typer
+from rich import box
+from rich import print as rich_print
+from rich.table import Table
+
+from nfch import utils
+from nfch.file_manager import DeletionProgress, FileManager
+from nfch.orphans import STATE_FILE, Sweep, WorkFolder
+from nfch.scanner import DEFAULT_WORKERS
+
+app = typer.Typer()
+
+SECONDS_PER_DAY: int = 86_400
+
+
+def report(work_folders: list[WorkFolder], root: Path, older_than: int | None) -> None:
+    """Print the work folders found, largest first, those past the age policy being marked."""
+    now: float = time.time()
+    table: Table = Table(title=f'Work folders under "{root}"', box=box.SIMPLE)
+    table.add_column(header="Project", overflow="fold")
+    table.add_column(header="Workflow")
+    table.add_column(header="Files", justify="right")
+    table.add_column(header="Size", justify="right")
+    table.add_column(header="Last run")
+    table.add_column(header="Age (days)", justify="right")
+    table.add_column(header="Status")
+    for work_folder in work_folders:
+        age: float = (now - work_folder.last_run) / SECONDS_PER_DAY
+        status: str = ""
+        if work_folder.active:
+            status = "running"
+        elif older_than is not None and age >= older_than:
+            status = "expired"
+        table.add_row(
+            str(work_folder.project.relative_to(root.absolute())),
+            work_folder.path.parent.parent.name,
+            f"{work_folder.files:,}",
+            utils.human_readable_size(num_bytes=work_folder.bytes),
+            time.strftime("%Y-%m-%d %H:%M", time.localtime(work_folder.last_run)),
+            f"{age:.0f}",
+            status,
+        )
+    rich_print(table)
+
+
+def remove(work_folders: list[WorkFolder], workers: int) -> int:
+    """Remove work folders task folder by task folder, exiting if interrupted, and return how many failed."""
+    failed: int = 0
+    for work_folder in work_folders:
+        utils.processing(message=f'Removing "{work_folder.path}"...')
+        progress: DeletionProgress = FileManager.delete_folders(
+            folders=FileManager.iter_work_units(work_folder=work_folder.path),
+            workers=workers,
+        )
+        if progress.interrupted:
+            utils.warning(message=f"Interrupted after {progress.summary()}. Run the same command again to continue.")
+            raise typer.Exit(code=130)
+        if progress.errors:
+            for error in progress.errors:
+                utils.fail(message=error, level=1)
+            failed += 1
+            continue
+        FileManager.remove_tree(path=work_folder.path)
+    return failed
+
+
+@app.command()
+def sweep(  # noqa: PLR0913, PLR0917
+    root: Annotated[
+        Path,
+        typer.Argument(
+            help="Top of the tree holding the projects, e.g. the shared project filesystem.",
+        ),
+    ],
+    older_than: Annotated[
+        int | None,
+        typer.Option(
+            help="Age policy: work folders whose run was last active this many days ago or more are expired.",
+        ),
+    ] = None,
+    delete: Annotated[  # noqa: FBT002
+        bool,
+        typer.Option(
+            help="Remove the expired work folders, those of queued or running launches are always kept.",
+        ),
+    ] = False,
+    state_file: Annotated[
+        Path,
+        typer.Option(
+            "--state",
+            help="Crawl state kept between sweeps, so that only the folders whose mtime changed are visited again.",
+        ),
+    ] = STATE_FILE,
+    workers: Annotated[
+        int,
+        typer.Option(
+            help="Number of threads crawling, measuring and deleting folders in parallel.",
+        ),
+    ] = DEFAULT_WORKERS,
+    refresh: Annotated[  # noqa: FBT002
+        bool,
+        typer.Option(
+            help="Ignore the state of previous sweeps and visit every folder again.",
+        ),
+    ] = False,
+) -> None:
+    """Find the work folders of the nfch projects under a folder, their size and last run, and remove expired ones.
+
+    Parameters
+    ----------
+    root : Annotated[ Path, typer.Argument ]
+        Top of the tree holding the projects
+    older_than : Annotated[ int | None, typer.Option, optional
+        Age policy in days, by default None (no work folder is expired)
+    delete : Annotated[ bool, typer.Option, optional
+        Remove the expired work folders, by default False
+    state_file : Annotated[ Path, typer.Option, optional
+        Crawl state kept between sweeps, by default STATE_FILE ("~/.nfch/sweep.json")
+    workers : Annotated[ int, typer.Option, optional
+        Number of threads crawling, measuring and deleting folders in parallel, by default DEFAULT_WORKERS
+    refresh : Annotated[ bool, typer.Option, optional
+        Ignore the state of previous sweeps, by default False
+
+    """
+    if not root.is_dir():
+        utils.fail(message=f'Folder "{root}" could not be found, exiting!')
+        raise typer.Exit(code=1)
+    if delete and older_than is None:
+        utils.fail(message="--delete needs an age policy (--older-than), exiting!")
+        raise typer.Exit(code=1)
+
+    crawl: Sweep = Sweep(root=root, state_file=state_file)
+    utils.processing(message=f'Crawling "{root}" with {workers} threads...')
+    errors: list[tuple[str, OSError]] = crawl.run(workers=workers, use_state=not refresh)
+    for path, error in errors:
+        utils.warning(message=f"{path}: {error}", level=1)
+    work_folders: list[WorkFolder] = crawl.results()
+    utils.info(
+        message=f"{len(crawl.directories):,} folders crawled ({crawl.listed:,} new or changed), "
+        f"{len(crawl.projects):,} projects and {len(work_folders):,} work folders found ({crawl.measured:,} measured).",
+    )
+    if not work_folders:
+        return
+    report(work_folders=work_folders, root=root, older_than=older_than)
+    total: int = sum(work_folder.bytes for work_folder in work_folders)
+    utils.info(message=f"{utils.human_readable_size(num_bytes=total)} held by work folders.")
+    if older_than is None:
+        return
+
+    cutoff: float = time.time() - older_than * SECONDS_PER_DAY
+    expired: list[WorkFolder] = [
+        work_folder for work_folder in work_folders if not work_folder.active and work_folder.last_run <= cutoff
+    ]
+    reclaimable: int = sum(work_folder.bytes for work_folder in expired)
+    utils.info(
+        message=f"{len(expired):,} work folders older than {older_than} days, "
+        f"{utils.human_readable_size(num_bytes=reclaimable)} reclaimable.",
+    )
+    if not delete:
+        return
+    failed: int = remove(work_folders=expired, workers=workers)
+    if failed:
+        utils.fail(message=f"{failed} work folders could not be fully removed, exiting!")
+        raise typer.Exit(code=1)
+    utils.success(
+        message=f"{len(expired):,} work folders removed, {utils.human_readable_size(num_bytes=reclaimable)} reclaimed.",
+    )
@@ -0,0 +1,219 @@
+"""Module containing the classes to read Nextflow execution trace files and index their tasks by hash."""
+
+import csv
+from collections.abc import Iterable, Iterator
+from datetime import datetime
+from pathlib import Path
+from typing import NamedTuple
+
+# statuses of tasks whose work folder can be reused by "-resume"
+SUCCESS_STATUSES: frozenset[str] = frozenset({"COMPLETED", "CACHED"})
+TRACE_GLOB: str = "execution_trace_*.txt"
+
+
+class TraceRecord(NamedTuple):
+    """A single task (row) of a Nextflow execution trace file."""
+
+    run: int
+    task_id: int
+    hash: str
+    name: str
+    status: str
+    row: dict[str, str]
+
+    @property
+    def process(self) -> str:
+        """Process name without the tag, e.g. "NFCORE_RNASEQ:RNASEQ:FASTQC"."""
+        return self.name.split(" (", maxsplit=1)[0]
+
+    @property
+    def tag(self) -> str:
+        """Task tag, typically the sample name, e.g. "sample1" for "NFCORE_RNASEQ:RNASEQ:FASTQC (sample1)"."""
+        if " (" not in self.name:
+            return ""
+        return self.name.split(" (", maxsplit=1)[1].rstrip(")")
+
+    @property
+    def succeeded(self) -> bool:
+        """Whether the work folder of the task can be reused by "-resume"."""
+        return self.status in SUCCESS_STATUSES
+
+
+def find_trace_files(output_folder: Path) -> list[Path]:
+    """Find the execution trace files of a workflow, oldest first.
+
+    Parameters
+    ----------
+    output_folder : Path
+        Output folder of the workflow, containing "pipeline_info/"
+
+    Returns
+    -------
+    list[Path]
+        Trace files sorted chronologically (their names end with a timestamp)
+
+    """
+    return sorted((output_folder / "pipeline_info").glob(pattern=TRACE_GLOB))
+
+
+def read_trace(file_path: Path, run: int = 0) -> Iterator[TraceRecord]:
+    """Stream the records of an execution trace file.
+
+    Parameters
+    ----------
+    file_path : Path
+        Tab separated execution trace file
+    run : int, optional
+        Index of the run the trace file belongs to, by default 0
+
+    Yields
+    ------
+    Iterator[TraceRecord]
+        One record per task
+
+    """
+    with file_path.open(mode="r", encoding="utf-8", newline="") as trace_file:
+        for row in csv.DictReader(f=trace_file, delimiter="\t"):
+            task_hash: str = row.get("hash") or ""
+            if not task_hash or task_hash == "-":
+                continue
+            yield TraceRecord(
+                run=run,
+                task_id=int(row.get("task_id") or 0),
+                hash=task_hash,
+                name=row.get("name") or "",
+                status=row.get("status") or "",
+                row=row,
+            )
+
+
+def task_key(task_folder: Path) -> str:
+    """Convert a task folder ("work/ab/cdef1234...") into the abbreviated hash used by traces ("ab/cdef12").
+
+    Parameters
+    ----------
+    task_folder : Path
+        Task folder within a Nextflow work folder
+
+    Returns
+    -------
+    str
+        Abbreviated task hash
+
+    """
+    return f"{task_folder.parent.name}/{task_folder.name[:6]}"
+
+
+class TaskIndex:
+    """Index of the tasks of one or several runs of a workflow by their (abbreviated) hash."""
+
+    def __init__(self, records: Iterable[TraceRecord]) -> None:
+        """Build the index.
+
+        Parameters
+        ----------
+        records : Iterable[TraceRecord]
+            Trace records of all runs
+
+        """
+        self.by_hash: dict[str, list[TraceRecord]] = {}
+        self.runs: int = 0
+        for record in records:
+            self.by_hash.setdefault(record.hash, []).append(record)
+            self.runs = max(self.runs, record.run + 1)
+
+    @classmethod
+    def from_trace_files(cls, trace_files: list[Path]) -> "TaskIndex":
+        """Build the index from trace files, given oldest first.
+
+        Parameters
+        ----------
+        trace_files : list[Path]
+            Execution trace files, oldest first
+
+        Returns
+        -------
+        TaskIndex
+            Index of all tasks of all runs
+
+        """
+
+        def _records() -> Iterator[TraceRecord]:
+            for run, trace_file in enumerate(trace_files):
+                yield from read_trace(file_path=trace_file, run=run)
+
+        return cls(records=_records())
+
+    def get(self, task_folder: Path) -> list[TraceRecord]:
+        """Return the records of a task folder, empty if the folder is not referenced by any trace."""
+        return self.by_hash.get(task_key(task_folder=task_folder), [])
+
+    def records(self) -> Iterator[TraceRecord]:
+        """Iterate over all records."""
+        for records in self.by_hash.values():
+            yield from records
+
+    def resume_critical(self) -> set[str]:
+        """Return the hashes of the latest successful attempt of every task.
+
+        For every task name, the most recent run in which it succeeded is looked up and the hashes of its successful
+        records in that run are kept. Failed/aborted attempts and attempts superseded by a later run are not part of the
+        returned set.
+
+        Returns
+        -------
+        set[str]
+            Abbreviated hashes of the task folders "-resume" relies on
+
+        """
+        latest_run: dict[str, int] = {}
+        for record in self.records():
+            if record.succeeded:
+                latest_run[record.name] = max(latest_run.get(record.name, -1), record.run)
+        return {record.hash for record in self.records() if record.succeeded and latest_run[record.name] == record.run}
+
+    def last_successful_run(self) -> int | None:
+        """Return the index of the most recent run in which every task eventually succeeded.
+
+        Returns
+        -------
+        int | None
+            Run index, None if no run succeeded
+
+        """
+        names_by_run: dict[int, set[str]] = {}
+        succeeded_by_run: dict[int, set[str]] = {}
+        for record in self.records():
+            names_by_run.setdefault(record.run, set()).add(record.name)
+            if record.succeeded:
+                succeeded_by_run.setdefault(record.run, set()).add(record.name)
+        for run in sorted(names_by_run, reverse=True):
+            if names_by_run[run] == succeeded_by_run.get(run, set()):
+                return run
+        return None
+
+    def run_hashes(self, run: int) -> set[str]:
+        """Return the hashes of the successful tasks of a run (including the cached ones)."""
+        return {record.hash for record in self.records() if record.run == run and record.succeeded}
+
+
+def trace_start_time(file_path: Path) -> float | None:
+    """Return the start time of a run from the timestamp in its trace file name.
+
+    Parameters
+    ----------
+    file_path : Path
+        Trace file named like "execution_trace_2025-03-01_12-30-00.txt"
+
+    Returns
+    -------
+    float | None
+        POSIX timestamp (local time), None if the name does not contain a timestamp
+
+    """
+    timestamp: str = file_path.stem.removeprefix("execution_trace_")
+    try:
+        # the timestamp is written in the local time zone of the machine running Nextflow
+        return datetime.strptime(timestamp, "%Y-%m-%d_%H-%M-%S").astimezone().timestamp()
+    except ValueError:
+        return None
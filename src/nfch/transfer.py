@@ -0,0 +1,250 @@
+"""Module containing the class Transfer copying folder trees with parallel, resumable and verified file copies.
+
+Large files (e.g. the 20+ GB suffix array of a STAR index) are split into ranges copied concurrently. Ranges are copied
+with os.copy_file_range, which lets NFS 4.2 servers and filesystems such as XFS or Btrfs copy the data server-side
+without it crossing the network twice, and with positioned reads/writes otherwise. A file is written to
+"<name>.nfch-partial" with the ranges already copied listed in "<name>.nfch-partial.done", so that an interrupted
+transfer resumes where it stopped. Once copied, the file is verified against its source with streaming checksums and
+renamed into place.
+"""
+
+import os
+import threading
+from collections.abc import Iterable
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import NamedTuple
+
+from nfch import profiling
+from nfch.checksum import HashAlgorithm, hash_file
+
+PARTIAL_SUFFIX: str = ".nfch-partial"
+DONE_SUFFIX: str = ".nfch-partial.done"
+RANGE_SIZE: int = 256 * 1024 * 1024
+BUFFER_SIZE: int = 8 * 1024 * 1024
+
+
+class FileTransfer(NamedTuple):
+    """A file to be copied."""
+
+    source: Path
+    destination: Path
+    size: int
+
+
+class TransferSummary(NamedTuple):
+    """Outcome of a transfer."""
+
+    files: int
+    skipped: int
+    copied_bytes: int
+    resumed_bytes: int
+
+
+def copy_range(source_fd: int, destination_fd: int, offset: int, length: int) -> None:
+    """Copy a byte range between two open files, at the same offset, without moving their file positions.
+
+    Parameters
+    ----------
+    source_fd : int
+        File descriptor of the source, open for reading
+    destination_fd : int
+        File descriptor of the destination, open for writing
+    offset : int
+        Position of the range
+    length : int
+        Number of bytes
+
+    """
+    end: int = offset + length
+    if hasattr(os, "copy_file_range"):
+        try:
+            while offset < end:
+                copied: int = os.copy_file_range(source_fd, destination_fd, end - offset, offset, offset)
+                if copied == 0:
+                    break
+                offset += copied
+        except OSError:
+            # e.g. not supported between these filesystems, the rest of the range is copied below
+            pass
+    while offset < end:
+        data: bytes = os.pread(source_fd, min(BUFFER_SIZE, end - offset), offset)
+        if not data:
+            msg: str = f"source file shrank while being copied, {end - offset} bytes missing"
+            raise OSError(msg)
+        offset += os.pwrite(destination_fd, data, offset)
+
+
+def plan(source_folder: Path, destination_folder: Path, files: Iterable[Path]) -> list[FileTransfer]:
+    """List the files to be copied with their destination, keeping their path relative to the source folder.
+
+    Parameters
+    ----------
+    source_folder : Path
+        Folder the files are relative to
+    destination_folder : Path
+        Folder receiving the files
+    files : Iterable[Path]
+        Files within the source folder
+
+    Returns
+    -------
+    list[FileTransfer]
+        Files to be copied, largest first so that the longest copies start first
+
+    """
+    transfers: list[FileTransfer] = [
+        FileTransfer(
+            source=file_path,
+            destination=destination_folder / file_path.relative_to(source_folder),
+            size=file_path.stat().st_size,
+        )
+        for file_path in files
+    ]
+    return sorted(transfers, key=lambda transfer: -transfer.size)
+
+
+class Transfer:
+    """Copy files with a thread pool, ranges of large files being copied concurrently."""
+
+    def __init__(
+        self,
+        transfers: list[FileTransfer],
+        workers: int = 8,
+        range_size: int = RANGE_SIZE,
+        algorithm: HashAlgorithm = HashAlgorithm.MD5,
+    ) -> None:
+        """Instantiate the transfer.
+
+        Parameters
+        ----------
+        transfers : list[FileTransfer]
+            Files to be copied
+        workers : int, optional
+            Number of ranges copied and files verified concurrently, by default 8
+        range_size : int, optional
+            Number of bytes copied per task, by default RANGE_SIZE (256 MiB)
+        algorithm : HashAlgorithm, optional
+            Checksum algorithm used to verify the copies, by default HashAlgorithm.MD5
+
+        """
+        self.transfers: list[FileTransfer] = transfers
+        self.workers: int = workers
+        self.range_size: int = range_size
+        self.algorithm: HashAlgorithm = algorithm
+        self.copied_bytes: int = 0
+        self.resumed_bytes: int = 0
+        self._lock: threading.Lock = threading.Lock()
+
+    @staticmethod
+    def is_done(transfer: FileTransfer) -> bool:
+        """Return whether a file was transferred by a previous run: in place with the size and mtime of its source."""
+        try:
+            destination_stat: os.stat_result = transfer.destination.stat()
+        except FileNotFoundError:
+            return False
+        source_stat: os.stat_result = transfer.source.stat()
+        return (destination_stat.st_size, destination_stat.st_mtime_ns) == (
+            source_stat.st_size,
+            source_stat.st_mtime_ns,
+        )
+
+    def _copy_file(self, transfer: FileTransfer, executor: ThreadPoolExecutor) -> list[Future[None]]:
+        """Submit the ranges of a file not copied yet, the partial file being created or resumed."""
+        partial: Path = transfer.destination.with_name(transfer.destination.name + PARTIAL_SUFFIX)
+        done_file: Path = transfer.destination.with_name(transfer.destination.name + DONE_SUFFIX)
+        partial.parent.mkdir(parents=True, exist_ok=True)
+        ranges: list[tuple[int, int]] = [
+            (offset, min(self.range_size, transfer.size - offset))
+            for offset in range(0, transfer.size, self.range_size)
+        ]
+        # "<offset> <length>" lines, ranges of a previous run with another range size are copied again
+        done: set[str] = set()
+        if partial.is_file() and done_file.is_file():
+            done = set(done_file.read_text(encoding="utf-8").splitlines())
+        else:
+            done_file.unlink(missing_ok=True)
+        with partial.open(mode="ab") as partial_file:
+            partial_file.truncate(transfer.size)
+        with self._lock:
+            self.resumed_bytes += sum(length for offset, length in ranges if f"{offset} {length}" in done)
+        file_lock: threading.Lock = threading.Lock()
+
+        def _copy(offset: int, length: int) -> None:
+            with profiling.span("copy range", path=transfer.source, offset=offset):
+                source_fd: int = os.open(transfer.source, os.O_RDONLY)
+                try:
+                    destination_fd: int = os.open(partial, os.O_WRONLY)
+                    try:
+                        copy_range(source_fd=source_fd, destination_fd=destination_fd, offset=offset, length=length)
+                        os.fsync(destination_fd)
+                    finally:
+                        os.close(destination_fd)
+                finally:
+                    os.close(source_fd)
+            with file_lock, done_file.open(mode="a", encoding="utf-8") as journal:
+                journal.write(f"{offset} {length}\n")
+            with self._lock:
+                self.copied_bytes += length
+
+        return [executor.submit(_copy, offset, length) for offset, length in ranges if f"{offset} {length}" not in done]
+
+    def _finalise(self, transfer: FileTransfer) -> None:
+        """Verify a copied file against its source and move it into place with the mtime of its source.
+
+        Raises
+        ------
+        OSError
+            If the copy does not match its source, the partial file is removed so that the next run copies it again
+
+        """
+        partial: Path = transfer.destination.with_name(transfer.destination.name + PARTIAL_SUFFIX)
+        done_file: Path = transfer.destination.with_name(transfer.destination.name + DONE_SUFFIX)
+        with profiling.span("verify", path=transfer.source):
+            if hash_file(file_path=partial, algorithm=self.algorithm) != hash_file(
+                file_path=transfer.source,
+                algorithm=self.algorithm,
+            ):
+                partial.unlink()
+                done_file.unlink(missing_ok=True)
+                msg: str = f'"{transfer.destination}" does not match "{transfer.source}"'
+                raise OSError(msg)
+        source_stat: os.stat_result = transfer.source.stat()
+        os.utime(partial, ns=(source_stat.st_atime_ns, source_stat.st_mtime_ns))
+        partial.chmod(source_stat.st_mode & 0o777)
+        partial.replace(transfer.destination)
+        done_file.unlink(missing_ok=True)
+
+    def run(self) -> TransferSummary:
+        """Copy and verify the files not transferred yet.
+
+        Returns
+        -------
+        TransferSummary
+            Number of files transferred and skipped (already in place), bytes copied and resumed
+
+        Raises
+        ------
+        OSError
+            If a file could not be copied or does not match its source, the files copied so far are kept
+
+        """
+        pending: list[FileTransfer] = [transfer for transfer in self.transfers if not self.is_done(transfer=transfer)]
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="nfch-transfer") as executor:
+            ranges: dict[FileTransfer, list[Future[None]]] = {
+                transfer: self._copy_file(transfer=transfer, executor=executor) for transfer in pending
+            }
+            # a file is verified as soon as its ranges are copied, while the ranges of other files are being copied
+            verifications: list[Future[None]] = []
+            for transfer, futures in ranges.items():
+                for future in futures:
+                    future.result()
+                verifications.append(executor.submit(self._finalise, transfer))
+            for future in verifications:
+                future.result()
+        return TransferSummary(
+            files=len(pending),
+            skipped=len(self.transfers) - len(pending),
+            copied_bytes=self.copied_bytes,
+            resumed_bytes=self.resumed_bytes,
+        )
@@ -1,15 +1,28 @@
 """The module contains some utility functions used by all the submodules."""
 
-import json
+import queue
 import sys
+import threading
+import time
+from collections.abc import Callable, Iterable
 from pathlib import Path
-from typing import Any
+from typing import Any, TypeVar
 
+from nfch import profiling, state
 from nfch.message_manager import MessageManager
 
+info = MessageManager.info
+processing = MessageManager.processing
+success = MessageManager.success
+warning = MessageManager.warning
+fail = MessageManager.fail
+
+T = TypeVar("T")
+R = TypeVar("R")
+
 
 def dict_to_json(dictionary: dict[str, Any], file_path: Path) -> None:
-    """Write a dict into a json file.
+    """Write a dict into a json file, atomically and while holding the lock of the file (see nfch.state).
 
     Parameters
     ----------
@@ -20,15 +33,15 @@ def dict_to_json(dictionary: dict[str, Any], file_path: Path) -> None:
 
     """
     try:
-        with file_path.open(mode="w", encoding="utf-8") as json_file:
-            json.dump(obj=dictionary, fp=json_file, indent=2)
+        with profiling.span("json write", path=file_path):
+            state.write_json(dictionary=dictionary, file_path=file_path)
     except PermissionError:
         MessageManager.fail(message=f'"{file_path}" is not writable, aborting!')
         sys.exit()
 
 
 def json_to_dict(file_path: Path) -> dict[str, Any]:
-    """Convert a json file to a dict.
+    """Convert a json file to a dict, files that did not change since the previous call are not parsed again.
 
     Parameters
     ----------
@@ -42,8 +55,8 @@ def json_to_dict(file_path: Path) -> dict[str, Any]:
 
     """
     try:
-        with file_path.open(mode="r", encoding="utf-8") as json_file:
-            data: dict[str, Any] = json.load(fp=json_file)
+        with profiling.span("json read", path=file_path):
+            data: dict[str, Any] = state.read_json(file_path=file_path)
     except FileNotFoundError:
         MessageManager.fail(message=f'File "{file_path}" not found, aborting!')
         sys.exit()
@@ -62,31 +75,114 @@ def string_to_textfile(text: str, file_path: Path) -> None:
 
     """
     try:
-        with file_path.open(mode="w", encoding="utf-8") as text_file:
+        with profiling.span("text write", path=file_path), file_path.open(mode="w", encoding="utf-8") as text_file:
             text_file.write(text)
     except PermissionError:
         MessageManager.fail(message=f'"{file_path}" is not writable, aborting!')
         sys.exit()
     MessageManager.success(message=f'File "{file_path}" has been created successfully.')
 
-    def create_folder(folder_path: Path) -> None:
-        """Create a folder.
 
-        Parameters
-        ----------
-        folder_path : Path
-            Path to the folder of interest
+def create_folder(folder_path: Path) -> None:
+    """Create a folder.
 
-        """
-        try:
+    Parameters
+    ----------
+    folder_path : Path
+        Path to the folder of interest
+
+    """
+    try:
+        with profiling.span("mkdir", path=folder_path):
             folder_path.mkdir()
-            MessageManager.success(message=f'Directory "{folder_path}" created successfully.')
-        except FileExistsError:
-            MessageManager.fail(
-                message=f'Directory "{folder_path}" already exists, aborting! You can remove or rename "{folder_path}"'
-                "and try again.",
-            )
-            sys.exit()
-        except PermissionError:
-            MessageManager.fail(message=f'Directory "{folder_path.parent}" is not writable, aborting!')
-            sys.exit()
+        MessageManager.success(message=f'Directory "{folder_path}" created successfully.')
+    except FileExistsError:
+        MessageManager.fail(
+            message=f'Directory "{folder_path}" already exists, aborting! You can remove or rename "{folder_path}"'
+            "and try again.",
+        )
+        sys.exit()
+    except PermissionError:
+        MessageManager.fail(message=f'Directory "{folder_path.parent}" is not writable, aborting!')
+        sys.exit()
+
+
+def human_readable_size(num_bytes: float) -> str:
+    """Convert a number of bytes into a human readable string, e.g. "1.5 GiB".
+
+    Parameters
+    ----------
+    num_bytes : float
+        Number of bytes
+
+    Returns
+    -------
+    str
+        Human readable size
+
+    """
+    units: list[str] = ["B", "KiB", "MiB", "GiB", "TiB", "PiB"]
+    size: float = float(num_bytes)
+    for unit in units[:-1]:
+        if abs(size) < 1024:  # noqa: PLR2004
+            return f"{size:.1f} {unit}" if unit != "B" else f"{int(size)} {unit}"
+        size /= 1024
+    return f"{size:.1f} {units[-1]}"
+
+
+def map_with_timeout(
+    func: Callable[[T], R],
+    items: Iterable[T],
+    timeout: float,
+    max_workers: int = 16,
+) -> dict[T, R | Exception]:
+    """Apply a function to items concurrently, giving up on the calls that take longer than a timeout.
+
+    Every call runs in its own daemon thread, so that a call stuck on an unresponsive (network) filesystem neither
+    blocks the other calls nor the exit of the program. A timed out call frees its slot for the next item.
+
+    Parameters
+    ----------
+    func : Callable[[T], R]
+        Function to be applied
+    items : Iterable[T]
+        Hashable items
+    timeout : float
+        Maximum number of seconds per call
+    max_workers : int, optional
+        Maximum number of concurrent calls (not counting timed out ones), by default 16
+
+    Returns
+    -------
+    dict[T, R | Exception]
+        Result per item, or the exception raised by the call (TimeoutError if the call timed out)
+
+    """
+    pending: list[T] = list(dict.fromkeys(items))
+    pending.reverse()
+    results: dict[T, R | Exception] = {}
+    outcomes: queue.Queue[tuple[T, R | Exception]] = queue.Queue()
+    deadlines: dict[T, float] = {}
+
+    def _call(item: T) -> None:
+        try:
+            outcomes.put((item, func(item)))
+        except Exception as error:  # noqa: BLE001
+            outcomes.put((item, error))
+
+    while pending or deadlines:
+        while pending and len(deadlines) < max_workers:
+            item: T = pending.pop()
+            deadlines[item] = time.monotonic() + timeout
+            threading.Thread(target=_call, args=(item,), daemon=True).start()
+        try:
+            done_item, outcome = outcomes.get(timeout=max(0.0, min(deadlines.values()) - time.monotonic()))
+            if done_item in deadlines:
+                del deadlines[done_item]
+                results[done_item] = outcome
+        except queue.Empty:
+            now: float = time.monotonic()
+            for expired in [item for item, deadline in deadlines.items() if deadline <= now]:
+                del deadlines[expired]
+                results[expired] = TimeoutError(f"no response within {timeout}s")
+    return results
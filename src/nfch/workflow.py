@@ -1,10 +1,13 @@
 """Classes representing nfcore workflows."""
 
-import textwrap
+import os
 from pathlib import Path
 
-from nfch import utils
+from nfch import contrasts, profiling, state, utils
+from nfch.gene_sets import GeneSetIndex, write_gmt
 from nfch.message_manager import MessageManager
+from nfch.reference_store import FEATURES_FILE, AnnotationCache, ReferenceStore
+from nfch.resources import CUSTOM_CONFIG
 
 
 class Workflow:
@@ -31,12 +34,13 @@ class Workflow:
         self.output_folder: Path = self.wf_folder / "output"
         self.nf_settings: Path = self.run_folder / "nf_params.json"
 
-        project_settings: dict[str, str] = utils.json_to_dict(file_path=Path(".nfch/settings.json"))
+        self.state: state.ProjectState = state.ProjectState()
+        self.project_settings: dict[str, str] = self.state.settings
 
         self.run_settings: dict[str, str | bool | int | float] = {}
-        self.run_settings["input"] = "samplesheet.csv"
+        self.run_settings["input"] = "../metadata/samplesheet.csv"
         self.run_settings["outdir"] = "../output"
-        self.run_settings["email"] = project_settings["email"]
+        self.run_settings["email"] = self.project_settings["email"]
 
         # create folder for the workflow of interest
         utils.create_folder(folder_path=self.wf_folder)
@@ -50,6 +54,7 @@ class Workflow:
         # create subfolder for the output
         utils.create_folder(folder_path=self.output_folder)
 
+    @profiling.traced
     def create_nextflow_command(self, profile: str) -> None:
         """Create a Nextflow command file within the run folder.
 
@@ -64,20 +69,45 @@ class Workflow:
         file_path: Path = self.run_folder / "nextflow_command.txt"
         MessageManager.processing(message=f'Creating the Nextflow command within "{file_path}"...')
 
-        nextflow_command: str = textwrap.dedent(
-            text=f"""
-        nohup nextflow run {self.wf_name} \\
-            -revision {self.revision} \\
-            -profile {profile} \\
-            -resume \\
-            -params-file nf_params.json \\
-        > nohup_nextflow.out \\
-        2> nohup_nextflow.err
-        """,
+        options: list[str] = [f"-revision {self.revision}", f"-profile {profile}"]
+        if CUSTOM_CONFIG.is_file():
+            # resources tuned with "nfch rnaseq tune", the command is run from within the run folder
+            options.append(f"-c {os.path.relpath(CUSTOM_CONFIG, start=self.run_folder)}")
+            MessageManager.info(message=f'"{CUSTOM_CONFIG}" will be used to set the resources of the processes.')
+        options.extend(["-resume", "-params-file nf_params.json"])
+
+        nextflow_command: str = (
+            f"\nnohup nextflow run {self.wf_name} \\\n"
+            + "".join(f"    {option} \\\n" for option in options)
+            + "> nohup_nextflow.out \\\n2> nohup_nextflow.err\n"
         )
 
         utils.string_to_textfile(text=nextflow_command, file_path=file_path)
 
+    def cached_annotation(self, gtf: Path, file_name: str) -> str:
+        """Return a file of the indexed annotation of a gtf ("nfch reference annotation"), if it was already built.
+
+        Parameters
+        ----------
+        gtf : Path
+            Annotation gtf file
+        file_name : str
+            File of the annotation, e.g. FEATURES_FILE
+
+        Returns
+        -------
+        str
+            Path of the file, empty if the annotation of the gtf was not built
+
+        """
+        folder: Path | None = AnnotationCache.from_settings(settings=self.project_settings).folder(
+            gtf=gtf,
+            hash_missing=False,
+        )
+        if folder is None or not (folder / file_name).is_file():
+            return ""
+        return str(folder / file_name)
+
 
 class RNASeq(Workflow):
     """A class representing nfcore/rnaseq workflows."""
@@ -102,6 +132,7 @@ class RNASeq(Workflow):
         super().create_nextflow_command(profile="docker")
         self.create_nf_params()
 
+    @profiling.traced
     def create_nf_params(self) -> None:
         """Create a Nextflow settings file within the run folder.
 
@@ -111,26 +142,76 @@ class RNASeq(Workflow):
             Genome build of interest, must match the key in the genomes.json file
 
         """
-        genomes: dict[str, dict[str, str]] = utils.json_to_dict(file_path=Path(".nfch/genomes.json"))
+        genomes: dict[str, dict[str, str]] = self.state.genomes
         self.run_settings["extra_salmon_quant_args"] = "--gcBias"
         self.run_settings["fasta"] = genomes[self.genome_build]["fasta"]
         self.run_settings["gtf"] = genomes[self.genome_build]["gtf"]
 
-        if genomes[self.genome_build]["nfcore_rnaseq_index"]:
+        nfcore_rnaseq_index: str = genomes[self.genome_build]["nfcore_rnaseq_index"] or self.stored_index(
+            fasta=Path(genomes[self.genome_build]["fasta"]),
+            gtf=Path(genomes[self.genome_build]["gtf"]),
+        )
+        if nfcore_rnaseq_index:
             # use the genome indexes if present and turn off the save_reference flag
-            nfcore_rnaseq_index_path: Path = Path(genomes[self.genome_build]["nfcore_rnaseq_index"])
+            nfcore_rnaseq_index_path: Path = Path(nfcore_rnaseq_index)
             self.run_settings["save_reference"] = False
             self.run_settings["star_index"] = str(object=nfcore_rnaseq_index_path / "index" / "star")
             self.run_settings["salmon_index"] = str(object=nfcore_rnaseq_index_path / "index" / "salmon")
-            self.run_settings["gene_bed"] = str(object=next(nfcore_rnaseq_index_path.glob(pattern="*.bed")))
+            with profiling.span("glob *.bed", path=nfcore_rnaseq_index_path):
+                self.run_settings["gene_bed"] = str(object=next(nfcore_rnaseq_index_path.glob(pattern="*.bed")))
         else:
+            # no "gene_bed" is passed: the run converts the gtf itself and saves the gene bed with the indexes, as
+            # expected by "nfch reference register/publish" and by later lookups in the reference store
             self.run_settings["save_reference"] = True
             MessageManager.warning(
-                message="Do not forget to transfer the generated genome indexes to the appropriate location with"
-                "something like 'rsync -ahr --progress genome /home/eetlioglu/references/GRCh38_Ensembl/release_113/'",
+                message='Do not forget to register the generated genome indexes with "nfch reference register" once the'
+                " run is finished, so that later projects reuse them.",
             )
         utils.dict_to_json(dictionary=self.run_settings, file_path=self.nf_settings)
 
+    @profiling.traced
+    def stored_index(self, fasta: Path, gtf: Path) -> str:
+        """Look up indexes built from the same fasta/gtf by the same revision in the shared reference store.
+
+        Parameters
+        ----------
+        fasta : Path
+            Genome fasta file
+        gtf : Path
+            Annotation gtf file
+
+        Returns
+        -------
+        str
+            Folder of the stored indexes, empty if no store is configured or nothing is found
+
+        """
+        if not self.project_settings.get("reference_store"):
+            return ""
+        store: ReferenceStore = ReferenceStore(root=Path(self.project_settings["reference_store"]))
+        MessageManager.processing(message=f'Looking up the genome indexes in the reference store "{store.root}"...')
+        stored: Path | None = store.lookup(fasta=fasta, gtf=gtf, revision=self.revision)
+        if stored is None:
+            return ""
+        MessageManager.success(message=f'Genome indexes found in "{stored}", they will not be rebuilt.')
+        return str(stored)
+
+    @staticmethod
+    @profiling.traced
+    def update_nf_params(settings: dict[str, str | bool | int | float]) -> None:
+        """Update the parameters file of an already prepared nfcore/rnaseq run.
+
+        Parameters
+        ----------
+        settings : dict[str, str | bool | int | float]
+            Parameters to be added or overridden
+
+        """
+        nf_settings: Path = RNASeq.wf_folder / "run" / "nf_params.json"
+        with state.update_json(file_path=nf_settings) as run_settings:
+            run_settings.update(settings)
+        MessageManager.success(message=f'"{nf_settings}" has been updated with {", ".join(settings)}.')
+
 
 class DiffAbun(Workflow):
     """To be implemented."""
@@ -138,13 +219,17 @@ class DiffAbun(Workflow):
     wf_name: str = r"nf-core/differentialabundance"
     wf_folder: Path = Path("nfcore_differentialabundance")
 
-    def __init__(self, revision: str) -> None:
+    def __init__(self, revision: str, min_set_size: int = 15, max_set_size: int = 500) -> None:
         """Create an istance of the DiffAbun class.
 
         Parameters
         ----------
         revision : str
             Version of the nfcore/differentialabundance pipeline
+        min_set_size : int, optional
+            Minimum number of genes of the count matrix for a gene set to be tested, by default 15
+        max_set_size : int, optional
+            Maximum number of genes of the count matrix for a gene set to be tested, by default 500
 
         """
         super().__init__(
@@ -153,40 +238,126 @@ class DiffAbun(Workflow):
             wf_folder=DiffAbun.wf_folder,
         )
         super().create_nextflow_command(profile="rnaseq,docker")
-        self.create_nf_params()
+        self.create_nf_params(min_set_size=min_set_size, max_set_size=max_set_size)
 
-    def create_nf_params(self, organism: str = "human") -> None:
+    @profiling.traced
+    def create_nf_params(self, organism: str = "human", min_set_size: int = 15, max_set_size: int = 500) -> None:
         """Create a parameters file for a nfcore/differentialabundance run.
 
         Parameters
         ----------
         organism : str, optional
             Species/organism of interest, by default "human"
+        min_set_size : int, optional
+            Minimum number of genes of the count matrix for a gene set to be tested, by default 15
+        max_set_size : int, optional
+            Maximum number of genes of the count matrix for a gene set to be tested, by default 500
 
         """
-        nfcore_rnaseq_params: dict[str, str | bool] = utils.json_to_dict(
-            file_path=Path("nfcore_rnaseq/run/nf_params.json"),
-        )
+        nfcore_rnaseq_params: dict[str, str | bool] = self.state.nf_params(wf_folder=RNASeq.wf_folder)
 
         signatures: dict[str, dict[str, str]] = utils.json_to_dict(
             file_path=Path("/home/eetlioglu/references/msigdb/signatures.json"),
         )
         expected_signatures = ["H", "C2", "C3", "C5", "C8"]
         expected_signatures = [signatures[organism][sig.lower() + ".all"] for sig in expected_signatures]
-        expected_signatures_as_str = ",".join(expected_signatures)
 
-        self.run_settings["input"] = "../../nfcore_rnaseq/run/samplesheet.csv"
+        self.run_settings["input"] = "../../nfcore_rnaseq/metadata/samplesheet.csv"
         self.run_settings["contrasts"] = "../metadata/contrasts.csv"
         self.run_settings["matrix"] = (
             "../../nfcore_rnaseq/output/star_salmon/salmon.merged.gene_counts_length_scaled.tsv"
         )
+        expected_signatures_as_str = ",".join(
+            self.trim_gene_sets(gmt_files=expected_signatures, min_size=min_set_size, max_size=max_set_size),
+        )
         self.run_settings["gtf"] = nfcore_rnaseq_params["gtf"]
+        features: str = self.cached_annotation(gtf=Path(str(nfcore_rnaseq_params["gtf"])), file_name=FEATURES_FILE)
+        if features:
+            # gene_id, gene_name and gene_biotype of the indexed annotation, instead of a conversion of the gtf
+            self.run_settings["features"] = features
         self.run_settings["differential_min_fold_change"] = 2
         self.run_settings["differential_max_qval"] = 0.05
         self.run_settings["gsea_run"] = True
         self.run_settings["gsea_metric"] = "log2_Ratio_of_Classes"
         self.run_settings["gene_sets_files"] = expected_signatures_as_str
+        self.run_settings["gsea_set_min"] = min_set_size
+        self.run_settings["gsea_set_max"] = max_set_size
         self.run_settings["gsea_plot_top_x"] = 20
         self.run_settings["gprofiler2_run"] = True
         self.run_settings["gprofiler2_organism"] = "hsapiens"
         utils.dict_to_json(dictionary=self.run_settings, file_path=self.nf_settings)
+
+    @profiling.traced
+    def trim_gene_sets(self, gmt_files: list[str], min_size: int, max_size: int) -> list[str]:
+        """Write the gene sets of GMT files trimmed to the genes of the count matrix and to a size window.
+
+        The GMT files are indexed once (see GeneSetIndex), the trimmed files are written to "metadata/gene_sets".
+
+        Parameters
+        ----------
+        gmt_files : list[str]
+            GMT files, e.g. MSigDB collections
+        min_size : int
+            Minimum number of genes of the count matrix for a gene set to be kept
+        max_size : int
+            Maximum number of genes of the count matrix for a gene set to be kept
+
+        Returns
+        -------
+        list[str]
+            Trimmed GMT files relative to the run folder, the given files if the count matrix does not exist yet
+
+        """
+        matrix: Path = self.run_folder / str(self.run_settings["matrix"])
+        if not matrix.is_file():
+            MessageManager.warning(
+                message=f'"{matrix}" does not exist yet, the gene sets cannot be trimmed to its genes and will be used'
+                " whole.",
+            )
+            return gmt_files
+        MessageManager.processing(
+            message=f"Trimming the gene sets to the genes of the count matrix, keeping {min_size}-{max_size} genes...",
+        )
+        universe: set[str] = contrasts.read_matrix_genes(file_path=matrix)
+        gene_sets_folder: Path = self.metadata_folder / "gene_sets"
+        gene_sets_folder.mkdir(exist_ok=True)
+        trimmed: list[str] = []
+        for gmt_file in map(Path, gmt_files):
+            index: GeneSetIndex = GeneSetIndex.load(file_path=gmt_file)
+            count: int = write_gmt(
+                gene_sets=index.trim(universe=universe, min_size=min_size, max_size=max_size),
+                file_path=gene_sets_folder / gmt_file.name,
+            )
+            MessageManager.info(message=f"{gmt_file.name}: {count:,} of {len(index.names):,} gene sets kept.", level=1)
+            trimmed.append(os.path.relpath(gene_sets_folder / gmt_file.name, start=self.run_folder))
+        return trimmed
+
+    @staticmethod
+    def validate_inputs() -> bool:
+        """Check the samplesheet, the contrasts and the count matrix of a prepared run before it is launched.
+
+        The paths are taken from the parameters file and resolved against the run folder, as Nextflow would.
+
+        Returns
+        -------
+        bool
+            True if no problem was found
+
+        """
+        run_folder: Path = DiffAbun.wf_folder / "run"
+        run_settings: dict[str, str | bool | int | float] = utils.json_to_dict(file_path=run_folder / "nf_params.json")
+        paths: dict[str, Path] = {key: run_folder / str(run_settings[key]) for key in ("input", "contrasts", "matrix")}
+        MessageManager.processing(message="Validating the samplesheet, the contrasts and the count matrix...")
+        problems: list[str] = contrasts.validate_inputs(
+            samplesheet=paths["input"],
+            contrasts_file=paths["contrasts"],
+            matrix=paths["matrix"],
+            id_column=str(run_settings.get("observations_id_col", "sample")),
+        )
+        for problem in problems:
+            MessageManager.fail(message=problem, level=1)
+        if problems:
+            MessageManager.fail(message=f"{len(problems)} problem(s) found, fix them before launching the run!")
+            return False
+        MessageManager.success(message="The inputs of the run are consistent.")
+        return True
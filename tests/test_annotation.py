@@ -0,0 +1,60 @@
+"""Provide tests for the GeneTable class and the annotation cache."""
+
+import gzip
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from nfch.annotation import GeneTable
+from nfch.reference_store import FEATURES_FILE, GENE_BED_FILE, AnnotationCache
+
+GTF: str = """#!genome-build GRCh38
+1\tensembl\tgene\t11\t100\t.\t+\t.\tgene_id "G1"; gene_name "TP53"; gene_biotype "protein_coding";
+1\tensembl\ttranscript\t11\t100\t.\t+\t.\tgene_id "G1"; transcript_id "T1"; gene_name "TP53";
+1\tensembl\texon\t11\t20\t.\t+\t.\tgene_id "G1"; transcript_id "T1";
+1\tensembl\tCDS\t15\t20\t.\t+\t0\tgene_id "G1"; transcript_id "T1";
+1\tensembl\texon\t51\t100\t.\t+\t.\tgene_id "G1"; transcript_id "T1";
+1\tensembl\tCDS\t51\t60\t.\t+\t0\tgene_id "G1"; transcript_id "T1";
+1\tensembl\tfive_prime_utr\t11\t14\t.\t+\t.\tgene_id "G1"; transcript_id "T1";
+1\tensembl\tgene\t31\t40\t.\t-\t.\tgene_id "G2"; gene_name "MIR1"; gene_biotype "miRNA";
+1\tensembl\ttranscript\t31\t40\t.\t-\t.\tgene_id "G2"; transcript_id "T2";
+1\tensembl\texon\t31\t40\t.\t-\t.\tgene_id "G2"; transcript_id "T2";
+2\tucsc\texon\t201\t300\t.\t-\t.\tgene_id "G3"; transcript_id "T3"; gene_name "XIST"; gene_type "lncRNA";
+2\tucsc\texon\t101\t150\t.\t-\t.\tgene_id "G3"; transcript_id "T3";
+"""
+
+
+def test_gene_table(tmp_path: Path) -> None:
+    """Test that a gzip compressed gtf is indexed once, with genes derived from their exons when they have no line."""
+    gtf: Path = tmp_path / "genes.gtf.gz"
+    with gzip.open(gtf, mode="wt") as gtf_file:
+        gtf_file.write(GTF)
+    cache: AnnotationCache = AnnotationCache(root=tmp_path / "store" / "annotations")
+    assert cache.folder(gtf=gtf, hash_missing=False) is None
+    folder: Path | None = cache.folder(gtf=gtf)
+    assert folder is not None
+    assert cache.folder(gtf=gtf, hash_missing=False) == folder
+
+    parsed: GeneTable = GeneTable.load(gtf=gtf, folder=folder)
+    cached: GeneTable = GeneTable.load(gtf=gtf, folder=folder)
+    assert parsed.symbols() == cached.symbols() == {"G1": "TP53", "G2": "MIR1", "G3": "XIST"}
+    assert cached.biotype_counts() == {"lncRNA": 1, "miRNA": 1, "protein_coding": 1}
+    assert cached.arrays["gene_starts"].tolist() == [10, 30, 100]
+    assert cached.arrays["gene_ends"].tolist() == [100, 40, 300]
+    assert cached.overlapping(contig="1", start=35, end=36).tolist() == [0, 1]
+    assert cached.overlapping(contig="1", start=0, end=10).tolist() == []
+    assert cached.overlapping(contig="1", start=95, end=200).tolist() == [0]
+    assert cached.overlapping(contig="3", start=0, end=1).tolist() == []
+
+    assert (folder / GENE_BED_FILE).read_text().splitlines() == [
+        "1\t10\t100\tT1\t0\t+\t14\t60\t0\t2\t10,50,\t0,40,",
+        "1\t30\t40\tT2\t0\t-\t30\t30\t0\t1\t10,\t0,",
+        "2\t100\t300\tT3\t0\t-\t100\t100\t0\t2\t50,100,\t0,100,",
+    ]
+    assert (folder / FEATURES_FILE).read_text().splitlines()[:2] == [
+        "gene_id\tgene_name\tgene_biotype",
+        "G1\tTP53\tprotein_coding",
+    ]
+    assert list(cached.bed_lines(biotypes=["miRNA"])) == ["1\t30\t40\tT2\t0\t-\t30\t30\t0\t1\t10,\t0,\n"]
@@ -0,0 +1,95 @@
+"""Provide tests for the batch preparation of projects."""
+
+import json
+from pathlib import Path
+
+from nfch import batch
+
+
+def _write_genomes_json(tmp_path: Path) -> Path:
+    """Write a genomes.json with a single genome build, "build"."""
+    for file in ["genome.fa", "genes.gtf"]:
+        (tmp_path / file).write_text("")
+    genomes_json: Path = tmp_path / "genomes.json"
+    genomes_json.write_text(
+        json.dumps(
+            {
+                "build": {
+                    "fasta": str(tmp_path / "genome.fa"),
+                    "gtf": str(tmp_path / "genes.gtf"),
+                    "nfcore_rnaseq_index": "",
+                }
+            }
+        ),
+    )
+    return genomes_json
+
+
+def test_prepare_projects(tmp_path: Path, monkeypatch) -> None:  # noqa: ANN001
+    """Test that valid projects are prepared and an already prepared one is reported as failed."""
+    monkeypatch.chdir(tmp_path)
+    genomes_json: Path = _write_genomes_json(tmp_path=tmp_path)
+    manifest: Path = tmp_path / "manifest.csv"
+    manifest.write_text("project_dir,genome_build,email\nbatch_1,,a@b.c\nbatch_2,,\nbatch_3,unknown,\n")
+    (tmp_path / "batch_2" / "nfcore_rnaseq").mkdir(parents=True)
+
+    entries: list[batch.BatchEntry] = batch.read_manifest(
+        file_path=manifest,
+        genome_build="build",
+        revision="3.18.0",
+        email="x@y.z",
+    )
+    assert [entry.email for entry in entries] == ["a@b.c", "x@y.z", "x@y.z"]
+    assert batch.prepare_projects(entries=entries, genomes_json=genomes_json) == []
+
+    results: list[batch.BatchResult] = batch.prepare_projects(entries=entries[:2], genomes_json=genomes_json, workers=2)
+    assert [result.ok for result in results] == [True, False]
+    assert "already exists" in results[1].message
+    nf_params: dict[str, str] = json.loads(
+        (tmp_path / "batch_1" / "nfcore_rnaseq" / "run" / "nf_params.json").read_text()
+    )
+    assert nf_params["email"] == "a@b.c"
+    assert nf_params["gtf"] == str(tmp_path / "genes.gtf")
+    assert (tmp_path / "batch_1" / ".nfch" / "batch_prepare.log").is_file()
+
+
+def test_relative_manifest(tmp_path: Path, monkeypatch) -> None:  # noqa: ANN001
+    """Test that projects of a relative manifest prepared by the same process are not nested into each other."""
+    monkeypatch.chdir(tmp_path)
+    genomes_json: Path = _write_genomes_json(tmp_path=tmp_path)
+    Path("batch").mkdir()
+    manifest: Path = Path("batch/manifest.csv")
+    manifest.write_text("project_dir,genome_build,email\nbatch_1,,\nbatch_2,,\nbatch_3,,\n")
+
+    entries: list[batch.BatchEntry] = batch.read_manifest(
+        file_path=manifest,
+        genome_build="build",
+        revision="3.18.0",
+        email="x@y.z",
+    )
+    assert [entry.project_dir for entry in entries] == [tmp_path / "batch" / f"batch_{i}" for i in (1, 2, 3)]
+    results: list[batch.BatchResult] = batch.prepare_projects(entries=entries, genomes_json=genomes_json, workers=1)
+    assert all(result.ok for result in results)
+    for i in (1, 2, 3):
+        assert (tmp_path / "batch" / f"batch_{i}" / "nfcore_rnaseq").is_dir()
+    assert not (tmp_path / "batch" / "batch_1" / "batch_2").exists()
+
+
+def test_unexpected_error(tmp_path: Path, monkeypatch) -> None:  # noqa: ANN001
+    """Test that an unexpected error fails its project only."""
+    monkeypatch.chdir(tmp_path)
+    genomes_json: Path = _write_genomes_json(tmp_path=tmp_path)
+    genomes: dict[str, dict[str, str]] = json.loads(genomes_json.read_text())
+    del genomes["build"]["nfcore_rnaseq_index"]
+    genomes_json.write_text(json.dumps(genomes))
+
+    entry: batch.BatchEntry = batch.BatchEntry(
+        project_dir=tmp_path / "batch_1",
+        genome_build="build",
+        revision="3.18.0",
+        email="x@y.z",
+    )
+    result: batch.BatchResult = batch.prepare_project(entry=entry, genomes_json=genomes_json)
+    assert not result.ok
+    assert result.message == "KeyError: 'nfcore_rnaseq_index'"
+    assert Path.cwd() == tmp_path
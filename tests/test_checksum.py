@@ -0,0 +1,68 @@
+"""Provide tests for the checksum module."""
+
+import hashlib
+import importlib.util
+import os
+from pathlib import Path
+
+import pytest
+
+from nfch.checksum import ChecksumManifest, HashAlgorithm, hash_file, samplesheet_fastqs
+
+
+def test_hash_file(tmp_path: Path) -> None:
+    """Test that the streamed checksum matches hashlib, also across buffer boundaries."""
+    file_path: Path = tmp_path / "reads.fastq.gz"
+    content: bytes = os.urandom(100_000)
+    file_path.write_bytes(content)
+
+    assert hash_file(file_path=file_path, buffer_size=4096) == hashlib.md5(content).hexdigest()  # noqa: S324
+    assert hash_file(file_path=file_path, algorithm=HashAlgorithm.SHA256) == hashlib.sha256(content).hexdigest()
+
+
+def test_manifest(tmp_path: Path) -> None:
+    """Test that only new/changed files are hashed and that corrupted files are detected."""
+    samplesheet: Path = tmp_path / "samplesheet.csv"
+    samplesheet.write_text("sample,fastq_1,fastq_2,strandedness\ns1,s1_R1.fastq.gz,/abs/s1_R2.fastq.gz,auto\n")
+    assert samplesheet_fastqs(samplesheet=samplesheet, base_folder=tmp_path) == [
+        tmp_path / "s1_R1.fastq.gz",
+        Path("/abs/s1_R2.fastq.gz"),
+    ]
+
+    fastq: Path = tmp_path / "s1_R1.fastq.gz"
+    fastq.write_bytes(b"@read\nACGT\n+\nIIII\n")
+    manifest: ChecksumManifest = ChecksumManifest(manifest_file=tmp_path / "checksums.json")
+    assert manifest.update(file_paths=[fastq], workers=1) == []
+    assert manifest.is_current(file_path=fastq, algorithm=HashAlgorithm.MD5)
+
+    # same size and mtime, different content
+    file_stat: os.stat_result = fastq.stat()
+    fastq.write_bytes(b"@read\nACGA\n+\nIIII\n")
+    os.utime(fastq, ns=(file_stat.st_atime_ns, file_stat.st_mtime_ns))
+    reloaded: ChecksumManifest = ChecksumManifest(manifest_file=tmp_path / "checksums.json")
+    assert reloaded.update(file_paths=[fastq], workers=1) == []
+    assert reloaded.update(file_paths=[fastq], workers=1, verify=True) == [fastq]
+
+
+def test_manifest_unreadable(tmp_path: Path, monkeypatch) -> None:  # noqa: ANN001
+    """Test that an unreadable file is reported while the checksums of the others are recorded."""
+    readable: Path = tmp_path / "s1_R1.fastq.gz"
+    readable.write_bytes(b"@read\nACGT\n+\nIIII\n")
+    unreadable: Path = tmp_path / "s1_R2.fastq.gz"
+    unreadable.mkdir()
+    monkeypatch.setattr(Path, "is_file", lambda path: path.exists())
+    manifest: ChecksumManifest = ChecksumManifest(manifest_file=tmp_path / "checksums.json")
+    assert manifest.update(file_paths=[readable, unreadable], workers=1) == []
+    assert manifest.unreadable == [unreadable]
+    assert ChecksumManifest(manifest_file=tmp_path / "checksums.json").digest(file_path=readable) is not None
+
+
+@pytest.mark.skipif(importlib.util.find_spec("xxhash") is not None, reason="xxhash is installed")
+def test_manifest_missing_xxhash(tmp_path: Path) -> None:
+    """Test that xxhash without its package exits before any file is hashed."""
+    fastq: Path = tmp_path / "s1_R1.fastq.gz"
+    fastq.write_bytes(b"@read\nACGT\n+\nIIII\n")
+    manifest: ChecksumManifest = ChecksumManifest(manifest_file=tmp_path / "checksums.json")
+    with pytest.raises(SystemExit):
+        manifest.update(file_paths=[fastq], algorithm=HashAlgorithm.XXHASH, workers=1)
+    assert not manifest.files
@@ -0,0 +1,56 @@
+"""Provide tests for the validation of nfcore/differentialabundance inputs."""
+
+from pathlib import Path
+
+from nfch.contrasts import validate_inputs
+
+
+def test_validate_inputs(tmp_path: Path) -> None:
+    """Test that all problems are reported in one pass."""
+    samplesheet: Path = tmp_path / "samplesheet.csv"
+    samplesheet.write_text("sample,condition,batch\nA1,ctrl,b1\nA2,ctrl,b2\nB1,treated,b1\n")
+    contrasts_file: Path = tmp_path / "contrasts.csv"
+    contrasts_file.write_text(
+        "id,variable,reference,target,blocking\n"
+        "ok,condition,ctrl,treated,batch\n"
+        "typo,condition,ctrl,treatd,\n"
+        "ok,genotype,wt,ko,donor\n",
+    )
+    matrix: Path = tmp_path / "matrix.tsv"
+    matrix.write_text("gene_id\tgene_name\tA1\tB1\nENSG1\tTP53\t1\t2\n")
+
+    problems: list[str] = validate_inputs(samplesheet=samplesheet, contrasts_file=contrasts_file, matrix=matrix)
+
+    assert problems == [
+        'Contrast "typo": target level "treatd" is not a value of "condition" (ctrl, treated)',
+        'Contrast "ok" is defined more than once',
+        'Contrast "ok": variable "genotype" is not a column of the samplesheet',
+        'Contrast "ok": blocking variable "donor" is not a column of the samplesheet',
+        f'1 samples are not columns of "{matrix}": A2',
+    ]
+
+    contrasts_file.write_text("id,variable,reference,target\nok,condition,ctrl,treated\n")
+    matrix.write_text("gene_id\tgene_name\tA1\tA2\tB1\n")
+    assert validate_inputs(samplesheet=samplesheet, contrasts_file=contrasts_file, matrix=matrix) == []
+
+
+def test_lanes(tmp_path: Path) -> None:
+    """Test that the rows of a sample sequenced on several lanes are kept once, unless they disagree on a contrast."""
+    samplesheet: Path = tmp_path / "samplesheet.csv"
+    samplesheet.write_text(
+        "sample,fastq_1,condition,batch\n"
+        "A1,A1_L001.fastq.gz,ctrl,b1\n"
+        "A1,A1_L002.fastq.gz,ctrl,b1\n"
+        "B1,B1_L001.fastq.gz,treated,b1\n"
+        "B1,B1_L002.fastq.gz,treated,b2\n",
+    )
+    contrasts_file: Path = tmp_path / "contrasts.csv"
+    contrasts_file.write_text("id,variable,reference,target\nok,condition,ctrl,treated\n")
+    matrix: Path = tmp_path / "matrix.tsv"
+    matrix.write_text("gene_id\tgene_name\tA1\tB1\n")
+    assert validate_inputs(samplesheet=samplesheet, contrasts_file=contrasts_file, matrix=matrix) == []
+
+    contrasts_file.write_text("id,variable,reference,target,blocking\nok,condition,ctrl,treated,batch\n")
+    assert validate_inputs(samplesheet=samplesheet, contrasts_file=contrasts_file, matrix=matrix) == [
+        f'Sample "B1" has rows with different values of "batch" in "{samplesheet}"',
+    ]
@@ -0,0 +1,51 @@
+"""Provide tests for the CountsMatrix class."""
+
+import errno
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from nfch.contrasts import contrast_samples, read_contrasts, read_samplesheet
+from nfch.counts import CountsMatrix
+
+
+def test_load_and_qc(tmp_path: Path) -> None:
+    """Test parsing, the memory-mapped cache and the QC metrics."""
+    matrix_file: Path = tmp_path / "salmon.merged.gene_counts_length_scaled.tsv"
+    matrix_file.write_text(
+        "gene_id\tgene_name\tA1\tA2\tB1\nENSG1\tTP53\t10.5\t0\t3\nENSG2\tMYC\t0\t0\t0\nENSG3\tGAPDH\t100\t80\t120\n",
+    )
+
+    parsed: CountsMatrix = CountsMatrix.load(file_path=matrix_file)
+    cached: CountsMatrix = CountsMatrix.load(file_path=matrix_file)
+
+    assert CountsMatrix.cache_folder(file_path=matrix_file).joinpath("metadata.json").is_file()
+    assert cached.samples == parsed.samples == ["A1", "A2", "B1"]
+    assert list(cached.gene_names) == ["TP53", "MYC", "GAPDH"]
+    assert cached.library_sizes().tolist() == [110.5, 80, 123]
+    assert cached.detected_genes().tolist() == [2, 1, 2]
+    assert cached.correlation().shape == (3, 3)
+
+    samplesheet: Path = tmp_path / "samplesheet.csv"
+    samplesheet.write_text("sample,condition\nA1,ctrl\nA2,ctrl\nB1,treated\n")
+    contrasts_file: Path = tmp_path / "contrasts.csv"
+    contrasts_file.write_text("id,variable,reference,target\ntreated_vs_ctrl,condition,ctrl,treated\n")
+    reference, target = contrast_samples(
+        contrast=read_contrasts(file_path=contrasts_file)[0],
+        samples=read_samplesheet(file_path=samplesheet),
+    )
+    assert cached.subset(samples=target + reference).values[:, 0].tolist() == [3, 0, 120]
+
+
+def test_read_only_cache(tmp_path: Path, monkeypatch) -> None:  # noqa: ANN001
+    """Test that a cache which cannot be written, e.g. on a read-only mount, only means parsing again."""
+    matrix_file: Path = tmp_path / "salmon.merged.gene_counts.tsv"
+    matrix_file.write_text("gene_id\tgene_name\tA1\nENSG1\tTP53\t1\n")
+
+    def _read_only(*_: object, **__: object) -> None:
+        raise OSError(errno.EROFS, "Read-only file system")
+
+    monkeypatch.setattr(CountsMatrix, "save", _read_only)
+    assert CountsMatrix.load(file_path=matrix_file).samples == ["A1"]
@@ -0,0 +1,61 @@
+"""Provide tests for the store of differential tables."""
+
+import os
+from pathlib import Path
+
+from nfch import differential
+from nfch.differential import Direction, Hit
+
+DESEQ2: str = (
+    "gene_id\tgene_name\tbaseMean\tlog2FoldChange\tlfcSE\tstat\tpvalue\tpadj\n"
+    "ENSG1\tTP53\t10\t2.5\t0.1\t1\t0.001\t0.01\n"
+    "ENSG2\tMYC\t5\t-3\t0.1\t1\t0.001\t0.02\n"
+    "ENSG3\tGAPDH\t1\t4\t1\t1\tNA\tNA\n"
+)
+LIMMA: str = (
+    "gene_id\tlogFC\tAveExpr\tt\tP.Value\tadj.P.Val\tB\n"
+    "ENSG1\t1.5\t3\t1\t0.001\t0.001\t1\n"
+    "ENSG2\t2\t3\t1\t0.001\t0.001\t1\n"
+)
+
+
+def test_index_and_query(tmp_path: Path) -> None:
+    """Test that the tables are indexed incrementally and that cross-contrast filters are answered."""
+    tables: Path = tmp_path / "output" / "tables" / "differential"
+    tables.mkdir(parents=True)
+    (tables / "treated_vs_ctrl.deseq2.results.tsv").write_text(DESEQ2)
+    (tables / "treated_vs_ctrl.deseq2.results_filtered.tsv").write_text(DESEQ2)
+    (tables / "late_vs_early.limma.results.tsv").write_text(LIMMA)
+    database_file: Path = tmp_path / "differential.sqlite"
+
+    files: list[Path] = differential.find_tables(paths=[tmp_path / "output"])
+    assert [file.name for file in files] == ["late_vs_early.limma.results.tsv", "treated_vs_ctrl.deseq2.results.tsv"]
+    assert differential.index(files=files, database_file=database_file) == (2, 0, 0, 5)
+    assert differential.index(files=files, database_file=database_file) == (0, 2, 0, 0)
+    assert differential.contrasts(database_file=database_file) == [
+        ("late_vs_early", "limma", 2),
+        ("treated_vs_ctrl", "deseq2", 3),
+    ]
+
+    assert differential.query(database_file=database_file, direction=Direction.UP) == [
+        Hit(gene_id="ENSG1", gene_name="TP53", log2_fold_changes={"late_vs_early": 1.5, "treated_vs_ctrl": 2.5}),
+    ]
+    assert [hit.gene_id for hit in differential.query(database_file=database_file, min_contrasts=1)] == [
+        "ENSG1",
+        "ENSG2",
+    ]
+    assert differential.query(
+        database_file=database_file, contrast_ids=["treated_vs_ctrl"], direction=Direction.DOWN
+    ) == [
+        Hit(gene_id="ENSG2", gene_name="MYC", log2_fold_changes={"treated_vs_ctrl": -3.0}),
+    ]
+
+    # a rerun replaces the rows of its tables, deleted tables are dropped
+    (tables / "treated_vs_ctrl.deseq2.results.tsv").write_text(DESEQ2.replace("\t2.5\t", "\t-2.5\t"))
+    os.utime(tables / "treated_vs_ctrl.deseq2.results.tsv", ns=(0, 0))
+    (tables / "late_vs_early.limma.results.tsv").unlink()
+    assert differential.index(files=files[1:], database_file=database_file) == (1, 0, 1, 3)
+    assert [hit.gene_id for hit in differential.query(database_file=database_file, direction=Direction.DOWN)] == [
+        "ENSG1",
+        "ENSG2",
+    ]
@@ -0,0 +1,32 @@
+"""Provide tests for the DiskUsage class."""
+
+import os
+from pathlib import Path
+
+from nfch.disk_usage import DiskUsage
+
+
+def test_links_counted_once(tmp_path: Path) -> None:
+    """Test that hard links and symlinks do not inflate the totals, and that the cache is reused."""
+    cache_file: Path = tmp_path / "du.json"
+    wf_folder: Path = tmp_path / "nfcore_rnaseq"
+    task_folder: Path = wf_folder / "run" / "work" / "ab" / "cdef1234"
+    task_folder.mkdir(parents=True)
+    (wf_folder / "output").mkdir()
+    (task_folder / "sample.bam").write_bytes(b"x" * 50_000)
+    os.link(task_folder / "sample.bam", wf_folder / "output" / "sample.bam")
+    (wf_folder / "output" / "sample.bam.link").symlink_to(task_folder / "sample.bam")
+
+    disk_usage: DiskUsage = DiskUsage(wf_folder=wf_folder, cache_file=cache_file)
+    disk_usage.scan(workers=2)
+    totals = disk_usage.totals()
+
+    size: int = (task_folder / "sample.bam").stat().st_blocks * 512
+    assert sum(counters["bytes"] for counters in totals["area"].values()) == size
+    assert sum(counters["files"] for counters in totals["area"].values()) == 1
+    assert totals["process"]["(untraced)"]["files"] + totals["area"]["output"]["files"] == 1
+
+    cached: DiskUsage = DiskUsage(wf_folder=wf_folder, cache_file=cache_file)
+    cached.scan(workers=2)
+    assert cached.cache_hits == len(cached.summaries)
+    assert cached.totals() == totals
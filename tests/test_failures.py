@@ -0,0 +1,71 @@
+"""Provide tests for the Nextflow log failure analysis."""
+
+from pathlib import Path
+
+from nfch.failures import Diagnosis, FailedTask, FailureGroup, find_work_dir, group_failures, scan_log, tail
+
+LOG: str = """Oct-17 12:00:01.123 [main] DEBUG nextflow.cli.Launcher - $> nextflow run nf-core/rnaseq -resume
+Oct-17 12:00:02.000 [Task submitter] INFO  nextflow.Session - [3f/9a7b12] Submitted process > RNASEQ:STAR (s1)
+Oct-17 12:10:00.000 [Task monitor] INFO  nextflow.processor.TaskProcessor - [3f/9a7b12] NOTE: Process `RNASEQ:STAR \
+(s1)` terminated with an error exit status (137) -- Execution is retried (1)
+Oct-17 12:11:00.000 [Task monitor] INFO  nextflow.processor.TaskProcessor - [aa/bbbbbb] NOTE: Process `RNASEQ:STAR \
+(s2)` terminated with an error exit status (137) -- Execution is retried (1)
+Oct-17 12:12:00.000 [Task monitor] INFO  nextflow.processor.TaskProcessor - [cc/dddddd] NOTE: Missing output file(s) \
+`*.txt` expected by process `RNASEQ:QUALIMAP (s1)` -- Error is ignored
+Oct-17 12:13:00.000 [Task monitor] INFO  nextflow.Session - NOTE: Nextflow is not tested with Java 23
+Oct-17 12:20:00.000 [Task monitor] ERROR nextflow.processor.TaskProcessor - Error executing process > 'RNASEQ:STAR (s1)'
+
+Caused by:
+  Process `RNASEQ:STAR (s1)` terminated with an error exit status (137)
+
+Command executed:
+
+  STAR --genomeDir star --foo [x] ERROR thing
+
+Command exit status:
+  137
+
+Command output:
+  (empty)
+
+Work dir:
+  /moved/elsewhere/work/e1/f2a3b4c5d6
+
+Tip: you can replicate the issue by changing to the process work dir and entering the command `bash .command.run`
+Oct-17 12:20:01.000 [main] ERROR nextflow.Nextflow - Pipeline failed [s1]
+"""
+
+
+def test_scan_log(tmp_path: Path) -> None:
+    """Test that failed attempts are found in one scan, grouped and followed to their work folder."""
+    log_file: Path = tmp_path / ".nextflow.log"
+    log_file.write_text(LOG)
+    diagnosis: Diagnosis = scan_log(file_path=log_file)
+    assert [(task.name, task.exit_status, task.outcome, task.task_hash) for task in diagnosis.tasks] == [
+        ("RNASEQ:STAR (s1)", "137", "retried", "3f/9a7b12"),
+        ("RNASEQ:STAR (s2)", "137", "retried", "aa/bbbbbb"),
+        ("RNASEQ:QUALIMAP (s1)", "-", "ignored", "cc/dddddd"),
+        ("RNASEQ:STAR (s1)", "137", "fatal", "e1/f2a3b4"),
+    ]
+    fatal: FailedTask = diagnosis.tasks[-1]
+    assert fatal.cause == "Process `RNASEQ:STAR (s1)` terminated with an error exit status (137)"
+    assert fatal.work_dir == "/moved/elsewhere/work/e1/f2a3b4c5d6"
+    assert diagnosis.errors == ["Pipeline failed [s1]"]
+
+    groups: list[FailureGroup] = group_failures(tasks=diagnosis.tasks)
+    assert [(group.process, group.exit_status, len(group.tasks)) for group in groups] == [
+        ("RNASEQ:STAR", "137", 3),
+        ("RNASEQ:QUALIMAP", "-", 1),
+    ]
+
+    # the work folder of a moved run is found from the task hash
+    work_folder: Path = tmp_path / "work"
+    (work_folder / "e1" / "f2a3b4c5d6").mkdir(parents=True)
+    (work_folder / "e1" / "f2a3b4c5d6" / ".command.err").write_text("".join(f"line {i}\n" for i in range(100)))
+    work_dir: Path | None = find_work_dir(task=fatal, work_folder=work_folder)
+    assert work_dir == work_folder / "e1" / "f2a3b4c5d6"
+    assert tail(file_path=work_dir / ".command.err", lines=2) == ["line 98", "line 99"]
+    assert find_work_dir(task=diagnosis.tasks[0], work_folder=work_folder) is None
+
+    log_file.write_text("")
+    assert scan_log(file_path=log_file) == Diagnosis(tasks=[], errors=[])
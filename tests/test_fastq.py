@@ -0,0 +1,78 @@
+"""Provide tests for the fastq module."""
+
+import gzip
+from pathlib import Path
+
+from nfch.fastq import check_pairs, inspect_fastq, inspect_fastqs, parse_header
+from nfch.samplesheet import FastqPair
+
+
+def _write_fastq(file_path: Path, reads: int, length: int, lane: int = 1, read: int = 1) -> None:
+    """Write a gzipped FASTQ file made of two gzip members (as bgzip does)."""
+    records: list[str] = [
+        f"@A00123:45:HXXXXDSXY:{lane}:1101:{number}:1000 {read}:N:0:ACGT+TTTT\n{'A' * length}\n+\n{'I' * length}\n"
+        for number in range(reads)
+    ]
+    half: int = reads // 2
+    file_path.write_bytes(
+        gzip.compress("".join(records[:half]).encode()) + gzip.compress("".join(records[half:]).encode())
+    )
+
+
+def test_parse_header() -> None:
+    """Test the Casava 1.8+ and the older header formats."""
+    header = parse_header(header="@A00123:45:HXXXXDSXY:2:1101:1000:1000 1:N:0:ACGTACGT+TGCATGCA")
+    assert (header.instrument, header.flowcell, header.lane, header.read) == ("A00123", "HXXXXDSXY", "2", "1")
+    assert header.index == "ACGTACGT+TGCATGCA"
+
+    header = parse_header(header="@HWUSI-EAS100R:6:73:941:1973#ACGT/2")
+    assert (header.instrument, header.lane, header.read, header.index) == ("HWUSI-EAS100R", "6", "2", "ACGT")
+
+
+def test_inspect(tmp_path: Path) -> None:
+    """Test the inspection of multi-member gzip files and the pair checks."""
+    _write_fastq(file_path=tmp_path / "s1_R1.fastq.gz", reads=20, length=100)
+    _write_fastq(file_path=tmp_path / "s1_R2.fastq.gz", reads=20, length=100, read=2)
+    _write_fastq(file_path=tmp_path / "s2_R1.fastq.gz", reads=20, length=150, lane=2)
+    _write_fastq(file_path=tmp_path / "s2_R2.fastq.gz", reads=20, length=150, lane=3, read=2)
+
+    summary = inspect_fastq(file_path=tmp_path / "s1_R1.fastq.gz", records=15)
+    expected_records: int = 15
+    assert summary.records == expected_records
+    assert summary.lanes == ("1",)
+    assert summary.index == "ACGT+TTTT"
+
+    pairs: list[FastqPair] = [
+        FastqPair(
+            sample=sample,
+            lane="",
+            fastq_1=tmp_path / f"{sample}_R1.fastq.gz",
+            fastq_2=tmp_path / f"{sample}_R2.fastq.gz",
+        )
+        for sample in ("s1", "s2", "s2")
+    ]
+    summaries = inspect_fastqs(file_paths=[path for pair in pairs for path in (pair.fastq_1, pair.fastq_2)], workers=2)
+    warnings, merged = check_pairs(pairs=pairs, summaries=summaries)
+
+    assert merged == ["s2"]
+    assert any("different flowcells/lanes" in warning for warning in warnings)
+    assert any("Mixed read lengths" in warning for warning in warnings)
+
+
+def test_inspect_corrupted(tmp_path: Path) -> None:
+    """Test that truncated and corrupted gzip files are reported instead of stopping the inspection."""
+    _write_fastq(file_path=tmp_path / "s1_R1.fastq.gz", reads=20, length=100)
+    content: bytes = (tmp_path / "s1_R1.fastq.gz").read_bytes()
+    (tmp_path / "s1_R2.fastq.gz").write_bytes(content[: len(content) // 4])
+    (tmp_path / "s2_R1.fastq.gz").write_bytes(content[:10] + b"\xff" * 100)
+
+    pairs: list[FastqPair] = [
+        FastqPair(sample="s1", lane="", fastq_1=tmp_path / "s1_R1.fastq.gz", fastq_2=tmp_path / "s1_R2.fastq.gz"),
+        FastqPair(sample="s2", lane="", fastq_1=tmp_path / "s2_R1.fastq.gz", fastq_2=None),
+    ]
+    summaries = inspect_fastqs(file_paths=[path for pair in pairs for path in (pair.fastq_1, pair.fastq_2) if path])
+    assert not summaries[tmp_path / "s1_R1.fastq.gz"].error
+    warnings, _ = check_pairs(pairs=pairs, summaries=summaries)
+
+    assert len(warnings) == 2  # noqa: PLR2004
+    assert all("could not be read" in warning for warning in warnings)
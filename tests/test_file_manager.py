@@ -0,0 +1,77 @@
+"""Provide tests for the FileManager class."""
+
+from pathlib import Path
+
+import pytest
+
+from nfch.file_manager import FileManager
+
+
+def _create_work_folder(wf_folder: Path, prefixes: int = 3, tasks: int = 4, files: int = 5) -> Path:
+    """Create a small Nextflow-like "run/work" folder with "xx/hash" task folders."""
+    work_folder: Path = wf_folder / "run" / "work"
+    for prefix in range(prefixes):
+        for task in range(tasks):
+            task_folder: Path = work_folder / f"{prefix:02x}" / f"{task:030x}"
+            (task_folder / "nested").mkdir(parents=True)
+            for file in range(files):
+                (task_folder / f"file_{file}.txt").write_text("x" * 10)
+            (task_folder / "link").symlink_to(task_folder / "file_0.txt")
+    (work_folder / "conda").mkdir()
+    (work_folder / "conda" / "env.yml").write_text("name: env")
+    return work_folder
+
+
+def test_iter_work_units(tmp_path: Path) -> None:
+    """Test that task folders are yielded individually and other top-level entries as a whole."""
+    work_folder: Path = _create_work_folder(wf_folder=tmp_path)
+
+    units: list[Path] = list(FileManager.iter_work_units(work_folder=work_folder))
+
+    assert len(units) == 3 * 4 + 1
+    assert work_folder / "conda" in units
+
+
+def test_clean(tmp_path: Path) -> None:
+    """Test that the whole work folder is removed and nothing outside of it."""
+    work_folder: Path = _create_work_folder(wf_folder=tmp_path)
+    (tmp_path / "output").mkdir()
+
+    FileManager.clean(wf_folder=tmp_path, workers=4)
+
+    assert not work_folder.exists()
+    assert (tmp_path / "output").is_dir()
+
+
+def test_delete_folders_counts(tmp_path: Path) -> None:
+    """Test the counters of the deletion engine, symlinks are removed but not followed."""
+    work_folder: Path = _create_work_folder(wf_folder=tmp_path, prefixes=1, tasks=2, files=3)
+
+    progress = FileManager.delete_folders(folders=FileManager.iter_work_units(work_folder=work_folder), workers=2)
+
+    expected_folders: int = 2 + 1  # two task folders and "conda"
+    assert progress.folders == expected_folders
+    assert progress.files == 2 * (3 + 1) + 1
+    assert not progress.interrupted
+    assert not progress.errors
+
+
+def test_delete_folders_symlinks(tmp_path: Path) -> None:
+    """Test that a top-level symlink to a folder outside the work folder is removed without touching its target."""
+    work_folder: Path = _create_work_folder(wf_folder=tmp_path / "project", prefixes=1, tasks=1, files=1)
+    cache: Path = tmp_path / "shared_cache"
+    cache.mkdir()
+    (cache / "image.sif").write_text("image")
+    (work_folder / "singularity").symlink_to(cache, target_is_directory=True)
+    (work_folder / "00" / f"{1:030x}").symlink_to(cache, target_is_directory=True)
+
+    FileManager.clean(wf_folder=tmp_path / "project", workers=2)
+
+    assert not work_folder.exists()
+    assert (cache / "image.sif").read_text() == "image"
+
+
+def test_clean_missing_folder(tmp_path: Path) -> None:
+    """Test that a missing work folder exits."""
+    with pytest.raises(SystemExit):
+        FileManager.clean(wf_folder=tmp_path)
@@ -0,0 +1,53 @@
+"""Provide tests for the GeneSetIndex class."""
+
+import errno
+import os
+from pathlib import Path
+
+from nfch.contrasts import read_matrix_genes
+from nfch.gene_sets import GeneSet, GeneSetIndex, write_gmt
+
+
+def test_trim(tmp_path: Path) -> None:
+    """Test that a GMT file is indexed once and trimmed to the genes of a count matrix and to a size window."""
+    gmt_file: Path = tmp_path / "h.all.v2024.1.Hs.symbols.gmt"
+    gmt_file.write_text(
+        "HALLMARK_A\thttp://a\tTP53\tMYC\tGAPDH\tTP53\n"
+        "HALLMARK_B\thttp://b\tMYC\tABSENT\n"
+        "HALLMARK_C\thttp://c\tTP53\tMYC\tGAPDH\tACTB\n",
+    )
+    matrix: Path = tmp_path / "salmon.merged.gene_counts_length_scaled.tsv"
+    matrix.write_text("gene_id\tgene_name\tA1\nENSG1\tTP53\t1\nENSG2\tMYC\t2\nENSG3\tGAPDH\t3\n")
+    universe: set[str] = read_matrix_genes(file_path=matrix)
+    assert universe == {"ENSG1", "ENSG2", "ENSG3", "TP53", "MYC", "GAPDH"}
+
+    parsed: GeneSetIndex = GeneSetIndex.load(file_path=gmt_file)
+    cached: GeneSetIndex = GeneSetIndex.load(file_path=gmt_file)
+    assert GeneSetIndex.cache_folder(file_path=gmt_file).joinpath("metadata.json").is_file()
+    assert (cached.genes, cached.offsets.tolist()) == (parsed.genes, parsed.offsets.tolist())
+    assert cached.genes == ["TP53", "MYC", "GAPDH", "ABSENT", "ACTB"]
+    assert list(cached.trim(universe=universe, min_size=2, max_size=3)) == [
+        GeneSet(name="HALLMARK_A", description="http://a", genes=["TP53", "MYC", "GAPDH"]),
+        GeneSet(name="HALLMARK_C", description="http://c", genes=["TP53", "MYC", "GAPDH"]),
+    ]
+
+    trimmed: Path = tmp_path / "trimmed.gmt"
+    assert write_gmt(gene_sets=cached.trim(universe=universe, min_size=1, max_size=1), file_path=trimmed) == 1
+    assert trimmed.read_text() == "HALLMARK_B\thttp://b\tMYC\n"
+
+    # a changed file is parsed again
+    gmt_file.write_text("HALLMARK_D\thttp://d\tACTB\n")
+    os.utime(gmt_file, ns=(0, 0))
+    assert GeneSetIndex.load(file_path=gmt_file).names == ["HALLMARK_D"]
+
+
+def test_read_only_cache(tmp_path: Path, monkeypatch) -> None:  # noqa: ANN001
+    """Test that a cache which cannot be written, e.g. on a read-only mount, only means parsing again."""
+    gmt_file: Path = tmp_path / "h.all.v2024.1.Hs.symbols.gmt"
+    gmt_file.write_text("HALLMARK_A\thttp://a\tTP53\tMYC\n")
+
+    def _read_only(*_: object, **__: object) -> None:
+        raise OSError(errno.EROFS, "Read-only file system")
+
+    monkeypatch.setattr(GeneSetIndex, "save", _read_only)
+    assert GeneSetIndex.load(file_path=gmt_file).names == ["HALLMARK_A"]
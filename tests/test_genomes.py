@@ -0,0 +1,54 @@
+"""Provide tests for the GenomePathValidator class."""
+
+import time
+from pathlib import Path
+
+from nfch import utils
+from nfch.genomes import GenomePathValidator
+
+
+def _create_index(path: Path) -> None:
+    """Create an nfcore/rnaseq-like index folder."""
+    for index, files in {"star": ["Genome", "SA", "SAindex", "chrName.txt"], "salmon": ["versionInfo.json"]}.items():
+        (path / "index" / index).mkdir(parents=True)
+        for file in files:
+            (path / "index" / index / file).write_text("")
+    (path / "genes.bed").write_text("")
+
+
+def test_validate(tmp_path: Path) -> None:
+    """Test that invalid paths are reported and deep checks are cached."""
+    (tmp_path / "genome.fa").write_text(">chr1\nACGT\n")
+    _create_index(path=tmp_path / "build")
+    genomes: dict[str, dict[str, str]] = {
+        "build": {"fasta": str(tmp_path / "genome.fa"), "gtf": "", "nfcore_rnaseq_index": str(tmp_path / "build")},
+    }
+    cache_file: Path = tmp_path / "cache.json"
+
+    assert GenomePathValidator(cache_file=cache_file).validate(genomes=genomes)
+    # salmon index incomplete
+    assert not GenomePathValidator(cache_file=cache_file).validate(genomes=genomes, deep=True)
+
+    for file in ["pos.bin", "seq.bin"]:
+        (tmp_path / "build" / "index" / "salmon" / file).write_text("")
+    assert GenomePathValidator(cache_file=cache_file).validate(genomes=genomes, deep=True)
+    assert utils.json_to_dict(file_path=cache_file)[str(tmp_path / "build")]["deep_checked"]
+
+    genomes["build"]["gtf"] = str(tmp_path / "missing.gtf")
+    assert not GenomePathValidator(cache_file=cache_file).validate(genomes=genomes)
+
+
+def test_map_with_timeout() -> None:
+    """Test that a hanging call times out without delaying the others."""
+
+    def _func(item: int) -> int:
+        if item == 0:
+            time.sleep(5)
+        return item * 2
+
+    start: float = time.monotonic()
+    results = utils.map_with_timeout(func=_func, items=range(4), timeout=0.2, max_workers=2)
+
+    assert time.monotonic() - start < 1
+    assert isinstance(results[0], TimeoutError)
+    assert [results[item] for item in range(1, 4)] == [2, 4, 6]
@@ -0,0 +1,95 @@
+"""Provide tests for the launcher of Nextflow runs."""
+
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+from nfch import launcher, state
+from nfch.diffabun import launch as launch_command
+from nfch.workflow import DiffAbun
+
+
+def test_launch(tmp_path: Path) -> None:
+    """Test that a run waits for a free slot, is started with the prepared command and is recorded."""
+    run_folder: Path = tmp_path / "nfcore_rnaseq" / "run"
+    run_folder.mkdir(parents=True)
+    (run_folder / launcher.COMMAND_FILE).write_text(
+        "\nnohup nextflow run nf-core/rnaseq \\\n    -revision 3.18.0 \\\n    -profile docker \\\n"
+        "    -resume \\\n    -params-file nf_params.json \\\n> nohup_nextflow.out \\\n2> nohup_nextflow.err\n",
+    )
+    backend: launcher.FakeBackend = launcher.FakeBackend(exit_status=1, duration=0.2)
+    queue: launcher.RunQueue = launcher.RunQueue(slots=1, folder=tmp_path / "queue")
+    run_launcher: launcher.Launcher = launcher.Launcher(
+        wf_folder=tmp_path / "nfcore_rnaseq",
+        backend=backend,
+        queue=queue,
+        settings_folder=tmp_path,
+    )
+
+    exit_statuses: list[int] = []
+    with queue.slot() as slot:
+        thread: threading.Thread = threading.Thread(
+            target=lambda: exit_statuses.append(run_launcher.run(interval=0.05))
+        )
+        thread.start()
+        thread.join(timeout=0.3)
+        # the only slot is taken, the run is queued
+        assert (slot.number, backend.jobs, run_launcher.launches()[-1]["status"]) == (0, {}, "queued")
+    thread.join()
+
+    assert exit_statuses == [1]
+    assert backend.jobs[1][0] == [
+        "nextflow",
+        "run",
+        "nf-core/rnaseq",
+        "-revision",
+        "3.18.0",
+        "-profile",
+        "docker",
+        "-resume",
+        "-params-file",
+        "nf_params.json",
+    ]
+    record: dict = state.read_json(file_path=run_launcher.record_file)["launches"][-1]
+    assert (record["status"], record["exit_status"], record["pid"]) == ("failed", 1, 1)
+    assert record["duration_seconds"] >= backend.duration
+    assert run_launcher.active() is None
+
+
+def test_launch_validates_inputs(tmp_path: Path, monkeypatch) -> None:  # noqa: ANN001
+    """Test that a nfcore/differentialabundance run with inconsistent inputs is not queued."""
+    monkeypatch.chdir(tmp_path)
+    run_folder: Path = DiffAbun.wf_folder / "run"
+    run_folder.mkdir(parents=True)
+    (run_folder / launcher.COMMAND_FILE).write_text("nextflow run nf-core/differentialabundance\n")
+    state.write_json(
+        dictionary={"input": "samplesheet.csv", "contrasts": "contrasts.csv", "matrix": "matrix.tsv"},
+        file_path=run_folder / "nf_params.json",
+    )
+
+    result = CliRunner().invoke(launch_command.app, ["--no-detach"])
+    assert result.exit_code == 1
+    assert "could not be found" in result.output
+    assert not list(Path(".nfch").glob("launch_*"))
+
+
+def test_slot_held_by_head_job(tmp_path: Path) -> None:
+    """Test that the slot of a head job stays taken once its launcher released it, until the head job exits."""
+    fcntl = pytest.importorskip("fcntl")
+    queue: launcher.RunQueue = launcher.RunQueue(slots=1, folder=tmp_path / "queue")
+    backend: launcher.LocalBackend = launcher.LocalBackend()
+    with queue.slot() as slot:
+        job_id: int = backend.start(
+            command=[sys.executable, "-c", "import time; time.sleep(60)"],
+            run_folder=tmp_path,
+            pass_fds=(slot.fd,),
+        )
+    with (tmp_path / "queue" / "slot_0.lock").open(mode="a") as lock_file:
+        with pytest.raises(BlockingIOError):
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        backend.processes[job_id].kill()
+        backend.processes[job_id].wait()
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
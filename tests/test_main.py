@@ -0,0 +1,61 @@
+"""Provide tests for the lazily loaded command line interface."""
+
+import subprocess
+import sys
+
+from typer.testing import CliRunner
+
+from nfch.cli import LazyGroup
+from nfch.main import COMMANDS, app
+
+# seconds, generous as the import of typer alone takes ~0.1s
+IMPORT_BUDGET: float = 1.0
+
+
+def test_registry_matches_commands() -> None:
+    """Test that every registered command can be loaded and that its short help matches the registry."""
+    root: LazyGroup = LazyGroup(name="nfch", registry=COMMANDS)
+    for group_name, group_entry in root.registry.items():
+        group = root.get_command(ctx=None, cmd_name=group_name)
+        assert group is not None
+        if not isinstance(group, LazyGroup):
+            # a top-level command rather than a group of commands
+            assert group.get_short_help_str(limit=1000) == group_entry.help, group_entry.module
+            continue
+        for name, entry in group.registry.items():
+            command = group.get_command(ctx=None, cmd_name=name)
+            assert command is not None
+            assert command.name == name
+            assert command.get_short_help_str(limit=1000) == entry.help, f"{group_entry.module}: {name}"
+
+
+def test_startup_is_lazy() -> None:
+    """Test that the sub-commands are not imported for the help and that the import of the CLI stays fast."""
+    code: str = """
+import sys, time
+start = time.perf_counter()
+from nfch.main import COMMANDS, app
+elapsed = time.perf_counter() - start
+from typer.testing import CliRunner
+CliRunner().invoke(app, ["rnaseq", "--help"])
+print(elapsed)
+print(" ".join(sorted(module for module in sys.modules if module.startswith("nfch"))))
+"""
+    result: subprocess.CompletedProcess[str] = subprocess.run(  # noqa: S603
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    elapsed, modules = result.stdout.splitlines()
+    assert float(elapsed) < IMPORT_BUDGET
+    assert modules.split() == ["nfch", "nfch.cli", "nfch.main", "nfch.rnaseq"]
+
+
+def test_help() -> None:
+    """Test that the commands are listed and run."""
+    result = CliRunner().invoke(app, ["rnaseq", "--help"])
+    assert result.exit_code == 0
+    assert "samplesheet" in result.output
+    result = CliRunner().invoke(app, ["project", "prerequisites"])
+    assert result.exit_code == 0
@@ -0,0 +1,63 @@
+"""Provide tests for the RunMonitor class."""
+
+from pathlib import Path
+
+from nfch.monitor import RUNNING, IncrementalReader, RunMonitor
+
+HEADER: str = "task_id\thash\tnative_id\tname\tstatus\texit\n"
+
+
+def test_poll(tmp_path: Path) -> None:
+    """Test that the log and the trace are followed incrementally, across instances, until a new run starts."""
+    wf_folder: Path = tmp_path / "nfcore_rnaseq"
+    (wf_folder / "run").mkdir(parents=True)
+    (wf_folder / "output" / "pipeline_info").mkdir(parents=True)
+    log: Path = wf_folder / "run" / "nohup_nextflow.out"
+    trace_file: Path = wf_folder / "output" / "pipeline_info" / "execution_trace_2025-01-01_10-00-00.txt"
+    state_file: Path = tmp_path / "status.json"
+    log.write_text(
+        "N E X T F L O W  ~  version 24.10.0\n"
+        "[aa/111111] Cached process > RNASEQ:FASTQC (s1)\n"
+        "[bb/222222] Submitted process > RNASEQ:STAR (s1)\n"
+        "[cc/333333] Submitted process > RNASEQ:STAR (s2)\n"
+        "[dd/444444] Submitted process > RNASEQ:STAR (s3",  # partial line
+    )
+    trace_file.write_text(HEADER + "1\taa/111111\t-\tRNASEQ:FASTQC (s1)\tCACHED\t0\n")
+
+    monitor: RunMonitor = RunMonitor(wf_folder=wf_folder, state_file=state_file)
+    monitor.poll()
+    assert (monitor.counts["RNASEQ:STAR"][RUNNING], monitor.counts["RNASEQ:FASTQC"]["CACHED"]) == (2, 1)
+    monitor.save()
+
+    with log.open(mode="a") as log_file:
+        log_file.write(")\nERROR ~ Error executing process > 'RNASEQ:STAR (s2)'\n")
+    with trace_file.open(mode="a") as trace_handle:
+        trace_handle.write(
+            "2\tbb/222222\t-\tRNASEQ:STAR (s1)\tCOMPLETED\t0\n3\tcc/333333\t-\tRNASEQ:STAR (s2)\tFAILED\t1\n"
+        )
+
+    monitor = RunMonitor(wf_folder=wf_folder, state_file=state_file)
+    assert monitor.log_reader.offset > 0
+    monitor.poll()
+    star = monitor.counts["RNASEQ:STAR"]
+    assert (star["COMPLETED"], star["FAILED"], star[RUNNING]) == (1, 1, 1)
+    assert monitor.last_error.startswith("Error executing process")
+    assert monitor.throughput() is not None
+
+    # a new run (-resume) has a new trace file and overwrites the log
+    log.write_text("[aa/111111] Cached process > RNASEQ:FASTQC (s1)\n")
+    (trace_file.parent / "execution_trace_2025-01-02_10-00-00.txt").write_text(HEADER)
+    monitor.poll()
+    # 3 tasks in the previous run
+    assert (monitor.expected, len(monitor.tasks)) == (3, 1)
+    assert monitor.last_error == ""
+
+
+def test_chunks(tmp_path: Path) -> None:
+    """Test that lines are read in bounded chunks, a line longer than a chunk being read whole."""
+    log: Path = tmp_path / "nohup_nextflow.out"
+    log.write_text("one\ntwo\n" + "x" * 20 + "\npartial")
+    reader: IncrementalReader = IncrementalReader(file_path=log)
+    assert reader.read_lines(chunk_bytes=5) == (["one"], True)
+    assert list(reader.iter_chunks(chunk_bytes=5)) == [(["two"], False), (["x" * 20], False)]
+    assert reader.offset == len("one\ntwo\n") + 21
@@ -0,0 +1,59 @@
+"""Provide tests for the harvester of MultiQC general statistics."""
+
+import json
+import os
+from pathlib import Path
+
+from nfch import multiqc
+
+
+def test_harvest(tmp_path: Path) -> None:
+    """Test that the general statistics are read in small chunks, skipping tricky values, and harvested once."""
+    data_folder: Path = tmp_path / "project" / "nfcore_rnaseq" / "output" / "multiqc" / "star_salmon" / "multiqc_data"
+    data_folder.mkdir(parents=True)
+    data_file: Path = data_folder / "multiqc_data.json"
+    report: dict = {
+        "config_title": 'a "quoted" {title} [with] \\ brackets',
+        "report_plot_data": {"plot": [{"x": [1, 2.5e3, None, True], "name": '}]\\"{['}] * 50},
+        "report_general_stats_data": [
+            {"s1": {"uniquely_mapped_percent": 91.5, "total_reads": 10}, "s2": {"uniquely_mapped_percent": 88.5}},
+            {"s1": {"percent_assigned": 70, "status": "pass"}},
+        ],
+        "report_general_stats_headers": [{"uniquely_mapped_percent": {"namespace": "STAR"}}, {}],
+        "report_saved_raw_data": {"multiqc_star": {"s1": {"x": "}"}}},
+        "config_version": 1.25,
+    }
+    data_file.write_text(json.dumps(report, indent=1))
+
+    assert multiqc.read_general_stats(file_path=data_file, chunk_size=7) == [
+        multiqc.Metric(sample="s1", module="STAR", metric="uniquely_mapped_percent", value=91.5),
+        multiqc.Metric(sample="s1", module="0", metric="total_reads", value=10.0),
+        multiqc.Metric(sample="s2", module="STAR", metric="uniquely_mapped_percent", value=88.5),
+        multiqc.Metric(sample="s1", module="1", metric="percent_assigned", value=70.0),
+    ]
+
+    files: list[Path] = multiqc.find_multiqc_files(paths=[tmp_path / "project"])
+    database_file: Path = tmp_path / "qc.sqlite"
+    assert files == [data_file]
+    assert multiqc.harvest(files=files, database_file=database_file) == (1, 0, 4)
+    assert multiqc.harvest(files=files, database_file=database_file) == (0, 1, 0)
+
+    # a rerun of the project replaces its metrics, recent MultiQC versions key the statistics by module
+    report["report_general_stats_data"] = {"star": {"s3": {"uniquely_mapped_percent": 80.0}}}
+    report["report_general_stats_headers"] = {"star": {"uniquely_mapped_percent": {"namespace": "STAR"}}}
+    data_file.write_text(json.dumps(report))
+    os.utime(data_file, ns=(0, 0))
+    assert multiqc.harvest(files=files, database_file=database_file) == (1, 0, 1)
+    assert multiqc.project_summary(database_file=database_file) == [
+        (str(tmp_path / "project"), 1, 80.0, None, None, None),
+    ]
+
+
+def test_missing_headers(tmp_path: Path) -> None:
+    """Test that statistics keyed by module are read when the headers are missing or empty."""
+    data_file: Path = tmp_path / "multiqc_data.json"
+    for headers in ({"report_general_stats_headers": []}, {}):
+        data_file.write_text(json.dumps({"report_general_stats_data": {"star": {"s1": {"reads": 5}}}, **headers}))
+        assert multiqc.read_general_stats(file_path=data_file) == [
+            multiqc.Metric(sample="s1", module="star", metric="reads", value=5.0),
+        ]
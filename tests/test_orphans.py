@@ -0,0 +1,86 @@
+"""Provide tests for the Sweep class and the "nfch sweep" command."""
+
+import json
+import os
+from pathlib import Path
+
+from typer.testing import CliRunner
+
+from nfch.orphans import Sweep, WorkFolder
+from nfch.sweep import app
+
+
+def make_project(folder: Path, workflow: str, tasks: dict[str, int]) -> Path:
+    """Create a project whose workflow has a work folder holding tasks of a number of bytes."""
+    (folder / ".nfch").mkdir(parents=True)
+    work_folder: Path = folder / workflow / "run" / "work"
+    for task, num_bytes in tasks.items():
+        task_folder: Path = work_folder / task[:2] / task[2:]
+        task_folder.mkdir(parents=True)
+        (task_folder / "output.bam").write_bytes(b"x" * num_bytes)
+    (work_folder.parent / ".nextflow.log").write_text("log")
+    return work_folder
+
+
+def test_sweep(tmp_path: Path) -> None:
+    """Test that projects are found, that their work folders are measured once and that changes are picked up."""
+    root: Path = tmp_path / "projects"
+    state_file: Path = tmp_path / "sweep.json"
+    first: Path = make_project(folder=root / "lab_a" / "P1", workflow="nfcore_rnaseq", tasks={"ab1234": 10_000})
+    second: Path = make_project(folder=root / "lab_b" / "P2", workflow="nfcore_rnaseq", tasks={"cd5678": 100})
+    # hard links (e.g. files published by "link") are counted once
+    os.link(second / "cd" / "5678" / "output.bam", second / "cd" / "5678" / "copy.bam")
+    # the folders of a project are not crawled further
+    make_project(folder=root / "lab_a" / "P1" / "nested", workflow="nfcore_rnaseq", tasks={"ef9012": 1})
+    (root / "lab_b" / "P2" / ".nfch" / "launch_nfcore_rnaseq.json").write_text(
+        json.dumps({"launches": [{"status": "running"}]}),
+    )
+
+    crawl: Sweep = Sweep(root=root, state_file=state_file)
+    assert crawl.run(workers=2) == []
+    results: list[WorkFolder] = crawl.results()
+    assert [(result.project.name, result.files, result.active) for result in results] == [
+        ("P1", 1, False),
+        ("P2", 1, True),
+    ]
+    assert results[0].path == first.absolute()
+    assert results[0].bytes >= results[1].bytes
+    assert (crawl.listed, crawl.measured) == (5, 2)
+
+    # nothing changed: nothing listed or measured again
+    crawl = Sweep(root=root, state_file=state_file)
+    crawl.run(workers=2)
+    assert (crawl.listed, crawl.measured, len(crawl.results())) == (0, 0, 2)
+
+    # a new task only leads to its work folder being measured again
+    (first / "ff" / "0000").mkdir(parents=True)
+    (first / "ff" / "0000" / "output.bam").write_bytes(b"x")
+    crawl = Sweep(root=root, state_file=state_file)
+    crawl.run(workers=2)
+    assert (crawl.listed, crawl.measured) == (0, 1)
+    assert next(result.files for result in crawl.results() if result.project.name == "P1") == 2  # noqa: PLR2004
+
+
+def test_delete(tmp_path: Path) -> None:
+    """Test that expired work folders are removed, except those of running launches, and not the caches they link."""
+    root: Path = tmp_path / "projects"
+    old: Path = make_project(folder=root / "P1", workflow="nfcore_rnaseq", tasks={"ab1234": 10})
+    running: Path = make_project(folder=root / "P2", workflow="nfcore_rnaseq", tasks={"cd5678": 10})
+    recent: Path = make_project(folder=root / "P3", workflow="nfcore_rnaseq", tasks={"ef9012": 10})
+    (root / "P2" / ".nfch" / "launch_nfcore_rnaseq.json").write_text(json.dumps({"launches": [{"status": "queued"}]}))
+    # a shared cache linked from a work folder is not followed by the deletion
+    cache: Path = tmp_path / "cache"
+    cache.mkdir()
+    (cache / "image.sif").write_text("image")
+    (old / "singularity").symlink_to(cache, target_is_directory=True)
+    for work_folder in (old, running):
+        for path in (*work_folder.iterdir(), work_folder, work_folder.parent / ".nextflow.log"):
+            os.utime(path, (0, 0))
+
+    arguments: list[str] = [str(root), "--state", str(tmp_path / "sweep.json"), "--older-than", "30"]
+    result = CliRunner().invoke(app, [*arguments, "--delete"])
+    assert result.exit_code == 0, result.output
+    assert not old.exists()
+    assert (cache / "image.sif").read_text() == "image"
+    assert running.is_dir()
+    assert recent.is_dir()
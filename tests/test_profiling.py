@@ -0,0 +1,45 @@
+"""Provide tests for the timed spans of "nfch --profile"."""
+
+import json
+from pathlib import Path
+
+from rich.console import Console
+
+from nfch import profiling
+
+
+@profiling.traced
+def _read(file_path: Path) -> str:
+    """Read a file within a traced function."""
+    with profiling.span("read", path=file_path):
+        return file_path.read_text()
+
+
+def test_spans(tmp_path: Path) -> None:
+    """Test that nothing is recorded while disabled, and that nested spans are merged by name and exported."""
+    file_path: Path = tmp_path / "file.txt"
+    file_path.write_text("x")
+    assert profiling.span("read") is profiling.NULL_SPAN
+    _read(file_path=file_path)
+    assert profiling.roots() == []
+
+    profiling.enable()
+    try:
+        with profiling.span("command"):
+            for _ in range(3):
+                _read(file_path=file_path)
+    finally:
+        profiling.disable()
+
+    (command,) = profiling.roots()
+    assert [child.name for child in command.children] == ["_read"] * 3
+    assert command.duration_ns >= sum(child.duration_ns for child in command.children)
+    console: Console = Console(width=200, record=True)
+    console.print(profiling.render(min_ms=0))
+    assert "_read x3" in console.export_text()
+
+    trace_file: Path = tmp_path / "trace.json"
+    profiling.write_chrome_trace(file_path=trace_file)
+    events: list[dict] = json.loads(trace_file.read_text())["traceEvents"]
+    assert sorted(event["name"] for event in events if event["ph"] == "X") == ["_read"] * 3 + ["command"] + ["read"] * 3
+    assert {event["args"].get("path") for event in events if event["name"] == "read"} == {str(file_path)}
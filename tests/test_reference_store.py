@@ -0,0 +1,41 @@
+"""Provide tests for the ReferenceStore class."""
+
+import shutil
+from pathlib import Path
+
+import pytest
+
+from nfch.reference_store import MANIFEST_FILE, ReferenceStore
+
+
+def test_register_and_lookup(tmp_path: Path) -> None:
+    """Test that registered indexes are hard-linked and found again from the same or identical files."""
+    genome_folder: Path = tmp_path / "output" / "genome"
+    for index, files in {"star": ["Genome", "SA", "SAindex", "chrName.txt"], "salmon": ["versionInfo.json"]}.items():
+        (genome_folder / "index" / index).mkdir(parents=True)
+        for file in files:
+            (genome_folder / "index" / index / file).write_text(file)
+    (genome_folder / "genes.bed").write_text("chr1\t0\t10\n")
+    fasta: Path = tmp_path / "genome.fa"
+    fasta.write_text(">chr1\nACGT\n")
+    gtf: Path = tmp_path / "genes.gtf"
+    gtf.write_text("chr1\tsource\tgene\t1\t4\n")
+    store: ReferenceStore = ReferenceStore(root=tmp_path / "store")
+    store.root.mkdir()
+
+    with pytest.raises(ValueError, match="salmon"):
+        store.register(genome_folder=genome_folder, fasta=fasta, gtf=gtf, revision="3.18.0")
+    for file in ["pos.bin", "seq.bin"]:
+        (genome_folder / "index" / "salmon" / file).write_text(file)
+    stored: Path = store.register(genome_folder=genome_folder, fasta=fasta, gtf=gtf, revision="3.18.0")
+
+    assert (stored / "index" / "star" / "SA").samefile(genome_folder / "index" / "star" / "SA")
+    assert (stored / MANIFEST_FILE).is_file()
+    assert not list(store.root.glob(pattern=".*.partial"))
+
+    store = ReferenceStore(root=tmp_path / "store")
+    assert store.lookup(fasta=fasta, gtf=gtf, revision="3.18.0") == stored
+    assert store.lookup(fasta=fasta, gtf=gtf, revision="3.19.0") is None
+    # same content elsewhere
+    shutil.copy(src=fasta, dst=tmp_path / "copy.fa")
+    assert store.lookup(fasta=tmp_path / "copy.fa", gtf=gtf, revision="3.18.0") == stored
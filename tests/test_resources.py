@@ -0,0 +1,49 @@
+"""Provide tests for the resources module."""
+
+from pathlib import Path
+
+from nfch import resources
+
+HEADER: str = "task_id\thash\tname\tstatus\tpeak_rss\t%cpu\trealtime\trchar\n"
+
+
+def test_parse() -> None:
+    """Test the parsing of the human readable values of traces."""
+    assert resources.parse_memory(text="1.5 GB") == 1.5 * 1024**3
+    assert resources.parse_memory(text="-") is None
+    assert (resources.parse_duration(text="1h 2m 3.5s"), resources.parse_duration(text="450ms")) == (3723.5, 0.45)
+    assert (resources.parse_percent(text="250.0%"), resources.parse_percent(text="-")) == (250.0, None)
+
+
+def test_tune(tmp_path: Path) -> None:
+    """Test that traces of several projects are combined into a config."""
+    for project, memory in [("p1", "10 GB"), ("p2", "20 GB")]:
+        pipeline_info: Path = tmp_path / project / "nfcore_rnaseq" / "output" / "pipeline_info"
+        pipeline_info.mkdir(parents=True)
+        rows: list[str] = [
+            f"{task}\taa/{task:06d}\tNFCORE_RNASEQ:RNASEQ:ALIGN_STAR:STAR_ALIGN (s{task})\tCOMPLETED\t{memory}\t"
+            f"790.5%\t1h 30m\t5 GB\n"
+            for task in range(3)
+        ]
+        rows.append("9\tbb/999999\tNFCORE_RNASEQ:RNASEQ:FASTQC (s1)\tFAILED\t-\t-\t-\t-\n")
+        (pipeline_info / "execution_trace_2025-01-01_10-00-00.txt").write_text(HEADER + "".join(rows))
+
+    trace_files: list[Path] = resources.find_trace_files(paths=[tmp_path / "p1", tmp_path / "p2"])
+    assert len(trace_files) == len(["p1", "p2"])
+    columns = resources.aggregate(trace_files=trace_files, workers=2)
+    assert list(columns) == ["STAR_ALIGN"]
+
+    recommendations = resources.recommend(columns=columns, q=100, headroom=1.2)
+    assert recommendations == [
+        resources.ProcessResources(
+            process="STAR_ALIGN",
+            tasks=6,
+            cpus=8,
+            memory_gb=24,
+            time_minutes=108,
+            memory_per_input_gb=3.0,
+        ),
+    ]
+    config: Path = tmp_path / "custom.config"
+    resources.write_config(recommendations=recommendations, file_path=config, trace_files=len(trace_files))
+    assert "withName: 'STAR_ALIGN' {\n        cpus = 8\n        memory = { 24.GB * task.attempt }" in config.read_text()
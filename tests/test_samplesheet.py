@@ -0,0 +1,40 @@
+"""Provide tests for the samplesheet module."""
+
+from pathlib import Path
+
+from nfch.samplesheet import find_fastqs, pair_fastqs, write_samplesheet
+
+
+def test_find_and_pair(tmp_path: Path) -> None:
+    """Test R1/R2 pairing across lanes and sequencing runs."""
+    names: dict[str, list[str]] = {
+        "run1": ["Ctrl_1_S1_L001_R1_001.fastq.gz", "Ctrl_1_S1_L001_R2_001.fastq.gz", "Ctrl_1_S1_L002_R1_001.fastq.gz"],
+        "run1/nested": ["Treat 2_R1.fq.gz", "Treat 2_R2.fq.gz", "notes.txt"],
+        "run2": ["Ctrl_1_S1_L001_R1_001.fastq.gz", "Ctrl_1_S1_L001_R2_001.fastq.gz", "orphan_R2.fastq.gz"],
+    }
+    for folder, files in names.items():
+        (tmp_path / folder).mkdir(parents=True, exist_ok=True)
+        for file in files:
+            (tmp_path / folder / file).write_text("")
+
+    fastqs: list[Path] = find_fastqs(fastq_dirs=[tmp_path / "run1", tmp_path / "run2"], workers=2)
+    pairs, problems = pair_fastqs(fastqs=fastqs)
+
+    expected_fastqs: int = 8
+    assert len(fastqs) == expected_fastqs
+    assert [(pair.sample, pair.lane, pair.fastq_2 is not None) for pair in pairs] == [
+        ("Ctrl_1", "001", True),
+        ("Ctrl_1", "001", True),
+        ("Treat_2", "", True),
+    ]
+    assert len(problems) == 2  # noqa: PLR2004
+    assert "orphan_R2" in problems[0]
+    # a lane with only R1 of a paired-end sample is reported and left out
+    assert "Ctrl_1_S1_L002_R1_001" in problems[1]
+    assert 'sample "Ctrl_1" is paired-end' in problems[1]
+
+    samplesheet: Path = tmp_path / "samplesheet.csv"
+    write_samplesheet(pairs=pairs, file_path=samplesheet)
+    lines: list[str] = samplesheet.read_text().splitlines()
+    assert lines[0] == "sample,fastq_1,fastq_2,strandedness"
+    assert lines[-1].endswith(",auto")
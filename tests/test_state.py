@@ -0,0 +1,49 @@
+"""Provide tests for the project state layer."""
+
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from nfch import state
+
+MODE: int = 0o640
+
+
+def increment(file_path: Path) -> None:
+    """Increment the counter of a json file 20 times."""
+    for _ in range(20):
+        with state.update_json(file_path=file_path) as data:
+            data["counter"] += 1
+
+
+def test_read_write(tmp_path: Path) -> None:
+    """Test that reads are cached until the file changes and that writes leave no temporary file behind."""
+    file_path: Path = tmp_path / "settings.json"
+    file_path.write_text(json.dumps({"email": "a@b.c"}))
+    file_path.chmod(MODE)
+
+    data: dict = state.read_json(file_path=file_path)
+    data["email"] = "modified"
+    assert state.read_json(file_path=file_path) == {"email": "a@b.c"}
+    file_path.write_text(json.dumps({"email": "d@e.f", "project": "x"}))
+    os.utime(file_path, ns=(0, 0))
+    assert state.read_json(file_path=file_path) == {"email": "d@e.f", "project": "x"}
+
+    state.write_json(dictionary={"email": "g@h.i"}, file_path=file_path)
+    assert json.loads(file_path.read_text()) == {"email": "g@h.i"}
+    assert file_path.stat().st_mode & 0o777 == MODE
+    assert sorted(path.name for path in tmp_path.iterdir()) == [".settings.json.lock", "settings.json"]
+
+    project: state.ProjectState = state.ProjectState(settings_folder=tmp_path)
+    project.update_settings(settings={"reference_store": "/store"})
+    assert project.settings == {"email": "g@h.i", "reference_store": "/store"}
+
+
+def test_concurrent_updates(tmp_path: Path) -> None:
+    """Test that updates from concurrent processes are not lost."""
+    file_path: Path = tmp_path / "counter.json"
+    state.write_json(dictionary={"counter": 0}, file_path=file_path)
+    with ProcessPoolExecutor(max_workers=4) as executor:
+        list(executor.map(increment, [file_path] * 4))
+    assert state.read_json(file_path=file_path) == {"counter": 80}
@@ -0,0 +1,103 @@
+"""Provide tests for the trace module."""
+
+import os
+from pathlib import Path
+
+import pytest
+
+from nfch import trace
+from nfch.file_manager import CleanMode, FileManager
+
+HEADER: str = "task_id\thash\tnative_id\tname\tstatus\texit\n"
+
+
+def _write_trace(output_folder: Path, timestamp: str, rows: list[tuple[str, str, str]]) -> Path:
+    """Write an execution trace file with (hash, name, status) rows."""
+    pipeline_info: Path = output_folder / "pipeline_info"
+    pipeline_info.mkdir(parents=True, exist_ok=True)
+    trace_file: Path = pipeline_info / f"execution_trace_{timestamp}.txt"
+    lines: list[str] = [
+        f"{task_id}\t{task_hash}\t-\t{name}\t{status}\t0\n" for task_id, (task_hash, name, status) in enumerate(rows)
+    ]
+    trace_file.write_text(HEADER + "".join(lines))
+    return trace_file
+
+
+def test_task_index(tmp_path: Path) -> None:
+    """Test failed, superseded and resume-critical tasks across two runs."""
+    _write_trace(
+        output_folder=tmp_path,
+        timestamp="2025-01-01_10-00-00",
+        rows=[
+            ("aa/111111", "RNASEQ:STAR (s1)", "COMPLETED"),
+            ("bb/222222", "RNASEQ:QUANT (s1)", "FAILED"),
+            ("cc/333333", "RNASEQ:QUANT (s1)", "COMPLETED"),
+            ("dd/444444", "RNASEQ:MULTIQC", "COMPLETED"),
+        ],
+    )
+    _write_trace(
+        output_folder=tmp_path,
+        timestamp="2025-01-02_10-00-00",
+        rows=[
+            ("aa/111111", "RNASEQ:STAR (s1)", "CACHED"),
+            ("cc/333333", "RNASEQ:QUANT (s1)", "CACHED"),
+            ("ee/555555", "RNASEQ:MULTIQC", "COMPLETED"),
+        ],
+    )
+    task_index = trace.TaskIndex.from_trace_files(trace_files=trace.find_trace_files(output_folder=tmp_path))
+
+    assert task_index.resume_critical() == {"aa/111111", "cc/333333", "ee/555555"}
+    assert task_index.last_successful_run() == 1
+    assert task_index.get(task_folder=Path("work/bb/2222223f0e"))[0].process == "RNASEQ:QUANT"
+    assert task_index.get(task_folder=Path("work/aa/111111ab"))[0].tag == "s1"
+
+
+def test_clean_failed(tmp_path: Path) -> None:
+    """Test that a selective clean keeps the resume-critical and the untraced task folders."""
+    _write_trace(
+        output_folder=tmp_path / "output",
+        timestamp="2025-01-01_10-00-00",
+        rows=[
+            ("aa/111111", "RNASEQ:STAR (s1)", "COMPLETED"),
+            ("bb/222222", "RNASEQ:QUANT (s1)", "FAILED"),
+            ("cc/333333", "RNASEQ:QUANT (s1)", "COMPLETED"),
+        ],
+    )
+    work_folder: Path = tmp_path / "run" / "work"
+    for task_folder in ["aa/1111110000", "bb/2222220000", "cc/3333330000", "ff/6666660000"]:
+        (work_folder / task_folder).mkdir(parents=True)
+        (work_folder / task_folder / ".command.sh").write_text("echo")
+
+    FileManager.clean(wf_folder=tmp_path, workers=2, mode=CleanMode.FAILED)
+
+    assert sorted(path.parent.name for path in work_folder.glob("*/*")) == ["aa", "cc", "ff"]
+    assert not (work_folder / "bb").exists()
+
+
+def test_clean_stale(tmp_path: Path) -> None:
+    """Test that a stale clean only removes the traced task folders not used by the last successful run."""
+    _write_trace(
+        output_folder=tmp_path / "output",
+        timestamp="2025-01-01_10-00-00",
+        rows=[("aa/111111", "RNASEQ:STAR (s1)", "COMPLETED")],
+    )
+    last_trace: Path = _write_trace(
+        output_folder=tmp_path / "output",
+        timestamp="2025-01-02_10-00-00",
+        rows=[("ee/555555", "RNASEQ:STAR (s1)", "COMPLETED")],
+    )
+    work_folder: Path = tmp_path / "run" / "work"
+    for task_folder in ["aa/1111110000", "ee/5555550000", "ff/6666660000"]:
+        (work_folder / task_folder).mkdir(parents=True)
+        os.utime(work_folder / task_folder, (0, 0))
+
+    # without the start time of the last run, nothing is removed
+    unknown: Path = last_trace.with_name("execution_trace_last.txt")
+    last_trace.rename(unknown)
+    with pytest.raises(SystemExit):
+        FileManager.clean(wf_folder=tmp_path, workers=2, mode=CleanMode.STALE)
+    assert sorted(path.parent.name for path in work_folder.glob("*/*")) == ["aa", "ee", "ff"]
+
+    unknown.rename(last_trace)
+    FileManager.clean(wf_folder=tmp_path, workers=2, mode=CleanMode.STALE)
+    assert sorted(path.parent.name for path in work_folder.glob("*/*")) == ["ee", "ff"]
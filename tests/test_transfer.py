@@ -0,0 +1,40 @@
+"""Provide tests for the parallel, resumable and verified transfer of files."""
+
+from pathlib import Path
+
+from nfch.transfer import DONE_SUFFIX, PARTIAL_SUFFIX, Transfer, plan
+
+RANGE_SIZE: int = 1000
+
+
+def test_transfer(tmp_path: Path) -> None:
+    """Test that files are copied by ranges, that an interrupted copy resumes and that copies in place are skipped."""
+    source: Path = tmp_path / "genome"
+    (source / "index" / "star").mkdir(parents=True)
+    (source / "index" / "star" / "SA").write_bytes(bytes(range(256)) * 20)
+    (source / "index" / "star" / "chrName.txt").write_text("chr1\n")
+    (source / "genes.bed").write_bytes(b"")
+    files: list[Path] = [path for path in source.rglob(pattern="*") if path.is_file()]
+    destination: Path = tmp_path / "references" / "build"
+
+    # a previous run copied the first range of the suffix array only
+    partial: Path = destination / "index" / "star" / f"SA{PARTIAL_SUFFIX}"
+    partial.parent.mkdir(parents=True)
+    partial.write_bytes((source / "index" / "star" / "SA").read_bytes()[:RANGE_SIZE])
+    partial.with_name(f"SA{DONE_SUFFIX}").write_text(f"0 {RANGE_SIZE}\n")
+
+    transfer: Transfer = Transfer(
+        transfers=plan(source_folder=source, destination_folder=destination, files=files),
+        workers=4,
+        range_size=RANGE_SIZE,
+    )
+    assert transfer.transfers[0].destination == destination / "index" / "star" / "SA"
+    assert transfer.run() == (3, 0, 256 * 20 - RANGE_SIZE + 5, RANGE_SIZE)
+    for file_path in files:
+        copy: Path = destination / file_path.relative_to(source)
+        assert copy.read_bytes() == file_path.read_bytes()
+        assert copy.stat().st_mtime_ns == file_path.stat().st_mtime_ns
+    assert not list(destination.rglob(pattern="*.nfch-partial*"))
+
+    transfer = Transfer(transfers=plan(source_folder=source, destination_folder=destination, files=files))
+    assert transfer.run() == (0, 3, 0, 0)